@@ -0,0 +1,65 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark exporting CX element by element versus a column at a time.
+
+Run with:
+
+.. code-block:: sh
+
+   $ python benchmarks/columnar_export.py --nodes 100000 --edges 300000 --attributes 1000000
+
+The triples are only counted, so the numbers show the cost of the exporters themselves rather than of a store or
+serializer. Building the columns is timed separately.
+"""
+
+import time
+
+import click
+from cx_rdf.columnar import ColumnarCx
+from cx_rdf.io import ALLOWED_POLICIES, cx_columns_to_rdf_graph, cx_to_rdf_graph
+from cx_rdf.sinks import CountingSink
+
+
+def make_cx(n_nodes: int, n_edges: int, n_attributes: int):
+    """Make a CX document with the given number of nodes, edges between them, and node attributes."""
+    return [
+        {'nodes': [{'@id': i, 'n': f'node {i}'} for i in range(n_nodes)]},
+        {'edges': [
+            {'@id': i, 's': i % n_nodes, 't': (7 * i + 1) % n_nodes, 'i': 'interacts with'}
+            for i in range(n_edges)
+        ]},
+        {'nodeAttributes': [
+            {'po': i % n_nodes, 'n': f'attribute {i % 20}', 'v': f'value {i % 1000}'}
+            for i in range(n_attributes)
+        ]},
+    ]
+
+
+@click.command()
+@click.option('--nodes', type=int, default=100_000, show_default=True)
+@click.option('--edges', type=int, default=300_000, show_default=True)
+@click.option('--attributes', type=int, default=1_000_000, show_default=True)
+@click.option('--policy', 'policies', type=click.Choice(ALLOWED_POLICIES), multiple=True,
+              default=['aspect', 'predicate'], show_default=True)
+def main(nodes: int, edges: int, attributes: int, policies):
+    """Compare the throughput of exporting elements and columns."""
+    cx_json = make_cx(nodes, edges, attributes)
+    click.echo(f'{nodes:,} nodes, {edges:,} edges, {attributes:,} node attributes')
+
+    start = time.perf_counter()
+    columnar = ColumnarCx.from_cx(cx_json)
+    click.echo(f'built columns in {time.perf_counter() - start:.2f}s')
+
+    for policy in policies:
+        for name, convert, source in (('elements', cx_to_rdf_graph, cx_json),
+                                      ('columns', cx_columns_to_rdf_graph, columnar)):
+            sink = CountingSink()
+            start = time.perf_counter()
+            convert(source, policy=policy, sink=sink)
+            elapsed = time.perf_counter() - start
+            click.echo(f'{policy:>9} {name:>8}: {sink.count:,} triples in {elapsed:.2f}s '
+                       f'({sink.count / elapsed:,.0f} triples/s)')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,54 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark inserting triples into an RDFLib graph one at a time versus in batches.
+
+Run with:
+
+.. code-block:: sh
+
+   $ python benchmarks/graph_batching.py --attributes 1000000 --store default
+
+Batching only pays off for stores that implement their own bulk insertion. RDFLib's in-memory stores add each
+triple one at a time either way, so they're expected to show no difference.
+"""
+
+import time
+
+import click
+from cx_rdf.io import cx_to_rdf_graph
+from rdflib import Graph
+
+
+def make_cx(n_nodes: int, n_attributes: int):
+    """Make a CX document with the given number of nodes and node attributes spread evenly over them."""
+    return [
+        {'nodes': [{'@id': i, 'n': f'node {i}'} for i in range(n_nodes)]},
+        {'nodeAttributes': [
+            {'po': i % n_nodes, 'n': f'attribute {i % 20}', 'v': f'value {i}'}
+            for i in range(n_attributes)
+        ]},
+    ]
+
+
+@click.command()
+@click.option('--nodes', type=int, default=100_000, show_default=True)
+@click.option('--attributes', type=int, default=1_000_000, show_default=True)
+@click.option('--policy', default='aspect', show_default=True)
+@click.option('--store', default='default', show_default=True, help='The name of an RDFLib store plugin')
+@click.option('--batch-size', 'batch_sizes', type=int, multiple=True, default=[1, 10_000], show_default=True)
+def main(nodes: int, attributes: int, policy: str, store: str, batch_sizes):
+    """Compare the throughput of converting into a graph with different batch sizes."""
+    cx_json = make_cx(nodes, attributes)
+    click.echo(f'{nodes:,} nodes, {attributes:,} node attributes, {policy} policy, {store} store')
+
+    for batch_size in batch_sizes:
+        start = time.perf_counter()
+        graph = cx_to_rdf_graph(cx_json, graph=Graph(store=store), policy=policy, batch_size=batch_size)
+        elapsed = time.perf_counter() - start
+        click.echo(f'batch size {batch_size:>7,}: {len(graph):,} triples in {elapsed:.2f}s '
+                   f'({len(graph) / elapsed:,.0f} triples/s)')
+        del graph
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,89 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark converting a big ontology to CX from the quadstore versus class by class.
+
+Run with:
+
+.. code-block:: sh
+
+   $ python benchmarks/owl_conversion.py --classes 100000
+
+A synthetic ontology shaped like GO is written to a temporary RDF/XML file: each class has a label, one or two named
+superclasses, and a restriction. Loading it with :mod:`owlready2` is timed separately from converting it, which is
+done both with :func:`cx_rdf.owl.convert_ontology` and by visiting each class as an :mod:`owlready2` object with
+:func:`cx_rdf.owl.ensure_node`, like the converter used to.
+"""
+
+import os
+import tempfile
+import time
+
+import click
+from cx_rdf.owl import convert_ontology, ensure_node
+from ndex2 import NiceCXNetwork
+from owlready2 import EntityClass, Thing, World
+
+BASE_IRI = 'http://example.org/synthetic.owl'
+
+
+def write_ontology(path: str, n_classes: int) -> None:
+    """Write an ontology with the given number of classes to an RDF/XML file."""
+    with open(path, 'w') as file:
+        file.write(
+            '<?xml version="1.0"?>\n'
+            '<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"'
+            ' xmlns:rdfs="http://www.w3.org/2000/01/rdf-schema#"'
+            f' xmlns:owl="http://www.w3.org/2002/07/owl#" xml:base="{BASE_IRI}">\n'
+            f'<owl:Ontology rdf:about="{BASE_IRI}"/>\n'
+            '<owl:ObjectProperty rdf:about="#part_of"/>\n'
+        )
+        for i in range(n_classes):
+            superclasses = {i // 2, i // 3} if i else set()
+            file.write(f'<owl:Class rdf:about="#C{i}"><rdfs:label>class {i}</rdfs:label>')
+            file.writelines(f'<rdfs:subClassOf rdf:resource="#C{j}"/>' for j in sorted(superclasses))
+            if i:
+                file.write(
+                    '<rdfs:subClassOf><owl:Restriction><owl:onProperty rdf:resource="#part_of"/>'
+                    f'<owl:someValuesFrom rdf:resource="#C{i // 5}"/></owl:Restriction></rdfs:subClassOf>'
+                )
+            file.write('</owl:Class>\n')
+        file.write('</rdf:RDF>\n')
+
+
+def convert_with_objects(onto) -> NiceCXNetwork:
+    """Convert an ontology by visiting each class and its superclasses as :mod:`owlready2` objects."""
+    cx = NiceCXNetwork()
+    entities = {}
+    for entity_class in onto.classes():
+        source = ensure_node(cx, entities, entity_class)
+        for super_class in entity_class.is_a:
+            if super_class is not Thing and isinstance(super_class, EntityClass):
+                cx.create_edge(edge_source=source, edge_target=ensure_node(cx, entities, super_class),
+                               edge_interaction='subClassOf')
+    return cx
+
+
+@click.command()
+@click.option('--classes', type=int, default=100_000, show_default=True)
+def main(classes: int):
+    """Compare converting an ontology from the quadstore and class by class."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'synthetic.owl')
+        start = time.perf_counter()
+        write_ontology(path, classes)
+        click.echo(f'wrote {classes:,} classes ({os.path.getsize(path) / 1024 ** 2:.1f} MiB) '
+                   f'in {time.perf_counter() - start:.2f}s')
+
+        start = time.perf_counter()
+        onto = World().get_ontology(path).load()
+        click.echo(f'loaded in {time.perf_counter() - start:.2f}s')
+
+        for name, convert in (('quadstore', convert_ontology), ('objects', convert_with_objects)):
+            start = time.perf_counter()
+            cx = convert(onto)
+            elapsed = time.perf_counter() - start
+            click.echo(f'{name:>9}: {len(cx.nodes):,} nodes and {len(cx.edges):,} edges in {elapsed:.2f}s')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,151 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark how long the ``cx_to_rdf`` command takes to start.
+
+Run with:
+
+.. code-block:: sh
+
+   $ python benchmarks/startup.py --compare benchmarks/startup_baseline.json
+
+The command is run the way its console script runs it, in a new interpreter each time, like it is when a shell
+pipeline converts one file after another. Each case is timed from starting the interpreter to it exiting:
+
+- ``python``: an interpreter that does nothing, which the other cases can't beat
+- ``help``: ``cx_to_rdf --help``, which is only the imports
+- ``convert``: converting a small synthetic network to N-Triples, which is mostly the imports
+
+It also lists the slow optional dependencies each case imported, which should be none of them.
+
+Save the results with ``--save`` to make a new baseline, and compare against one with ``--compare``, which exits
+with an error if any case got slower than the tolerance allows. Baselines are only comparable on the same machine.
+"""
+
+import json
+import os
+import platform
+import subprocess
+import sys
+import tempfile
+import time
+from typing import Dict, List
+
+import click
+from cx_rdf.synthetic import generate_cx
+from cx_rdf.utils import get_version
+
+#: What the console script for ``cx_to_rdf`` runs
+ENTRY_POINT = 'import sys; from cx_rdf.cli import cx_to_rdf; sys.exit(cx_to_rdf())'
+
+#: Print which of the slow dependencies were imported once the command is done
+REPORT_IMPORTS = (
+    'import atexit, json, sys; '
+    'atexit.register(lambda: print(json.dumps(sorted(set({!r}) & set(sys.modules))), file=sys.stderr))'
+)
+
+#: The dependencies that take much longer to import than a small network takes to convert
+SLOW_DEPENDENCIES = ('ndex2', 'owlready2', 'pandas', 'networkx')
+
+#: The size of the network for the ``convert`` case, as arguments to :func:`cx_rdf.synthetic.generate_cx`
+SMALL_NETWORK = dict(nodes=50, edges=150, node_attributes=150, edge_attributes=50, citations=5, supports=5)
+
+
+def _time_command(arguments: List[str]) -> float:
+    """Run a command in a new interpreter and time it from start to exit."""
+    start = time.perf_counter()
+    subprocess.run([sys.executable, *arguments], check=True, stdout=subprocess.DEVNULL, stderr=subprocess.DEVNULL)
+    return time.perf_counter() - start
+
+
+def _get_imported(arguments: List[str]) -> List[str]:
+    """Run the entry point and get which of the slow dependencies it imported."""
+    code = REPORT_IMPORTS.format(SLOW_DEPENDENCIES) + '; ' + ENTRY_POINT
+    result = subprocess.run([sys.executable, '-c', code, *arguments], check=True, stdout=subprocess.DEVNULL,
+                            stderr=subprocess.PIPE, universal_newlines=True)
+    return json.loads(result.stderr.strip().splitlines()[-1])
+
+
+def run_startup(path: str, repeat: int = 5) -> List[Dict]:
+    """Time each case, keeping the fastest of the repeats.
+
+    :param path: The path to a small CX file to convert
+    :param repeat: The number of times to run each case
+    """
+    cases = [
+        ('python', ['-c', 'pass'], None),
+        ('help', ['-c', ENTRY_POINT, '--help'], ['--help']),
+        ('convert', ['-c', ENTRY_POINT, '-i', path, '-f', 'nt', '-o', os.devnull],
+         ['-i', path, '-f', 'nt', '-o', os.devnull]),
+    ]
+    results = []
+    for name, arguments, entry_point_arguments in cases:
+        result = dict(case=name, seconds=min(_time_command(arguments) for _ in range(repeat)))
+        if entry_point_arguments is not None:
+            result['imported'] = _get_imported(entry_point_arguments)
+        results.append(result)
+    return results
+
+
+def _format_result(result: Dict) -> str:
+    text = f'{result["case"]:>8}: {result["seconds"] * 1000:,.0f} ms'
+    if result.get('imported'):
+        text += f' (imported {", ".join(result["imported"])})'
+    return text
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """Compare results with a baseline, giving a message for each case that got slower than the tolerance.
+
+    Importing any of the slow dependencies is a regression too, no matter how long it took.
+    """
+    baseline_results = {result['case']: result for result in baseline['results']}
+    regressions = []
+    for result in results:
+        if result.get('imported'):
+            regressions.append(f'{result["case"]} imported {", ".join(result["imported"])}')
+
+        old = baseline_results.get(result['case'])
+        if old is None:
+            continue
+        ratio = result['seconds'] / old['seconds']
+        click.echo(f'{result["case"]:>8}: {ratio:.2f}x the baseline time')
+        if ratio > 1 + tolerance:
+            regressions.append(f'{result["case"]} took {ratio:.2f}x as long as the baseline')
+    return regressions
+
+
+@click.command()
+@click.option('--repeat', type=click.IntRange(min=1), default=5, show_default=True,
+              help='Number of times to run each case, keeping the fastest')
+@click.option('--save', type=click.File('w'), help='Save the results as a new baseline')
+@click.option('--compare', 'baseline', type=click.File(), help='Compare the results with a saved baseline')
+@click.option('--tolerance', type=float, default=0.25, show_default=True,
+              help='How much slower than the baseline a case can be, as a fraction of its time')
+def main(repeat: int, save, baseline, tolerance: float):
+    """Benchmark how long the cx_to_rdf command takes to start."""
+    with tempfile.TemporaryDirectory() as directory:
+        path = os.path.join(directory, 'small.cx')
+        with open(path, 'w') as file:
+            json.dump(generate_cx(**SMALL_NETWORK), file)
+        results = run_startup(path, repeat=repeat)
+
+    for result in results:
+        click.echo(_format_result(result))
+
+    if save is not None:
+        json.dump(dict(
+            version=get_version(),
+            python=platform.python_version(),
+            machine=platform.machine(),
+            results=results,
+        ), save, indent=2)
+        save.write('\n')
+
+    if baseline is not None:
+        regressions = compare(results, json.load(baseline), tolerance)
+        if regressions:
+            raise click.ClickException('\n'.join(regressions))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,159 @@
+# -*- coding: utf-8 -*-
+
+"""Benchmark converting synthetic networks with every policy to every output format.
+
+Run with:
+
+.. code-block:: sh
+
+   $ python benchmarks/suite.py --scale small --compare benchmarks/baseline.json
+
+Each conversion goes through :func:`cx_rdf.io.cx_file_to_rdf_file`, like the ``cx_to_rdf`` command, from CX JSON
+in memory to ``os.devnull``. It runs in a new process so its peak memory can be measured on its own. The peak memory
+is how much the process grew while converting, on top of the generated network. The number of triples is counted
+separately, so the throughput is the number of triples over the time it took to convert and serialize them.
+
+Save the results with ``--save`` to make a new baseline, and compare against one with ``--compare``, which exits
+with an error if any case got slower than the tolerance allows. Baselines are only comparable on the same machine.
+"""
+
+from concurrent.futures import ProcessPoolExecutor
+import io
+import json
+import os
+import platform
+import time
+from typing import Dict, Iterable, List
+
+import click
+from cx_rdf.cli import EXPORT_FORMATS
+from cx_rdf.io import ALLOWED_POLICIES, cx_file_to_rdf_file, cx_to_rdf_graph
+from cx_rdf.sinks import CountingSink
+from cx_rdf.stats import get_peak_memory
+from cx_rdf.synthetic import generate_cx
+from cx_rdf.utils import get_version
+
+#: The sizes of the networks for each scale, as arguments to :func:`cx_rdf.synthetic.generate_cx`
+SCALES = {
+    'small': dict(nodes=500, edges=1500, node_attributes=1500, edge_attributes=500, citations=25, supports=25),
+    'medium': dict(nodes=5000, edges=15000, node_attributes=15000, edge_attributes=5000, citations=250, supports=250),
+    'large': dict(nodes=50000, edges=150000, node_attributes=150000, edge_attributes=50000, citations=2500,
+                  supports=2500),
+}
+
+#: Minting IRIs lets the predicate policy's edge predicates be written as RDF/XML
+BASE_IRI = 'http://example.com/network/'
+
+
+def _run_case(text: str, policy: str, rdf_format: str) -> Dict:
+    """Convert a network in a new process, timing it and measuring how much the process grew."""
+    before = get_peak_memory()
+    start = time.perf_counter()
+    try:
+        with open(os.devnull, 'w') as destination:
+            cx_file_to_rdf_file(io.StringIO(text), destination, policy=policy, rdf_format=rdf_format,
+                                base_iri=BASE_IRI)
+    except Exception as e:
+        return dict(error=f'{type(e).__name__}: {e}')
+    seconds = time.perf_counter() - start
+    after = get_peak_memory()
+    return dict(seconds=seconds, peak_memory=None if before is None else after - before)
+
+
+def run_case(text: str, policy: str, rdf_format: str) -> Dict:
+    """Convert a network in a new process."""
+    with ProcessPoolExecutor(max_workers=1) as executor:
+        return executor.submit(_run_case, text, policy, rdf_format).result()
+
+
+def run_suite(cx_json, policies: List[str], formats: List[str], repeat: int = 1) -> Iterable[Dict]:
+    """Benchmark each policy with each format, keeping the fastest of the repeats."""
+    text = json.dumps(cx_json)
+    for policy in policies:
+        sink = CountingSink()
+        cx_to_rdf_graph(cx_json, policy=policy, sink=sink, base_iri=BASE_IRI)
+
+        for rdf_format in formats:
+            runs = [run_case(text, policy, rdf_format) for _ in range(repeat)]
+            result = dict(policy=policy, format=rdf_format, triples=sink.count)
+            if 'error' in runs[0]:
+                result.update(runs[0])
+            else:
+                result.update(min(runs, key=lambda run: run['seconds']))
+                result['triples_per_second'] = sink.count / result['seconds']
+            yield result
+
+
+def _format_result(result: Dict) -> str:
+    case = f'{result["policy"]:>9} {result["format"]:>10}'
+    if 'error' in result:
+        return f'{case}: {result["error"]}'
+    memory = '' if result['peak_memory'] is None else f', {result["peak_memory"] / 1024 ** 2:,.1f} MiB peak'
+    return (f'{case}: {result["triples"]:,} triples in {result["seconds"]:.3f}s '
+            f'({result["triples_per_second"]:,.0f} triples/s{memory})')
+
+
+def compare(results: List[Dict], baseline: Dict, tolerance: float) -> List[str]:
+    """Compare results with a baseline, giving a message for each case that got slower than the tolerance."""
+    baseline_results = {
+        (result['policy'], result['format']): result
+        for result in baseline['results']
+    }
+    regressions = []
+    for result in results:
+        old = baseline_results.get((result['policy'], result['format']))
+        if old is None or 'seconds' not in old or 'seconds' not in result:
+            continue
+        ratio = result['seconds'] / old['seconds']
+        click.echo(f'{result["policy"]:>9} {result["format"]:>10}: {ratio:.2f}x the baseline time')
+        if ratio > 1 + tolerance:
+            regressions.append(f'{result["policy"]} {result["format"]} took {ratio:.2f}x as long as the baseline')
+    return regressions
+
+
+@click.command()
+@click.option('--scale', type=click.Choice(SCALES), default='small', show_default=True)
+@click.option('--seed', type=int, default=0, show_default=True)
+@click.option('--policy', 'policies', type=click.Choice(ALLOWED_POLICIES), multiple=True,
+              default=ALLOWED_POLICIES, show_default=True)
+@click.option('--format', 'formats', type=click.Choice(EXPORT_FORMATS), multiple=True, default=EXPORT_FORMATS,
+              show_default=True)
+@click.option('--repeat', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Number of times to run each case, keeping the fastest')
+@click.option('--save', type=click.File('w'), help='Save the results as a new baseline')
+@click.option('--compare', 'baseline', type=click.File(), help='Compare the results with a saved baseline')
+@click.option('--tolerance', type=float, default=0.25, show_default=True,
+              help='How much slower than the baseline a case can be, as a fraction of its time')
+def main(scale: str, seed: int, policies, formats, repeat: int, save, baseline, tolerance: float):
+    """Benchmark converting a synthetic network with each policy to each format."""
+    parameters = dict(SCALES[scale], seed=seed)
+    cx_json = generate_cx(**parameters)
+    click.echo(f'{scale} network: ' + ', '.join(f'{value:,} {key}' for key, value in parameters.items()))
+
+    results = []
+    for result in run_suite(cx_json, list(policies), list(formats), repeat=repeat):
+        click.echo(_format_result(result))
+        results.append(result)
+
+    if save is not None:
+        json.dump(dict(
+            scale=scale,
+            parameters=parameters,
+            version=get_version(),
+            python=platform.python_version(),
+            machine=platform.machine(),
+            results=results,
+        ), save, indent=2)
+        save.write('\n')
+
+    if baseline is not None:
+        baseline = json.load(baseline)
+        if baseline['parameters'] != parameters:
+            raise click.UsageError('the baseline was made with a different network')
+        regressions = compare(results, baseline, tolerance)
+        if regressions:
+            raise click.ClickException('\n'.join(regressions))
+
+
+if __name__ == '__main__':
+    main()
@@ -41,6 +41,10 @@ TESTS_REQUIRE = [
 ENTRY_POINTS = {
     'console_scripts': [
         'cx_to_rdf = cx_rdf.cli:cx_to_rdf',
+        'cx_to_rdf_batch = cx_rdf.cli:batch',
+        'cx_to_rdf_delta = cx_rdf.cli:delta',
+        'cx_to_rdf_fetch = cx_rdf.cli:fetch',
+        'rdf_to_cx = cx_rdf.cli:rdf_to_cx',
         'owl_to_cx = cx_rdf.cli:owl_to_cx',
     ]
 }
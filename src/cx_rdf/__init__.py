@@ -19,16 +19,21 @@ CX-RDF installs a command line utility for converting a CX file to RDF. Example
    $ cat my_network.cx | cx_to_rdf > my_network.xml
 
 The ``-f`` option can be used to specify the format RDFLib uses to serialize. It defaults to
-``xml``, but other formats like ``turtle`` are often preferred.
+``xml``, but other formats like ``turtle`` are often preferred. The ``nt`` and ``nquads`` formats are written
+while the CX is read, so they use the least memory for large networks.
 """
 
 from .constants import CX
-from .io import cx_to_rdf_graph
+from .importer import rdf_to_cx
+from .io import cx_file_to_rdf_graph, cx_to_rdf_graph, iter_triples
 from .utils import get_version
 
 __all__ = [
     'CX',
     'cx_to_rdf_graph',
+    'cx_file_to_rdf_graph',
+    'iter_triples',
+    'rdf_to_cx',
     'get_version'
 ]
 
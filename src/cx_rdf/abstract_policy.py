@@ -1,24 +1,38 @@
 # -*- coding: utf-8 -*-
 
-"""Functions for exporting CX to RDF."""
-
+"""Functions for exporting CX to RDF.
+
+The abstract policy describes each key and value of an element with an entry node of its own, which takes five
+triples. The compact abstract policy instead mints a predicate for each key of each aspect, like
+``<http://ndexbio.org/rdfs/key/nodes/n>`` for the names of nodes, so each key and value takes a single triple. The
+predicates are declared the first time they're used, with their key by ``cx:has_key`` and linked from their aspect by
+``cx:aspect_has_key``. Strings, numbers, and booleans become literals of the matching XSD datatype, and lists,
+objects, and nulls become ``rdf:JSON`` literals, so the elements can be rebuilt exactly. It's used by giving the
+``compact`` policy to :func:`cx_rdf.cx_to_rdf_graph`.
+"""
+
+import json
 import logging
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
+from urllib.parse import quote, unquote
 
-from rdflib import BNode, Graph, Literal, RDF, RDFS
+from rdflib import Graph, Literal, URIRef
+from rdflib.term import Node
 
-from .constants import CX
-from .typing import CxType
-from .utils import bind_cx_namespace, iterate_aspect_fragments
+from .constants import CX, CX_KEY, RDF_JSON, RDF_PROPERTY, RDF_TYPE
+from .exporter_base import Exporter
+from .sinks import TripleSink
+from .typing import CxElementsType, CxType
 
 __all__ = [
     'export',
+    'export_elements',
 ]
 
 log = logging.getLogger(__name__)
 
 
-def export(cx_json: CxType, graph: Optional[Graph] = None) -> Graph:
+def export(cx_json: CxType, graph: Optional[Graph] = None, sink: Optional[TripleSink] = None) -> Optional[Graph]:
     """Convert a CX JSON object to an RDFLib :class:`rdflib.Graph`.
 
     This policy for serializing CX to RDF is the most general, and only manages to encode the structure of a CX
@@ -26,66 +40,164 @@ def export(cx_json: CxType, graph: Optional[Graph] = None) -> Graph:
 
     :param cx_json: A CX JSON object
     :param graph: An RDFLib graph (to append to)
-    :return: An RDFLib graph
+    :param sink: An optional destination for the triples. Overrides the graph if given.
+    :return: The graph that was filled, or None if a sink without one was given
+    """
+    exporter = _AbstractExporter(graph=graph, sink=sink)
+    return exporter.export(cx_json)
+
+
+def export_elements(
+    elements: CxElementsType,
+    graph: Optional[Graph] = None,
+    sink: Optional[TripleSink] = None,
+) -> Optional[Graph]:
+    """Convert a stream of CX aspect names and elements to an RDFLib :class:`rdflib.Graph`.
+
+    :param elements: An iterable of pairs of aspect names and elements
+    :param graph: An RDFLib graph (to append to)
+    :param sink: An optional destination for the triples. Overrides the graph if given.
+    :return: The graph that was filled, or None if a sink without one was given
     """
-    if graph is None:
-        graph = Graph()
+    exporter = _AbstractExporter(graph=graph, sink=sink)
+    return exporter.export_elements(elements)
+
+
+class _AbstractExporter(Exporter):
+    """A class to mediate shared state in the export function."""
+
+    __slots__ = ()
+
+    policy = CX.abstract_network
+
+    def iter_chunk_entities(self, aspect_name: str, elements: Iterable[Dict]) -> Iterable[Tuple[str, Any]]:
+        """Iterate over the entities that adding the elements would declare, which is only their aspect."""
+        yield 'aspect', aspect_name
+
+    def extend_element(self, aspect_name: str, element: Dict) -> None:
+        """Add an element from any aspect to the graph."""
+        _handle_aspect_element(self, aspect_name, element)
+
+
+class _CompactAbstractExporter(_AbstractExporter):
+    """An exporter for the abstract policy that uses a predicate for each key of an aspect's elements."""
+
+    __slots__ = ('keys', '_aspect_keys')
+
+    policy = CX.compact_abstract_network
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        #: keep track of the declared predicates by the quoted aspect name and key, like ``nodes/n``
+        self.keys: Dict[str, URIRef] = {}
+        #: look up the predicates by aspect name then key, without quoting
+        self._aspect_keys: Dict[str, Dict[str, URIRef]] = {}
+
+    def iter_chunk_entities(self, aspect_name: str, elements: Iterable[Dict]) -> Iterable[Tuple[str, Any]]:
+        """Iterate over the entities that adding the elements would declare, which are their aspect and keys."""
+        yield 'aspect', aspect_name
+        keys = {key for element in elements for key in element}
+        for key in sorted(keys, key=str):
+            yield 'key', _get_key_identifier(aspect_name, key)
+
+    def _get_entity_registry(self, kind: str):
+        if kind == 'key':
+            return self.keys
+        return super()._get_entity_registry(kind)
+
+    def adopt_entity(self, kind: str, identifier: Any) -> Node:
+        """Register an entity that's declared elsewhere, without adding any triples."""
+        if kind == 'key':
+            predicate = self.keys[identifier] = CX_KEY[identifier]
+            return predicate
+        return super().adopt_entity(kind, identifier)
+
+    def ensure_entity(self, kind: str, identifier: Any) -> Node:
+        """Get an entity, like a node, an aspect, or a key, declaring it if it hasn't been yet."""
+        if kind == 'key':
+            aspect_name, key = map(unquote, identifier.split('/', 1))
+            return self.ensure_key(aspect_name, key)
+        return super().ensure_entity(kind, identifier)
+
+    def iterate_entities(self) -> Iterable[Tuple[str, Any]]:
+        """Iterate over the kinds and identifiers of the entities that have been declared, including the keys."""
+        yield from super().iterate_entities()
+        for identifier in self.keys:
+            yield 'key', identifier
 
-    bind_cx_namespace(graph)
+    def ensure_key(self, aspect_name: str, key: str) -> URIRef:
+        """Get the predicate for a key of an aspect's elements, declaring it if it hasn't been yet."""
+        identifier = _get_key_identifier(aspect_name, key)
+        predicate = self.keys.get(identifier)
+        if predicate is None:
+            predicate = self.keys[identifier] = CX_KEY[identifier]
+            self.declaration_sink.add((predicate, RDF_TYPE, RDF_PROPERTY))
+            self.declaration_sink.add((predicate, CX.has_key, self.terms.literal(key)))
+            self.declaration_sink.add((self.ensure_aspect(aspect_name), CX.aspect_has_key, predicate))
+        self._aspect_keys.setdefault(aspect_name, {})[key] = predicate
+        return predicate
 
-    document = BNode()
-    graph.add((document, RDF.type, CX.network))
-    graph.add((document, CX.policy, CX.abstract_network))
+    def extend_element(self, aspect_name: str, element: Dict) -> None:
+        """Add an element from any aspect to the graph, with a triple for each of its keys."""
+        aspect_node = self.ensure_aspect(aspect_name)
+        aspect_keys = self._aspect_keys.get(aspect_name)
+        if aspect_keys is None:
+            aspect_keys = self._aspect_keys[aspect_name] = {}
 
-    aspects = {}
+        element_node = self.mint_element(aspect_name)
+        add = self.sink.add
+        literal = self.terms.literal
+        # the type of the element is implied by it being an element of an aspect, so it's left out
+        add((aspect_node, CX.has_element, element_node))
 
-    for aspect_name, elements in iterate_aspect_fragments(cx_json):
-        _handle_aspects(graph, aspects, document, aspect_name, elements)
+        for key, value in element.items():
+            predicate = aspect_keys.get(key)
+            if predicate is None:
+                predicate = self.ensure_key(aspect_name, key)
+            add((element_node, predicate, literal(value) if type(value) in _SCALAR_TYPES else _json_literal(value)))
 
-    return graph
 
+#: The types of values that become literals of the matching XSD datatype, rather than JSON
+_SCALAR_TYPES = frozenset((str, bool, int, float))
 
-def _handle_aspects(graph, aspects, document, aspect_name, elements):
-    aspect_node = _get_aspect_node(graph, aspects, document, aspect_name)
-    _handle_elements(graph, aspect_node, elements)
 
+def _json_literal(value: Any) -> Literal:
+    """Get a JSON literal for a list, an object, or a null."""
+    return Literal(json.dumps(value, ensure_ascii=False, separators=(',', ':')), datatype=RDF_JSON)
 
-def _get_aspect_node(graph, aspects, document, aspect_name):
-    aspect_node = aspects.get(aspect_name)
 
-    if aspect_node is None:
-        aspect_node = aspects[aspect_name] = BNode()
-        graph.add((aspect_node, RDF.type, CX.aspect))
-        graph.add((document, CX.has_aspect, aspect_node))
-        graph.add((aspect_node, RDFS.label, Literal(aspect_name)))
+def _get_key_identifier(aspect_name: str, key: str) -> str:
+    """Get the identifier of a key, which is also the local name of its predicate."""
+    return f'{quote(aspect_name, safe="")}/{quote(str(key), safe="")}'
 
-    return aspect_node
 
+def _handle_aspect_element(exporter: Exporter, aspect_name: str, element: Dict):
+    aspect_node = _get_aspect_node(exporter, aspect_name)
+    _handle_element(exporter, aspect_node, aspect_name, element)
 
-def _handle_elements(graph: Graph, aspect_node: BNode, elements: List[Dict]):
-    """Handle all attributes from a CX JSON aspect."""
-    for element in elements:
-        _handle_element(graph, aspect_node, element)
 
+def _get_aspect_node(exporter: Exporter, aspect_name: str):
+    return exporter.ensure_aspect(aspect_name)
 
-def _handle_element(graph: Graph, aspect_node: BNode, element: Dict):
+
+def _handle_element(exporter: Exporter, aspect_node: Node, aspect_name: str, element: Dict):
     """Handle an attribute from a CX JSON aspect.
 
-    Creates a blank node, registers it to the aspect as an entry, then adds its data.
+    Creates a node, registers it to the aspect as an entry, then adds its data.
     """
-    element_node = BNode()
-    graph.add((element_node, RDF.type, CX.attribute))
-    graph.add((aspect_node, CX.has_element, element_node))
+    element_node = exporter.mint_element(aspect_name)
+    exporter.sink.add((element_node, RDF_TYPE, CX.attribute))
+    exporter.sink.add((aspect_node, CX.has_element, element_node))
 
     for key, value in element.items():
-        _handle_element_entries(graph, element_node, key, value)
+        _handle_element_entries(exporter, element_node, key, value)
 
 
-def _handle_element_entries(graph: Graph, element_node: BNode, key, value):
-    entry_node = BNode()
-    graph.add((entry_node, RDF.type, CX.entry))
-    graph.add((element_node, CX.has_entry, entry_node))
+def _handle_element_entries(exporter: Exporter, element_node: Node, key, value):
+    entry_node = exporter.mint_part(element_node, key)
+    exporter.sink.add((entry_node, RDF_TYPE, CX.entry))
+    exporter.sink.add((element_node, CX.has_entry, entry_node))
 
-    graph.add((entry_node, CX.has_key, Literal(key)))
+    exporter.sink.add((entry_node, CX.has_key, exporter.terms.literal(key)))
     # TODO need to handle different types here
-    graph.add((entry_node, CX.has_value, Literal(value)))
+    exporter.sink.add((entry_node, CX.has_value, exporter.terms.literal(value)))
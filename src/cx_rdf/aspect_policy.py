@@ -3,288 +3,318 @@
 """Functions for exporting CX to RDF."""
 
 import itertools as itt
+from itertools import repeat
 import logging
-from typing import Dict, List, Optional
+from typing import Any, Dict, Iterable, Optional, Tuple
 
-from ndex2.cx import known_aspects
-from rdflib import BNode, Graph, Literal, RDF, RDFS
+from rdflib import BNode, Graph, Literal
 
-from .constants import CX
+from .abstract_policy import _handle_element
+from .columnar import AttributeColumns, EdgeColumns, iter_slices, NodeColumns
+from .constants import CX, KNOWN_ASPECTS, RDF_TYPE, RDFS_LABEL
 from .exporter_base import Exporter
-from .typing import CxType
-from .utils import iterate_aspect_fragments
+from .sinks import TripleSink
+from .typing import CxElementsType, CxType
 
 __all__ = [
     'export',
+    'export_elements',
 ]
 
 log = logging.getLogger(__name__)
 
 
-def export(cx_json: CxType, graph: Optional[Graph] = None) -> Graph:
+def export(cx_json: CxType, graph: Optional[Graph] = None, sink: Optional[TripleSink] = None) -> Optional[Graph]:
     """Convert a CX JSON object to an RDFLib :class:`rdflib.Graph`.
 
     This policy uses CX standards for NDEx to make more meaningful RDF.
 
     :param cx_json: A CX JSON object
     :param graph: An optional RDFLib graph to fill. If not specified, creates one.
-    :return: An RDFLib graph
+    :param sink: An optional destination for the triples. Overrides the graph if given.
+    :return: The graph that was filled, or None if a sink without one was given
     """
-    exporter = _Exporter(graph=graph)
+    exporter = _Exporter(graph=graph, sink=sink)
     return exporter.export(cx_json)
 
 
+def export_elements(
+    elements: CxElementsType,
+    graph: Optional[Graph] = None,
+    sink: Optional[TripleSink] = None,
+) -> Optional[Graph]:
+    """Convert a stream of CX aspect names and elements to an RDFLib :class:`rdflib.Graph`.
+
+    :param elements: An iterable of pairs of aspect names and elements
+    :param graph: An optional RDFLib graph to fill. If not specified, creates one.
+    :param sink: An optional destination for the triples. Overrides the graph if given.
+    :return: The graph that was filled, or None if a sink without one was given
+    """
+    exporter = _Exporter(graph=graph, sink=sink)
+    return exporter.export_elements(elements)
+
+
 class _Exporter(Exporter):
     """A class to mediate shared state in the export function."""
 
+    __slots__ = ('handlers',)
+
     policy = CX.aspect
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        #: keep track of aspects by name, since they're represented by a BNode
-        self.aspects = {}
-
-    def export(self, cx_json: CxType) -> Graph:
-        """Convert a CX JSON object to an RDFLib :class:`rdflib.Graph`.
 
-        This policy uses CX standards for NDEx to make more meaningful RDF.
-
-        :param cx_json: A CX JSON object
-        :return: An RDFLib graph
-        """
-        for name, attributes in iterate_aspect_fragments(cx_json):
-            self._extend_aspect(name, attributes)
-
-        return self.graph
+        #: look up the handler for each element by the name of its aspect
+        self.handlers = {
+            'numberVerification': self._extend_number_verification_entry,
+            'nodes': self._extend_node_entry,
+            'edges': self._extend_edge_entry,
+            'metaData': self._extend_metadata_entry,
+            'nodeAttributes': self._extend_node_attribute_entry,
+            'edgeAttributes': self._extend_edge_attribute_entry,
+            'networkAttributes': self._extend_network_attribute_entry,
+            'citations': self._extend_citation_entry,
+            'edgeCitations': self._extend_edge_citation_entry,
+            'supports': self._extend_support_entry,
+            'edgeSupports': self._extend_edge_support_entry,
+        }
+        self.column_handlers = {
+            'nodes': self._extend_node_columns,
+            'edges': self._extend_edge_columns,
+            'nodeAttributes': self._extend_node_attribute_columns,
+            'edgeAttributes': self._extend_edge_attribute_columns,
+        }
 
     def get_aspect(self, aspect_name: str) -> BNode:
         """Get an aspect by name.
 
         :param aspect_name: The name of the aspect
         """
-        aspect_node = self.aspects.get(aspect_name)
-        if aspect_node is not None:
-            return aspect_node
+        return self.ensure_aspect(aspect_name)
 
-        aspect_node = self.aspects[aspect_name] = BNode()
-        self.graph.add((aspect_node, RDF.type, CX.aspect))
-        self.graph.add((aspect_node, RDFS.label, Literal(aspect_name)))
-        self.graph.add((self.document, CX.has_aspect, aspect_node))
+    def iter_chunk_entities(self, aspect_name: str, elements: Iterable[Dict]) -> Iterable[Tuple[str, Any]]:
+        """Iterate over the entities that adding the elements would declare, starting with their aspect."""
+        yield 'aspect', aspect_name
+        yield from super().iter_chunk_entities(aspect_name, elements)
 
-        return aspect_node
+    def extend_element(self, aspect_name: str, element: Dict) -> None:
+        """Add an element from a CX aspect to the graph.
 
-    def _extend_aspect(self, name: str, entries: List[Dict]):
-        """Add a CX group to the graph.
+        Aspects that aren't modeled by this policy are encoded with the generic structure of the abstract policy.
 
-        :param str name:
-        :param list[dict] entries:
+        :param aspect_name: The name of the aspect
+        :param element: An element from the aspect
         """
-        aspect = self.get_aspect(name)
+        aspect = self.get_aspect(aspect_name)
+
+        handler = self.handlers.get(aspect_name)
+        if handler is not None:
+            handler(aspect, element)
+            return
 
-        if name == 'numberVerification':
-            n = entries[0]['longNumber']
-            self.graph.add((self.document, CX.has_number_verification, Literal(n)))
-        elif name == 'nodes':
-            self._extend_node_entries(aspect, entries)
-        elif name == 'edges':
-            self._extend_edge_entries(aspect, entries)
-        elif name == 'metaData':
-            self._extend_metadata_entries(entries)
-        elif name == 'nodeAttributes':
-            self._extend_node_attribute_entries(aspect, entries)
-        elif name == 'edgeAttributes':
-            self._extend_edge_attributes_entries(aspect, entries)
-        elif name == 'networkAttributes':
-            self._extend_network_attribute_entries(aspect, entries)
-        elif name == 'citations':
-            self._extend_citation_entries(aspect, entries)
-        elif name == 'edgeCitations':
-            self._extend_edge_citation_entries(aspect, entries)
-        elif name == 'supports':
-            self._extend_support_entries(aspect, entries)
-        elif name == 'edgeSupports':
-            self._extend_edge_support_entries(aspect, entries)
-        elif name in known_aspects:
-            raise ValueError(f'unhandled known aspect: {name}')
+        if aspect_name in KNOWN_ASPECTS:
+            log.debug('unhandled known aspect: %s', aspect_name)
         else:
-            raise ValueError(f'unhandled unknown aspect: {name}')
+            log.debug('unhandled unknown aspect: %s', aspect_name)
 
-    def _extend_metadata_entries(self, entries):
-        for entry in entries:
-            self._extend_metadata_entry(entry)
+        _handle_element(self, aspect, aspect_name, element)
 
-    def _extend_metadata_entry(self, entry: Dict):
+    def _extend_number_verification_entry(self, aspect, entry):
+        n = entry['longNumber']
+        self.sink.add((self.document, CX.has_number_verification, Literal(n)))
+
+    def _extend_metadata_entry(self, aspect, entry: Dict):
         name = entry['name']
         aspect = self.get_aspect(name)
 
         version = entry['version']
-        self.graph.add((aspect, CX.aspect_version, Literal(version)))
+        self.sink.add((aspect, CX.aspect_version, Literal(version)))
 
         count = entry['elementCount']
-        self.graph.add((aspect, CX.aspect_elements_count, Literal(count)))
+        self.sink.add((aspect, CX.aspect_elements_count, Literal(count)))
 
         group = entry['consistencyGroup']
-        self.graph.add((aspect, CX.aspect_consistency_group, Literal(group)))
+        self.sink.add((aspect, CX.aspect_consistency_group, Literal(group)))
 
         counter = entry.get('idCounter')
         if counter:
-            self.graph.add((aspect, CX.aspect_id_counter, Literal(counter)))
-
-    def _extend_node_entries(self, aspect, entries):
-        for entry in entries:
-            node = self._extend_node_entry(entry)
-            self.graph.add((aspect, CX.aspect_has_attribute, node))
+            self.sink.add((aspect, CX.aspect_id_counter, Literal(counter)))
 
-    def _extend_node_entry(self, entry) -> BNode:
+    def _extend_node_entry(self, aspect, entry) -> BNode:
         node_id = entry['@id']
         node = self.ensure_node(node_id)
+        self.sink.add((aspect, CX.aspect_has_attribute, node))
 
         node_label = entry.get('n')
         if node_label is not None:
-            self.graph.add((node, RDFS.label, Literal(node_label)))
+            self.sink.add((node, RDFS_LABEL, self.terms.literal(node_label)))
 
         return node
 
-    def _extend_edge_entries(self, aspect, entries):
-        for entry in entries:
-            node = self._extend_edge_entry(entry)
-            self.graph.add((aspect, CX.aspect_has_attribute, node))
-
-    def _extend_edge_entry(self, entry) -> BNode:
+    def _extend_edge_entry(self, aspect, entry) -> BNode:
         edge_id = entry['@id']
         edge = self.ensure_edge(edge_id)
+        self.sink.add((aspect, CX.aspect_has_attribute, edge))
 
         edge_source_id = entry['s']
         edge_target_id = entry['t']
 
-        self.graph.add((edge, CX.edge_has_source, self.ensure_node(edge_source_id)))
-        self.graph.add((edge, CX.edge_has_target, self.ensure_node(edge_target_id)))
+        self.sink.add((edge, CX.edge_has_source, self.ensure_node(edge_source_id)))
+        self.sink.add((edge, CX.edge_has_target, self.ensure_node(edge_target_id)))
 
         edge_interaction = entry.get('i')
         if edge_interaction is not None:
-            self.graph.add((edge, CX.edge_has_interaction, Literal(edge_interaction)))
+            self.sink.add((edge, CX.edge_has_interaction, self.terms.literal(edge_interaction)))
 
         return edge
 
-    def _extend_node_attribute_entries(self, aspect, entries):
-        for entry in entries:
-            node = self._extend_node_attribute_entry(entry)
-            self.graph.add((aspect, CX.aspect_has_attribute, node))
-
-    def _extend_node_attribute_entry(self, entry) -> BNode:
+    def _extend_node_attribute_entry(self, aspect, entry) -> BNode:
         node = self.ensure_node(entry['po'])
 
-        node_attribute = BNode()
-        self.graph.add((node_attribute, RDF.type, CX.node_attribute))
-        self.graph.add((node, CX.node_has_attribute, node_attribute))
+        node_attribute = self.mint_element('nodeAttributes')
+        self.sink.add((aspect, CX.aspect_has_attribute, node_attribute))
+        self.sink.add((node_attribute, RDF_TYPE, CX.node_attribute))
+        self.sink.add((node, CX.node_has_attribute, node_attribute))
 
-        self.graph.add((node_attribute, CX.attribute_has_name, Literal(entry['n'])))
-        self.graph.add((node_attribute, CX.attribute_has_value, Literal(entry['v'])))
+        self.sink.add((node_attribute, CX.attribute_has_name, self.terms.literal(entry['n'])))
+        self.sink.add_all([
+            (node_attribute, CX.attribute_has_value, literal)
+            for literal in self.get_value_literals(entry['v'], entry.get('d'))
+        ])
 
         return node_attribute
 
-    def _extend_network_attribute_entries(self, aspect, entries):
-        for entry in entries:
-            node = self._extend_network_attribute_entry(entry)
-            self.graph.add((aspect, CX.aspect_has_attribute, node))
-
-    def _extend_network_attribute_entry(self, entry) -> BNode:
-        network_attribute = BNode()
-        self.graph.add((self.document, CX.network_has_attribute, network_attribute))
-        self.graph.add((network_attribute, RDF.type, CX.network_attribute))
+    def _extend_node_columns(self, columns: NodeColumns) -> None:
+        aspect = self.get_aspect('nodes')
+        add_all = self.sink.add_all
+        literal = self.terms.literal
+
+        for rows in iter_slices(len(columns)):
+            nodes = list(map(self.ensure_node, columns.ids[rows]))
+            add_all(zip(repeat(aspect), repeat(CX.aspect_has_attribute), nodes))
+            add_all([
+                (node, RDFS_LABEL, literal(name))
+                for node, name in zip(nodes, columns.names[rows])
+                if name is not None
+            ])
+
+    def _extend_edge_columns(self, columns: EdgeColumns) -> None:
+        aspect = self.get_aspect('edges')
+        add_all = self.sink.add_all
+        literal = self.terms.literal
+
+        for rows in iter_slices(len(columns)):
+            edges = list(map(self.ensure_edge, columns.ids[rows]))
+            add_all(zip(repeat(aspect), repeat(CX.aspect_has_attribute), edges))
+            add_all(zip(edges, repeat(CX.edge_has_source), map(self.ensure_node, columns.sources[rows])))
+            add_all(zip(edges, repeat(CX.edge_has_target), map(self.ensure_node, columns.targets[rows])))
+            add_all([
+                (edge, CX.edge_has_interaction, literal(interaction))
+                for edge, interaction in zip(edges, columns.interactions[rows])
+                if interaction is not None
+            ])
+
+    def _extend_attribute_columns(self, aspect_name: str, attribute_type, has_attribute, ensure_parent,
+                                  columns: AttributeColumns):
+        aspect = self.get_aspect(aspect_name)
+        add_all = self.sink.add_all
+        literal = self.terms.literal
+
+        for rows in iter_slices(len(columns)):
+            parents = list(map(ensure_parent, columns.parents[rows]))
+            attributes = self.mint_elements(aspect_name, len(parents))
+            add_all(zip(repeat(aspect), repeat(CX.aspect_has_attribute), attributes))
+            add_all(zip(attributes, repeat(RDF_TYPE), repeat(attribute_type)))
+            add_all(zip(parents, repeat(has_attribute), attributes))
+            add_all(zip(attributes, repeat(CX.attribute_has_name), map(literal, columns.names[rows])))
+            add_all(self.get_value_triples(attributes, columns.values[rows], columns.data_types[rows]))
+
+    def _extend_node_attribute_columns(self, columns: AttributeColumns) -> None:
+        self._extend_attribute_columns('nodeAttributes', CX.node_attribute, CX.node_has_attribute, self.ensure_node,
+                                       columns)
+
+    def _extend_edge_attribute_columns(self, columns: AttributeColumns) -> None:
+        self._extend_attribute_columns('edgeAttributes', CX.edge_attribute, CX.edge_has_attribute, self.ensure_edge,
+                                       columns)
+
+    def _extend_network_attribute_entry(self, aspect, entry) -> BNode:
+        network_attribute = self.mint_element('networkAttributes')
+        self.sink.add((aspect, CX.aspect_has_attribute, network_attribute))
+        self.sink.add((self.document, CX.network_has_attribute, network_attribute))
+        self.sink.add((network_attribute, RDF_TYPE, CX.network_attribute))
 
         name = entry['n']
-        self.graph.add((network_attribute, CX.network_attribute_has_key, Literal(name)))
-
-        value = entry['v']
-        data_type = entry.get('d')
+        self.sink.add((network_attribute, CX.network_attribute_has_key, self.terms.literal(name)))
 
-        if data_type is None or data_type == 'string':
-            self.graph.add((network_attribute, CX.network_attribute_has_key, Literal(value)))
-        else:
-            raise TypeError(f'unhandled data type: {data_type} {value}')
+        self.sink.add_all([
+            (network_attribute, CX.attribute_has_value, literal)
+            for literal in self.get_value_literals(entry['v'], entry.get('d'))
+        ])
 
         return network_attribute
 
-    def _extend_edge_attributes_entries(self, aspect, entries):
-        for entry in entries:
-            node = self._extend_edge_attribute_entry(entry)
-            self.graph.add((aspect, CX.aspect_has_attribute, node))
-
-    def _extend_edge_attribute_entry(self, entry) -> BNode:
-        edge = self.ensure_node(entry['po'])
-        edge_attribute = BNode()
-        self.graph.add((edge_attribute, RDF.type, CX.edge_attribute))
-        self.graph.add((edge, CX.edge_has_attribute, edge_attribute))
+    def _extend_edge_attribute_entry(self, aspect, entry) -> BNode:
+        edge = self.ensure_edge(entry['po'])
+        edge_attribute = self.mint_element('edgeAttributes')
+        self.sink.add((aspect, CX.aspect_has_attribute, edge_attribute))
+        self.sink.add((edge_attribute, RDF_TYPE, CX.edge_attribute))
+        self.sink.add((edge, CX.edge_has_attribute, edge_attribute))
 
-        self.graph.add((edge_attribute, CX.attribute_has_name, Literal(entry['n'])))
-        self.graph.add((edge_attribute, CX.attribute_has_value, Literal(entry['v'])))
+        self.sink.add((edge_attribute, CX.attribute_has_name, self.terms.literal(entry['n'])))
+        self.sink.add_all([
+            (edge_attribute, CX.attribute_has_value, literal)
+            for literal in self.get_value_literals(entry['v'], entry.get('d'))
+        ])
 
         return edge_attribute
 
-    def _extend_citation_entries(self, aspect, entries):
-        for entry in entries:
-            node = self._extend_citation_entry(entry)
-            self.graph.add((aspect, CX.aspect_has_attribute, node))
-
-    def _extend_citation_entry(self, entry) -> BNode:
+    def _extend_citation_entry(self, aspect, entry) -> BNode:
         citation_id = entry['@id']
         citation = self.ensure_citation(citation_id)
+        self.sink.add((aspect, CX.aspect_has_attribute, citation))
 
         title = entry.get('dc:title')
         if title is not None:
-            self.graph.add((citation, CX.citation_has_title, Literal(title)))
+            self.sink.add((citation, CX.citation_has_title, Literal(title)))
 
         # FIXME handle other possible keys in citation entry
 
         return citation
 
-    def _extend_edge_citation_entries(self, aspect, entries):
-        for entry in entries:
-            self._extend_edge_citation_entry(aspect, entry)
-
     def _extend_edge_citation_entry(self, aspect, entry):
         edge_ids = entry['po']
         citation_ids = entry['citations']
 
         for edge_id, citation_id in itt.product(edge_ids, citation_ids):
-            edge_citation = BNode()
-            self.graph.add((aspect, CX.aspect_has_attribute, edge_citation))
+            edge_citation = self.mint_element('edgeCitations')
+            self.sink.add((aspect, CX.aspect_has_attribute, edge_citation))
 
             edge = self.ensure_edge(edge_id)
             citation = self.ensure_citation(citation_id)
-            self.graph.add((edge_citation, CX.edge_citation_has_edge, edge))
-            self.graph.add((edge_citation, CX.edge_citation_has_citation, citation))
-
-    def _extend_support_entries(self, aspect, entries):
-        for entry in entries:
-            node = self._extend_support_entry(entry)
-            self.graph.add((aspect, CX.aspect_has_attribute, node))
+            self.sink.add((edge_citation, CX.edge_citation_has_edge, edge))
+            self.sink.add((edge_citation, CX.edge_citation_has_citation, citation))
 
-    def _extend_support_entry(self, entry) -> BNode:
+    def _extend_support_entry(self, aspect, entry) -> BNode:
         support_id = entry['@id']
         support = self.ensure_citation(support_id)
+        self.sink.add((aspect, CX.aspect_has_attribute, support))
 
         text = entry.get('text')
         if text is not None:
-            self.graph.add((support, CX.support_has_text, Literal(text)))
+            self.sink.add((support, CX.support_has_text, Literal(text)))
 
         # FIXME handle other possible keys in support entry
 
         return support
 
-    def _extend_edge_support_entries(self, aspect, entries):
-        for entry in entries:
-            self._extend_edge_support_entry(aspect, entry)
-
     def _extend_edge_support_entry(self, aspect, entry):
         edge_ids = entry['po']
         support_ids = entry['supports']
 
         for edge_id, support_id in itt.product(edge_ids, support_ids):
-            edge_support = BNode()
-            self.graph.add((aspect, CX.aspect_has_attribute, edge_support))
+            edge_support = self.mint_element('edgeSupports')
+            self.sink.add((aspect, CX.aspect_has_attribute, edge_support))
             edge = self.ensure_edge(edge_id)
             support = self.ensure_support(support_id)
-            self.graph.add((edge_support, CX.edge_support_has_edge, edge))
-            self.graph.add((edge_support, CX.edge_support_has_support, support))
+            self.sink.add((edge_support, CX.edge_support_has_edge, edge))
+            self.sink.add((edge_support, CX.edge_support_has_support, support))
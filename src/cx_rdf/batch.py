@@ -0,0 +1,226 @@
+# -*- coding: utf-8 -*-
+
+"""Converting many CX files at once.
+
+The files are converted by a pool of worker processes that stay alive for the whole batch, so the cost of starting
+Python and importing RDFLib is only paid once per worker instead of once per file. Files whose output is newer than
+them and were converted with the same settings are skipped, and a file that fails to convert doesn't stop the rest of
+the batch.
+
+.. code-block:: python
+
+    from cx_rdf.batch import convert_batch
+
+    for result in convert_batch('networks/', 'rdf/', rdf_format='nt'):
+        print(result.path, result.status, result.seconds)
+"""
+
+from collections import defaultdict
+from concurrent.futures import as_completed, ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+import glob
+import json
+import os
+import time
+from typing import DefaultDict, Dict, Iterable, List, NamedTuple, Optional, Tuple
+
+from .io import cx_file_to_rdf_file
+from .utils import get_version
+
+__all__ = [
+    'BatchResult',
+    'get_batch_paths',
+    'get_destination',
+    'convert_batch',
+]
+
+#: The file extensions for the RDF formats
+FORMAT_EXTENSIONS = {
+    'xml': 'rdf',
+    'pretty-xml': 'rdf',
+    'n3': 'n3',
+    'turtle': 'ttl',
+    'nt': 'nt',
+    'nquads': 'nq',
+    'trix': 'trix',
+    'trig': 'trig',
+}
+
+#: The extensions of the files that are converted when given a directory
+CX_EXTENSIONS = ('.cx', '.json')
+
+#: The type used for the settings of a conversion, by their names
+Settings = Dict[str, Optional[str]]
+
+#: The name of the file in the output directory that has the settings each RDF file was converted with
+MANIFEST_NAME = '.cx_rdf_batch'
+
+
+class BatchResult(NamedTuple):
+    """The outcome of converting a file in a batch."""
+
+    #: The CX file
+    path: str
+    #: The RDF file
+    destination: str
+    #: One of ``converted``, ``skipped``, or ``failed``
+    status: str
+    #: The number of seconds the conversion took
+    seconds: float = 0.0
+    #: The error, if the conversion failed
+    error: Optional[str] = None
+
+
+def get_batch_paths(source: str) -> List[str]:
+    """List the CX files in a directory, or the files matching a glob pattern, in sorted order.
+
+    :param source: A directory, in which case the files ending with ``.cx`` or ``.json`` are used, or a glob
+     pattern like ``networks/**/*.cx``
+    """
+    if os.path.isdir(source):
+        paths = (
+            os.path.join(source, name)
+            for name in os.listdir(source)
+            if name.endswith(CX_EXTENSIONS)
+        )
+    else:
+        paths = glob.iglob(source, recursive=True)
+
+    return sorted(path for path in paths if os.path.isfile(path))
+
+
+def get_destination(path: str, output_directory: str, rdf_format: Optional[str] = None) -> str:
+    """Get the path of the RDF file for a CX file, with the extension of the format.
+
+    :param path: The CX file
+    :param output_directory: The directory to put the RDF file in
+    :param rdf_format: The RDF format. Defaults to RDF/XML.
+    """
+    stem = os.path.splitext(os.path.basename(path))[0]
+    return os.path.join(output_directory, f'{stem}.{FORMAT_EXTENSIONS[rdf_format or "xml"]}')
+
+
+def _get_settings(policy: Optional[str], rdf_format: Optional[str], base_iri: Optional[str]) -> Settings:
+    """Get the settings of a conversion, which an RDF file is only up to date for if it was converted with them."""
+    return {
+        'policy': policy or 'predicate',
+        'rdf_format': rdf_format or 'xml',
+        'base_iri': base_iri,
+        'version': get_version(),
+    }
+
+
+def _read_manifest(output_directory: str) -> Dict[str, Settings]:
+    """Read the settings each RDF file in the output directory was converted with, by the names of the files."""
+    try:
+        with open(os.path.join(output_directory, MANIFEST_NAME)) as file:
+            return json.load(file)
+    except (OSError, ValueError):
+        return {}
+
+
+def _write_manifest(output_directory: str, manifest: Dict[str, Settings]) -> None:
+    path = os.path.join(output_directory, MANIFEST_NAME)
+    with open(f'{path}.part', 'w') as file:
+        json.dump(manifest, file, indent=2, sort_keys=True)
+    os.replace(f'{path}.part', path)
+
+
+def _is_up_to_date(path: str, destination: str, settings: Settings, manifest: Dict[str, Settings]) -> bool:
+    """Check if the RDF file was converted with the same settings and is at least as new as the CX file."""
+    if manifest.get(os.path.basename(destination)) != settings:
+        return False
+    try:
+        return os.path.getmtime(destination) >= os.path.getmtime(path)
+    except OSError:
+        return False
+
+
+def convert_batch(source: str, output_directory: str, policy: Optional[str] = None,
+                  rdf_format: Optional[str] = None, base_iri: Optional[str] = None,
+                  workers: Optional[int] = None, force: bool = False) -> Iterable[BatchResult]:
+    """Convert many CX files to RDF files with a pool of worker processes.
+
+    :param source: A directory or glob pattern. See :func:`get_batch_paths`.
+    :param output_directory: The directory to write the RDF files in, which is created if it doesn't exist
+    :param policy: Defaults to the 'predicate' policy. Can also use 'abstract', 'compact', or 'aspect'
+    :param rdf_format: The RDF format to output. Defaults to RDF/XML.
+    :param base_iri: If given, each network mints deterministic IRIs under this IRI followed by the name of its file,
+     like ``<base_iri><name>/node_5``
+    :param workers: The number of worker processes. Defaults to the number of CPUs.
+    :param force: If true, converts files even if their outputs are up to date. Outputs are only up to date if they're
+     newer than their CX files and were converted with the same policy, format, base IRI, and version of CX-RDF, which
+     are kept in a file named :data:`MANIFEST_NAME` in the output directory.
+    :return: An iterable of the results for each file, in the order they finish. Files that would be written to the
+     same RDF file, like ``a/x.cx`` and ``b/x.cx``, fail without being converted. If a worker process dies, the files
+     that hadn't finished fail too, since the pool can't go on.
+    """
+    os.makedirs(output_directory, exist_ok=True)
+    settings = _get_settings(policy, rdf_format, base_iri)
+    manifest = _read_manifest(output_directory)
+
+    paths_by_destination: DefaultDict[str, List[str]] = defaultdict(list)
+    for path in get_batch_paths(source):
+        paths_by_destination[get_destination(path, output_directory, rdf_format=rdf_format)].append(path)
+
+    tasks: List[Tuple[str, str]] = []
+    for destination, paths in paths_by_destination.items():
+        if len(paths) > 1:
+            # converting them at once would have the workers overwrite each other's output
+            for path in paths:
+                others = ', '.join(other for other in paths if other != path)
+                yield BatchResult(path, destination, 'failed', error=f'same output file as {others}')
+        elif not force and _is_up_to_date(paths[0], destination, settings, manifest):
+            yield BatchResult(paths[0], destination, 'skipped')
+        else:
+            tasks.append((paths[0], destination))
+
+    if not tasks:
+        return
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        futures = {
+            executor.submit(_convert_path, path, destination, policy, rdf_format, base_iri): (path, destination)
+            for path, destination in tasks
+        }
+        try:
+            for future in as_completed(futures):
+                try:
+                    result = future.result()
+                except BrokenProcessPool as e:
+                    path, destination = futures[future]
+                    result = BatchResult(path, destination, 'failed', error=f'{type(e).__name__}: {e}')
+                if result.status == 'converted':
+                    manifest[os.path.basename(result.destination)] = settings
+                yield result
+        finally:
+            # also when the batch is stopped early, so the files converted so far are skipped next time
+            _write_manifest(output_directory, manifest)
+
+
+def _get_network_base_iri(base_iri: str, name: str) -> str:
+    """Get the IRI to mint a network's IRIs under, which is the base IRI followed by the name of the network."""
+    if not base_iri.endswith(('/', '#')):
+        base_iri += '/'
+    return f'{base_iri}{name}/'
+
+
+def _convert_path(path: str, destination: str, policy: Optional[str], rdf_format: Optional[str],
+                  base_iri: Optional[str]) -> BatchResult:
+    """Convert a single file in a worker, catching any error so the batch can go on."""
+    if base_iri is not None:
+        base_iri = _get_network_base_iri(base_iri, os.path.splitext(os.path.basename(path))[0])
+
+    # write next to the destination first, so a failed conversion never looks up to date
+    partial = f'{destination}.part'
+    start = time.perf_counter()
+    try:
+        with open(path) as file, open(partial, 'w') as rdf_file:
+            cx_file_to_rdf_file(file, rdf_file, policy=policy, rdf_format=rdf_format, base_iri=base_iri)
+        os.replace(partial, destination)
+    except Exception as e:
+        if os.path.exists(partial):
+            os.remove(partial)
+        return BatchResult(path, destination, 'failed', time.perf_counter() - start, f'{type(e).__name__}: {e}')
+
+    return BatchResult(path, destination, 'converted', time.perf_counter() - start)
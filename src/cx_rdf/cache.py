@@ -0,0 +1,220 @@
+# -*- coding: utf-8 -*-
+
+"""A cache of conversions on disk, so networks that haven't changed aren't converted again.
+
+Entries are keyed on a hash of the CX, the policy, the RDF format, the base IRI, and the version of CX-RDF, so
+changing any of them gives a new entry rather than a stale one. When the entries take up more than the cache's
+maximum size, the least recently used ones are removed.
+
+.. code-block:: python
+
+    from cx_rdf import cx_to_rdf_graph
+    from cx_rdf.cache import ConversionCache
+
+    cache = ConversionCache('~/.cache/cx_rdf')
+    graph = cx_to_rdf_graph(cx_json, policy='aspect', cache=cache)
+
+Graphs are kept as pickles, so only use a directory nobody else can write to.
+"""
+
+import hashlib
+import json
+import os
+import pickle
+import shutil
+import tempfile
+from typing import Callable, IO, Iterable, Optional, TextIO, Tuple
+import uuid
+
+from rdflib import Graph
+
+from .typing import CxType
+from .utils import get_version
+
+__all__ = [
+    'ConversionCache',
+    'hash_file',
+    'hash_cx',
+]
+
+#: The total size of the entries a cache keeps by default, in bytes
+DEFAULT_MAX_SIZE = 10 * 1024 ** 3
+
+#: The number of characters or bytes read at once while hashing a file
+_CHUNK_SIZE = 1 << 20
+
+#: The amount of an unseekable input, like STDIN, that's kept in memory while it's hashed before going to disk
+_SPOOL_SIZE = 64 * 1024 ** 2
+
+#: The format of the entries for graphs, rather than for RDF files
+GRAPH_FORMAT = 'graph'
+
+
+def hash_file(file: IO) -> Tuple[str, IO]:
+    """Hash the contents of a file incrementally.
+
+    :param file: A file-like object opened in text or binary mode
+    :return: The hex digest and a file to read the same contents from, positioned at the start. This is the same file
+     if it's seekable, otherwise a temporary copy made while hashing.
+    """
+    digest = hashlib.sha256()
+    copy = None
+    if not file.seekable():
+        copy = tempfile.SpooledTemporaryFile(max_size=_SPOOL_SIZE, mode='w+b' if _is_binary(file) else 'w+')
+
+    for chunk in iter(lambda: file.read(_CHUNK_SIZE), file.read(0)):
+        digest.update(chunk if isinstance(chunk, bytes) else chunk.encode('utf-8'))
+        if copy is not None:
+            copy.write(chunk)
+
+    if copy is None:
+        file.seek(0)
+        return digest.hexdigest(), file
+
+    copy.seek(0)
+    return digest.hexdigest(), copy
+
+
+def _is_binary(file: IO) -> bool:
+    return isinstance(file.read(0), bytes)
+
+
+def hash_cx(cx_json: CxType) -> str:
+    """Hash CX JSON by its compact serialization, without building the whole string."""
+    digest = hashlib.sha256()
+    for chunk in json.JSONEncoder(separators=(',', ':')).iterencode(cx_json):
+        digest.update(chunk.encode('utf-8'))
+    return digest.hexdigest()
+
+
+class ConversionCache:
+    """A directory of converted networks with a bounded size."""
+
+    def __init__(self, directory: str, max_size: int = DEFAULT_MAX_SIZE):
+        """Initialize the cache, creating the directory if it doesn't exist.
+
+        :param directory: The directory to keep the entries in
+        :param max_size: The total size of the entries in bytes. The least recently used ones are removed first when
+         it's exceeded.
+        """
+        self.directory = os.path.expanduser(directory)
+        self.max_size = max_size
+        os.makedirs(self.directory, exist_ok=True)
+
+    @staticmethod
+    def get_key(digest: str, policy: Optional[str] = None, rdf_format: Optional[str] = None,
+                base_iri: Optional[str] = None) -> str:
+        """Get the key of a conversion.
+
+        :param digest: The hash of the CX, from :func:`hash_file` or :func:`hash_cx`
+        :param policy: The policy, or None for the default, which has the same key as the 'predicate' policy
+        :param rdf_format: The RDF format, or :data:`GRAPH_FORMAT` for a graph. None has the same key as RDF/XML,
+         which is the default.
+        :param base_iri: The base IRI, if any
+        """
+        parts = (digest, policy or 'predicate', rdf_format or 'xml', base_iri or '', get_version())
+        return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+    def _get_path(self, key: str) -> str:
+        return os.path.join(self.directory, key)
+
+    def get(self, key: str) -> Optional[str]:
+        """Get the path of an entry and mark it as recently used, or None if it isn't in the cache."""
+        path = self._get_path(key)
+        try:
+            os.utime(path)
+        except FileNotFoundError:
+            return None
+        return path
+
+    def _new_entry(self, mode: str) -> IO:
+        """Open a temporary file in the cache's directory for writing an entry."""
+        encoding = None if 'b' in mode else 'utf-8'
+        return tempfile.NamedTemporaryFile(mode=mode, encoding=encoding, dir=self.directory, prefix='.',
+                                           suffix='.part', delete=False)
+
+    def _new_entry_path(self) -> str:
+        """Get an unused path in the cache's directory for an entry that isn't written through a file object."""
+        return os.path.join(self.directory, f'.{uuid.uuid4().hex}.part')
+
+    def _put(self, key: str, path: str) -> None:
+        """Move a temporary file into the cache as the entry for a key, then remove old entries if it's too big."""
+        os.replace(path, self._get_path(key))
+        self.evict()
+
+    def _iterate_entries(self) -> Iterable[os.DirEntry]:
+        with os.scandir(self.directory) as entries:
+            yield from (entry for entry in entries if entry.is_file() and not entry.name.startswith('.'))
+
+    def evict(self) -> None:
+        """Remove the least recently used entries until the total size is within the limit."""
+        entries = [(entry.stat(), entry.path) for entry in self._iterate_entries()]
+        total = sum(stat.st_size for stat, _ in entries)
+        for stat, path in sorted(entries, key=lambda pair: pair[0].st_mtime):
+            if total <= self.max_size:
+                return
+            try:
+                os.remove(path)
+            except FileNotFoundError:  # another process got to it first
+                pass
+            total -= stat.st_size
+
+    def write(self, key: str, destination: TextIO, convert: Callable[[TextIO], None]) -> bool:
+        """Write the cached serialization for a key to a file, converting and caching it first if it's missing.
+
+        :param key: The key of the conversion
+        :param destination: A file-like object opened for writing text
+        :param convert: A function that writes the serialization to the file it's given
+        :return: If the serialization was already in the cache
+        """
+        path = self.get(key)
+        if path is not None:
+            try:
+                with open(path, encoding='utf-8') as file:
+                    shutil.copyfileobj(file, destination)
+                return True
+            except FileNotFoundError:  # evicted in the meantime
+                pass
+
+        with self._new_entry('w') as entry:
+            try:
+                convert(entry)
+                entry.flush()
+                with open(entry.name, encoding='utf-8') as file:
+                    shutil.copyfileobj(file, destination)
+            except BaseException:
+                os.remove(entry.name)
+                raise
+
+        self._put(key, entry.name)
+        return False
+
+    def get_graph(self, key: str, convert: Callable[[], Graph], graph: Optional[Graph] = None) -> Graph:
+        """Load the cached graph for a key, converting and caching it first if it's missing.
+
+        :param key: The key of the conversion
+        :param convert: A function that builds the graph in a new graph
+        :param graph: An optional RDFLib graph to fill. If not specified, creates one.
+        """
+        path = self.get(key)
+        if path is not None:
+            try:
+                with open(path, 'rb') as file:
+                    triples = pickle.load(file)
+            except FileNotFoundError:  # evicted in the meantime
+                pass
+            else:
+                if graph is None:
+                    graph = Graph()
+                graph.addN((s, p, o, graph) for s, p, o in triples)
+                return graph
+
+        converted = convert()
+        with self._new_entry('wb') as entry:
+            pickle.dump(list(converted), entry, protocol=pickle.HIGHEST_PROTOCOL)
+        self._put(key, entry.name)
+
+        if graph is None:
+            return converted
+        graph.addN((s, p, o, graph) for s, p, o in converted)
+        return graph
@@ -1,16 +1,20 @@
 # -*- coding: utf-8 -*-
 
-"""CLI for CX-RDF."""
+"""CLI for CX-RDF.
 
-import json
+The commands are run once per file from shell pipelines, so each one only imports what it needs when it's run. In
+particular, :mod:`ndex2` and :mod:`owlready2` take much longer to import than converting a small network, so only
+``owl_to_cx`` imports them.
+"""
+
+import io
 import os
 import sys
+import tempfile
 
 import click
-import ndex2
 
-from .io import ALLOWED_POLICIES, cx_to_rdf_graph
-from .owl import convert_owl
+from .io import _get_exporter_cls, ALLOWED_POLICIES, cx_file_to_rdf_file, cx_file_to_rdf_store
 
 EXPORT_FORMATS = ['xml', 'n3', 'turtle', 'nt', 'pretty-xml', 'trix', 'trig', 'nquads']
 
@@ -26,11 +30,199 @@ def main():
               help='Output RDF file path. Defaults to STDOUT.')
 @click.option('-p', '--policy', type=click.Choice(ALLOWED_POLICIES), help='RDF schema policy')
 @click.option('-f', '--rdf-format', type=click.Choice(EXPORT_FORMATS), help='RDF output format')
-def cx_to_rdf(file, destination, policy, rdf_format):
-    """Convert CX to RDF."""
-    cx_json = json.load(file)
-    graph = cx_to_rdf_graph(cx_json, policy=policy)
-    graph.serialize(destination=destination, format=rdf_format)
+@click.option('-b', '--base-iri', help='IRI to mint deterministic IRIs under instead of making blank nodes')
+@click.option('--columnar', is_flag=True, help='Load the CX into columns and export a column at a time')
+@click.option('-w', '--workers', type=click.IntRange(min=1), default=1, show_default=True,
+              help='Number of processes to convert nodes, edges, and their attributes in')
+@click.option('-s', '--store', type=click.Path(dir_okay=False),
+              help='Build the graph in an SQLite database at this path instead of writing RDF')
+@click.option('-c', '--cache', type=click.Path(file_okay=False),
+              help='Directory to reuse the RDF from if the same CX has been converted the same way before')
+@click.option('--cache-size', type=click.IntRange(min=1), default=10 * 1024, show_default=True,
+              help='Size the cache is kept under, in MiB')
+@click.option('--stats', is_flag=True,
+              help='Write the time, triples, and memory of each aspect and phase to STDERR as JSON')
+@click.option('-e', '--edge-table', type=click.Path(dir_okay=False),
+              help='Also write a table of the edges and the labels of their nodes to an SQLite database at this path')
+def cx_to_rdf(file, destination, policy, rdf_format, base_iri, columnar, workers, store, cache, cache_size, stats,
+              edge_table):
+    """Convert CX to RDF.
+
+    N-Triples and N-Quads are written as the CX is read, without building a graph in memory. Give a base IRI to
+    get the same IRIs every time the same network is converted. Big networks can be converted in several processes
+    with the workers option. Networks too big to fit in memory can be converted into a store on disk, which can be
+    reopened for querying with :func:`cx_rdf.store.open_graph`. With a cache, networks that haven't changed since
+    they were last converted are copied from the cache. To see where the time goes, the stats option reports each
+    aspect and the parsing and serializing around them. With the predicate policy, the edges can also be written
+    to a table that answers the query for visualizations without going through the RDF.
+    """
+    from .cache import ConversionCache
+    from .stats import ConversionStats
+
+    if columnar and workers > 1:
+        raise click.UsageError('--columnar can not be combined with --workers')
+    if stats and (workers > 1 or store is not None):
+        raise click.UsageError('--stats can not be combined with --workers or --store')
+    if edge_table is not None and (store is not None or cache is not None):
+        raise click.UsageError('--edge-table can not be combined with --store or --cache')
+    if edge_table is not None and policy not in {None, 'predicate'}:
+        raise click.UsageError('--edge-table only works with the predicate policy')
+
+    if store is not None:
+        cx_file_to_rdf_store(file, store, policy=policy, base_iri=base_iri, columnar=columnar, workers=workers)
+        return
+
+    if cache is not None:
+        cache = ConversionCache(cache, max_size=cache_size * 1024 ** 2)
+
+    hooks = ConversionStats() if stats else None
+    cx_file_to_rdf_file(file, destination, policy=policy, rdf_format=rdf_format, base_iri=base_iri,
+                        columnar=columnar, workers=workers, cache=cache, hooks=hooks, edge_table=edge_table)
+    if hooks is not None:
+        hooks.write(sys.stderr)
+
+
+@main.command()
+@click.argument('source')
+@click.argument('output_directory', type=click.Path(file_okay=False))
+@click.option('-p', '--policy', type=click.Choice(ALLOWED_POLICIES), help='RDF schema policy')
+@click.option('-f', '--rdf-format', type=click.Choice(EXPORT_FORMATS), help='RDF output format')
+@click.option('-b', '--base-iri', help='IRI to mint deterministic IRIs under, followed by the name of each file')
+@click.option('-w', '--workers', type=click.IntRange(min=1), help='Number of processes. Defaults to the number of CPUs')
+@click.option('--force', is_flag=True, help='Convert files even if their outputs are up to date')
+def batch(source, output_directory, policy, rdf_format, base_iri, workers, force):
+    """Convert a directory of CX files to RDF.
+
+    SOURCE is a directory, in which case all .cx and .json files in it are converted, or a glob pattern. Files whose
+    output is newer than them and was converted with the same options are skipped. Failures are reported without
+    stopping the rest of the batch.
+    """
+    from .batch import convert_batch
+
+    failures = 0
+    for result in convert_batch(source, output_directory, policy=policy, rdf_format=rdf_format, base_iri=base_iri,
+                                workers=workers, force=force):
+        if result.status == 'failed':
+            failures += 1
+            click.secho(f'failed {result.path} after {result.seconds:.2f}s: {result.error}', fg='red', err=True)
+        elif result.status == 'skipped':
+            click.echo(f'skipped {result.path}, {result.destination} is up to date')
+        else:
+            click.echo(f'converted {result.path} to {result.destination} in {result.seconds:.2f}s')
+
+    if failures:
+        raise click.ClickException(f'{failures} file(s) failed to convert')
+
+
+@main.command()
+@click.argument('output_directory', type=click.Path(file_okay=False))
+@click.argument('uuids', nargs=-1)
+@click.option('-i', '--file', type=click.File(), help='File with more network UUIDs, one per line')
+@click.option('-u', '--url', help='Base URL of the NDEx API. Defaults to the public NDEx server')
+@click.option('-p', '--policy', type=click.Choice(ALLOWED_POLICIES), help='RDF schema policy')
+@click.option('-f', '--rdf-format', type=click.Choice(EXPORT_FORMATS), help='RDF output format')
+@click.option('-b', '--base-iri', help='IRI to mint deterministic IRIs under, followed by the UUID of each network')
+@click.option('-c', '--concurrency', type=click.IntRange(min=1), default=4, show_default=True,
+              help='Number of networks to download at once')
+@click.option('--retries', type=click.IntRange(min=0), default=3, show_default=True,
+              help='Number of times to retry a network after an error that might go away')
+@click.option('--backoff', type=click.FloatRange(min=0), default=1.0, show_default=True,
+              help='Seconds to wait before the first retry, doubling with each one after')
+@click.option('--username', envvar='NDEX_USERNAME', help='NDEx username for private networks')
+@click.option('--password', envvar='NDEX_PASSWORD', help='NDEx password for private networks')
+def fetch(output_directory, uuids, file, url, policy, rdf_format, base_iri, concurrency, retries, backoff, username,
+          password):
+    """Download networks from NDEx and convert them to RDF.
+
+    Each network is converted as it's downloaded, without saving the CX, and written to a file named after its UUID
+    in OUTPUT_DIRECTORY. Failures are reported without stopping the rest.
+    """
+    from .fetch import fetch_networks, NDEX_URL
+
+    uuids = list(uuids)
+    if file is not None:
+        uuids.extend(line.strip() for line in file if line.strip())
+    if not uuids:
+        raise click.UsageError('no network UUIDs were given')
+
+    failures = 0
+    for result in fetch_networks(uuids, output_directory, url=url or NDEX_URL, policy=policy, rdf_format=rdf_format,
+                                 base_iri=base_iri, concurrency=concurrency, retries=retries, backoff=backoff,
+                                 username=username, password=password):
+        if result.status == 'failed':
+            failures += 1
+            click.secho(f'failed {result.uuid} after {result.attempts} attempt(s): {result.error}', fg='red',
+                        err=True)
+        else:
+            click.echo(f'converted {result.uuid} to {result.destination} in {result.seconds:.2f}s')
+
+    if failures:
+        raise click.ClickException(f'{failures} network(s) failed to convert')
+
+
+@main.command()
+@click.argument('old', type=click.Path(exists=True, dir_okay=False))
+@click.argument('new', type=click.File())
+@click.option('-b', '--base-iri', required=True, help='IRI the IRIs of both versions are minted under')
+@click.option('-p', '--policy', type=click.Choice(ALLOWED_POLICIES), help='RDF schema policy')
+@click.option('-o', '--destination', type=click.File('w'), default=sys.stdout,
+              help='Output SPARQL Update file path. Defaults to STDOUT.')
+@click.option('--added', type=click.File('w'), help='Write the added triples to this N-Triples file instead')
+@click.option('--removed', type=click.File('w'), help='Write the removed triples to this N-Triples file instead')
+@click.option('--fingerprints', type=click.Path(dir_okay=False),
+              help='File to read the fingerprints of OLD from, if it exists, and to write those of NEW to')
+def delta(old, new, base_iri, policy, destination, added, removed, fingerprints):
+    """Convert only what changed between two versions of a CX network.
+
+    Outputs a SPARQL Update that deletes the triples of the elements of OLD that changed or were removed and
+    inserts those of NEW, or two N-Triples files with the added and removed triples. Elements are matched by their
+    identifiers, or by their positions in their aspects if they don't have any.
+    """
+    from .delta import cx_elements_delta, read_fingerprints, write_fingerprints
+    from .reader import iterate_cx_elements
+
+    if (added is None) != (removed is None):
+        raise click.UsageError('--added and --removed must be given together')
+
+    old_fingerprints = None
+    if fingerprints is not None and os.path.exists(fingerprints):
+        with open(fingerprints) as file:
+            old_fingerprints = read_fingerprints(file)
+
+    def _get_old_elements():
+        with open(old) as file:
+            yield from iterate_cx_elements(file)
+
+    result = cx_elements_delta(_get_exporter_cls(policy), _get_old_elements, iterate_cx_elements(new),
+                               base_iri=base_iri, old_fingerprints=old_fingerprints)
+
+    if added is not None:
+        result.write_ntriples(added, removed)
+    else:
+        result.write_sparql_update(destination)
+
+    if fingerprints is not None:
+        with open(fingerprints, 'w') as file:
+            write_fingerprints(result.fingerprints, file)
+    click.echo(f'added {len(result.added)} and removed {len(result.removed)} triple(s)', err=True)
+
+
+@main.command()
+@click.option('-i', '--file', type=click.File(), default=sys.stdin,
+              help='Input N-Triples or N-Quads file path. Defaults to STDIN')
+@click.option('-o', '--destination', type=click.File('w'), default=sys.stdout,
+              help='Output CX file path. Defaults to STDOUT.')
+@click.option('--max-in-memory', type=click.IntRange(min=1), default=1_000_000, show_default=True,
+              help='Number of triples to keep in memory before sorting them on disk')
+def rdf_to_cx(file, destination, max_in_memory):
+    """Convert RDF made with the aspect or predicate policy back to CX.
+
+    The triples are grouped by the elements they describe in a single pass, sorting them on disk once there are too
+    many to keep in memory, and the CX is written an aspect fragment at a time.
+    """
+    from .importer import rdf_file_to_cx_file
+
+    rdf_file_to_cx_file(file, destination, max_in_memory=max_in_memory)
 
 
 @main.command()
@@ -40,19 +232,36 @@ def cx_to_rdf(file, destination, policy, rdf_format):
 @click.option('--indent', type=int, help='Pretty print JSON indent option')
 @click.option('--ndex', is_flag=True,
               help='Enables upload to NDEx. NDEX_USERNAME and NDEX_PASSWORD must be set in the environment.')
-def owl_to_cx(base_iri, destination, indent, ndex):
-    """Download/load OWL then convert to CX."""
-    cx = convert_owl(base_iri)
+@click.option('-c', '--cache-directory', type=click.Path(file_okay=False),
+              help='Directory to reopen the parsed ontology from if it has not changed since it was last loaded')
+@click.option('--cache-size', type=click.IntRange(min=1), default=10 * 1024, show_default=True,
+              help='Size the cache is kept under, in MiB')
+def owl_to_cx(base_iri, destination, indent, ndex, cache_directory, cache_size):
+    """Download/load OWL then convert to CX.
 
-    if ndex:
-        username = os.environ['NDEX_USERNAME']
-        password = os.environ['NDEX_USERNAME']
-        client = ndex2.Ndex2(username=username, password=password)
-        uri = client.save_new_network(cx.to_cx())
-        click.echo(uri.rsplit('/')[-1])
+    The CX is written as it's made, so the network is never built in memory. With a cache directory, ontologies that
+    haven't changed since they were last parsed are reopened from it, which is much faster for big ones.
+    """
+    from .owl import convert_owl_to_file, OntologyCache
 
-    else:
-        json.dump(cx.to_cx(), destination, indent=indent)
+    cache = None if cache_directory is None else OntologyCache(cache_directory, max_size=cache_size * 1024 ** 2)
+
+    if not ndex:
+        convert_owl_to_file(base_iri, destination, indent=indent, cache=cache)
+        return
+
+    import ndex2
+
+    username = os.environ['NDEX_USERNAME']
+    password = os.environ['NDEX_PASSWORD']
+    client = ndex2.Ndex2(username=username, password=password)
+    with tempfile.TemporaryFile() as buffer:
+        text = io.TextIOWrapper(buffer, encoding='utf-8')
+        convert_owl_to_file(base_iri, text, cache=cache)
+        text.detach()  # flushes the text without closing the file
+        buffer.seek(0)
+        uri = client.save_cx_stream_as_new_network(buffer)
+    click.echo(uri.rsplit('/')[-1])
 
 
 if __name__ == '__main__':
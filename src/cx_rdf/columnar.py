@@ -0,0 +1,237 @@
+# -*- coding: utf-8 -*-
+
+"""A columnar representation of CX for exporting whole aspects at once.
+
+The exporters normally get one element at a time as a dictionary, so every element pays for looking up its keys and
+for dispatching to its handler. A :class:`ColumnarCx` instead splits the big aspects, ``nodes``, ``edges``,
+``nodeAttributes``, and ``edgeAttributes``, into one column per key, so a policy can convert a whole column of
+identifiers to nodes or of values to literals in one go and hand the triples to its sink in batches. Integer columns
+are stored as arrays of machine integers. Everything else in the CX is kept as a list of elements.
+
+.. code-block:: python
+
+    from cx_rdf.columnar import ColumnarCx
+    from cx_rdf.io import cx_columns_to_rdf_graph
+
+    with open('network.cx') as file:
+        columns = ColumnarCx.from_file(file)
+
+    graph = cx_columns_to_rdf_graph(columns, policy='aspect')
+"""
+
+from array import array
+from typing import Dict, FrozenSet, Iterable, List, Optional, TextIO, Tuple, Union
+
+from .reader import iterate_cx_elements
+from .typing import CxElementsType, CxType
+from .utils import iterate_aspect_elements
+
+__all__ = [
+    'ColumnarCx',
+    'Columns',
+    'NodeColumns',
+    'EdgeColumns',
+    'AttributeColumns',
+    'ASPECT_COLUMNS',
+    'iter_slices',
+]
+
+#: The number of rows the exporters turn into triples at once. Keeping more triples alive at once than this only
+#: makes the garbage collector work harder.
+COLUMN_BATCH_SIZE = 1_000
+
+
+class Columns:
+    """The columns of an aspect, with one row per element.
+
+    Keys that don't have a column are kept for the few elements that have them, so the elements can be rebuilt
+    exactly.
+    """
+
+    #: The CX keys of the columns, in the same order as :attr:`__slots__`
+    keys: Tuple[str, ...] = ()
+    #: The keys every element has to have
+    required: Tuple[str, ...] = ()
+    #: The keys whose columns hold integers
+    integer_keys: Tuple[str, ...] = ()
+
+    __slots__ = ('extras', '_length', '_appenders')
+
+    _key_set: FrozenSet[str] = frozenset()
+
+    def __init_subclass__(cls, **kwargs):
+        """Look up the keys with columns as a set, for finding the keys without one."""
+        super().__init_subclass__(**kwargs)
+        cls._key_set = frozenset(cls.keys)
+
+    def __init__(self):
+        """Initialize empty columns."""
+        for name in self.__slots__:
+            setattr(self, name, [])
+        #: The keys without a column for each row that has any
+        self.extras: Dict[int, Dict] = {}
+        self._length = 0
+        self._bind_appenders()
+
+    def _bind_appenders(self) -> None:
+        self._appenders = [(getattr(self, name).append, key) for name, key in zip(self.__slots__, self.keys)]
+
+    def append(self, element: Dict) -> None:
+        """Add an element as a row.
+
+        :param element: An element from the aspect
+        :raises KeyError: If the element is missing one of the required keys
+        """
+        for key in self.required:
+            if key not in element:
+                raise KeyError(f'{key} missing from element: {element}')
+
+        get = element.get
+        for append, key in self._appenders:
+            append(get(key))
+
+        if not self._key_set.issuperset(element):
+            self.extras[self._length] = {
+                key: value
+                for key, value in element.items()
+                if key not in self._key_set
+            }
+
+        self._length += 1
+
+    def freeze(self) -> None:
+        """Pack the integer columns into arrays, if all of their values fit."""
+        for name, key in zip(self.__slots__, self.keys):
+            if key not in self.integer_keys:
+                continue
+            column = getattr(self, name)
+            if isinstance(column, array) or not all(type(value) is int for value in column):
+                continue
+            try:
+                setattr(self, name, array('q', column))
+            except OverflowError:
+                pass
+        self._bind_appenders()
+
+    def __len__(self) -> int:
+        """Count the rows."""
+        return self._length
+
+    def iter_elements(self) -> Iterable[Dict]:
+        """Rebuild the elements, row by row."""
+        columns = [getattr(self, name) for name in self.__slots__]
+        for row, values in enumerate(zip(*columns)):
+            element = {key: value for key, value in zip(self.keys, values) if value is not None}
+            extra = self.extras.get(row)
+            if extra is not None:
+                element.update(extra)
+            yield element
+
+
+class NodeColumns(Columns):
+    """The columns of the nodes aspect."""
+
+    keys = ('@id', 'n')
+    required = ('@id',)
+    integer_keys = ('@id',)
+
+    __slots__ = ('ids', 'names')
+
+
+class EdgeColumns(Columns):
+    """The columns of the edges aspect."""
+
+    keys = ('@id', 's', 't', 'i')
+    required = ('@id', 's', 't')
+    integer_keys = ('@id', 's', 't')
+
+    __slots__ = ('ids', 'sources', 'targets', 'interactions')
+
+
+class AttributeColumns(Columns):
+    """The columns of the node and edge attribute aspects."""
+
+    keys = ('po', 'n', 'v', 'd')
+    required = ('po', 'n', 'v')
+    integer_keys = ('po',)
+
+    __slots__ = ('parents', 'names', 'values', 'data_types')
+
+
+#: The aspects that are split into columns, and the class holding their columns
+ASPECT_COLUMNS = {
+    'nodes': NodeColumns,
+    'edges': EdgeColumns,
+    'nodeAttributes': AttributeColumns,
+    'edgeAttributes': AttributeColumns,
+}
+
+
+class ColumnarCx:
+    """A CX document with its big aspects split into columns."""
+
+    def __init__(self):
+        """Initialize an empty document."""
+        #: The aspects in the order they first appeared, each as columns or as a list of elements
+        self.aspects: List[Tuple[str, Union[Columns, List[Dict]]]] = []
+        self._index: Dict[str, Union[Columns, List[Dict]]] = {}
+
+    @classmethod
+    def from_elements(cls, elements: CxElementsType) -> 'ColumnarCx':
+        """Build the columns from a stream of CX aspect names and elements.
+
+        Fragments of the same aspect are merged, in the position where the aspect first appeared.
+
+        :param elements: An iterable of pairs of aspect names and elements
+        """
+        rv = cls()
+        for aspect_name, element in elements:
+            rv.append(aspect_name, element)
+        for _, part in rv.aspects:
+            if isinstance(part, Columns):
+                part.freeze()
+        return rv
+
+    @classmethod
+    def from_cx(cls, cx_json: CxType) -> 'ColumnarCx':
+        """Build the columns from CX JSON."""
+        return cls.from_elements(iterate_aspect_elements(cx_json))
+
+    @classmethod
+    def from_file(cls, file: TextIO) -> 'ColumnarCx':
+        """Build the columns from a file containing a CX document, reading it incrementally."""
+        return cls.from_elements(iterate_cx_elements(file))
+
+    def append(self, aspect_name: str, element: Dict) -> None:
+        """Add an element from the given aspect.
+
+        :param aspect_name: The name of the aspect
+        :param element: An element from the aspect
+        """
+        part = self._index.get(aspect_name)
+        if part is None:
+            columns_cls = ASPECT_COLUMNS.get(aspect_name)
+            part = self._index[aspect_name] = [] if columns_cls is None else columns_cls()
+            self.aspects.append((aspect_name, part))
+        part.append(element)
+
+    def get(self, aspect_name: str) -> Optional[Union[Columns, List[Dict]]]:
+        """Get the columns or elements of an aspect, if it's present."""
+        return self._index.get(aspect_name)
+
+    def iter_elements(self) -> CxElementsType:
+        """Iterate over the aspect names and elements, with the elements rebuilt from their columns."""
+        for aspect_name, part in self.aspects:
+            elements = part.iter_elements() if isinstance(part, Columns) else part
+            for element in elements:
+                yield aspect_name, element
+
+
+def iter_slices(length: int, size: int = COLUMN_BATCH_SIZE) -> Iterable[slice]:
+    """Iterate over consecutive slices covering the rows of a column.
+
+    :param length: The number of rows
+    :param size: The number of rows in each slice
+    """
+    for start in range(0, length, size):
+        yield slice(start, start + size)
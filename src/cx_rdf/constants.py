@@ -2,12 +2,137 @@
 
 """Constants for CX-RDF."""
 
-from rdflib import Namespace
+from rdflib import Namespace, RDF, RDFS, URIRef
 
 __all__ = [
     'CX',
+    'CX_KEY',
+    'CX_TERMS',
+    'KNOWN_ASPECTS',
+    'RDF_JSON',
+    'RDF_PROPERTY',
+    'RDF_TYPE',
+    'RDFS_LABEL',
 ]
 
-CX = Namespace("http://ndexbio.org/rdfs#")
+#: The names of the aspects NDEx knows about, from :data:`ndex2.cx.known_aspects`. They're copied here so converting
+#: doesn't have to import :mod:`ndex2`, which takes much longer than the conversion of a small network.
+KNOWN_ASPECTS = frozenset({
+    'nodes',
+    'edges',
+    'nodeAttributes',
+    'edgeAttributes',
+    'networkAttributes',
+    'provenanceHistory',
+    'citations',
+    'nodeCitations',
+    'edgeCitations',
+    'supports',
+    'nodeSupports',
+    'edgeSupports',
+    'cartesianLayout',
+    '@context',
+    'cyVisualProperties',
+    'visualProperties',
+})
+
+#: The classes and predicates in the CX vocabulary used by the export policies
+CX_TERMS = (
+    # classes
+    'network',
+    'aspect',
+    'metadata',
+    'node',
+    'edge',
+    'citation',
+    'support',
+    'attribute',
+    'entry',
+    'node_attribute',
+    'edge_attribute',
+    'network_attribute',
+    # policies
+    'abstract_network',
+    'compact_abstract_network',
+    'concise',
+    # predicates
+    'policy',
+    'has_aspect',
+    'has_metadata',
+    'has_node',
+    'has_edge',
+    'has_citation',
+    'has_support',
+    'has_element',
+    'has_entry',
+    'has_key',
+    'has_value',
+    'has_id',
+    'has_number_verification',
+    'aspect_version',
+    'aspect_elements_count',
+    'aspect_consistency_group',
+    'aspect_id_counter',
+    'aspect_has_attribute',
+    'aspect_has_key',
+    'node_has_attribute',
+    'node_has_alias',
+    'edge_has_id',
+    'edge_has_source',
+    'edge_has_target',
+    'edge_has_interaction',
+    'edge_has_attribute',
+    'edge_has_citation',
+    'edge_has_support',
+    'network_has_attribute',
+    'network_attribute_has_key',
+    'attribute_has_name',
+    'attribute_has_value',
+    'attribute_has_uri',
+    'citation_has_id',
+    'citation_has_title',
+    'support_has_id',
+    'support_has_text',
+    'edge_citation_has_edge',
+    'edge_citation_has_citation',
+    'edge_support_has_edge',
+    'edge_support_has_support',
+)
+
+
+class _PrecomputedNamespace(Namespace):
+    """A namespace that creates the URI references for a fixed set of terms once, up front.
+
+    Looking up one of these terms as an attribute finds it directly on the instance instead of going through
+    :meth:`rdflib.Namespace.__getattr__`, which builds a new :class:`rdflib.URIRef` on every access. Other terms
+    still work like in a normal namespace.
+    """
+
+    def __new__(cls, value, terms=()):
+        namespace = super().__new__(cls, value)
+        for term in terms:
+            namespace.__dict__[term] = namespace.term(term)
+        return namespace
+
+    def __getnewargs__(self):
+        return str(self), tuple(self.__dict__)
+
+
+CX = _PrecomputedNamespace("http://ndexbio.org/rdfs#", CX_TERMS)
+
+#: RDF's type predicate, looked up once since attribute access on RDFLib's closed namespaces isn't free
+RDF_TYPE = RDF.type
+
+#: RDFS's label predicate
+RDFS_LABEL = RDFS.label
+
+#: RDF's class of predicates
+RDF_PROPERTY = RDF.Property
+
+#: RDF's datatype for JSON literals, which RDFLib's namespace for RDF doesn't have yet
+RDF_JSON = URIRef('http://www.w3.org/1999/02/22-rdf-syntax-ns#JSON')
+
+#: The namespace of the predicates the compact abstract policy mints for the keys of each aspect's elements
+CX_KEY = Namespace('http://ndexbio.org/rdfs/key/')
 
 VERSION = '0.0.1-dev'
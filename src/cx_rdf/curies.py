@@ -0,0 +1,185 @@
+# -*- coding: utf-8 -*-
+
+"""Expanding the CURIEs in attribute values with the prefixes from a network's ``@context``.
+
+NDEx networks write identifiers as CURIEs like ``hgnc:1100``, whose prefixes are defined in the ``@context`` aspect.
+The same prefixes, and often the same CURIEs, come up over and over, so a :class:`CurieIndex` keeps the most recently
+expanded ones in a bounded cache.
+
+.. code-block:: python
+
+    from cx_rdf.curies import CurieIndex
+
+    curies = CurieIndex()
+    curies.add_prefixes({'hgnc': 'http://identifiers.org/hgnc/'})
+    uri = curies.expand('hgnc:1100')
+
+The ``@context`` doesn't have to come before the attributes. Until it's seen, the CURIEs whose prefixes aren't known
+are held back in a :class:`cx_rdf.pending.PendingBuffer` with the subject and predicate of their triples, and the
+triples are made once the prefixes arrive. A network doesn't need an ``@context`` at all, though, so once the
+``metaData`` aspect has been seen without one, the context is taken to be empty and nothing is held back.
+"""
+
+from functools import lru_cache
+import logging
+import re
+from typing import Dict, Iterable, List, Mapping, Optional, Tuple
+
+from rdflib import URIRef
+from rdflib.term import Node
+
+from .pending import PendingBuffer
+from .sinks import Triple
+
+__all__ = [
+    'CurieIndex',
+]
+
+log = logging.getLogger(__name__)
+
+#: The number of expanded CURIEs a :class:`CurieIndex` keeps by default
+DEFAULT_CURIE_CACHE_SIZE = 1 << 16
+
+#: Prefixes that could be in an ``@context``, so things like ``12:30`` aren't held back waiting for one
+_PREFIX_PATTERN = re.compile(r'[A-Za-z_][\w.\-]*\Z')
+
+#: A CURIE held back until its prefix is known, with the subject and predicate of its triple
+Deferred = Tuple[Node, Node, str]
+
+
+def _split_curie(curie: str) -> Optional[Tuple[str, str]]:
+    """Split a CURIE into its prefix and local identifier, or give None if it isn't written like one.
+
+    URLs like ``http://example.com`` aren't CURIEs, even though they have a colon.
+    """
+    pair = curie.strip().split(':', 1)
+    if 2 != len(pair):
+        return None
+
+    prefix, identifier = (part.strip() for part in pair)
+    if not prefix or not identifier or identifier.startswith('//'):
+        return None
+
+    return prefix, identifier
+
+
+class CurieIndex:
+    """Expands CURIEs with the prefixes from the ``@context``, reusing recent expansions."""
+
+    __slots__ = ('prefixes', 'has_context', 'context_listed', 'pending', '_expand')
+
+    def __init__(self, maxsize: int = DEFAULT_CURIE_CACHE_SIZE, pending: Optional[PendingBuffer] = None):
+        """Initialize the index.
+
+        :param maxsize: The number of expanded CURIEs to keep. The least recently used ones are dropped first.
+        :param pending: Where to hold back the CURIEs waiting for their prefixes, keyed by the prefix. If not
+         given, makes a new buffer.
+        """
+        #: The namespace of each prefix
+        self.prefixes: Dict[str, str] = {}
+        #: Whether an ``@context`` has been seen. After that, CURIEs with unknown prefixes aren't held back anymore.
+        self.has_context = False
+        #: Whether the ``metaData`` aspect lists an ``@context``, or None if it hasn't been seen
+        self.context_listed: Optional[bool] = None
+        self.pending = PendingBuffer() if pending is None else pending
+        self._expand = lru_cache(maxsize=maxsize)(self._expand_uncached)
+
+    def _expand_uncached(self, curie: str) -> Optional[URIRef]:
+        pair = _split_curie(curie)
+        if pair is None:
+            return None
+
+        prefix, identifier = pair
+        namespace = self.prefixes.get(prefix)
+        if namespace is None:
+            return None
+
+        return URIRef(namespace + identifier)
+
+    @property
+    def waits_for_context(self) -> bool:
+        """Whether CURIEs with unknown prefixes are held back.
+
+        They're held back until the ``@context`` is seen, or until the ``metaData`` aspect is seen without one.
+        """
+        return not self.has_context and self.context_listed is not False
+
+    def add_metadata(self, aspect_name: str) -> None:
+        """Note an aspect listed in the ``metaData`` aspect.
+
+        :param aspect_name: The name of the aspect
+        """
+        if aspect_name == '@context':
+            self.context_listed = True
+        elif self.context_listed is None:
+            self.context_listed = False
+
+    def expand(self, curie: str) -> Optional[URIRef]:
+        """Expand a CURIE, or give None if it isn't one or its prefix isn't known."""
+        return self._expand(curie)
+
+    def add_prefixes(self, prefixes: Mapping[str, str]) -> List[Triple]:
+        """Add prefixes from an element of the ``@context``.
+
+        :param prefixes: The namespace of each prefix
+        :return: The triples for the CURIEs that were held back waiting for these prefixes
+        """
+        self.prefixes.update((prefix, str(namespace)) for prefix, namespace in prefixes.items())
+        self.has_context = True
+        # the cache remembers which CURIEs couldn't be expanded, which might have changed
+        self._expand.cache_clear()
+
+        triples = []
+        for prefix in prefixes:
+            for subject, predicate, curie in self.pending.resolve(prefix):
+                uri = self._expand(curie)
+                if uri is not None:
+                    triples.append((subject, predicate, uri))
+        return triples
+
+    def get_triples(self, subject: Node, predicate: Node, curies: Iterable[str]) -> List[Triple]:
+        """Get the triples from a subject to the URIs of the given CURIEs.
+
+        The CURIEs whose prefixes aren't known yet are held back until they are, while waiting for the ``@context``.
+        See :attr:`waits_for_context`. Anything else that can't be expanded is skipped.
+
+        :param subject: The subject of the triples
+        :param predicate: The predicate of the triples
+        :param curies: The CURIEs to expand
+        """
+        triples = []
+        for curie in curies:
+            uri = self._expand(curie)
+            if uri is not None:
+                triples.append((subject, predicate, uri))
+            else:
+                self._defer(subject, predicate, curie)
+        return triples
+
+    def _defer(self, subject: Node, predicate: Node, curie: str) -> None:
+        pair = _split_curie(curie)
+        if pair is None:
+            log.debug('incorrectly written pair: %s', curie)
+            return
+
+        prefix = pair[0]
+        if not self.waits_for_context:
+            log.debug('missing prefix "%s" in context', prefix)
+        elif not _PREFIX_PATTERN.match(prefix):
+            log.debug('not a prefix: %s', prefix)
+        else:
+            self.pending.add(prefix, (subject, predicate, curie))
+
+    def pop_deferred(self) -> List[Deferred]:
+        """Take the CURIEs that are being held back, so another index can make their triples."""
+        return [item for _, item in self.pending.pop_all()]
+
+    def extend_deferred(self, deferred: Iterable[Deferred]) -> List[Triple]:
+        """Take over CURIEs that another index was holding back.
+
+        :return: The triples for the ones that can already be expanded
+        """
+        triples = []
+        for subject, predicate, curie in deferred:
+            triples.extend(self.get_triples(subject, predicate, (curie,)))
+        return triples
@@ -0,0 +1,297 @@
+# -*- coding: utf-8 -*-
+
+"""Converting only what changed between two versions of the same CX network.
+
+Each element is matched with the element from the other version with the same ``@id`` in the same aspect, or, if it
+doesn't have one, with the element at the same position in the same aspect. The triples each element generates are
+hashed into a fingerprint, and only the elements whose fingerprints differ are converted into added and removed
+triples. The declarations of nodes, edges, citations, supports, and aspects are added or removed when the first
+element referring to them appears or the last one disappears.
+
+.. code-block:: python
+
+    from cx_rdf.delta import cx_delta
+
+    delta = cx_delta(old_cx_json, new_cx_json, base_iri='http://example.com/network/')
+    with open('update.ru', 'w') as file:
+        delta.write_sparql_update(file)
+
+A base IRI is required, since blank nodes from different conversions can't be matched. The fingerprints of the new
+version can be saved with :func:`write_fingerprints` so the next delta can skip converting the old version just to
+fingerprint it. Elements without identifiers get IRIs by their position, so inserting one shifts all of those after
+it in the same aspect, which then all count as changed. A triple that's generated by both a removed element and an
+unchanged one is removed too.
+"""
+
+from hashlib import blake2b
+import json
+from typing import Any, Callable, Dict, Iterable, List, NamedTuple, Optional, Set, TextIO, Tuple, Type
+
+from .exporter_base import Exporter
+from .io import _get_exporter_cls
+from .sinks import CountingSink, ListSink, term_to_nt, Triple
+from .typing import CxElementsType, CxType
+from .utils import get_version, iterate_aspect_elements
+
+__all__ = [
+    'Delta',
+    'Fingerprints',
+    'cx_delta',
+    'cx_elements_delta',
+    'get_fingerprints',
+    'read_fingerprints',
+    'write_fingerprints',
+]
+
+#: The type used for the key matching an element across versions: its aspect, then its ``@id``, or if it doesn't
+#: have one, its position in the aspect
+ElementKey = Tuple[str, Any, Optional[int]]
+
+#: The type used for entities: their kind, like ``node`` or ``aspect``, and their identifier
+Entity = Tuple[str, Any]
+
+
+class Fingerprints(NamedTuple):
+    """The fingerprints of the elements of a network, and the entities it declares."""
+
+    policy: str
+    base_iri: str
+    elements: Dict[ElementKey, str]
+    entities: Set[Entity]
+
+
+class Delta(NamedTuple):
+    """The triples added and removed between two versions of a network."""
+
+    added: Set[Triple]
+    removed: Set[Triple]
+    #: The fingerprints of the new version, for the next delta
+    fingerprints: Fingerprints
+
+    def write_ntriples(self, added_file: TextIO, removed_file: TextIO) -> None:
+        """Write the added and removed triples as N-Triples, in sorted order.
+
+        :param added_file: A file-like object opened for writing text, for the added triples
+        :param removed_file: A file-like object opened for writing text, for the removed triples
+        """
+        added_file.writelines(f'{line}\n' for line in _to_lines(self.added))
+        removed_file.writelines(f'{line}\n' for line in _to_lines(self.removed))
+
+    def write_sparql_update(self, file: TextIO) -> None:
+        """Write a SPARQL Update request that turns the old version of the network into the new one.
+
+        :param file: A file-like object opened for writing text
+        """
+        if self.removed:
+            file.write('DELETE DATA {\n')
+            file.writelines(f'  {line}\n' for line in _to_lines(self.removed))
+            file.write('}')
+            file.write(' ;\n' if self.added else '\n')
+        if self.added:
+            file.write('INSERT DATA {\n')
+            file.writelines(f'  {line}\n' for line in _to_lines(self.added))
+            file.write('}\n')
+
+
+def _to_line(triple: Triple) -> str:
+    s, p, o = triple
+    return f'{term_to_nt(s)} {term_to_nt(p)} {term_to_nt(o)} .'
+
+
+def _to_lines(triples: Iterable[Triple]) -> List[str]:
+    return sorted(map(_to_line, triples))
+
+
+def _new_exporter(exporter_cls: Type[Exporter], base_iri: str) -> Exporter:
+    """Make an exporter that keeps its triples in a list, doesn't declare the network, and drops declarations."""
+    sink = ListSink()
+    exporter = exporter_cls(sink=sink, base_iri=base_iri)
+    sink.triples.clear()
+    exporter.declaration_sink = CountingSink()
+    return exporter
+
+
+def _iterate_element_triples(exporter: Exporter, elements: CxElementsType) -> Iterable[Tuple[ElementKey, List]]:
+    """Convert elements one at a time, giving the key of each and the triples it generates besides declarations."""
+    triples = exporter.sink.triples
+    positions: Dict[str, int] = {}
+    for aspect_name, element in elements:
+        position = positions.get(aspect_name, 0)
+        positions[aspect_name] = position + 1
+
+        identifier = element.get('@id')
+        key = (aspect_name, identifier, None) if identifier is not None else (aspect_name, None, position)
+
+        exporter.add_element(aspect_name, element)
+        yield key, triples[:]
+        triples.clear()
+
+
+#: The fingerprints are sums of the hashes of triples, modulo this
+_MODULUS = 1 << 128
+
+
+def _hash_triple(triple: Triple) -> int:
+    return int.from_bytes(blake2b(_to_line(triple).encode('utf-8'), digest_size=16).digest(), 'big')
+
+
+def _iterate_fingerprints(exporter: Exporter, elements: CxElementsType) -> Iterable[Tuple[ElementKey, str, List]]:
+    """Convert elements and fingerprint them, combining the fingerprints of elements that share a key.
+
+    Each triple is hashed on its own and the hashes are summed, so the order of the triples doesn't matter and the
+    fingerprint of a key can be updated by the elements that share it without keeping the triples of the ones before.
+    Only the triples of each element itself are given with the fingerprint of its key so far.
+    """
+    sums: Dict[ElementKey, int] = {}
+    for key, triples in _iterate_element_triples(exporter, elements):
+        total = (sums.get(key, 0) + sum(map(_hash_triple, triples))) % _MODULUS
+        sums[key] = total
+        yield key, f'{total:032x}', triples
+
+
+def get_fingerprints(exporter_cls: Type[Exporter], elements: CxElementsType, base_iri: str) -> Fingerprints:
+    """Fingerprint the elements of a network.
+
+    :param exporter_cls: The exporter for the policy
+    :param elements: An iterable of pairs of aspect names and elements
+    :param base_iri: The IRI the network's IRIs are minted under
+    """
+    exporter = _new_exporter(exporter_cls, base_iri)
+    fingerprints = {key: fingerprint for key, fingerprint, _ in _iterate_fingerprints(exporter, elements)}
+    return Fingerprints(str(exporter.policy), exporter.base_iri, fingerprints, set(exporter.iterate_entities()))
+
+
+def cx_elements_delta(exporter_cls: Type[Exporter], get_old_elements: Callable[[], CxElementsType],
+                      new_elements: CxElementsType, base_iri: str,
+                      old_fingerprints: Optional[Fingerprints] = None) -> Delta:
+    """Get the triples added and removed between two versions of a network given as streams of elements.
+
+    :param exporter_cls: The exporter for the policy
+    :param get_old_elements: A function that gives a new iterable of the pairs of aspect names and elements of the
+     old version each time it's called. It's called to fingerprint the old version unless the old fingerprints are
+     given, then again only if any elements were changed or removed.
+    :param new_elements: An iterable of pairs of aspect names and elements of the new version
+    :param base_iri: The IRI the network's IRIs are minted under
+    :param old_fingerprints: The fingerprints of the old version, if they were saved from an earlier delta
+    :raises ValueError: If the fingerprints are for a different policy or base IRI
+    """
+    if base_iri is None:
+        raise ValueError('a base IRI is needed to match the triples of two conversions')
+
+    new_exporter = _new_exporter(exporter_cls, base_iri)
+    if old_fingerprints is None:
+        old_fingerprints = get_fingerprints(exporter_cls, get_old_elements(), base_iri)
+    elif (old_fingerprints.policy, old_fingerprints.base_iri) != (str(new_exporter.policy), new_exporter.base_iri):
+        raise ValueError('the fingerprints were made with a different policy or base IRI')
+
+    # the fingerprint of a key is only final once all of the elements sharing it have been converted, so its triples
+    # are kept while its fingerprint differs from the old one
+    new_triples: Dict[ElementKey, List] = {}
+    new_fingerprints: Dict[ElementKey, str] = {}
+    # the keys that matched the old version before another element shared them, whose triples until then were the
+    # same as the old ones
+    reopened: Set[ElementKey] = set()
+    for key, fingerprint, triples in _iterate_fingerprints(new_exporter, new_elements):
+        if key in new_fingerprints and key not in new_triples:
+            reopened.add(key)
+        new_fingerprints[key] = fingerprint
+        if old_fingerprints.elements.get(key) != fingerprint:
+            new_triples.setdefault(key, []).extend(triples)
+        else:
+            new_triples.pop(key, None)
+            reopened.discard(key)
+
+    added: Set[Triple] = set()
+    for triples in new_triples.values():
+        added.update(triples)
+
+    removed: Set[Triple] = set()
+    changed = {
+        key
+        for key, fingerprint in old_fingerprints.elements.items()
+        if new_fingerprints.get(key) != fingerprint
+    }
+    if changed:
+        old_exporter = _new_exporter(exporter_cls, base_iri)
+        for key, triples in _iterate_element_triples(old_exporter, get_old_elements()):
+            if key in changed:
+                removed.update(triples)
+                if key in reopened:
+                    added.update(triples)
+
+    new_entities = set(new_exporter.iterate_entities())
+    shared_entities = new_entities & old_fingerprints.entities
+    added.update(_get_declarations(exporter_cls, base_iri, new_entities - shared_entities, shared_entities))
+    removed.update(_get_declarations(exporter_cls, base_iri, old_fingerprints.entities - shared_entities,
+                                     shared_entities))
+
+    fingerprints = Fingerprints(old_fingerprints.policy, old_fingerprints.base_iri, new_fingerprints, new_entities)
+    return Delta(added - removed, removed - added, fingerprints)
+
+
+def _get_declarations(exporter_cls: Type[Exporter], base_iri: str, entities: Iterable[Entity],
+                      shared_entities: Iterable[Entity]) -> List[Triple]:
+    """Get the triples declaring entities, but not the entities shared by both versions that they refer to."""
+    exporter = _new_exporter(exporter_cls, base_iri)
+    for kind, identifier in shared_entities:
+        exporter.adopt_entity(kind, identifier)
+    declarations = exporter.declaration_sink = ListSink()
+    for kind, identifier in entities:
+        exporter.ensure_entity(kind, identifier)
+    return declarations.triples
+
+
+def cx_delta(old_cx_json: Optional[CxType], new_cx_json: CxType, base_iri: str, policy: Optional[str] = None,
+             old_fingerprints: Optional[Fingerprints] = None) -> Delta:
+    """Get the triples added and removed between two versions of a CX network.
+
+    :param old_cx_json: The old version of the network. Can be None if the old fingerprints are given and no
+     elements were changed or removed, which is checked.
+    :param new_cx_json: The new version of the network
+    :param base_iri: The IRI the network's IRIs are minted under
+    :param policy: Defaults to the 'predicate' policy. Can also use 'abstract', 'compact', or 'aspect'
+    :param old_fingerprints: The fingerprints of the old version, if they were saved from an earlier delta
+    """
+    def _get_old_elements() -> CxElementsType:
+        if old_cx_json is None:
+            raise ValueError('the old network is needed to remove the triples of elements that changed')
+        return iterate_aspect_elements(old_cx_json)
+
+    return cx_elements_delta(_get_exporter_cls(policy), _get_old_elements, iterate_aspect_elements(new_cx_json),
+                             base_iri=base_iri, old_fingerprints=old_fingerprints)
+
+
+def write_fingerprints(fingerprints: Fingerprints, file: TextIO) -> None:
+    """Write fingerprints as JSON lines, starting with a header.
+
+    :param fingerprints: The fingerprints of a network
+    :param file: A file-like object opened for writing text
+    """
+    header = {'policy': fingerprints.policy, 'base_iri': fingerprints.base_iri, 'version': get_version()}
+    file.write(json.dumps(header) + '\n')
+    for (aspect_name, identifier, position), fingerprint in fingerprints.elements.items():
+        file.write(json.dumps([aspect_name, identifier, position, fingerprint]) + '\n')
+    for kind, identifier in sorted(fingerprints.entities, key=str):
+        file.write(json.dumps({'kind': kind, 'id': identifier}) + '\n')
+
+
+def read_fingerprints(file: TextIO) -> Fingerprints:
+    """Read fingerprints written by :func:`write_fingerprints`.
+
+    :param file: A file-like object opened for reading text
+    :raises ValueError: If they were written by another version of CX-RDF, whose triples might differ
+    """
+    header = json.loads(next(file))
+    if header['version'] != get_version():
+        raise ValueError(f'fingerprints are from CX-RDF {header["version"]}, not {get_version()}')
+
+    elements, entities = {}, set()
+    for line in file:
+        entry = json.loads(line)
+        if isinstance(entry, dict):
+            entities.add((entry['kind'], entry['id']))
+        else:
+            aspect_name, identifier, position, fingerprint = entry
+            elements[aspect_name, identifier, position] = fingerprint
+
+    return Fingerprints(header['policy'], header['base_iri'], elements, entities)
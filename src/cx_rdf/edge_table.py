@@ -0,0 +1,298 @@
+# -*- coding: utf-8 -*-
+
+"""A table of the edges of a network in the predicate policy, with the labels of their nodes, next to its RDF.
+
+The predicate policy is made so visualizations can get a network's edges with a query like the one in
+:mod:`cx_rdf.predicate_policy`, but on a big graph, joining the types and labels of the sources and targets of all
+edges takes RDFLib a long time. The same rows can be written to an SQLite database while the network is converted,
+by passing the triples through an :class:`EdgeTableSink`, and read back right away later:
+
+.. code-block:: python
+
+    from cx_rdf import cx_file_to_rdf_graph
+    from cx_rdf.edge_table import EdgeTable, EdgeTableSink
+    from cx_rdf.sinks import GraphSink
+
+    sink = EdgeTableSink(GraphSink(), 'network.sqlite')
+    with open('network.cx') as file:
+        graph = cx_file_to_rdf_graph(file, policy='predicate', sink=sink)
+    sink.close()
+
+    # later
+    with EdgeTable('network.sqlite') as table:
+        for source_label, relation, target_label in table.query():
+            ...
+
+Since the nodes aspect can come after the edges, the sink only records the triples it needs while converting, and
+joins them into the table of edges once it's closed. The database also has the nodes and edges by their CX
+identifiers and by their subjects in the RDF.
+"""
+
+import os
+import pathlib
+import sqlite3
+from typing import Iterable, List, NamedTuple, Optional, Tuple
+
+from rdflib.term import Node
+
+from .constants import CX, RDF_TYPE, RDFS_LABEL
+from .sinks import Triple, TripleSink
+from .store import _decode, _encode
+
+__all__ = [
+    'EdgeRow',
+    'EdgeTable',
+    'EdgeTableSink',
+]
+
+#: The tables the triples are recorded in while converting, which are joined when the sink is closed
+_STAGING_SCHEMA = """
+CREATE TABLE staged_labels (subject TEXT NOT NULL, label TEXT NOT NULL);
+CREATE TABLE staged_node_ids (subject TEXT NOT NULL, id INTEGER NOT NULL);
+CREATE TABLE staged_edge_ids (subject TEXT NOT NULL, id INTEGER NOT NULL);
+CREATE TABLE staged_interactions (subject TEXT NOT NULL, interaction TEXT NOT NULL);
+CREATE TABLE staged_links (source TEXT NOT NULL, edge TEXT NOT NULL, target TEXT NOT NULL);
+"""
+
+#: Joins the recorded triples into the tables of nodes and edges, and the edge list of the documented query. Nodes
+#: and edges with more than one label or interaction keep the last one.
+_MATERIALIZE = """
+CREATE INDEX staged_labels_subject ON staged_labels (subject);
+CREATE INDEX staged_interactions_subject ON staged_interactions (subject);
+CREATE INDEX staged_links_edge ON staged_links (edge);
+
+CREATE TABLE nodes (
+    id INTEGER NOT NULL,
+    subject TEXT PRIMARY KEY,
+    label TEXT
+);
+INSERT OR REPLACE INTO nodes (id, subject, label)
+SELECT n.id, n.subject, (SELECT l.label FROM staged_labels l WHERE l.subject = n.subject ORDER BY l.rowid DESC)
+FROM staged_node_ids n;
+CREATE INDEX nodes_id ON nodes (id);
+CREATE INDEX nodes_label ON nodes (label);
+
+CREATE TABLE edges (
+    id INTEGER NOT NULL,
+    subject TEXT PRIMARY KEY,
+    source TEXT,
+    target TEXT,
+    interaction TEXT
+);
+INSERT OR REPLACE INTO edges (id, subject, interaction)
+SELECT e.id, e.subject, (
+    SELECT i.interaction FROM staged_interactions i WHERE i.subject = e.subject ORDER BY i.rowid DESC
+)
+FROM staged_edge_ids e;
+UPDATE edges SET (source, target) = (
+    SELECT k.source, k.target FROM staged_links k WHERE k.edge = edges.subject ORDER BY k.rowid DESC
+);
+CREATE INDEX edges_id ON edges (id);
+
+CREATE TABLE edge_list AS
+SELECT
+    e.id AS edge_id, e.subject AS edge, e.interaction AS interaction,
+    s.id AS source_id, s.subject AS source, s.label AS source_label,
+    t.id AS target_id, t.subject AS target, t.label AS target_label
+FROM edges e
+JOIN nodes s ON s.subject = e.source
+JOIN nodes t ON t.subject = e.target
+WHERE s.label IS NOT NULL AND t.label IS NOT NULL;
+CREATE INDEX edge_list_source_label ON edge_list (source_label);
+CREATE INDEX edge_list_target_label ON edge_list (target_label);
+
+DROP TABLE staged_labels;
+DROP TABLE staged_node_ids;
+DROP TABLE staged_edge_ids;
+DROP TABLE staged_interactions;
+DROP TABLE staged_links;
+"""
+
+_HAS_ID = CX.has_id
+_EDGE_HAS_ID = CX.edge_has_id
+_EDGE_HAS_INTERACTION = CX.edge_has_interaction
+_CX_NAMESPACE = str(CX)
+
+#: The number of rows an :class:`EdgeTableSink` collects by default before inserting them
+DEFAULT_BATCH_SIZE = 10_000
+
+
+class EdgeRow(NamedTuple):
+    """An edge, with the identifiers, subjects, and labels of its source and target."""
+
+    edge_id: int
+    edge: Node
+    interaction: Optional[str]
+    source_id: int
+    source: Node
+    source_label: Node
+    target_id: int
+    target: Node
+    target_label: Node
+
+
+class EdgeTableSink(TripleSink):
+    """A sink that passes triples on to another, recording the nodes and edges of the predicate policy on the way."""
+
+    def __init__(self, sink: TripleSink, path: str, batch_size: int = DEFAULT_BATCH_SIZE):
+        """Initialize the sink, replacing the database if it exists.
+
+        :param sink: The destination for the triples
+        :param path: The path of the database to write the table to
+        :param batch_size: The number of rows to collect before inserting them
+        """
+        self.sink = sink
+        self.graph = sink.graph
+        self.batch_size = batch_size
+
+        if os.path.exists(path):
+            os.remove(path)
+        self.connection = sqlite3.connect(path)
+        self.connection.executescript(_STAGING_SCHEMA)
+
+        self.labels: List[Tuple[str, str]] = []
+        self.node_ids: List[Tuple[str, int]] = []
+        self.edge_ids: List[Tuple[str, int]] = []
+        self.interactions: List[Tuple[str, str]] = []
+        self.links: List[Tuple[str, str, str]] = []
+        #: The number of rows recorded since they were last inserted
+        self.recorded = 0
+
+    def _record(self, triple: Triple) -> None:
+        s, p, o = triple
+        if p == RDFS_LABEL:
+            self.labels.append((_encode(s), _encode(o)))
+        elif p == _HAS_ID:
+            self.node_ids.append((_encode(s), o.toPython()))
+        elif p == _EDGE_HAS_ID:
+            self.edge_ids.append((_encode(s), o.toPython()))
+        elif p == _EDGE_HAS_INTERACTION:
+            self.interactions.append((_encode(s), str(o)))
+        elif p != RDF_TYPE and not p.startswith(_CX_NAMESPACE):  # the predicate policy uses edges as predicates
+            self.links.append((_encode(s), _encode(p), _encode(o)))
+        else:
+            return
+        self.recorded += 1
+
+    def add(self, triple: Triple) -> None:
+        """Add a triple to the other sink, and record it if it's about a node or an edge."""
+        self.sink.add(triple)
+        self._record(triple)
+        if self.recorded >= self.batch_size:
+            self._insert()
+
+    def add_all(self, triples: Iterable[Triple]) -> None:
+        """Add several triples to the other sink, and record the ones about nodes and edges."""
+        if not isinstance(triples, list):
+            triples = list(triples)
+        self.sink.add_all(triples)
+        for triple in triples:
+            self._record(triple)
+        if self.recorded >= self.batch_size:
+            self._insert()
+
+    def bind(self, prefix: str, namespace: str) -> None:
+        """Bind a prefix to a namespace in the other sink."""
+        self.sink.bind(prefix, namespace)
+
+    def flush(self) -> None:
+        """Flush the other sink and insert the recorded rows."""
+        self.sink.flush()
+        self._insert()
+
+    def _insert(self) -> None:
+        """Insert the rows recorded since the last time."""
+        for table, columns, rows in (
+            ('staged_labels', 'subject, label', self.labels),
+            ('staged_node_ids', 'subject, id', self.node_ids),
+            ('staged_edge_ids', 'subject, id', self.edge_ids),
+            ('staged_interactions', 'subject, interaction', self.interactions),
+            ('staged_links', 'source, edge, target', self.links),
+        ):
+            if rows:
+                parameters = ', '.join('?' * (1 + columns.count(',')))
+                self.connection.executemany(f'INSERT INTO {table} ({columns}) VALUES ({parameters})', rows)
+                rows.clear()
+        self.recorded = 0
+
+    def close(self) -> None:
+        """Join the recorded rows into the tables of nodes and edges, and close the database."""
+        if self.connection is None:
+            return
+        self.flush()
+        self.connection.executescript(_MATERIALIZE)
+        self.connection.commit()
+        self.connection.close()
+        self.connection = None
+
+
+class EdgeTable:
+    """A table of edges written by an :class:`EdgeTableSink`."""
+
+    def __init__(self, path: str):
+        """Open the database of the table.
+
+        :param path: The path of the database
+        """
+        # quoted, so paths with characters like ? and # that mean something in a URI work too
+        self.connection = sqlite3.connect(pathlib.Path(path).resolve().as_uri() + '?mode=ro', uri=True)
+
+    def __enter__(self) -> 'EdgeTable':
+        """Use the table in a with statement, which closes it at the end."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Close the database."""
+        self.close()
+
+    def close(self) -> None:
+        """Close the database."""
+        self.connection.close()
+
+    def query(self) -> Iterable[Tuple[Node, Node, Node]]:
+        """Iterate over the source label, relation, and target label of each edge.
+
+        These are the same rows as the query in :mod:`cx_rdf.predicate_policy` gives.
+        """
+        for source_label, edge, target_label in self.connection.execute(
+            'SELECT source_label, edge, target_label FROM edge_list'
+        ):
+            yield _decode(source_label), _decode(edge), _decode(target_label)
+
+    def iterate_edges(self, source_label: Optional[Node] = None,
+                      target_label: Optional[Node] = None) -> Iterable[EdgeRow]:
+        """Iterate over the edges whose source and target have labels.
+
+        :param source_label: If given, only the edges from nodes with this label
+        :param target_label: If given, only the edges to nodes with this label
+        """
+        conditions, parameters = [], []
+        for column, label in (('source_label', source_label), ('target_label', target_label)):
+            if label is not None:
+                conditions.append(f'{column} = ?')
+                parameters.append(_encode(label))
+        where = f' WHERE {" AND ".join(conditions)}' if conditions else ''
+
+        for row in self.connection.execute(
+            'SELECT edge_id, edge, interaction, source_id, source, source_label, target_id, target, target_label'
+            f' FROM edge_list{where}',
+            parameters,
+        ):
+            edge_id, edge, interaction, source_id, source, source_label, target_id, target, target_label = row
+            yield EdgeRow(edge_id, _decode(edge), interaction, source_id, _decode(source), _decode(source_label),
+                          target_id, _decode(target), _decode(target_label))
+
+    def get_node(self, node_id: int) -> Optional[Node]:
+        """Get the subject of the node with the given CX identifier."""
+        row = self.connection.execute('SELECT subject FROM nodes WHERE id = ?', (node_id,)).fetchone()
+        return None if row is None else _decode(row[0])
+
+    def get_edge(self, edge_id: int) -> Optional[Node]:
+        """Get the subject of the edge with the given CX identifier."""
+        row = self.connection.execute('SELECT subject FROM edges WHERE id = ?', (edge_id,)).fetchone()
+        return None if row is None else _decode(row[0])
+
+    def count_edges(self) -> int:
+        """Count the edges in the table."""
+        (count,) = self.connection.execute('SELECT COUNT(*) FROM edge_list').fetchone()
+        return count
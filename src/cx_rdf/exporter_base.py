@@ -3,15 +3,24 @@
 """A base class for CX export policies."""
 
 from abc import ABC, abstractmethod
+from itertools import count as _count, islice
 import logging
-from typing import Optional
+from typing import Any, Dict, Iterable, List, Optional, Tuple, Union
+from urllib.parse import quote
+from uuid import uuid4
 
-from rdflib import BNode, Graph, Literal, RDF, RDFS
+from rdflib import BNode, Graph, Literal, URIRef
 from rdflib.term import Node
 
-from .constants import CX
-from .typing import CxType
-from .utils import bind_cx_namespace
+from .columnar import ColumnarCx, Columns
+from .constants import CX, RDF_TYPE, RDFS_LABEL
+from .pending import PendingBuffer
+from .registry import IdRegistry
+from .sinks import GraphSink, TripleSink
+from .stats import AspectRecorder, ConversionHooks
+from .terms import TermFactory
+from .typing import CxElementsType, CxType
+from .utils import iterate_aspect_elements
 
 __all__ = [
     'Exporter',
@@ -19,23 +28,102 @@ __all__ = [
 
 log = logging.getLogger(__name__)
 
+#: The largest number of identifiers to make room for up front, so bad metadata can't exhaust memory
+MAX_RESERVATION = 1 << 27
+
+#: The kinds of entities the elements of the aspects with columns refer to, and the keys holding their identifiers
+ENTITY_KEYS = {
+    'nodes': (('node', '@id'),),
+    'edges': (('edge', '@id'), ('node', 's'), ('node', 't')),
+    'nodeAttributes': (('node', 'po'),),
+    'edgeAttributes': (('edge', 'po'),),
+}
+
 
 class Exporter(ABC):
     """The base class for CX to RDF exporters."""
 
+    __slots__ = (
+        'id_node', 'id_edge', 'id_citation', 'id_support', '_registries', 'aspects', 'terms', 'sink',
+        'declaration_sink', 'graph', 'base_iri', 'ordinals', '_mint_prefixes', '_blank_prefix', '_blank_ids',
+        '_entity_blank_prefix', 'document', 'column_handlers', 'hooks', 'pending',
+    )
+
     policy = None
 
-    def __init__(self, graph: Optional[Graph] = None):
-        """Initialize the exporter with several caches."""
-        self.id_node = {}
-        self.id_edge = {}
-        self.id_citation = {}
-        self.id_support = {}
+    def __init__(self, graph: Optional[Graph] = None, sink: Optional[TripleSink] = None,
+                 batch_size: Optional[int] = None, base_iri: Optional[str] = None,
+                 blank_prefix: Optional[str] = None, hooks: Optional[ConversionHooks] = None):
+        """Initialize the exporter with several caches.
+
+        :param graph: An optional RDFLib graph to fill. If not specified, creates one.
+        :param sink: An optional destination for the triples, like a :class:`cx_rdf.sinks.NTriplesSink`. Overrides
+         the graph if given.
+        :param batch_size: The number of triples to insert into the graph at once. See
+         :class:`cx_rdf.sinks.GraphSink`.
+        :param base_iri: If given, the network, its nodes, edges, citations, supports, aspects, and elements get
+         IRIs minted from this base instead of blank nodes. For example, the node with CX identifier 5 becomes
+         ``<base_iri>node_5`` and the third node attribute becomes ``<base_iri>nodeAttributes_2``. Since the IRIs
+         only depend on the CX, converting the same network twice gives the same triples. The local names start
+         with a letter so they still work as predicates in RDF/XML.
+        :param blank_prefix: If given without a base IRI, the network and the things with identifiers get blank
+         nodes labeled after this prefix, like ``<blank_prefix>node_5``, instead of numbered ones. Exporters that
+         share the prefix then agree on them, which lets several exporters convert parts of the same network.
+        :param hooks: If given, the number of elements and triples, the time, and the memory of converting each aspect
+         are measured and reported to these hooks. See :mod:`cx_rdf.stats`.
+        """
+        self.id_node = IdRegistry()
+        self.id_edge = IdRegistry()
+        self.id_citation = IdRegistry()
+        self.id_support = IdRegistry()
+        #: look up the identifier map for each aspect, for sizing them from the metadata
+        self._registries = {
+            'nodes': self.id_node,
+            'edges': self.id_edge,
+            'citations': self.id_citation,
+            'supports': self.id_support,
+        }
+        #: keep track of aspects by name, since they're represented by a BNode
+        self.aspects = {}
+
+        #: Reuses the literals for names and values that repeat across elements
+        self.terms = TermFactory()
 
-        self.graph = graph or Graph()
-        bind_cx_namespace(self.graph)
-        self.document = BNode()
-        self._add_document(RDF.type, CX.network)
+        self.sink = GraphSink(graph, batch_size=batch_size) if sink is None else sink
+        #: The graph being filled, or None if the triples are going to a sink without one
+        self.graph = self.sink.graph
+        self.sink.bind('cx', CX)
+        #: The destination for the triples that declare nodes, edges, citations, supports, and aspects the first time
+        #: they're seen. These are the only triples that depend on the order of the elements rather than only on
+        #: their content.
+        self.declaration_sink = self.sink
+
+        if base_iri is not None and not base_iri.endswith(('/', '#')):
+            base_iri += '/'
+        #: The prefix of minted IRIs, or None if blank nodes are used
+        self.base_iri = base_iri
+        #: The number of anonymous nodes minted so far for each aspect
+        self.ordinals: Dict[str, int] = {}
+        self._mint_prefixes: Dict[str, str] = {}
+        # blank nodes are numbered after a random prefix, which is much cheaper than a new UUID for each one
+        self._blank_prefix = f'N{uuid4().hex}_'
+        self._blank_ids = _count()
+        self._entity_blank_prefix = blank_prefix
+
+        if base_iri is not None:
+            self.document = URIRef(base_iri)
+        elif blank_prefix is not None:
+            self.document = BNode(f'{blank_prefix}network')
+        else:
+            self.document = self._new_blank_node()
+
+        #: look up the handler for all of the columns of an aspect at once by its name. See :meth:`extend_columns`.
+        self.column_handlers = {}
+        self.hooks = hooks
+        #: Holds back what can't be converted until a later aspect arrives, like CURIEs waiting for the ``@context``
+        self.pending = PendingBuffer()
+
+        self._add_document(RDF_TYPE, CX.network)
 
         if self.policy is None:
             raise TypeError(f'policy has not been set on class {self.__class__}')
@@ -44,11 +132,177 @@ class Exporter(ABC):
 
     def _add_label(self, s: Node, label: str):
         """Add a label to a node."""
-        self.graph.add((s, RDFS.label, Literal(label)))
+        self.sink.add((s, RDFS_LABEL, self.terms.literal(label)))
+
+    def get_value_literals(self, values: Any, data_type: Optional[str] = None) -> List[Literal]:
+        """Get the literals for the value of an attribute, typed by its CX data type.
+
+        :param values: The value of the attribute, or a list of values
+        :param data_type: The CX data type of the attribute, like ``double`` or ``list_of_string``
+        """
+        literal = self.terms.get_literal_factory(data_type)
+        # some writers leave out the data type of lists, so check the value itself
+        if isinstance(values, list):
+            return [literal(value) for value in values]
+        return [literal(values)]
+
+    def get_value_triples(self, attributes: List[Node], values: List[Any], data_types: List[Optional[str]],
+                          ) -> List[Tuple[Node, Node, Node]]:
+        """Get the triples linking a column of attributes to their values, typed by their CX data types.
+
+        :param attributes: The nodes of the attributes
+        :param values: The value of each attribute, or a list of values
+        :param data_types: The CX data type of each attribute, or None where it wasn't given
+        """
+        get_literal_factory = self.terms.get_literal_factory
+        triples = []
+        for attribute, value, data_type in zip(attributes, values, data_types):
+            literal = get_literal_factory(data_type)
+            if isinstance(value, list):
+                triples.extend((attribute, CX.attribute_has_value, literal(item)) for item in value)
+            else:
+                triples.append((attribute, CX.attribute_has_value, literal(value)))
+        return triples
 
     def _add_document(self, p: Node, o: Node):
         """Add a predicate and object triple with the document as the subject."""
-        self.graph.add((self.document, p, o))
+        self.sink.add((self.document, p, o))
+
+    def _new_blank_node(self) -> BNode:
+        """Make a new blank node."""
+        return BNode(f'{self._blank_prefix}{next(self._blank_ids)}')
+
+    def _get_mint_prefix(self, kind: str) -> str:
+        """Get the prefix for IRIs minted for things of the given kind, like a CX entity or an aspect's elements."""
+        prefix = self._mint_prefixes.get(kind)
+        if prefix is None:
+            prefix = self._mint_prefixes[kind] = f'{self.base_iri}{quote(kind, safe="")}_'
+        return prefix
+
+    def mint_entity(self, kind: str, identifier: Union[int, str]) -> Node:
+        """Make a node for something with an identifier, like a CX node, or the name of an aspect.
+
+        :param kind: The kind of thing, like ``node`` or ``edge``
+        :param identifier: The thing's identifier, which has to be unique for its kind
+        :return: A blank node, or an IRI if the exporter has a base IRI
+        """
+        if self.base_iri is None:
+            if self._entity_blank_prefix is None:
+                return self._new_blank_node()
+            if type(identifier) is not int:  # blank node labels can't be quoted, so spell out the bytes instead
+                identifier = str(identifier).encode('utf-8').hex()
+            return BNode(f'{self._entity_blank_prefix}{kind}_{identifier}')
+        if type(identifier) is int:  # the usual case, which never needs quoting
+            return URIRef(f'{self._get_mint_prefix(kind)}{identifier}')
+        return URIRef(self._get_mint_prefix(kind) + quote(str(identifier), safe=''))
+
+    def mint_element(self, aspect_name: str) -> Node:
+        """Make a node for something without an identifier, like a node attribute.
+
+        When the exporter has a base IRI, elements are numbered in the order they're minted for each aspect.
+
+        :param aspect_name: The name of the aspect the element comes from
+        :return: A blank node, or an IRI if the exporter has a base IRI
+        """
+        if self.base_iri is None:
+            return self._new_blank_node()
+
+        ordinal = self.ordinals.get(aspect_name, 0)
+        self.ordinals[aspect_name] = ordinal + 1
+        return URIRef(f'{self._get_mint_prefix(aspect_name)}{ordinal}')
+
+    def mint_elements(self, aspect_name: str, count: int) -> List[Node]:
+        """Make nodes for several consecutive elements without identifiers at once.
+
+        :param aspect_name: The name of the aspect the elements come from
+        :param count: The number of elements
+        :return: Blank nodes, or IRIs if the exporter has a base IRI, in the same order as :meth:`mint_element`
+         would have made them
+        """
+        if self.base_iri is None:
+            prefix = self._blank_prefix
+            return [BNode(f'{prefix}{ordinal}') for ordinal in islice(self._blank_ids, count)]
+
+        start = self.ordinals.get(aspect_name, 0)
+        self.ordinals[aspect_name] = start + count
+        prefix = self._get_mint_prefix(aspect_name)
+        return [URIRef(f'{prefix}{ordinal}') for ordinal in range(start, start + count)]
+
+    def mint_part(self, parent: Node, key: Union[int, str]) -> Node:
+        """Make a node for a part of another node, like an entry of an element in the abstract policy.
+
+        :param parent: The node this is a part of
+        :param key: The key of the part, which has to be unique within the parent
+        :return: A blank node, or an IRI below the parent's if the exporter has a base IRI
+        """
+        if self.base_iri is None:
+            return self._new_blank_node()
+        return URIRef(f'{parent}/{quote(str(key), safe="")}')
+
+    def _get_entity_registry(self, kind: str):
+        """Get the map from identifiers to nodes for the given kind of entity."""
+        if kind == 'aspect':
+            return self.aspects
+        return {
+            'node': self.id_node,
+            'edge': self.id_edge,
+            'citation': self.id_citation,
+            'support': self.id_support,
+        }[kind]
+
+    def has_entity(self, kind: str, identifier: Union[int, str]) -> bool:
+        """Check if an entity, like a node or an aspect, has already been declared.
+
+        :param kind: The kind of entity, like ``node``, ``edge``, or ``aspect``
+        :param identifier: The entity's identifier
+        """
+        return identifier in self._get_entity_registry(kind)
+
+    def adopt_entity(self, kind: str, identifier: Union[int, str]) -> Node:
+        """Register an entity that's declared elsewhere, without adding any triples.
+
+        This only gives the same node as the other exporter when both mint deterministic IRIs or blank nodes.
+
+        :param kind: The kind of entity, like ``node``, ``edge``, or ``aspect``
+        :param identifier: The entity's identifier
+        """
+        node = self._get_entity_registry(kind)[identifier] = self.mint_entity(kind, identifier)
+        return node
+
+    def iter_chunk_entities(self, aspect_name: str, elements: Iterable[Dict]) -> Iterable[Tuple[str, Any]]:
+        """Iterate over the kinds and identifiers of the entities that adding the elements would declare.
+
+        :param aspect_name: The name of one of the aspects in :data:`ENTITY_KEYS`
+        :param elements: Elements from the aspect
+        """
+        entity_keys = ENTITY_KEYS[aspect_name]
+        for element in elements:
+            for kind, key in entity_keys:
+                yield kind, element[key]
+
+    def get_shared_state(self) -> Dict:
+        """Get the state, beyond the declared entities, that other exporters need to convert later elements.
+
+        For example, the predicate policy needs the prefixes from the ``@context`` aspect to expand CURIEs.
+        """
+        return {}
+
+    def set_shared_state(self, state: Dict) -> None:
+        """Take over the state from another exporter's :meth:`get_shared_state`."""
+
+    def get_deferred_state(self) -> Optional[Dict]:
+        """Take what this exporter is holding back until later elements arrive, or None if there's nothing.
+
+        When several exporters convert parts of the same network, this lets the one that gets the later elements
+        finish the work. For example, the predicate policy holds back CURIEs until the ``@context`` aspect arrives.
+        """
+        pending = self.pending.pop_all()
+        return {'pending': pending} if pending else None
+
+    def merge_deferred_state(self, state: Dict) -> None:
+        """Take over what another exporter was holding back until later elements arrive."""
+        for key, item in state['pending']:
+            self.pending.add(key, item)
 
     def ensure_node(self, node_id: int) -> BNode:
         """Get a node with a given identifier from CX if it exists, otherwise create a BNode for it."""
@@ -56,10 +310,10 @@ class Exporter(ABC):
         if node is not None:
             return node
 
-        node = self.id_node[node_id] = BNode()  # represents the node
-        self.graph.add((node, RDF.type, CX.node))
-        self.graph.add((node, CX.has_id, Literal(node_id)))
-        self._add_document(CX.has_node, node)
+        node = self.id_node[node_id] = self.mint_entity('node', node_id)  # represents the node
+        self.declaration_sink.add((node, RDF_TYPE, CX.node))
+        self.declaration_sink.add((node, CX.has_id, Literal(node_id)))
+        self.declaration_sink.add((self.document, CX.has_node, node))
         return node
 
     def ensure_edge(self, edge_id: int) -> BNode:
@@ -68,10 +322,10 @@ class Exporter(ABC):
         if edge is not None:
             return edge
 
-        edge = self.id_edge[edge_id] = BNode()
-        self.graph.add((edge, RDF.type, CX.edge))
-        self.graph.add((edge, CX.edge_has_id, Literal(edge_id)))
-        self._add_document(CX.has_edge, edge)
+        edge = self.id_edge[edge_id] = self.mint_entity('edge', edge_id)
+        self.declaration_sink.add((edge, RDF_TYPE, CX.edge))
+        self.declaration_sink.add((edge, CX.edge_has_id, Literal(edge_id)))
+        self.declaration_sink.add((self.document, CX.has_edge, edge))
         return edge
 
     def ensure_citation(self, citation_id: int) -> BNode:
@@ -80,10 +334,10 @@ class Exporter(ABC):
         if citation is not None:
             return citation
 
-        citation = self.id_citation[citation_id] = BNode()
-        self.graph.add((citation, RDF.type, CX.citation))
-        self.graph.add((citation, CX.citation_has_id, Literal(citation_id)))
-        self._add_document(CX.has_citation, citation)
+        citation = self.id_citation[citation_id] = self.mint_entity('citation', citation_id)
+        self.declaration_sink.add((citation, RDF_TYPE, CX.citation))
+        self.declaration_sink.add((citation, CX.citation_has_id, Literal(citation_id)))
+        self.declaration_sink.add((self.document, CX.has_citation, citation))
         return citation
 
     def ensure_support(self, support_id: int) -> BNode:
@@ -92,16 +346,174 @@ class Exporter(ABC):
         if support is not None:
             return support
 
-        support = self.id_support[support_id] = BNode()
-        self.graph.add((support, RDF.type, CX.support))
-        self.graph.add((support, CX.support_has_id, Literal(support_id)))
-        self._add_document(CX.has_support, support)
+        support = self.id_support[support_id] = self.mint_entity('support', support_id)
+        self.declaration_sink.add((support, RDF_TYPE, CX.support))
+        self.declaration_sink.add((support, CX.support_has_id, Literal(support_id)))
+        self.declaration_sink.add((self.document, CX.has_support, support))
         return support
 
-    @abstractmethod
-    def export(self, cx_json: CxType) -> Graph:
+    def ensure_aspect(self, aspect_name: str) -> BNode:
+        """Get an aspect by name if it exists, otherwise create a BNode for it."""
+        aspect = self.aspects.get(aspect_name)
+        if aspect is not None:
+            return aspect
+
+        aspect = self.aspects[aspect_name] = self.mint_entity('aspect', aspect_name)
+        self.declaration_sink.add((aspect, RDF_TYPE, CX.aspect))
+        self.declaration_sink.add((aspect, RDFS_LABEL, self.terms.literal(aspect_name)))
+        self.declaration_sink.add((self.document, CX.has_aspect, aspect))
+        return aspect
+
+    def ensure_entity(self, kind: str, identifier: Union[int, str]) -> Node:
+        """Get an entity, like a node or an aspect, declaring it if it hasn't been yet.
+
+        :param kind: The kind of entity, like ``node``, ``edge``, or ``aspect``
+        :param identifier: The entity's identifier
+        """
+        return {
+            'node': self.ensure_node,
+            'edge': self.ensure_edge,
+            'citation': self.ensure_citation,
+            'support': self.ensure_support,
+            'aspect': self.ensure_aspect,
+        }[kind](identifier)
+
+    def iterate_entities(self) -> Iterable[Tuple[str, Union[int, str]]]:
+        """Iterate over the kinds and identifiers of the entities that have been declared."""
+        for kind in ('node', 'edge', 'citation', 'support', 'aspect'):
+            for identifier in self._get_entity_registry(kind):
+                yield kind, identifier
+
+    def export(self, cx_json: CxType) -> Optional[Graph]:
         """Convert a CX json to a RDFLib graph.
 
         :param cx_json: A CX JSON object
+        :return: The graph that was filled, or None if the exporter is writing to a sink without one
+        """
+        return self.export_elements(iterate_aspect_elements(cx_json))
+
+    def export_elements(self, elements: CxElementsType) -> Optional[Graph]:
+        """Convert a stream of CX aspect names and elements to a RDFLib graph.
+
+        :param elements: An iterable of pairs of aspect names and elements, like from
+         :func:`cx_rdf.utils.iterate_aspect_elements` or :func:`cx_rdf.reader.iterate_cx_elements`
+        :return: The graph that was filled, or None if the exporter is writing to a sink without one
+        """
+        if self.hooks is not None:
+            return self._export_elements_recorded(elements)
+
+        sink = self.sink
+        current_aspect_name = None
+
+        for aspect_name, element in elements:
+            if aspect_name != current_aspect_name:  # write the rest of the previous aspect's triples in bulk
+                sink.flush()
+                current_aspect_name = aspect_name
+
+            self.add_element(aspect_name, element)
+
+        sink.flush()
+        return self.graph
+
+    def _export_elements_recorded(self, elements: CxElementsType) -> Optional[Graph]:
+        """Convert a stream of CX aspect names and elements, reporting the measurements of each aspect."""
+        with AspectRecorder(self, self.hooks) as recorder:
+            current_aspect_name, stats = None, None
+            for aspect_name, element in recorder.iterate(elements):
+                if aspect_name != current_aspect_name:
+                    self.sink.flush()
+                    current_aspect_name, stats = aspect_name, recorder.start(aspect_name)
+
+                self.add_element(aspect_name, element)
+                stats.elements += 1
+
+            self.sink.flush()
+
+        return self.graph
+
+    def export_columns(self, columnar: ColumnarCx) -> Optional[Graph]:
+        """Convert CX in columns to a RDFLib graph, exporting each split aspect a column at a time.
+
+        :param columnar: A CX document with its big aspects split into columns
+        :return: The graph that was filled, or None if the exporter is writing to a sink without one
+        """
+        if self.hooks is not None:
+            return self._export_columns_recorded(columnar)
+
+        sink = self.sink
+        for aspect_name, part in columnar.aspects:
+            sink.flush()
+            if isinstance(part, Columns):
+                self.extend_columns(aspect_name, part)
+            else:
+                for element in part:
+                    self.add_element(aspect_name, element)
+
+        sink.flush()
+        return self.graph
+
+    def _export_columns_recorded(self, columnar: ColumnarCx) -> Optional[Graph]:
+        """Convert CX in columns, reporting the measurements of each aspect."""
+        with AspectRecorder(self, self.hooks) as recorder:
+            for aspect_name, part in columnar.aspects:
+                recorder.start(aspect_name).elements = len(part)
+                if isinstance(part, Columns):
+                    self.extend_columns(aspect_name, part)
+                else:
+                    for element in part:
+                        self.add_element(aspect_name, element)
+                self.sink.flush()
+
+        return self.graph
+
+    def extend_columns(self, aspect_name: str, columns: Columns) -> None:
+        """Add all of the elements from the given aspect's columns to the graph.
+
+        Uses the policy's handler from :attr:`column_handlers` if it has one, otherwise adds the elements one by one.
+
+        :param aspect_name: The name of the aspect
+        :param columns: The columns of the aspect
+        """
+        handler = self.column_handlers.get(aspect_name)
+        if handler is not None:
+            handler(columns)
+            return
+
+        for element in columns.iter_elements():
+            self.extend_element(aspect_name, element)
+
+    def add_element(self, aspect_name: str, element: Dict) -> None:
+        """Add a single element from the given aspect to the graph, sizing the identifier maps from its metadata.
+
+        :param aspect_name: The name of the aspect
+        :param element: An element from the aspect
+        """
+        if aspect_name == 'metaData':
+            self.reserve(element)
+        self.extend_element(aspect_name, element)
+
+    def reserve(self, metadata: Dict) -> None:
+        """Make room in the identifier maps for the elements described by an entry from the metaData aspect.
+
+        The ``idCounter`` is preferred since it's the largest identifier in use, then the ``elementCount``.
+
+        :param metadata: An element from the metaData aspect
+        """
+        registry = self._registries.get(metadata.get('name'))
+        if registry is None:
+            return
+
+        for key in ('idCounter', 'elementCount'):
+            value = metadata.get(key)
+            if isinstance(value, int) and not isinstance(value, bool) and 0 < value <= MAX_RESERVATION:
+                registry.reserve(value + 1 if key == 'idCounter' else value)
+                return
+
+    @abstractmethod
+    def extend_element(self, aspect_name: str, element: Dict) -> None:
+        """Add a single element from the given aspect to the graph.
+
+        :param aspect_name: The name of the aspect
+        :param element: An element from the aspect
         """
         raise NotImplementedError
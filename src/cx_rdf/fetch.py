@@ -0,0 +1,216 @@
+# -*- coding: utf-8 -*-
+
+"""Downloading networks from NDEx and converting them as they arrive.
+
+Many networks are downloaded at once by an :mod:`asyncio` event loop, over a bounded pool of connections that are kept
+alive between networks. Each response is read by the converter as it comes in, so a network is never saved as CX
+first, and the RDF is written to a file named after its UUID. Downloads that fail because of the network or the server
+are retried after waiting longer each time, and a network that can't be converted doesn't stop the rest.
+
+.. code-block:: python
+
+    from cx_rdf.fetch import fetch_networks
+
+    uuids = ['f1dd6cc3-0007-11e6-b550-06603eb7f303', '8a2d7ee9-1513-11e9-bb6a-0ac135e8bacf']
+    for result in fetch_networks(uuids, 'rdf/', rdf_format='nt', concurrency=4):
+        print(result.uuid, result.status, result.attempts, result.seconds)
+
+The server can be replaced by anything that serves CX at ``<url>/network/<uuid>``, like a mirror or a test server.
+"""
+
+import asyncio
+import base64
+from concurrent.futures import ThreadPoolExecutor
+from http.client import HTTPConnection, HTTPException, HTTPSConnection
+import os
+import time
+from typing import Dict, Iterable, List, NamedTuple, Optional
+from urllib.parse import quote, urlsplit
+
+from .batch import _get_network_base_iri, get_destination
+from .io import cx_file_to_rdf_file
+
+__all__ = [
+    'FetchResult',
+    'fetch_networks',
+    'fetch_networks_async',
+]
+
+#: The base URL of the NDEx REST API
+NDEX_URL = 'https://www.ndexbio.org/v2'
+
+#: The number of networks downloaded at once by default
+DEFAULT_CONCURRENCY = 4
+
+#: The number of times a download is retried by default
+DEFAULT_RETRIES = 3
+
+#: The number of seconds to wait before the first retry by default, which doubles with each one after
+DEFAULT_BACKOFF = 1.0
+
+#: The number of seconds to wait for the server by default
+DEFAULT_TIMEOUT = 60.0
+
+#: The HTTP statuses that might go away if the request is made again
+RETRY_STATUSES = {408, 429, 500, 502, 503, 504}
+
+
+class FetchResult(NamedTuple):
+    """The outcome of downloading and converting a network."""
+
+    #: The UUID of the network
+    uuid: str
+    #: The RDF file
+    destination: str
+    #: Either ``converted`` or ``failed``
+    status: str
+    #: The number of times the network was requested
+    attempts: int
+    #: The number of seconds it took, including waiting to retry
+    seconds: float
+    #: The last error, if the network failed
+    error: Optional[str] = None
+
+
+class _StatusError(Exception):
+    """Raised when the server answers with something other than a network."""
+
+    def __init__(self, status: int, reason: str):
+        super().__init__(f'HTTP {status} {reason}')
+        self.status = status
+
+
+def fetch_networks(uuids: Iterable[str], output_directory: str, **kwargs) -> List[FetchResult]:
+    """Download networks from NDEx and convert them to RDF files.
+
+    :param uuids: The UUIDs of the networks
+    :param output_directory: The directory to write the RDF files in, which is created if it doesn't exist
+    :param kwargs: The options of :func:`fetch_networks_async`
+    :return: The results for each network, in the order of the UUIDs
+    """
+    return asyncio.run(fetch_networks_async(uuids, output_directory, **kwargs))
+
+
+async def fetch_networks_async(uuids: Iterable[str], output_directory: str, url: str = NDEX_URL,
+                               policy: Optional[str] = None, rdf_format: Optional[str] = None,
+                               base_iri: Optional[str] = None, concurrency: int = DEFAULT_CONCURRENCY,
+                               retries: int = DEFAULT_RETRIES, backoff: float = DEFAULT_BACKOFF,
+                               timeout: float = DEFAULT_TIMEOUT, username: Optional[str] = None,
+                               password: Optional[str] = None) -> List[FetchResult]:
+    """Download networks from NDEx and convert them to RDF files, in an event loop that's already running.
+
+    :param uuids: The UUIDs of the networks
+    :param output_directory: The directory to write the RDF files in, which is created if it doesn't exist
+    :param url: The base URL of the API, under which each network is at ``/network/<uuid>``
+    :param policy: Defaults to the 'predicate' policy. Can also use 'abstract', 'compact', or 'aspect'
+    :param rdf_format: The RDF format to output. Defaults to RDF/XML.
+    :param base_iri: If given, each network mints deterministic IRIs under this IRI followed by its UUID
+    :param concurrency: The number of networks to download and convert at once, which is also the number of
+     connections kept open to the server
+    :param retries: The number of times to try a network again after an error from the connection or a status from
+     the server that might go away
+    :param backoff: The number of seconds to wait before the first retry, which doubles with each one after
+    :param timeout: The number of seconds to wait for the server before giving up on an attempt
+    :param username: An optional NDEx username, to download private networks
+    :param password: The password of the NDEx user
+    :return: The results for each network, in the order of the UUIDs. UUIDs that are repeated are only downloaded
+     once.
+    """
+    headers = {'Accept': 'application/json'}
+    if username is not None:
+        credentials = base64.b64encode(f'{username}:{password or ""}'.encode('utf-8')).decode('ascii')
+        headers['Authorization'] = f'Basic {credentials}'
+
+    fetcher = _Fetcher(url, output_directory, headers=headers, concurrency=concurrency, retries=retries,
+                       backoff=backoff, timeout=timeout,
+                       options=dict(policy=policy, rdf_format=rdf_format))
+    return await fetcher.fetch_all(uuids, base_iri=base_iri)
+
+
+class _Fetcher:
+    """Mediates the pool of connections and the threads the networks are converted in."""
+
+    def __init__(self, url: str, output_directory: str, headers: Dict[str, str], concurrency: int, retries: int,
+                 backoff: float, timeout: float, options: Dict):
+        parts = urlsplit(url)
+        self.connection_cls = HTTPSConnection if parts.scheme == 'https' else HTTPConnection
+        self.host = parts.netloc
+        self.path = parts.path.rstrip('/')
+        self.output_directory = output_directory
+        self.headers = headers
+        self.concurrency = concurrency
+        self.retries = retries
+        self.backoff = backoff
+        self.timeout = timeout
+        self.options = options
+
+    async def fetch_all(self, uuids: Iterable[str], base_iri: Optional[str] = None) -> List[FetchResult]:
+        """Download and convert all networks, with at most as many at once as there are connections."""
+        os.makedirs(self.output_directory, exist_ok=True)
+
+        # taking a connection from the queue is what bounds the concurrency
+        connections: asyncio.Queue = asyncio.Queue()
+        for _ in range(self.concurrency):
+            connections.put_nowait(self.connection_cls(self.host, timeout=self.timeout))
+
+        try:
+            with ThreadPoolExecutor(max_workers=self.concurrency) as executor:
+                return await asyncio.gather(*(
+                    self.fetch(uuid, connections, executor, base_iri=base_iri)
+                    for uuid in dict.fromkeys(uuids)  # two downloads of the same network would write the same file
+                ))
+        finally:
+            while not connections.empty():
+                connections.get_nowait().close()
+
+    async def fetch(self, uuid: str, connections: asyncio.Queue, executor: ThreadPoolExecutor,
+                    base_iri: Optional[str] = None) -> FetchResult:
+        """Download and convert a network, retrying errors that might go away."""
+        destination = get_destination(uuid, self.output_directory, rdf_format=self.options['rdf_format'])
+        if base_iri is not None:
+            base_iri = _get_network_base_iri(base_iri, uuid)
+
+        loop = asyncio.get_running_loop()
+        start = time.perf_counter()
+        for attempt in range(1, self.retries + 2):
+            connection = await connections.get()
+            try:
+                await loop.run_in_executor(executor, self._convert, connection, uuid, destination, base_iri)
+            except (_StatusError, HTTPException, OSError) as e:
+                connection.close()
+                error = str(e) if isinstance(e, _StatusError) else f'{type(e).__name__}: {e}'
+                if isinstance(e, _StatusError) and e.status not in RETRY_STATUSES:
+                    break
+            except Exception as e:
+                connection.close()
+                error = f'{type(e).__name__}: {e}'
+                break
+            else:
+                return FetchResult(uuid, destination, 'converted', attempt, time.perf_counter() - start)
+            finally:
+                connections.put_nowait(connection)
+
+            if attempt <= self.retries:
+                await asyncio.sleep(self.backoff * 2 ** (attempt - 1))
+
+        return FetchResult(uuid, destination, 'failed', attempt, time.perf_counter() - start, error)
+
+    def _convert(self, connection: HTTPConnection, uuid: str, destination: str, base_iri: Optional[str]) -> None:
+        """Request a network and convert the response as it's read, in a worker thread."""
+        connection.request('GET', f'{self.path}/network/{quote(uuid)}', headers=self.headers)
+        response = connection.getresponse()
+        if response.status != 200:
+            response.read()
+            raise _StatusError(response.status, response.reason)
+
+        # write next to the destination first, so a failed attempt never leaves a partial file behind
+        partial = f'{destination}.part'
+        try:
+            with open(partial, 'w') as rdf_file:
+                cx_file_to_rdf_file(response, rdf_file, base_iri=base_iri, **self.options)
+            response.read()  # the reader stops at the end of the document, so the connection can be reused
+            os.replace(partial, destination)
+        except BaseException:
+            if os.path.exists(partial):
+                os.remove(partial)
+            raise
@@ -0,0 +1,561 @@
+# -*- coding: utf-8 -*-
+
+"""Converting RDF made with the aspect or predicate policy back to CX.
+
+RDF that was edited after it was exported can be turned back into CX for NDEx, without loading it into a graph:
+
+.. code-block:: python
+
+    from cx_rdf.importer import rdf_file_to_cx_file
+
+    with open('network.nt') as source, open('network.cx', 'w') as destination:
+        rdf_file_to_cx_file(source, destination)
+
+The N-Triples are read in a single pass. The triples that describe a CX element mostly share their subject, so
+they're grouped by it. Once more than ``max_in_memory`` triples have been read, they're sorted by subject and written
+to a temporary file, and the sorted runs are merged at the end, so the memory needed is bounded by that, by the
+identifiers of the nodes, edges, citations, and supports, which are needed to resolve the references between elements
+like they are when exporting, and by the links between edges and their citations and supports. A few triples are
+grouped with the element they describe instead of their subject:
+
+- the attributes of nodes and edges are grouped with the attribute instead of its node or edge
+- in the predicate policy, an edge's triple from its source to its target is grouped with the edge
+
+Each group then becomes an element of a CX aspect, which are written incrementally with a
+:class:`cx_rdf.writer.CxWriter`. Both policies are understood at once, since their vocabularies only overlap where
+they mean the same thing.
+
+Some things can't be converted back:
+
+- the ``@context`` and the aspects that only the abstract policy encodes
+- the data type of a list with a single value, which comes back as the value itself. The values of ``alias``
+  attributes are always lists, since the predicate policy requires it.
+- the order of the values of a list, if the triples weren't kept in the order they were exported in
+- how the ``edgeCitations`` and ``edgeSupports`` elements were grouped, since each edge is linked to each of its
+  citations and supports on its own. They come back as one element for each citation or support, with all of its
+  edges, merging the ones with the same edges.
+"""
+
+from collections import defaultdict
+from functools import lru_cache
+import heapq
+import io
+from itertools import groupby
+import json
+import logging
+from operator import itemgetter
+import pickle
+import re
+import tempfile
+from typing import Any, BinaryIO, DefaultDict, Dict, Iterable, List, Optional, TextIO, Tuple
+
+from rdflib import XSD
+
+from .constants import CX, RDF_JSON, RDF_TYPE, RDFS_LABEL
+from .terms import LIST_PREFIX
+from .typing import CxElementsType, CxType
+from .writer import CxWriter
+
+__all__ = [
+    'rdf_to_cx',
+    'rdf_file_to_cx_file',
+    'iterate_rdf_cx_elements',
+    'RdfSyntaxError',
+]
+
+log = logging.getLogger(__name__)
+
+#: The number of triples kept in memory by default before they're sorted and written to a temporary file
+DEFAULT_MAX_IN_MEMORY = 1_000_000
+
+#: The number of triples in each pickle of a sorted run, which is how many are read back at once while merging
+_RUN_BLOCK_SIZE = 4096
+
+_BLANK_NODE = r'_:[^\s.<>"]+(?:\.+[^\s.<>"]+)*'
+_RESOURCE = rf'<[^>]*>|{_BLANK_NODE}'
+
+#: A line of N-Triples, or of N-Quads, whose graph is ignored
+_STATEMENT = re.compile(rf'''
+    \s*(?P<subject>{_RESOURCE})
+    \s*(?P<predicate>{_RESOURCE})
+    \s*(?:
+        (?P<object>{_RESOURCE})
+        | "(?P<lexical>(?:[^"\\]|\\.)*)"(?:@(?P<language>[A-Za-z][A-Za-z0-9\-]*)|\^\^<(?P<datatype>[^>]*)>)?
+    )
+    \s*(?:{_RESOURCE})?
+    \s*\.\s*(?:\#.*)?\Z
+''', re.VERBOSE)
+
+_ESCAPE = re.compile(r'\\(?:u([0-9A-Fa-f]{4})|U([0-9A-Fa-f]{8})|(.))')
+
+_CHARACTER_ESCAPES = {'t': '\t', 'b': '\b', 'n': '\n', 'r': '\r', 'f': '\f', '"': '"', "'": "'", '\\': '\\'}
+
+#: The CX data type of each XSD datatype, and how to get the value from its lexical form
+_DATATYPES = {
+    str(XSD.integer): ('integer', int),
+    str(XSD.int): ('integer', int),
+    str(XSD.long): ('long', int),
+    str(XSD.double): ('double', float),
+    str(XSD.float): ('double', float),
+    str(XSD.decimal): ('double', float),
+    str(XSD.boolean): ('boolean', lambda lexical: lexical in {'true', '1'}),
+    str(XSD.string): ('string', str),
+    str(RDF_JSON): (None, json.loads),
+}
+
+#: The predicates that give the identifiers of each kind of entity
+_ID_PREDICATES = {
+    str(CX.has_id): 'node',
+    str(CX.edge_has_id): 'edge',
+    str(CX.citation_has_id): 'citation',
+    str(CX.support_has_id): 'support',
+}
+
+#: The predicates from an entity to one of its attributes, whose triples are grouped with the attribute
+_ATTRIBUTE_PREDICATES = {str(CX.node_has_attribute), str(CX.edge_has_attribute)}
+
+#: The predicates that only declare things, or repeat what's given by other triples
+_SKIPPED_PREDICATES = {
+    str(predicate)
+    for predicate in (
+        CX.has_aspect, CX.has_metadata, CX.has_node, CX.has_edge, CX.has_citation, CX.has_support,
+        CX.network_has_attribute, CX.aspect_has_attribute, CX.has_number_verification, CX.node_has_alias,
+        CX.attribute_has_uri,
+        # the abstract encoding of the aspects the policies don't model
+        CX.has_element, CX.has_entry, CX.has_key, CX.has_value,
+    )
+}
+
+#: The policies that can be converted back
+_POLICIES = {str(CX.aspect), str(CX.concise)}
+
+#: The grouping of the triple from an edge's source to its target in the predicate policy
+_CONCISE_EDGE = 'concise edge'
+
+_CX_NAMESPACE = str(CX)
+_RDF_TYPE = str(RDF_TYPE)
+_RDFS_LABEL = str(RDFS_LABEL)
+_POLICY = str(CX.policy)
+
+#: A triple that's grouped with the element it describes, as its key, predicate, and object. Resources are given by
+#: their IRIs or by their blank node labels starting with ``_:``, and literals by their values and CX data types.
+Record = Tuple[str, str, Any]
+
+
+class RdfSyntaxError(ValueError):
+    """Raised when a line of N-Triples is malformed."""
+
+
+def _unescape_match(match) -> str:
+    code = match.group(1) or match.group(2)
+    if code is not None:
+        return chr(int(code, 16))
+    return _CHARACTER_ESCAPES.get(match.group(3), match.group(0))
+
+
+def _unescape(text: str) -> str:
+    """Replace the escape sequences of N-Triples in a string."""
+    return _ESCAPE.sub(_unescape_match, text) if '\\' in text else text
+
+
+@lru_cache(maxsize=1 << 16)
+def _get_resource(token: str) -> str:
+    """Get a resource from how it's written in N-Triples, which is its IRI or its blank node label."""
+    if token[0] == '<':
+        return _unescape(token[1:-1])
+    return token  # IRIs can't start with _: so blank nodes keep it
+
+
+@lru_cache(maxsize=1 << 16)
+def _get_value(lexical: str, datatype: Optional[str]) -> Tuple[Any, Optional[str]]:
+    """Get the value and the CX data type of a literal, which is None for plain strings and anything else unknown."""
+    lexical = _unescape(lexical)
+    if datatype is None:
+        return lexical, None
+
+    datatype = _unescape(datatype)
+    converter = _DATATYPES.get(datatype)
+    if converter is not None:
+        data_type, convert = converter
+        try:
+            return convert(lexical), data_type
+        except ValueError:
+            log.debug('invalid lexical form for %s: %s', datatype, lexical)
+    # strings, and everything else like dates, are kept as they're written
+    return lexical, None
+
+
+class _Importer:
+    """Groups the triples of a stream of N-Triples by the element they describe, then converts them to CX."""
+
+    __slots__ = ('max_in_memory', 'ids', 'policy', 'records', 'runs', 'edge_references', 'handlers')
+
+    def __init__(self, max_in_memory: int = DEFAULT_MAX_IN_MEMORY):
+        self.max_in_memory = max_in_memory
+        #: The CX identifier of each resource of each kind of entity
+        self.ids: Dict[str, Dict[str, int]] = {kind: {} for kind in ('node', 'edge', 'citation', 'support')}
+        #: The policy of the network, if it's been given
+        self.policy: Optional[str] = None
+        #: The triples that haven't been sorted into a run yet
+        self.records: List[Record] = []
+        #: The temporary files of the sorted runs
+        self.runs: List[BinaryIO] = []
+        #: The edges of each citation and support, which are regrouped into elements after all the triples are read
+        self.edge_references: Dict[str, DefaultDict[int, List[int]]] = {
+            'citation': defaultdict(list),
+            'support': defaultdict(list),
+        }
+
+        #: look up how to convert each kind of thing by its type
+        self.handlers = {
+            str(CX.node): self._iterate_node_elements,
+            str(CX.edge): self._iterate_edge_elements,
+            str(CX.node_attribute): self._iterate_node_attribute_elements,
+            str(CX.edge_attribute): self._iterate_edge_attribute_elements,
+            str(CX.network_attribute): self._iterate_network_attribute_elements,
+            str(CX.citation): self._iterate_citation_elements,
+            str(CX.support): self._iterate_support_elements,
+            str(CX.metadata): self._iterate_metadata_elements,
+            str(CX.aspect): self._iterate_metadata_elements,
+        }
+
+    def read(self, file: TextIO) -> None:
+        """Read the triples from a file of N-Triples.
+
+        :param file: A file-like object opened in text mode
+        """
+        match_statement = _STATEMENT.match
+        for line_number, line in enumerate(file, start=1):
+            match = match_statement(line)
+            if match is None:
+                if not line.strip() or line.lstrip().startswith('#'):
+                    continue
+                raise RdfSyntaxError(f'invalid N-Triples on line {line_number}: {line.rstrip()}')
+
+            subject, predicate, resource, lexical, _, datatype = match.groups()
+            if resource is not None:
+                obj = _get_resource(resource)
+            else:
+                obj = _get_value(lexical, datatype)
+            self.add(_get_resource(subject), _get_resource(predicate), obj)
+
+        if self.policy is not None and self.policy not in _POLICIES:
+            raise ValueError(f'can only convert the aspect and predicate policies to CX, not {self.policy}')
+
+    def add(self, subject: str, predicate: str, obj: Any) -> None:
+        """Add a triple to the group of the element it describes.
+
+        :param subject: The IRI or blank node label of the subject
+        :param predicate: The IRI of the predicate, or a blank node label for edges in the predicate policy
+        :param obj: The IRI or blank node label of the object, or a pair of the value and CX data type of a literal
+        """
+        kind = _ID_PREDICATES.get(predicate)
+        if kind is not None:
+            if isinstance(obj, tuple):
+                self.ids[kind][subject] = obj[0]
+        elif predicate in _ATTRIBUTE_PREDICATES:
+            if isinstance(obj, str):
+                self._add_record((obj, predicate, subject))
+        elif predicate == _POLICY:
+            self.policy = obj
+        elif predicate in _SKIPPED_PREDICATES:
+            pass
+        elif predicate.startswith(_CX_NAMESPACE) or predicate == _RDF_TYPE or predicate == _RDFS_LABEL:
+            self._add_record((subject, predicate, obj))
+        elif isinstance(obj, str):  # might be an edge in the predicate policy, which is checked by its type later
+            self._add_record((predicate, _CONCISE_EDGE, (subject, obj)))
+
+    def _add_record(self, record: Record) -> None:
+        records = self.records
+        records.append(record)
+        if len(records) >= self.max_in_memory:
+            self._spill()
+
+    def _spill(self) -> None:
+        """Sort the triples in memory by their groups and write them to a new run."""
+        self.records.sort(key=itemgetter(0))
+        file = tempfile.TemporaryFile()
+        for start in range(0, len(self.records), _RUN_BLOCK_SIZE):
+            pickle.dump(self.records[start:start + _RUN_BLOCK_SIZE], file, protocol=pickle.HIGHEST_PROTOCOL)
+        file.seek(0)
+        self.runs.append(file)
+        self.records = []
+
+    def iterate_groups(self) -> Iterable[Tuple[str, List[Record]]]:
+        """Iterate over the keys of the groups and their triples, in the order the triples were read."""
+        self.records.sort(key=itemgetter(0))
+        # ties go to the earlier runs, which keeps the triples of each group in order
+        records = heapq.merge(*map(_iterate_run, self.runs), self.records, key=itemgetter(0))
+        try:
+            for key, group in groupby(records, key=itemgetter(0)):
+                yield key, list(group)
+        finally:
+            self.close()
+
+    def close(self) -> None:
+        """Delete the temporary files of the runs."""
+        for file in self.runs:
+            file.close()
+        self.runs.clear()
+        self.records = []
+
+    def iterate_elements(self) -> CxElementsType:
+        """Iterate over the aspect names and elements made from each group of triples."""
+        for key, records in self.iterate_groups():
+            types = []
+            objects = defaultdict(list)
+            for _, predicate, obj in records:
+                if predicate == _RDF_TYPE:
+                    types.append(obj)
+                else:
+                    objects[predicate].append(obj)
+
+            handled = False
+            for type_ in types:
+                handler = self.handlers.get(type_)
+                if handler is not None:
+                    handled = True
+                    yield from handler(key, objects)
+
+            if not handled:  # the elements linking edges to citations and supports in the aspect policy aren't typed
+                self._add_edge_references(objects)
+
+        yield from self._iterate_edge_reference_elements()
+
+    def _get_id(self, kind: str, resource: str) -> Optional[int]:
+        identifier = self.ids[kind].get(resource)
+        if identifier is None:
+            log.debug('no identifier for %s: %s', kind, resource)
+        return identifier
+
+    def _get_ids(self, kind: str, resources: Iterable[str]) -> List[int]:
+        ids = (self._get_id(kind, resource) for resource in resources)
+        return [identifier for identifier in ids if identifier is not None]
+
+    def _iterate_node_elements(self, key: str, objects: Dict[str, List]) -> CxElementsType:
+        node_id = self._get_id('node', key)
+        if node_id is None:
+            return
+
+        element = {'@id': node_id}
+        label = _get_literal(objects, _RDFS_LABEL)
+        if label is not None:
+            element['n'] = label
+        yield 'nodes', element
+
+    def _iterate_edge_elements(self, key: str, objects: Dict[str, List]) -> CxElementsType:
+        edge_id = self._get_id('edge', key)
+        if edge_id is None:
+            return
+
+        # the aspect policy gives the source and target, and the predicate policy uses the edge as a predicate
+        sources, targets = objects[str(CX.edge_has_source)], objects[str(CX.edge_has_target)]
+        for source, target in objects[_CONCISE_EDGE]:
+            sources.append(source)
+            targets.append(target)
+        if not sources or not targets:
+            log.debug('no source or target for edge: %s', key)
+            return
+
+        source_id, target_id = self._get_id('node', sources[0]), self._get_id('node', targets[0])
+        if source_id is None or target_id is None:
+            return
+
+        element = {'@id': edge_id, 's': source_id, 't': target_id}
+        interaction = _get_literal(objects, str(CX.edge_has_interaction))
+        if interaction is not None:
+            element['i'] = interaction
+        yield 'edges', element
+
+        # the predicate policy links edges to their citations and supports directly
+        for kind, predicate in (('citation', CX.edge_has_citation), ('support', CX.edge_has_support)):
+            references = self.edge_references[kind]
+            for reference_id in self._get_ids(kind, objects[str(predicate)]):
+                references[reference_id].append(edge_id)
+
+    def _add_edge_references(self, objects: Dict[str, List]) -> None:
+        """Add the edges of an element of the aspect policy that links one edge to one citation or support."""
+        for kind, edge_predicate, reference_predicate in (
+            ('citation', CX.edge_citation_has_edge, CX.edge_citation_has_citation),
+            ('support', CX.edge_support_has_edge, CX.edge_support_has_support),
+        ):
+            edge_ids = self._get_ids('edge', objects.get(str(edge_predicate), ()))
+            if not edge_ids:
+                continue
+            references = self.edge_references[kind]
+            for reference_id in self._get_ids(kind, objects[str(reference_predicate)]):
+                references[reference_id].extend(edge_ids)
+
+    def _iterate_edge_reference_elements(self) -> CxElementsType:
+        """Iterate over the ``edgeCitations`` and ``edgeSupports`` elements.
+
+        Both policies give a triple for each pair of an edge and a citation or support, so the elements are made
+        again with the edges of each citation or support, and the ones with the same edges are merged.
+        """
+        for kind, aspect_name, key in (
+            ('citation', 'edgeCitations', 'citations'),
+            ('support', 'edgeSupports', 'supports'),
+        ):
+            by_edges: Dict[Tuple[int, ...], List[int]] = {}
+            for reference_id, edge_ids in self.edge_references[kind].items():
+                by_edges.setdefault(tuple(dict.fromkeys(edge_ids)), []).append(reference_id)
+            for edge_ids, reference_ids in by_edges.items():
+                yield aspect_name, {'po': list(edge_ids), key: reference_ids}
+
+    def _iterate_node_attribute_elements(self, key: str, objects: Dict[str, List]) -> CxElementsType:
+        parents = objects[str(CX.node_has_attribute)]
+        node_id = self._get_id('node', parents[0]) if parents else None
+        if node_id is None:
+            log.debug('no node for attribute: %s', key)
+            return
+
+        element = _get_attribute(objects)
+        if element is not None:
+            yield 'nodeAttributes', {'po': node_id, **element}
+
+    def _iterate_edge_attribute_elements(self, key: str, objects: Dict[str, List]) -> CxElementsType:
+        parents = objects[str(CX.edge_has_attribute)]
+        edge_id = self._get_id('edge', parents[0]) if parents else None
+        if edge_id is None:
+            log.debug('no edge for attribute: %s', key)
+            return
+
+        element = _get_attribute(objects)
+        if element is not None:
+            yield 'edgeAttributes', {'po': edge_id, **element}
+
+    def _iterate_network_attribute_elements(self, key: str, objects: Dict[str, List]) -> CxElementsType:
+        if not objects[str(CX.attribute_has_name)]:
+            # both policies give the name as the key of the network attribute
+            keys = objects[str(CX.network_attribute_has_key)]
+            if 1 < len(keys):
+                # older versions gave the values as keys too, and the triples don't say which one is the name
+                raise ValueError(f'network attribute {key} has more than one key, so its name is ambiguous')
+            objects[str(CX.attribute_has_name)].extend(keys)
+
+        element = _get_attribute(objects)
+        if element is not None:
+            yield 'networkAttributes', element
+
+    def _iterate_citation_elements(self, key: str, objects: Dict[str, List]) -> CxElementsType:
+        citation_id = self._get_id('citation', key)
+        if citation_id is None:
+            return
+
+        # both policies give supports the citation with their identifier instead of a support of their own
+        text = _get_literal(objects, str(CX.support_has_text))
+        if text is not None:
+            yield 'supports', {'@id': citation_id, 'text': text}
+
+        title = _get_literal(objects, str(CX.citation_has_title))
+        if title is not None:
+            yield 'citations', {'@id': citation_id, 'dc:title': title}
+        elif text is None:
+            yield 'citations', {'@id': citation_id}
+
+    def _iterate_support_elements(self, key: str, objects: Dict[str, List]) -> CxElementsType:
+        text = _get_literal(objects, str(CX.support_has_text))
+        if text is None:  # only referred to by edges, since the text is on the citation
+            return
+
+        support_id = self._get_id('support', key)
+        if support_id is not None:
+            yield 'supports', {'@id': support_id, 'text': text}
+
+    def _iterate_metadata_elements(self, key: str, objects: Dict[str, List]) -> CxElementsType:
+        name = _get_literal(objects, _RDFS_LABEL)
+        if name is None:
+            return
+
+        element = {'name': name}
+        for field, predicate in (('version', CX.aspect_version), ('consistencyGroup', CX.aspect_consistency_group)):
+            value = _get_literal(objects, str(predicate))
+            if value is not None:
+                element[field] = value
+        if 1 < len(element):
+            yield 'metaData', element
+
+
+def _iterate_run(file: BinaryIO) -> Iterable[Record]:
+    """Iterate over the triples of a sorted run, a block at a time."""
+    while True:
+        try:
+            block = pickle.load(file)
+        except EOFError:
+            return
+        yield from block
+
+
+def _get_literal(objects: Dict[str, List], predicate: str) -> Optional[Any]:
+    """Get the value of the first literal object of a predicate, if there is one."""
+    for obj in objects.get(predicate, ()):
+        if isinstance(obj, tuple):
+            return obj[0]
+    return None
+
+
+def _get_attribute(objects: Dict[str, List]) -> Optional[Dict]:
+    """Get the name, value, and data type of an attribute, or None if it doesn't have a name."""
+    name = _get_literal(objects, str(CX.attribute_has_name))
+    if name is None:
+        return None
+
+    literals = [obj for obj in objects[str(CX.attribute_has_value)] if isinstance(obj, tuple)]
+    if 1 == len(literals) and name != 'alias':
+        value, data_type = literals[0]
+        element = {'n': name, 'v': value}
+        if data_type is not None:
+            element['d'] = data_type
+        return element
+
+    data_types = {data_type for _, data_type in literals}
+    data_type = data_types.pop() if 1 == len(data_types) else None
+    return {'n': name, 'v': [value for value, _ in literals], 'd': f'{LIST_PREFIX}{data_type or "string"}'}
+
+
+def iterate_rdf_cx_elements(file: TextIO, max_in_memory: int = DEFAULT_MAX_IN_MEMORY) -> CxElementsType:
+    """Iterate over the CX aspect names and elements of N-Triples made with the aspect or predicate policy.
+
+    All of the triples are read before the first element is given. The elements of an aspect aren't necessarily
+    together, and the metadata comes as ``metaData`` elements with only the version and consistency group of each
+    aspect, if they were given, since the number of elements might have changed.
+
+    :param file: A file-like object with N-Triples or N-Quads, opened in text mode
+    :param max_in_memory: The number of triples to keep in memory. Past this, they're sorted and written to disk.
+    :return: A generator of pairs of aspect names and elements
+    :raises RdfSyntaxError: If a line isn't valid N-Triples
+    :raises ValueError: If the RDF was made with another policy, or if a network attribute has more than one key
+    """
+    importer = _Importer(max_in_memory=max_in_memory)
+    try:
+        importer.read(file)
+    except Exception:
+        importer.close()
+        raise
+    return importer.iterate_elements()
+
+
+def rdf_file_to_cx_file(source: TextIO, destination: TextIO, max_in_memory: int = DEFAULT_MAX_IN_MEMORY,
+                        **kwargs) -> None:
+    """Convert N-Triples made with the aspect or predicate policy to CX, writing it incrementally.
+
+    :param source: A file-like object with N-Triples or N-Quads, opened in text mode
+    :param destination: A file-like object to write the CX to, opened in text mode
+    :param max_in_memory: The number of triples to keep in memory. Past this, they're sorted and written to disk.
+    :param kwargs: Other keyword arguments to pass to :class:`cx_rdf.writer.CxWriter`
+    """
+    with CxWriter(destination, **kwargs) as writer:
+        writer.add_all(iterate_rdf_cx_elements(source, max_in_memory=max_in_memory))
+
+
+def rdf_to_cx(source: TextIO, max_in_memory: int = DEFAULT_MAX_IN_MEMORY) -> CxType:
+    """Convert N-Triples made with the aspect or predicate policy to a CX JSON object.
+
+    Use :func:`rdf_file_to_cx_file` for networks that are too big to keep in memory.
+
+    :param source: A file-like object with N-Triples or N-Quads, opened in text mode
+    :param max_in_memory: The number of triples to keep in memory. Past this, they're sorted and written to disk.
+    """
+    destination = io.StringIO()
+    rdf_file_to_cx_file(source, destination, max_in_memory=max_in_memory)
+    return json.loads(destination.getvalue())
@@ -2,38 +2,329 @@
 
 """Top level input/output functions."""
 
-from typing import Optional
+from contextlib import contextmanager
+import time
+from typing import Iterable, Optional, TextIO
 
 from rdflib import Graph
 
-from . import abstract_policy, aspect_policy, predicate_policy
-from .typing import CxType
+from .abstract_policy import _AbstractExporter, _CompactAbstractExporter
+from .aspect_policy import _Exporter as _AspectExporter
+from .cache import ConversionCache, GRAPH_FORMAT, hash_cx, hash_file
+from .columnar import ColumnarCx
+from .exporter_base import Exporter
+from .predicate_policy import _ConciseEdgeExporter
+from .reader import iterate_cx_elements
+from .sinks import GraphSink, ListSink, NQuadsSink, NTriplesSink, Triple, TripleSink
+from .stats import ConversionHooks, get_peak_memory
+from .typing import CxElementsType, CxType
+from .utils import iterate_aspect_elements
 
 __all__ = [
-    'cx_to_rdf_graph'
+    'cx_to_rdf_graph',
+    'cx_file_to_rdf_graph',
+    'cx_elements_to_rdf_graph',
+    'cx_columns_to_rdf_graph',
+    'cx_file_to_rdf_file',
+    'cx_file_to_rdf_store',
+    'iter_triples',
+    'iter_element_triples',
+    'get_exporter',
 ]
 
-ALLOWED_POLICIES = ['aspect', 'abstract', 'predicate']
+ALLOWED_POLICIES = ['aspect', 'abstract', 'compact', 'predicate']
 
+#: RDF formats that are written line by line while converting, without building a graph
+STREAMING_FORMATS = {
+    'nt': NTriplesSink,
+    'nquads': NQuadsSink,
+}
 
-def cx_to_rdf_graph(cx_json: CxType, graph: Optional[Graph] = None, policy: Optional[str] = None) -> Graph:
+_POLICY_EXPORTERS = {
+    'aspect': _AspectExporter,
+    'abstract': _AbstractExporter,
+    'compact': _CompactAbstractExporter,
+    'predicate': _ConciseEdgeExporter,
+}
+
+
+def get_exporter(policy: Optional[str] = None, graph: Optional[Graph] = None,
+                 sink: Optional[TripleSink] = None, batch_size: Optional[int] = None,
+                 base_iri: Optional[str] = None, hooks: Optional[ConversionHooks] = None) -> Exporter:
+    """Get an exporter for the given policy.
+
+    :param policy: Defaults to the 'predicate' policy. Can also use 'abstract', 'compact', or 'aspect'
+    :param graph: An optional RDFLib graph to fill. If not specified, creates one.
+    :param sink: An optional destination for the triples. Overrides the graph if given.
+    :param batch_size: The number of triples to insert into the graph at once. See
+     :class:`cx_rdf.sinks.GraphSink`.
+    :param base_iri: An optional IRI to mint deterministic IRIs under instead of making blank nodes. See
+     :class:`cx_rdf.exporter_base.Exporter`.
+    :param hooks: Optional hooks to report the measurements of each aspect to. See :mod:`cx_rdf.stats`.
+    """
+    exporter_cls = _get_exporter_cls(policy)
+    return exporter_cls(graph=graph, sink=sink, batch_size=batch_size, base_iri=base_iri, hooks=hooks)
+
+
+def _get_exporter_cls(policy: Optional[str] = None):
+    if policy is None:
+        policy = 'predicate'
+
+    exporter_cls = _POLICY_EXPORTERS.get(policy)
+    if exporter_cls is None:
+        raise ValueError('invalid policy given: {}. Use one of: {}'.format(policy, ', '.join(ALLOWED_POLICIES)))
+
+    return exporter_cls
+
+
+def cx_to_rdf_graph(cx_json: CxType, graph: Optional[Graph] = None, policy: Optional[str] = None,
+                    sink: Optional[TripleSink] = None, batch_size: Optional[int] = None,
+                    base_iri: Optional[str] = None, workers: int = 1, cache: Optional[ConversionCache] = None,
+                    hooks: Optional[ConversionHooks] = None) -> Optional[Graph]:
     """Export CX as RDF with the given policy.
 
     :param cx_json: CX JSON
     :param graph: An optional RDFLib graph to fill. If not specified, creates one.
-    :param policy: Defaults to the 'predicate' policy. Can also use 'abstract' or 'aspect'
+    :param policy: Defaults to the 'predicate' policy. Can also use 'abstract', 'compact', or 'aspect'
+    :param sink: An optional destination for the triples. Overrides the graph if given.
+    :param batch_size: The number of triples to insert into the graph at once. See
+     :class:`cx_rdf.sinks.GraphSink`.
+    :param base_iri: An optional IRI to mint deterministic IRIs under instead of making blank nodes. See
+     :class:`cx_rdf.exporter_base.Exporter`.
+    :param workers: The number of processes to convert the nodes, edges, and their attributes in. See
+     :mod:`cx_rdf.parallel`. Defaults to converting everything in this process.
+    :param cache: An optional cache to load the graph from if the same CX has been converted the same way before,
+     or to keep it in otherwise. Can't be used with a sink.
+    :param hooks: Optional hooks to report the measurements of each aspect and phase to. See :mod:`cx_rdf.stats`.
+    :return: The graph that was filled, or None if a sink without one was given
     """
-    if policy is None:
-        return predicate_policy.export(cx_json, graph=graph)
+    if cache is None:
+        return cx_elements_to_rdf_graph(iterate_aspect_elements(cx_json), graph=graph, policy=policy, sink=sink,
+                                        batch_size=batch_size, base_iri=base_iri, workers=workers, hooks=hooks)
+
+    if sink is not None:
+        raise ValueError('a cache can only be used to build a graph, not with a sink')
+
+    key = cache.get_key(hash_cx(cx_json), policy=policy, rdf_format=GRAPH_FORMAT, base_iri=base_iri)
+    return cache.get_graph(key, lambda: cx_to_rdf_graph(cx_json, policy=policy, batch_size=batch_size,
+                                                        base_iri=base_iri, workers=workers, hooks=hooks),
+                           graph=graph)
+
+
+def cx_file_to_rdf_graph(file: TextIO, graph: Optional[Graph] = None, policy: Optional[str] = None,
+                         sink: Optional[TripleSink] = None, batch_size: Optional[int] = None,
+                         base_iri: Optional[str] = None, workers: int = 1,
+                         hooks: Optional[ConversionHooks] = None) -> Optional[Graph]:
+    """Export a CX file as RDF with the given policy, reading it incrementally.
+
+    :param file: A file-like object containing a CX document
+    :param graph: An optional RDFLib graph to fill. If not specified, creates one.
+    :param policy: Defaults to the 'predicate' policy. Can also use 'abstract', 'compact', or 'aspect'
+    :param sink: An optional destination for the triples. Overrides the graph if given.
+    :param batch_size: The number of triples to insert into the graph at once. See
+     :class:`cx_rdf.sinks.GraphSink`.
+    :param base_iri: An optional IRI to mint deterministic IRIs under instead of making blank nodes. See
+     :class:`cx_rdf.exporter_base.Exporter`.
+    :param workers: The number of processes to convert the nodes, edges, and their attributes in. See
+     :mod:`cx_rdf.parallel`. Defaults to converting everything in this process.
+    :param hooks: Optional hooks to report the measurements of each aspect and phase to. See :mod:`cx_rdf.stats`.
+    :return: The graph that was filled, or None if a sink without one was given
+    """
+    return cx_elements_to_rdf_graph(iterate_cx_elements(file), graph=graph, policy=policy, sink=sink,
+                                    batch_size=batch_size, base_iri=base_iri, workers=workers, hooks=hooks)
+
+
+def cx_elements_to_rdf_graph(elements: CxElementsType, graph: Optional[Graph] = None,
+                             policy: Optional[str] = None, sink: Optional[TripleSink] = None,
+                             batch_size: Optional[int] = None, base_iri: Optional[str] = None,
+                             workers: int = 1, hooks: Optional[ConversionHooks] = None) -> Optional[Graph]:
+    """Export a stream of CX aspect names and elements as RDF with the given policy.
+
+    :param elements: An iterable of pairs of aspect names and elements
+    :param graph: An optional RDFLib graph to fill. If not specified, creates one.
+    :param policy: Defaults to the 'predicate' policy. Can also use 'abstract', 'compact', or 'aspect'
+    :param sink: An optional destination for the triples. Overrides the graph if given.
+    :param batch_size: The number of triples to insert into the graph at once. See
+     :class:`cx_rdf.sinks.GraphSink`.
+    :param base_iri: An optional IRI to mint deterministic IRIs under instead of making blank nodes. See
+     :class:`cx_rdf.exporter_base.Exporter`.
+    :param workers: The number of processes to convert the nodes, edges, and their attributes in. See
+     :mod:`cx_rdf.parallel`. Defaults to converting everything in this process.
+    :param hooks: Optional hooks to report the measurements of each aspect and phase to. See :mod:`cx_rdf.stats`.
+    :return: The graph that was filled, or None if a sink without one was given
+    """
+    if workers > 1:
+        if hooks is not None:
+            raise ValueError('the aspects can only be measured when converting in one process')
+        from .parallel import export_parallel
+
+        if sink is None:
+            sink = GraphSink(graph, batch_size=batch_size)
+        return export_parallel(_get_exporter_cls(policy), elements, sink, base_iri=base_iri, workers=workers)
+
+    exporter = get_exporter(policy=policy, graph=graph, sink=sink, batch_size=batch_size, base_iri=base_iri,
+                            hooks=hooks)
+    return exporter.export_elements(elements)
+
+
+def cx_columns_to_rdf_graph(columnar: ColumnarCx, graph: Optional[Graph] = None, policy: Optional[str] = None,
+                            sink: Optional[TripleSink] = None, batch_size: Optional[int] = None,
+                            base_iri: Optional[str] = None,
+                            hooks: Optional[ConversionHooks] = None) -> Optional[Graph]:
+    """Export CX that's been split into columns as RDF with the given policy, a column at a time.
+
+    :param columnar: A CX document with its big aspects split into columns
+    :param graph: An optional RDFLib graph to fill. If not specified, creates one.
+    :param policy: Defaults to the 'predicate' policy. Can also use 'abstract', 'compact', or 'aspect'
+    :param sink: An optional destination for the triples. Overrides the graph if given.
+    :param batch_size: The number of triples to insert into the graph at once. See
+     :class:`cx_rdf.sinks.GraphSink`.
+    :param base_iri: An optional IRI to mint deterministic IRIs under instead of making blank nodes. See
+     :class:`cx_rdf.exporter_base.Exporter`.
+    :param hooks: Optional hooks to report the measurements of each aspect and phase to. See :mod:`cx_rdf.stats`.
+    :return: The graph that was filled, or None if a sink without one was given
+    """
+    exporter = get_exporter(policy=policy, graph=graph, sink=sink, batch_size=batch_size, base_iri=base_iri,
+                            hooks=hooks)
+    return exporter.export_columns(columnar)
+
+
+def cx_file_to_rdf_file(file: TextIO, destination: TextIO, policy: Optional[str] = None,
+                        rdf_format: Optional[str] = None, base_iri: Optional[str] = None,
+                        columnar: bool = False, workers: int = 1, cache: Optional[ConversionCache] = None,
+                        hooks: Optional[ConversionHooks] = None, edge_table: Optional[str] = None) -> None:
+    """Convert a CX file to an RDF file.
+
+    N-Triples and N-Quads are written while the CX is being read, so memory stays constant. All other formats are
+    serialized by RDFLib from an in-memory graph.
+
+    :param file: A file-like object containing a CX document
+    :param destination: A file-like object opened for writing text
+    :param policy: Defaults to the 'predicate' policy. Can also use 'abstract', 'compact', or 'aspect'
+    :param rdf_format: The RDF format to output. Defaults to RDF/XML.
+    :param base_iri: An optional IRI to mint deterministic IRIs under instead of making blank nodes. This is needed
+     for the 'predicate' policy to give valid N-Triples and RDF/XML, since it uses its attributes as predicates.
+    :param columnar: If true, reads the whole CX into columns first and exports a column at a time. This is faster
+     for big networks, but keeps the CX in memory.
+    :param workers: The number of processes to convert the nodes, edges, and their attributes in. Can't be combined
+     with the columnar export.
+    :param cache: An optional cache to copy the RDF from if the same CX has been converted the same way before, or
+     to keep it in otherwise
+    :param hooks: Optional hooks to report the measurements of each aspect and phase to. See :mod:`cx_rdf.stats`.
+    :param edge_table: An optional path to write a table of the edges to while converting, so they can be looked up
+     without querying the RDF. Only works with the 'predicate' policy. See :mod:`cx_rdf.edge_table`.
+    """
+    if edge_table is not None:
+        if policy not in {None, 'predicate'}:
+            raise ValueError(f'an edge table can only be written with the predicate policy, not {policy}')
+        if cache is not None:
+            raise ValueError('an edge table can not be written when copying from a cache')
+
+    if cache is not None:
+        digest, file = hash_file(file)
+        key = cache.get_key(digest, policy=policy, rdf_format=rdf_format, base_iri=base_iri)
+        cache.write(key, destination, lambda entry: cx_file_to_rdf_file(
+            file, entry, policy=policy, rdf_format=rdf_format, base_iri=base_iri, columnar=columnar, workers=workers,
+            hooks=hooks,
+        ))
+        return
+
+    if columnar:
+        if workers > 1:
+            raise ValueError('the columnar export can not be run with several workers')
+        with _measure(hooks, 'parse'):
+            source = ColumnarCx.from_file(file)
+        convert, options = cx_columns_to_rdf_graph, {}
+    else:
+        convert, source, options = cx_file_to_rdf_graph, file, {'workers': workers}
+
+    sink_cls = STREAMING_FORMATS.get(rdf_format)
+    sink = None if sink_cls is None else sink_cls(destination)
+    if edge_table is not None:
+        from .edge_table import EdgeTableSink
+
+        sink = EdgeTableSink(GraphSink() if sink is None else sink, edge_table)
+
+    graph = convert(source, policy=policy, sink=sink, base_iri=base_iri, hooks=hooks, **options)
+    if edge_table is not None:
+        sink.close()
+    if sink_cls is not None:
+        return
+
+    with _measure(hooks, 'serialize'):
+        destination.write(graph.serialize(format=rdf_format, encoding='utf-8').decode('utf-8'))
+
+
+@contextmanager
+def _measure(hooks: Optional[ConversionHooks], phase: str):
+    """Report the time and memory of a phase to hooks, if there are any."""
+    if hooks is None:
+        yield
+        return
 
-    if policy not in ALLOWED_POLICIES:
-        ValueError('invalid policy given: {}. Use one of: {}'.format(policy, ', '.format(ALLOWED_POLICIES)))
+    memory = get_peak_memory()
+    start = time.perf_counter()
+    yield
+    hooks.on_phase(phase, time.perf_counter() - start, None if memory is None else get_peak_memory() - memory)
 
-    if policy == 'aspect':
-        return aspect_policy.export(cx_json, graph=graph)
 
-    if policy == 'abstract':
-        return abstract_policy.export(cx_json, graph=graph)
+def cx_file_to_rdf_store(file: TextIO, path: str, policy: Optional[str] = None, base_iri: Optional[str] = None,
+                         columnar: bool = False, workers: int = 1) -> None:
+    """Convert a CX file to a graph in an SQLite database on disk.
+
+    The graph can be reopened later with :func:`cx_rdf.store.open_graph`.
+
+    :param file: A file-like object containing a CX document
+    :param path: The path of the database. If it already contains a graph, the triples are added to it.
+    :param policy: Defaults to the 'predicate' policy. Can also use 'abstract', 'compact', or 'aspect'
+    :param base_iri: An optional IRI to mint deterministic IRIs under instead of making blank nodes
+    :param columnar: If true, reads the whole CX into columns first and exports a column at a time
+    :param workers: The number of processes to convert the nodes, edges, and their attributes in. Can't be combined
+     with the columnar export.
+    """
+    if columnar and workers > 1:
+        raise ValueError('the columnar export can not be run with several workers')
+
+    from .store import open_graph
+
+    graph = open_graph(path)
+    try:
+        if columnar:
+            cx_columns_to_rdf_graph(ColumnarCx.from_file(file), graph=graph, policy=policy, base_iri=base_iri)
+        else:
+            cx_file_to_rdf_graph(file, graph=graph, policy=policy, base_iri=base_iri, workers=workers)
+        graph.commit()
+    finally:
+        graph.close()
+
+
+def iter_triples(cx_json: CxType, policy: Optional[str] = None,
+                 base_iri: Optional[str] = None) -> Iterable[Triple]:
+    """Iterate over the RDF triples for CX with the given policy, without building a graph.
+
+    :param cx_json: CX JSON
+    :param policy: Defaults to the 'predicate' policy. Can also use 'abstract', 'compact', or 'aspect'
+    :param base_iri: An optional IRI to mint deterministic IRIs under instead of making blank nodes
+    """
+    return iter_element_triples(iterate_aspect_elements(cx_json), policy=policy, base_iri=base_iri)
+
+
+def iter_element_triples(elements: CxElementsType, policy: Optional[str] = None,
+                         base_iri: Optional[str] = None) -> Iterable[Triple]:
+    """Iterate over the RDF triples for a stream of CX aspect names and elements with the given policy.
+
+    :param elements: An iterable of pairs of aspect names and elements
+    :param policy: Defaults to the 'predicate' policy. Can also use 'abstract', 'compact', or 'aspect'
+    :param base_iri: An optional IRI to mint deterministic IRIs under instead of making blank nodes
+    """
+    sink = ListSink()
+    exporter = get_exporter(policy=policy, sink=sink, base_iri=base_iri)
+    buffer = sink.triples
+
+    for aspect_name, element in elements:
+        yield from buffer
+        buffer.clear()
+        exporter.add_element(aspect_name, element)
 
-    if policy == 'predicate':
-        return predicate_policy.export(cx_json, graph=graph)
+    yield from buffer
+    buffer.clear()
@@ -1,73 +1,287 @@
 # -*- coding: utf-8 -*-
 
-"""Functions to import OWL to CX."""
+"""Functions to import OWL to CX.
 
-from typing import Mapping, Type
+Each class of the ontology becomes a node named after it, with its label as the ``l`` attribute, and each
+``subClassOf`` relationship between named classes becomes an edge. Superclasses from other ontologies get nodes too.
+
+.. code-block:: python
+
+    from cx_rdf.owl import convert_owl
+
+    cx = convert_owl('http://purl.obolibrary.org/obo/go.owl')
+
+Big ontologies can be written straight to a file with :func:`convert_owl_to_file`, which never builds the network in
+memory.
+
+Ontologies like GO or ChEBI have hundreds of thousands of classes, so rather than loading each class as an
+:mod:`owlready2` object, the classes, their superclasses, and their labels are read with one query each from the
+quadstore the ontology was loaded into.
+
+Parsing a big ontology takes much longer than converting it, so the quadstores can be kept in an
+:class:`OntologyCache` and reopened as long as the ontology hasn't changed:
+
+.. code-block:: python
+
+    from cx_rdf.owl import convert_owl, OntologyCache
+
+    cache = OntologyCache('~/.cache/cx_rdf/ontologies')
+    cx = convert_owl('http://purl.obolibrary.org/obo/go.owl', cache=cache)
+"""
+
+import hashlib
+import os
+import sqlite3
+from typing import Dict, Iterable, MutableMapping, Optional, TextIO, Tuple, Type
+from urllib.parse import urlsplit
+from urllib.request import Request, url2pathname, urlopen
 
 from ndex2 import NiceCXNetwork
-from owlready2 import EntityClass, get_ontology, Restriction, Thing
+import owlready2
+from owlready2 import (
+    EntityClass, get_ontology, label, Ontology, owl_class, owl_thing, rdf_type, rdfs_subclassof, World,
+)
 
+from .cache import ConversionCache
+from .typing import CxElementsType
+from .utils import get_version
+from .writer import CxWriter
 
-def ensure_node(cx: NiceCXNetwork, entities: Mapping[Type[EntityClass], int], entity_class: EntityClass):
-    """Ensure a node in the network."""
-    try:
-        name = EntityClass.get_name(entity_class)
-    except Exception:
-        return
+#: The number of seconds to wait for the server when checking if a remote ontology changed
+VERSION_TIMEOUT = 30
 
-    node_id = cx.create_node(node_name=name)
+#: Records the IRI of the ontology a cached quadstore was made for, since it's not always the one it was loaded from
+_CACHED_ONTOLOGY_SCHEMA = 'CREATE TABLE cx_rdf_ontology (iri TEXT NOT NULL)'
+
+#: Gets the identifiers and IRIs of the named classes of an ontology
+_CLASSES = """
+SELECT objs.s, resources.iri
+FROM objs JOIN resources ON resources.storid = objs.s
+WHERE objs.c = ? AND objs.p = ? AND objs.o = ? AND objs.s > 0
+ORDER BY objs.s
+"""
+
+#: Gets the named superclasses of all classes, with the IRIs of the superclasses. Anonymous superclasses, like
+#: restrictions, have negative identifiers.
+_SUPERCLASSES = """
+SELECT DISTINCT objs.s, objs.o, resources.iri
+FROM objs JOIN resources ON resources.storid = objs.o
+WHERE objs.p = ? AND objs.o > 0 AND objs.o != ?
+ORDER BY objs.s, objs.o
+"""
+
+#: Gets all labels, in the order they were loaded
+_LABELS = 'SELECT s, o FROM datas WHERE p = ? ORDER BY rowid'
 
-    try:
-        label = entity_class.label.first()
-        if label:
-            cx.add_node_attribute(property_of=node_id, name='l', values=label)
-    except Exception:
-        pass
 
-    entities[entity_class] = node_id
+def get_name(iri: str) -> str:
+    """Get the name of an entity from its IRI, the same way :mod:`owlready2` does."""
+    for separator in ('#', '/', ':'):
+        _, found, name = iri.rpartition(separator)
+        if found:
+            return name
+    return iri
+
+
+def ensure_node(cx: NiceCXNetwork, entities: MutableMapping[Type[EntityClass], int], entity_class: EntityClass) -> int:
+    """Ensure a node in the network for an :mod:`owlready2` class, labeling it when it's first made."""
+    node_id = entities.get(entity_class)
+    if node_id is not None:
+        return node_id
+
+    node_id = entities[entity_class] = cx.create_node(node_name=entity_class.name)
+    entity_label = entity_class.label.first()
+    if entity_label:
+        cx.add_node_attribute(property_of=node_id, name='l', values=str(entity_label))
     return node_id
 
 
-def convert_owl(base_iri: str) -> NiceCXNetwork:
+def get_ontology_version(base_iri: str) -> str:
+    """Get a tag that changes whenever an ontology does.
+
+    For a local file, this is its modification time and size. For a remote ontology, it's the ``ETag`` or else the
+    ``Last-Modified`` header the server answers a ``HEAD`` request with. If the server gives neither or can't be
+    reached, the tag is empty, so the ontology is only parsed again once it's evicted from the cache.
+
+    :param base_iri: The IRI of an ontology, or the path of a local file
+    """
+    parts = urlsplit(base_iri)
+    if parts.scheme in {'', 'file'}:
+        stat = os.stat(url2pathname(parts.path) if parts.scheme else base_iri)
+        return f'{stat.st_mtime_ns}:{stat.st_size}'
+
+    try:
+        with urlopen(Request(base_iri, method='HEAD'), timeout=VERSION_TIMEOUT) as response:
+            headers = response.headers
+    except OSError:
+        return ''
+    return headers.get('ETag') or headers.get('Last-Modified') or ''
+
+
+class OntologyCache(ConversionCache):
+    """A directory of ontologies that have been parsed into :mod:`owlready2` quadstores, with a bounded size."""
+
+    @staticmethod
+    def get_ontology_key(base_iri: str, version: str) -> str:
+        """Get the key of a parsed ontology.
+
+        :param base_iri: The IRI of the ontology, or the absolute path of a local file
+        :param version: The tag from :func:`get_ontology_version`
+        """
+        parts = (base_iri, version, owlready2.VERSION, get_version())
+        return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+    def load(self, base_iri: str) -> Ontology:
+        """Load an ontology from the cache, parsing and caching it first if it's missing or has changed.
+
+        Each ontology is in its own :class:`owlready2.World`. Ontologies from the cache are read from their files on
+        disk, so they need less memory than parsed ones too.
+
+        :param base_iri: The IRI of an ontology to download, or the path of a local file
+        """
+        if not urlsplit(base_iri).scheme:
+            base_iri = os.path.abspath(base_iri)
+        key = self.get_ontology_key(base_iri, get_ontology_version(base_iri))
+
+        path = self.get(key)
+        if path is not None:
+            # not exclusive, so other processes can read the same entry
+            world = World(filename=path, exclusive=False)
+            # owlready2 writes to the quadstore when it opens it, so commit to let go of the lock straight away
+            world.graph.commit()
+            row = world.graph.execute('SELECT iri FROM cx_rdf_ontology').fetchone()
+            return world.get_ontology(row[0])
+
+        # parsing into a quadstore in memory and copying it is much faster than parsing into one on disk
+        world = World()
+        onto = world.get_ontology(base_iri).load()
+        # owlready2 keeps a transaction open on its connection, which the backup would wait on forever
+        world.graph.commit()
+        entry_path = self._new_entry_path()
+        try:
+            connection = sqlite3.connect(entry_path)
+            try:
+                world.graph.db.backup(connection)
+                connection.execute(_CACHED_ONTOLOGY_SCHEMA)
+                connection.execute('INSERT INTO cx_rdf_ontology (iri) VALUES (?)', (onto.base_iri,))
+                connection.commit()
+            finally:
+                connection.close()
+        except BaseException:
+            if os.path.exists(entry_path):
+                os.remove(entry_path)
+            raise
+
+        self._put(key, entry_path)
+        return onto
+
+
+def load_ontology(base_iri: str, cache: Optional[OntologyCache] = None) -> Ontology:
+    """Load an ontology with :mod:`owlready2`.
+
+    :param base_iri: The IRI of an ontology to download, or the path of a local file
+    :param cache: An optional cache to reopen the parsed ontology from if it hasn't changed since it was last loaded,
+     or to keep it in otherwise
+    """
+    if cache is None:
+        return get_ontology(base_iri).load()
+    return cache.load(base_iri)
+
+
+def convert_owl(base_iri: str, cache: Optional[OntologyCache] = None) -> NiceCXNetwork:
     """Serialize an OWL ontology in CX.
 
-    :param base_iri: The IRI of an ontology to download with :py:mod:`owlready2`
+    :param base_iri: The IRI of an ontology to download with :py:mod:`owlready2`, or the path of a local file
+    :param cache: An optional cache of parsed ontologies. See :func:`load_ontology`.
     :return: A nice CX network
     """
-    onto = get_ontology(base_iri).load()
+    return convert_ontology(load_ontology(base_iri, cache=cache))
+
+
+def convert_owl_to_file(base_iri: str, destination: TextIO, indent: Optional[int] = None,
+                        cache: Optional[OntologyCache] = None) -> None:
+    """Serialize an OWL ontology in a CX file, writing the elements as they're made.
+
+    Unlike :func:`convert_owl`, the network is never kept in memory, only the identifiers of its nodes.
+
+    :param base_iri: The IRI of an ontology to download with :py:mod:`owlready2`, or the path of a local file
+    :param destination: A file-like object opened for writing text
+    :param indent: If given, pretty prints the CX with this many spaces per level
+    :param cache: An optional cache of parsed ontologies. See :func:`load_ontology`.
+    """
+    onto = load_ontology(base_iri, cache=cache)
+    with CxWriter(destination, indent=indent) as writer:
+        writer.add_all(iterate_owl_cx_elements(onto))
+
 
+def convert_ontology(onto: Ontology) -> NiceCXNetwork:
+    """Serialize an ontology that's been loaded with :mod:`owlready2` in CX.
+
+    :param onto: An ontology
+    :return: A nice CX network
+    """
     cx = NiceCXNetwork()
-    entities = {}
 
-    for entity_class in onto.classes():
-        edge_source = ensure_node(cx, entities, entity_class)
+    for aspect_name, element in iterate_owl_cx_elements(onto):
+        if aspect_name == 'nodes':
+            cx.create_node(id=element['@id'], node_name=element['n'])
+        elif aspect_name == 'edges':
+            cx.create_edge(id=element['@id'], edge_source=element['s'], edge_target=element['t'],
+                           edge_interaction=element['i'])
+        else:
+            cx.add_node_attribute(property_of=element['po'], name=element['n'], values=element['v'])
+
+    cx.update_consistency_group()
+
+    return cx
 
-        if edge_source is None:
-            raise ValueError('edge is none!')
 
-        for super_class in entity_class.is_a:
-            if super_class is Thing:
-                continue
+def iterate_owl_cx_elements(onto: Ontology) -> CxElementsType:
+    """Iterate over the aspect names and elements of the CX for an ontology that's been loaded with :mod:`owlready2`.
 
-            if isinstance(super_class, Restriction):
-                continue
+    :param onto: An ontology
+    :return: A generator of pairs of aspect names and elements from the nodes, edges, and node attributes aspects
+    """
+    labels = _get_labels(onto)
+    nodes: Dict[int, int] = {}
 
-            edge_target = ensure_node(cx, entities, super_class)
+    def _make_node(storid: int, iri: str) -> CxElementsType:
+        node_id = nodes[storid] = len(nodes)
+        yield 'nodes', {'@id': node_id, 'n': get_name(iri)}
+        node_label = labels.get(storid)
+        if node_label:
+            yield 'nodeAttributes', {'po': node_id, 'n': 'l', 'v': node_label}
 
-            if edge_target is None:
-                raise ValueError('Edge taret is none for {} ({})'.format(super_class, super_class.__class__))
+    for storid, iri in _iterate_classes(onto):
+        yield from _make_node(storid, iri)
+    # the classes of the ontology are numbered first, so any node numbered after them is from another ontology
+    number_of_classes = len(nodes)
 
-            cx.create_edge(
-                edge_source=edge_source,
-                edge_target=edge_target,
-                edge_interaction='subClassOf',
-            )
+    edge_id = 0
+    for storid, super_storid, super_iri in _iterate_superclasses(onto):
+        source = nodes.get(storid)
+        if source is None or source >= number_of_classes:
+            continue
+        if super_storid not in nodes:
+            yield from _make_node(super_storid, super_iri)
+        yield 'edges', {'@id': edge_id, 's': source, 't': nodes[super_storid], 'i': 'subClassOf'}
+        edge_id += 1
 
-            # TODO add more attributes/properties?
 
-        for i in entity_class.instances():
-            print('instance: %s', i)
+def _iterate_classes(onto: Ontology) -> Iterable[Tuple[int, str]]:
+    """Iterate over the identifiers in the quadstore and IRIs of the named classes of an ontology."""
+    return onto.world.graph.execute(_CLASSES, (onto.graph.c, rdf_type, owl_class))
 
-    cx.update_consistency_group()
 
-    return cx
+def _iterate_superclasses(onto: Ontology) -> Iterable[Tuple[int, int, str]]:
+    """Iterate over the identifiers of classes and their named superclasses, other than ``owl:Thing``."""
+    return onto.world.graph.execute(_SUPERCLASSES, (rdfs_subclassof, owl_thing))
+
+
+def _get_labels(onto: Ontology) -> Dict[int, str]:
+    """Get the first label of each entity in the quadstore by its identifier."""
+    labels: Dict[int, str] = {}
+    for storid, value in onto.world.graph.execute(_LABELS, (label.storid,)):
+        if storid not in labels:
+            labels[storid] = str(value)
+    return labels
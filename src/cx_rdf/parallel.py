@@ -0,0 +1,178 @@
+# -*- coding: utf-8 -*-
+
+"""Converting a single CX network with several processes.
+
+The big aspects, ``nodes``, ``edges``, ``nodeAttributes``, and ``edgeAttributes``, are cut into chunks of consecutive
+elements that are converted by a pool of worker processes, while the small aspects are converted by the main process
+as they're read. Workers serialize their triples as N-Triples when the destination is a :class:`NTriplesSink` or
+:class:`NQuadsSink`, so the main process only has to write them out. The results are merged in the same order as
+the elements, so the output is the same as converting the network in one process.
+
+The main process keeps track of which nodes, edges, and aspects have been declared, and tells the worker for each
+chunk which of the entities it refers to have already been declared by an earlier chunk, so every entity is
+declared exactly once. All exporters mint the same IRIs for the same entity, or the same blank nodes if there's no
+base IRI, so the chunks agree on them. Anything a worker holds back until later elements arrive, like the CURIEs
+waiting for an ``@context`` that comes after the attributes, is handed over to the main process.
+"""
+
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+import io
+import os
+from typing import Any, Dict, List, NamedTuple, Optional, Tuple, Type, Union
+from uuid import uuid4
+
+from rdflib import Graph, URIRef
+
+from .exporter_base import ENTITY_KEYS, Exporter
+from .sinks import ListSink, NQuadsSink, NTriplesSink, Triple, TripleSink
+from .typing import CxElementsType
+
+__all__ = [
+    'export_parallel',
+    'PARALLEL_ASPECTS',
+]
+
+#: The number of elements in each chunk given to a worker
+DEFAULT_CHUNK_SIZE = 20_000
+
+#: The aspects whose elements are converted by the workers
+PARALLEL_ASPECTS = frozenset(ENTITY_KEYS)
+
+
+class _Chunk(NamedTuple):
+    """Everything a worker needs to convert a chunk of elements on its own."""
+
+    exporter_cls: Type[Exporter]
+    base_iri: Optional[str]
+    blank_prefix: str
+    #: Whether to serialize the triples as N-Quads instead of returning them in a list
+    serialize: bool
+    #: The graph to put the N-Quads in, or None for the default graph
+    graph_name: Optional[URIRef]
+    state: Dict
+    aspect_name: str
+    #: The ordinal of the first element in its aspect, for minting the same IRIs as a single exporter would
+    ordinal: int
+    #: The kinds and identifiers of the entities that earlier chunks have already declared
+    declared: List[Tuple[str, Any]]
+    elements: List[Dict]
+
+
+def export_parallel(exporter_cls: Type[Exporter], elements: CxElementsType, sink: TripleSink,
+                    base_iri: Optional[str] = None, workers: Optional[int] = None,
+                    chunk_size: int = DEFAULT_CHUNK_SIZE) -> Optional[Graph]:
+    """Convert a stream of CX aspect names and elements with a pool of worker processes.
+
+    :param exporter_cls: The exporter for the policy
+    :param elements: An iterable of pairs of aspect names and elements
+    :param sink: The destination for the triples
+    :param base_iri: An optional IRI to mint deterministic IRIs under instead of making blank nodes
+    :param workers: The number of worker processes. Defaults to the number of CPUs.
+    :param chunk_size: The number of elements in each chunk given to a worker
+    :return: The graph that was filled, or None if the sink doesn't have one
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+
+    blank_prefix = f'N{uuid4().hex}_'
+    exporter = exporter_cls(sink=sink, base_iri=base_iri, blank_prefix=blank_prefix)
+    serialize = isinstance(sink, NTriplesSink)
+    graph_name = sink.graph_name if isinstance(sink, NQuadsSink) else None
+
+    # keep a few chunks per worker in flight so workers don't wait, but not so many that the results pile up
+    max_pending = 2 * workers
+    pending = deque()
+
+    def _write_results(limit: int) -> None:
+        while len(pending) > limit:
+            result, deferred_state = pending.popleft().result()
+            if serialize:
+                sink.file.write(result)
+            else:
+                sink.add_all(result)
+            if deferred_state is not None:
+                exporter.merge_deferred_state(deferred_state)
+
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        def _submit(aspect_name: str, chunk: List[Dict]) -> None:
+            entities = set(exporter.iter_chunk_entities(aspect_name, chunk))
+            declared = [(kind, identifier) for kind, identifier in entities if exporter.has_entity(kind, identifier)]
+            for kind, identifier in entities.difference(declared):
+                exporter.adopt_entity(kind, identifier)
+
+            ordinal = exporter.ordinals.get(aspect_name, 0)
+            exporter.ordinals[aspect_name] = ordinal + len(chunk)
+
+            task = _Chunk(
+                exporter_cls=exporter_cls,
+                base_iri=base_iri,
+                blank_prefix=blank_prefix,
+                serialize=serialize,
+                graph_name=graph_name,
+                state=exporter.get_shared_state(),
+                aspect_name=aspect_name,
+                ordinal=ordinal,
+                declared=declared,
+                elements=chunk,
+            )
+            pending.append(executor.submit(_export_chunk, task))
+            _write_results(max_pending)
+
+        chunk_aspect_name, chunk = None, []
+        for aspect_name, element in elements:
+            if aspect_name in PARALLEL_ASPECTS:
+                if chunk and (aspect_name != chunk_aspect_name or len(chunk) >= chunk_size):
+                    _submit(chunk_aspect_name, chunk)
+                    chunk = []
+                chunk_aspect_name = aspect_name
+                chunk.append(element)
+                continue
+
+            if chunk:
+                _submit(chunk_aspect_name, chunk)
+                chunk = []
+
+            # the main process's triples have to come after those of all earlier chunks
+            _write_results(0)
+            exporter.add_element(aspect_name, element)
+
+        if chunk:
+            _submit(chunk_aspect_name, chunk)
+        _write_results(0)
+
+    sink.flush()
+    return exporter.graph
+
+
+def _export_chunk(chunk: _Chunk) -> Tuple[Union[str, List[Triple]], Optional[Dict]]:
+    """Convert a chunk of elements in a worker, as N-Triples or N-Quads if serializing, otherwise as a list.
+
+    Whatever the exporter held back for later elements is given back too, for the main process to finish.
+    """
+    if chunk.serialize:
+        file = io.StringIO()
+        sink = NQuadsSink(file, graph_name=chunk.graph_name)
+    else:
+        sink = ListSink()
+
+    exporter = chunk.exporter_cls(sink=sink, base_iri=chunk.base_iri, blank_prefix=chunk.blank_prefix)
+
+    # the main process has already declared the network
+    if chunk.serialize:
+        file.seek(0)
+        file.truncate()
+    else:
+        sink.triples.clear()
+
+    exporter.set_shared_state(chunk.state)
+    exporter.ordinals[chunk.aspect_name] = chunk.ordinal
+    for kind, identifier in chunk.declared:
+        exporter.adopt_entity(kind, identifier)
+
+    exporter.export_elements((chunk.aspect_name, element) for element in chunk.elements)
+
+    deferred_state = exporter.get_deferred_state()
+    if chunk.serialize:
+        return file.getvalue(), deferred_state
+    return sink.triples, deferred_state
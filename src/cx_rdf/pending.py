@@ -0,0 +1,148 @@
+# -*- coding: utf-8 -*-
+
+"""Holding back what can't be converted yet until what it waits on arrives.
+
+CX doesn't fix the order of the aspects, so an element can come before something it needs. References to nodes,
+edges, citations, and supports don't need to wait, since the exporters name entities after their identifiers as
+soon as they're referenced. Anything that depends on another aspect's content does, like a CURIE in a node attribute
+that comes before the ``@context`` with its prefix. A :class:`PendingBuffer` holds these items under the key they're
+waiting on and gives them back once it's resolved, without keeping the rest of the network around.
+
+.. code-block:: python
+
+    from cx_rdf.pending import PendingBuffer
+
+    pending = PendingBuffer(max_in_memory=100_000)
+    pending.add('hgnc', ('node_5', 'hgnc:1100'))
+    ...
+    for node, curie in pending.resolve('hgnc'):
+        ...
+
+So a network whose ``@context`` comes last can't exhaust memory, the items are written to a temporary file once
+there are more than ``max_in_memory`` of them, and read back when they're resolved.
+"""
+
+import io
+import pickle
+import tempfile
+from typing import Any, BinaryIO, Dict, Hashable, List, Optional, Tuple
+
+__all__ = [
+    'PendingBuffer',
+]
+
+#: The number of items a :class:`PendingBuffer` keeps in memory by default before writing them to disk
+DEFAULT_MAX_IN_MEMORY = 100_000
+
+
+class PendingBuffer:
+    """Holds items waiting on a key until it's resolved, spilling them to a temporary file past a threshold."""
+
+    __slots__ = (
+        'max_in_memory', '_items', '_in_memory', '_file', '_offsets', '_count', 'deferred', 'resolved', 'spilled',
+        'peak',
+    )
+
+    def __init__(self, max_in_memory: int = DEFAULT_MAX_IN_MEMORY):
+        """Initialize the buffer.
+
+        :param max_in_memory: The number of items to keep in memory. Past this, all of them are written to disk.
+        """
+        self.max_in_memory = max_in_memory
+        self._items: Dict[Hashable, List[Any]] = {}
+        self._in_memory = 0
+        self._file: Optional[BinaryIO] = None
+        #: where the batches of items for each key start in the file, in the order they were written
+        self._offsets: Dict[Hashable, List[int]] = {}
+        self._count = 0
+
+        #: The number of items that were held back
+        self.deferred = 0
+        #: The number of items that were given back once their keys were resolved
+        self.resolved = 0
+        #: The number of items that were written to disk
+        self.spilled = 0
+        #: The largest number of items waiting at once
+        self.peak = 0
+
+    def __len__(self) -> int:
+        """Get the number of items still waiting."""
+        return self._count
+
+    def add(self, key: Hashable, item: Any) -> None:
+        """Hold back an item until its key is resolved.
+
+        :param key: What the item is waiting on
+        :param item: Anything that can be pickled
+        """
+        self._items.setdefault(key, []).append(item)
+        self._in_memory += 1
+        self._count += 1
+        self.deferred += 1
+        if self._count > self.peak:
+            self.peak = self._count
+        if self._in_memory > self.max_in_memory:
+            self._spill()
+
+    def _spill(self) -> None:
+        """Write all of the items in memory to the temporary file."""
+        if self._file is None:
+            self._file = tempfile.TemporaryFile()
+        file = self._file
+        file.seek(0, io.SEEK_END)
+        for key, items in self._items.items():
+            self._offsets.setdefault(key, []).append(file.tell())
+            pickle.dump(items, file, protocol=pickle.HIGHEST_PROTOCOL)
+            self.spilled += len(items)
+        self._items.clear()
+        self._in_memory = 0
+
+    def _take(self, key: Hashable) -> List[Any]:
+        """Remove the items waiting on a key, oldest first."""
+        items = []
+        for offset in self._offsets.pop(key, ()):
+            self._file.seek(offset)
+            items.extend(pickle.load(self._file))
+
+        in_memory = self._items.pop(key, None)
+        if in_memory is not None:
+            items.extend(in_memory)
+            self._in_memory -= len(in_memory)
+
+        self._count -= len(items)
+        if not self._count:  # nothing is left in the file
+            self.close()
+        return items
+
+    def resolve(self, key: Hashable) -> List[Any]:
+        """Get the items that were waiting on a key, which don't wait anymore, in the order they were added."""
+        items = self._take(key)
+        self.resolved += len(items)
+        return items
+
+    def pop_all(self) -> List[Tuple[Hashable, Any]]:
+        """Take all of the items still waiting with their keys, so something else can wait for them."""
+        return [
+            (key, item)
+            for key in list(self._offsets) + [key for key in self._items if key not in self._offsets]
+            for item in self._take(key)
+        ]
+
+    def close(self) -> None:
+        """Forget the items still waiting and delete the temporary file, if there is one."""
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+        self._items.clear()
+        self._offsets.clear()
+        self._in_memory = self._count = 0
+
+    def get_stats(self) -> Dict[str, int]:
+        """Get how many items were held back, resolved, and written to disk, and how many are still waiting."""
+        return {
+            'deferred': self.deferred,
+            'resolved': self.resolved,
+            'spilled': self.spilled,
+            'pending': self._count,
+            'peak': self.peak,
+        }
@@ -24,146 +24,167 @@ This makes it possible to quickly generate networks using a SPARQL query like:
         ?target RDFS:label ?target_label .
         ?relation a ndex:edge .
     }
+
+On big networks, the same rows can be precomputed while converting with :mod:`cx_rdf.edge_table`, so they don't
+need a query at all.
 """
 
 import itertools as itt
+from itertools import repeat
 import logging
 from typing import Dict, List, Optional
 
-from ndex2.cx import known_aspects
-from rdflib import BNode, Graph, Literal, Namespace, RDF
+from rdflib import BNode, Graph, Literal
+from rdflib.term import Node
 
-from .abstract_policy import _handle_aspects
-from .constants import CX
+from .abstract_policy import _handle_aspect_element
+from .columnar import AttributeColumns, EdgeColumns, iter_slices, NodeColumns
+from .constants import CX, KNOWN_ASPECTS, RDF_TYPE, RDFS_LABEL
+from .curies import CurieIndex
 from .exporter_base import Exporter
-from .typing import CxType
-from .utils import iterate_aspect_fragments
+from .sinks import Triple, TripleSink
+from .typing import CxElementsType, CxType
 
 __all__ = [
     'export',
+    'export_elements',
 ]
 
 log = logging.getLogger(__name__)
 
 
-def export(cx_json: CxType, graph: Optional[Graph] = None) -> Graph:
+def export(cx_json: CxType, graph: Optional[Graph] = None, sink: Optional[TripleSink] = None) -> Optional[Graph]:
     """Convert a CX JSON object to an RDFLib :class:`rdflib.Graph`.
 
     This policy uses CX standards for NDEx to make more meaningful RDF.
 
     :param cx_json: A CX JSON object
     :param graph: An optional RDFLib graph to fill. If not specified, creates one.
+    :param sink: An optional destination for the triples. Overrides the graph if given.
     """
-    exporter = _ConciseEdgeExporter(graph=graph)
+    exporter = _ConciseEdgeExporter(graph=graph, sink=sink)
     return exporter.export(cx_json)
 
 
+def export_elements(
+    elements: CxElementsType,
+    graph: Optional[Graph] = None,
+    sink: Optional[TripleSink] = None,
+) -> Optional[Graph]:
+    """Convert a stream of CX aspect names and elements to an RDFLib :class:`rdflib.Graph`.
+
+    :param elements: An iterable of pairs of aspect names and elements
+    :param graph: An optional RDFLib graph to fill. If not specified, creates one.
+    :param sink: An optional destination for the triples. Overrides the graph if given.
+    """
+    exporter = _ConciseEdgeExporter(graph=graph, sink=sink)
+    return exporter.export_elements(elements)
+
+
 class _ConciseEdgeExporter(Exporter):
     """A class to mediate shared state in the export function."""
 
+    __slots__ = ('curies', 'handlers')
+
     policy = CX.concise
 
     def __init__(self, *args, **kwargs):
         super().__init__(*args, **kwargs)
-        #: keep track of aspects by name, since they're represented by a BNode
-        self.aspects = {}
-        self.context: Dict[str, Namespace] = {}
-
-    def export(self, cx_json: CxType) -> Graph:
-        """Convert a CX JSON object to an RDFLib :class:`rdflib.Graph`.
-
-        This policy uses CX standards for NDEx to make more meaningful RDF.
-
-        :param cx_json: A CX JSON object
+        #: expands the CURIEs in attributes with the prefixes from the ``@context`` aspect
+        self.curies = CurieIndex(pending=self.pending)
+
+        #: look up the handler for each element by the name of its aspect
+        self.handlers = {
+            'numberVerification': self._extend_number_verification_element,
+            '@context': self._extend_context_element,
+            'nodes': self._extend_node_element,
+            'edges': self._extend_edge_entry,
+            'metaData': self._add_metadata_aspect_value,
+            'nodeAttributes': self._extend_node_attribute_entry,
+            'edgeAttributes': self._extend_edge_attribute_entry,
+            'networkAttributes': self._add_network_attribute_entry,
+            'citations': self._extend_citation_entry,
+            'edgeCitations': self._extend_edge_citation_entry,
+            'supports': self._extend_support_entry,
+            'edgeSupports': self._extend_edge_support_entry,
+        }
+        self.column_handlers = {
+            'nodes': self._extend_node_columns,
+            'edges': self._extend_edge_columns,
+            'nodeAttributes': self._extend_node_attribute_columns,
+            'edgeAttributes': self._extend_edge_attribute_columns,
+        }
+
+    def get_shared_state(self) -> Dict:
+        """Get the prefixes from the ``@context`` aspect, which are needed to expand CURIEs, or None while waiting."""
+        return {'context': None if self.curies.waits_for_context else dict(self.curies.prefixes)}
+
+    def set_shared_state(self, state: Dict) -> None:
+        """Take over the prefixes from the ``@context`` aspect of another exporter."""
+        if state['context'] is not None:
+            self.curies.add_prefixes(state['context'])
+
+    def merge_deferred_state(self, state: Dict) -> None:
+        """Take over the CURIEs another exporter held back, expanding those whose prefixes are known by now."""
+        self.sink.add_all(self.curies.extend_deferred(item for _, item in state['pending']))
+
+    def extend_element(self, aspect_name: str, element: Dict) -> None:
+        """Add an element from a CX aspect to the graph.
+
+        :param aspect_name: The name of the aspect
+        :param element: An element from the aspect
         """
-        for name, elements in iterate_aspect_fragments(cx_json):
-            self._extend_aspect(name, elements)
-
-        return self.graph
-
-    def _extend_aspect(self, name: str, elements: List[Dict]):
-        """Extend an aspect.
-
-        :param str name: The name of the aspect
-        :param elements:
-        """
-        if name == 'numberVerification':
-            n = elements[0]['longNumber']
-            self.graph.add((self.document, CX.has_number_verification, Literal(n)))
-        elif name == '@context':
-            self._extend_context(elements)
-        elif name == 'nodes':
-            self._extend_node_elements(elements)
-        elif name == 'edges':
-            self._extend_edge_elements(elements)
-        elif name == 'metaData':
-            self._extend_metadata_aspect_values(elements)
-        elif name == 'nodeAttributes':
-            self._extend_node_attribute_elements(elements)
-        elif name == 'edgeAttributes':
-            self._extend_edge_attribute_elements(elements)
-        elif name == 'networkAttributes':
-            self._extend_network_attribute_elements(elements)
-        elif name == 'citations':
-            self._extend_citation_elements(elements)
-        elif name == 'edgeCitations':
-            self._extend_edge_citation_elements(elements)
-        elif name == 'supports':
-            self._extend_support_elements(elements)
-        elif name == 'edgeSupports':
-            self._extend_edge_support_elements(elements)
-        elif name in known_aspects:
-            log.debug('unhandled known aspect: %s', name)
-            self._abstract_handle_aspect(name, elements)
-            # raise ValueError(f'unhandled known aspect: {name}')
+        handler = self.handlers.get(aspect_name)
+        if handler is not None:
+            handler(element)
+        elif aspect_name in KNOWN_ASPECTS:
+            log.debug('unhandled known aspect: %s', aspect_name)
+            self._abstract_handle_element(aspect_name, element)
         else:
-            log.debug('unhandled unknown aspect: %s', name)
-            # raise ValueError(f'unhandled unknown aspect: {name}')
-            self._abstract_handle_aspect(name, elements)
+            log.debug('unhandled unknown aspect: %s', aspect_name)
+            self._abstract_handle_element(aspect_name, element)
 
-    def _abstract_handle_aspect(self, aspect_name, elements):
-        return _handle_aspects(self.graph, self.aspects, self.document, aspect_name, elements)
+    def _abstract_handle_element(self, aspect_name, element):
+        return _handle_aspect_element(self, aspect_name, element)
 
-    def _extend_context(self, elements):
-        """Each entry is a dictionary, so update the context with all of them."""
-        for element in elements:
-            for prefix, uri in element.items():
-                self.context[prefix] = Namespace(uri)
+    def _extend_number_verification_element(self, element):
+        n = element['longNumber']
+        self.sink.add((self.document, CX.has_number_verification, Literal(n)))
 
-    def _extend_metadata_aspect_values(self, attributes):
-        for attribute in attributes:
-            self._add_metadata_aspect_value(attribute)
+    def _extend_context_element(self, element):
+        """Each element is a dictionary, so update the context with all of them.
+
+        The CURIEs of the attributes that came before the context get their URIs now.
+        """
+        self.sink.add_all(self.curies.add_prefixes(element))
 
     def _add_metadata_aspect_value(self, attribute) -> BNode:
         name = attribute['name']
+        self.curies.add_metadata(name)
 
-        metadata = BNode()
-        self.graph.add((metadata, RDF.type, CX.metadata))
-        self.graph.add((self.document, CX.has_metadata, metadata))
+        metadata = self.mint_element('metaData')
+        self.sink.add((metadata, RDF_TYPE, CX.metadata))
+        self.sink.add((self.document, CX.has_metadata, metadata))
         self._add_label(metadata, name)
 
         version = attribute.get('version')
         if version is not None:  # FIXME isn't this supposed to be required?
-            self.graph.add((metadata, CX.aspect_version, Literal(version)))
+            self.sink.add((metadata, CX.aspect_version, Literal(version)))
 
         element_count = attribute.get('elementCount')
         if element_count is not None:  # FIXME isn't this supposed to be required?
-            self.graph.add((metadata, CX.aspect_elements_count, Literal(element_count)))
+            self.sink.add((metadata, CX.aspect_elements_count, Literal(element_count)))
 
         group = attribute.get('consistencyGroup')
         if group is not None:  # FIXME isn't this supposed to be required?
-            self.graph.add((metadata, CX.aspect_consistency_group, Literal(group)))
+            self.sink.add((metadata, CX.aspect_consistency_group, Literal(group)))
 
         counter = attribute.get('idCounter')
         if counter:
-            self.graph.add((metadata, CX.aspect_id_counter, Literal(counter)))
+            self.sink.add((metadata, CX.aspect_id_counter, Literal(counter)))
 
         return metadata
 
-    def _extend_node_elements(self, elements):
-        for element in elements:
-            self._extend_node_element(element)
-
     def _extend_node_element(self, element) -> BNode:
         node_id = element['@id']
         node_label = element.get('n')
@@ -174,10 +195,6 @@ class _ConciseEdgeExporter(Exporter):
 
         return node
 
-    def _extend_edge_elements(self, entries):
-        for value in entries:
-            self._extend_edge_entry(value)
-
     def _extend_edge_entry(self, entry) -> BNode:
         source_id = entry['s']
         source = self.ensure_node(source_id)
@@ -188,123 +205,163 @@ class _ConciseEdgeExporter(Exporter):
         target_id = entry['t']
         target = self.ensure_node(target_id)
 
-        self.graph.add((source, edge, target))
+        self.sink.add((source, edge, target))
 
         interaction = entry.get('i')
         if interaction is not None:
-            self.graph.add((edge, CX.edge_has_interaction, Literal(interaction)))
+            self.sink.add((edge, CX.edge_has_interaction, self.terms.literal(interaction)))
 
         return edge
 
-    def _extend_node_attribute_elements(self, entries):
-        for entry in entries:
-            self._extend_node_attribute_entry(entry)
-
     def _extend_node_attribute_entry(self, entry) -> BNode:
         node = self.ensure_node(entry['po'])
 
-        node_attribute = BNode()
-        self.graph.add((node_attribute, RDF.type, CX.node_attribute))
-        self.graph.add((node, CX.node_has_attribute, node_attribute))
+        node_attribute = self.mint_element('nodeAttributes')
+        self.sink.add((node_attribute, RDF_TYPE, CX.node_attribute))
+        self.sink.add((node, CX.node_has_attribute, node_attribute))
 
         name = entry['n']
         values = entry['v']
-        data_type = entry.get('d', 'string')
-        data_type_is_list = data_type.startswith('list_of')
 
-        self.graph.add((node_attribute, CX.attribute_has_name, Literal(name)))
+        self.sink.add((node_attribute, CX.attribute_has_name, self.terms.literal(name)))
+        self.sink.add_all([
+            (node_attribute, CX.attribute_has_value, literal)
+            for literal in self.get_value_literals(values, entry.get('d'))
+        ])
 
-        if data_type_is_list:
-            for value in values:
-                self.graph.add((node_attribute, CX.attribute_has_value, Literal(value)))
-        else:
-            self.graph.add((node_attribute, CX.attribute_has_value, Literal(values)))
-
-        if name == 'alias':  # also add URIs based on the context
-            if not data_type_is_list:
-                raise ValueError
-
-            for value in values:
-                if not value:
-                    continue
-
-                value_pairs = value.strip().split(':', 1)
-
-                if 2 != len(value_pairs):
-                    log.debug('incorrectly written pair: %s', value)
-                    continue
-
-                k, v = (x.strip() for x in value_pairs)
-
-                prefix = self.context.get(k)
-                if prefix is None:
-                    log.debug('missing prefix "%s" in context', k)
-                    continue
-
-                uri = prefix[v]
-
-                self.graph.add((node, CX.node_has_alias, uri))
+        self.sink.add_all(self._get_node_curie_triples(node, node_attribute, name, values))
 
         return node_attribute
 
-    def _extend_edge_attribute_elements(self, entries):
-        for entry in entries:
-            self._extend_edge_attribute_entry(entry)
+    def _get_node_curie_triples(self, node: Node, node_attribute: Node, name: str, values) -> List[Triple]:
+        """Get the triples for the URIs of the CURIEs in a node attribute, which are the node's own for aliases."""
+        if name == 'alias':
+            if not isinstance(values, list):
+                raise ValueError
+            return self.curies.get_triples(node, CX.node_has_alias, values)
+        return self._get_curie_triples(node_attribute, values)
+
+    def _get_curie_triples(self, attribute: Node, values) -> List[Triple]:
+        """Get the triples for the URIs of the CURIEs in an attribute's values, expanded with the context."""
+        if isinstance(values, str):
+            return self.curies.get_triples(attribute, CX.attribute_has_uri, (values,)) if ':' in values else []
+        if isinstance(values, list):
+            return self.curies.get_triples(attribute, CX.attribute_has_uri, (
+                value
+                for value in values
+                if isinstance(value, str) and ':' in value
+            ))
+        return []
+
+    def _extend_node_columns(self, columns: NodeColumns) -> None:
+        add_all = self.sink.add_all
+        literal = self.terms.literal
+
+        for rows in iter_slices(len(columns)):
+            nodes = list(map(self.ensure_node, columns.ids[rows]))
+            add_all([
+                (node, RDFS_LABEL, literal(name))
+                for node, name in zip(nodes, columns.names[rows])
+                if name is not None
+            ])
+
+    def _extend_edge_columns(self, columns: EdgeColumns) -> None:
+        add_all = self.sink.add_all
+        literal = self.terms.literal
+
+        for rows in iter_slices(len(columns)):
+            sources = list(map(self.ensure_node, columns.sources[rows]))
+            edges = list(map(self.ensure_edge, columns.ids[rows]))
+            targets = list(map(self.ensure_node, columns.targets[rows]))
+            add_all(zip(sources, edges, targets))
+            add_all([
+                (edge, CX.edge_has_interaction, literal(interaction))
+                for edge, interaction in zip(edges, columns.interactions[rows])
+                if interaction is not None
+            ])
+
+    def _extend_node_attribute_columns(self, columns: AttributeColumns) -> None:
+        add_all = self.sink.add_all
+        literal = self.terms.literal
+
+        for rows in iter_slices(len(columns)):
+            nodes = list(map(self.ensure_node, columns.parents[rows]))
+            attributes = self.mint_elements('nodeAttributes', len(nodes))
+            names = columns.names[rows]
+            add_all(zip(attributes, repeat(RDF_TYPE), repeat(CX.node_attribute)))
+            add_all(zip(nodes, repeat(CX.node_has_attribute), attributes))
+            add_all(zip(attributes, repeat(CX.attribute_has_name), map(literal, names)))
+
+            values = columns.values[rows]
+            add_all(self.get_value_triples(attributes, values, columns.data_types[rows]))
+
+            triples = []
+            for node, attribute, name, value in zip(nodes, attributes, names, values):
+                triples.extend(self._get_node_curie_triples(node, attribute, name, value))
+            add_all(triples)
+
+    def _extend_edge_attribute_columns(self, columns: AttributeColumns) -> None:
+        add_all = self.sink.add_all
+        literal = self.terms.literal
+
+        for rows in iter_slices(len(columns)):
+            edges = list(map(self.ensure_edge, columns.parents[rows]))
+            attributes = self.mint_elements('edgeAttributes', len(edges))
+            add_all(zip(attributes, repeat(RDF_TYPE), repeat(CX.edge_attribute)))
+            add_all(zip(edges, repeat(CX.edge_has_attribute), attributes))
+            values = columns.values[rows]
+            add_all(zip(attributes, repeat(CX.attribute_has_name), map(literal, columns.names[rows])))
+            add_all(self.get_value_triples(attributes, values, columns.data_types[rows]))
+
+            triples = []
+            for attribute, value in zip(attributes, values):
+                triples.extend(self._get_curie_triples(attribute, value))
+            add_all(triples)
 
     def _extend_edge_attribute_entry(self, entry) -> BNode:
-        edge = self.ensure_node(entry['po'])
-        edge_attribute = BNode()
-        self.graph.add((edge_attribute, RDF.type, CX.edge_attribute))
-        self.graph.add((edge, CX.edge_has_attribute, edge_attribute))
-
-        self.graph.add((edge_attribute, CX.attribute_has_name, Literal(entry['n'])))
-        self.graph.add((edge_attribute, CX.attribute_has_value, Literal(entry['v'])))
+        edge = self.ensure_edge(entry['po'])
+        edge_attribute = self.mint_element('edgeAttributes')
+        self.sink.add((edge_attribute, RDF_TYPE, CX.edge_attribute))
+        self.sink.add((edge, CX.edge_has_attribute, edge_attribute))
+
+        self.sink.add((edge_attribute, CX.attribute_has_name, self.terms.literal(entry['n'])))
+        self.sink.add_all([
+            (edge_attribute, CX.attribute_has_value, literal)
+            for literal in self.get_value_literals(entry['v'], entry.get('d'))
+        ])
+        self.sink.add_all(self._get_curie_triples(edge_attribute, entry['v']))
 
         return edge_attribute
 
-    def _extend_network_attribute_elements(self, entries):
-        for entry in entries:
-            self._add_network_attribute_entry(entry)
-
     def _add_network_attribute_entry(self, entry) -> BNode:
-        network_attribute = BNode()
+        network_attribute = self.mint_element('networkAttributes')
 
-        self.graph.add((self.document, CX.network_has_attribute, network_attribute))
-        self.graph.add((network_attribute, RDF.type, CX.network_attribute))
+        self.sink.add((self.document, CX.network_has_attribute, network_attribute))
+        self.sink.add((network_attribute, RDF_TYPE, CX.network_attribute))
 
         name = entry['n']
-        self.graph.add((network_attribute, CX.network_attribute_has_key, Literal(name)))
+        self.sink.add((network_attribute, CX.network_attribute_has_key, self.terms.literal(name)))
 
-        value = entry['v']
-        data_type = entry.get('d')
-
-        if data_type is None or data_type == 'string':
-            self.graph.add((network_attribute, CX.network_attribute_has_key, Literal(value)))
-        else:
-            raise TypeError(f'unhandled data type: {data_type} {value}')
+        self.sink.add_all([
+            (network_attribute, CX.attribute_has_value, literal)
+            for literal in self.get_value_literals(entry['v'], entry.get('d'))
+        ])
+        self.sink.add_all(self._get_curie_triples(network_attribute, entry['v']))
 
         return network_attribute
 
-    def _extend_citation_elements(self, entries):
-        for entry in entries:
-            self._extend_citation_entry(entry)
-
     def _extend_citation_entry(self, entry) -> BNode:
         citation_id = entry['@id']
         citation = self.ensure_citation(citation_id)
 
         title = entry.get('dc:title')
         if title is not None:
-            self.graph.add((citation, CX.citation_has_title, Literal(title)))
+            self.sink.add((citation, CX.citation_has_title, Literal(title)))
 
         # FIXME handle other possible keys in citation entry
 
         return citation
 
-    def _extend_edge_citation_elements(self, entries):
-        for entry in entries:
-            self._extend_edge_citation_entry(entry)
-
     def _extend_edge_citation_entry(self, entry):
         edge_ids = entry['po']
         citation_ids = entry['citations']
@@ -312,11 +369,7 @@ class _ConciseEdgeExporter(Exporter):
         for edge_id, citation_id in itt.product(edge_ids, citation_ids):
             edge = self.ensure_edge(edge_id)
             citation = self.ensure_citation(citation_id)
-            self.graph.add((edge, CX.edge_has_citation, citation))
-
-    def _extend_support_elements(self, entries):
-        for entry in entries:
-            self._extend_support_entry(entry)
+            self.sink.add((edge, CX.edge_has_citation, citation))
 
     def _extend_support_entry(self, entry) -> BNode:
         support_id = entry['@id']
@@ -324,16 +377,12 @@ class _ConciseEdgeExporter(Exporter):
 
         text = entry.get('text')
         if text is not None:
-            self.graph.add((support, CX.support_has_text, Literal(text)))
+            self.sink.add((support, CX.support_has_text, Literal(text)))
 
         # FIXME handle other possible keys in support entry
 
         return support
 
-    def _extend_edge_support_elements(self, entries):
-        for entry in entries:
-            self._extend_edge_support_entry(entry)
-
     def _extend_edge_support_entry(self, entry):
         edge_ids = entry['po']
         support_ids = entry['supports']
@@ -341,4 +390,4 @@ class _ConciseEdgeExporter(Exporter):
         for edge_id, support_id in itt.product(edge_ids, support_ids):
             edge = self.ensure_edge(edge_id)
             support = self.ensure_support(support_id)
-            self.graph.add((edge, CX.edge_has_support, support))
+            self.sink.add((edge, CX.edge_has_support, support))
@@ -0,0 +1,171 @@
+# -*- coding: utf-8 -*-
+
+"""An incremental reader for CX documents.
+
+A CX document is a JSON array of aspect fragments, each of which is an object mapping aspect names to lists of
+elements. Rather than loading the whole document with :func:`json.load`, the reader in this module walks the two
+outermost levels of the document by hand and only decodes one element at a time, so the memory it needs is bounded by
+the size of the largest element instead of the size of the document.
+"""
+
+import codecs
+import json
+from typing import Dict, Optional, Union
+
+from .typing import CxElementsType
+
+__all__ = [
+    'CxSyntaxError',
+    'iterate_cx_elements',
+]
+
+#: The number of characters read from the underlying file at once
+DEFAULT_CHUNK_SIZE = 1 << 16
+
+_WHITESPACE = ' \t\n\r'
+
+
+class CxSyntaxError(ValueError):
+    """Raised when the structure of a CX document is malformed."""
+
+
+def iterate_cx_elements(file, chunk_size: int = DEFAULT_CHUNK_SIZE) -> CxElementsType:
+    """Iterate over the aspect names and elements of a CX document as they are read.
+
+    This is the streaming counterpart to :func:`cx_rdf.utils.iterate_aspect_elements`.
+
+    :param file: A file-like object opened in text or binary mode
+    :param chunk_size: The number of characters to read from the file at once
+    :return: A generator of pairs of aspect names and elements
+    """
+    return _Reader(file, chunk_size=chunk_size).iterate()
+
+
+class _Reader:
+    """Mediates the buffer and position while reading a CX document."""
+
+    def __init__(self, file, chunk_size: int = DEFAULT_CHUNK_SIZE):
+        self.file = file
+        self.chunk_size = chunk_size
+        self.buffer = ''
+        self.position = 0
+        self.exhausted = False
+        self.decoder = json.JSONDecoder()
+        self.byte_decoder = None
+
+    def iterate(self) -> CxElementsType:
+        """Iterate over pairs of aspect names and elements."""
+        self._expect('[')
+        if self._consume_if(']'):
+            return
+
+        while True:
+            yield from self._iterate_fragment()
+            if self._consume_if(']'):
+                return
+            self._expect(',')
+
+    def _iterate_fragment(self) -> CxElementsType:
+        """Iterate over the elements in a single aspect fragment, like ``{"nodes": [...]}``."""
+        self._expect('{')
+        if self._consume_if('}'):
+            return
+
+        while True:
+            aspect_name = self._decode()
+            if not isinstance(aspect_name, str):
+                raise CxSyntaxError(f'aspect name should be a string: {aspect_name}')
+            self._expect(':')
+
+            if self._peek() == '[':
+                yield from self._iterate_elements(aspect_name)
+            else:  # some writers give aspects with a single element, like @context, as an object
+                yield aspect_name, self._decode()
+
+            if self._consume_if('}'):
+                return
+            self._expect(',')
+
+    def _iterate_elements(self, aspect_name: str) -> CxElementsType:
+        """Iterate over the elements in the list of an aspect."""
+        self._expect('[')
+        if self._consume_if(']'):
+            return
+
+        while True:
+            yield aspect_name, self._decode()
+            if self._consume_if(']'):
+                return
+            self._expect(',')
+
+    def _fill(self, size: Optional[int] = None) -> bool:
+        """Read another chunk into the buffer, discarding what has already been consumed.
+
+        :param size: The number of characters to read. Defaults to the chunk size.
+        :return: If anything could be read
+        """
+        if self.exhausted:
+            return False
+
+        chunk = self.file.read(size or self.chunk_size)
+        if isinstance(chunk, bytes):
+            if self.byte_decoder is None:
+                self.byte_decoder = codecs.getincrementaldecoder('utf-8')()
+            chunk = self.byte_decoder.decode(chunk, final=not chunk)
+
+        if not chunk:
+            self.exhausted = True
+            return False
+
+        self.buffer = self.buffer[self.position:] + chunk
+        self.position = 0
+        return True
+
+    def _peek(self) -> str:
+        """Skip whitespace and return the next character without consuming it."""
+        while True:
+            buffer, position = self.buffer, self.position
+            while position < len(buffer) and buffer[position] in _WHITESPACE:
+                position += 1
+            self.position = position
+
+            if position < len(buffer):
+                return buffer[position]
+
+            if not self._fill():
+                raise CxSyntaxError('unexpected end of CX document')
+
+    def _consume_if(self, character: str) -> bool:
+        """Consume the next character if it matches."""
+        if self._peek() != character:
+            return False
+        self.position += 1
+        return True
+
+    def _expect(self, character: str) -> None:
+        """Consume the next character and raise an error if it does not match."""
+        actual = self._peek()
+        if actual != character:
+            raise CxSyntaxError(f'expected "{character}" but got "{actual}"')
+        self.position += 1
+
+    def _decode(self) -> Union[str, Dict]:
+        """Decode the next JSON value, reading more of the file until it is complete."""
+        self._peek()
+        size = self.chunk_size
+        while True:
+            try:
+                value, end = self.decoder.raw_decode(self.buffer, self.position)
+            except json.JSONDecodeError:
+                # grow the reads geometrically so elements larger than a chunk aren't re-scanned quadratically
+                if not self._fill(size):
+                    raise
+                size *= 2
+                continue
+
+            # a bare number running into the end of the buffer might be continued by the next chunk
+            if end == len(self.buffer) and self._fill():
+                continue
+
+            self.position = end
+            return value
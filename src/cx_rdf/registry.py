@@ -0,0 +1,102 @@
+# -*- coding: utf-8 -*-
+
+"""Compact maps from CX identifiers to the RDF nodes that represent them.
+
+CX identifiers are usually dense, counting up from zero to the ``idCounter`` of their aspect's metadata. An
+:class:`IdRegistry` keeps the nodes for such identifiers in a list indexed by the identifier, which takes a single
+pointer per identifier instead of a dictionary entry plus a boxed integer key. Identifiers that are far out of range,
+negative, or not integers at all go to a dictionary instead.
+"""
+
+from typing import Dict, List, Optional
+
+from rdflib.term import Node
+
+__all__ = [
+    'IdRegistry',
+]
+
+#: The number of identifiers past the end of the list that still extend it rather than going to the dictionary
+DENSE_SLACK = 1 << 10
+
+
+class IdRegistry:
+    """A map from CX identifiers to RDF nodes that's backed by a list when the identifiers are dense."""
+
+    __slots__ = ('_dense', '_sparse', '_size')
+
+    def __init__(self, capacity: int = 0):
+        """Initialize the registry.
+
+        :param capacity: The number of identifiers starting from zero to make room for up front
+        """
+        self._dense: List[Optional[Node]] = []
+        self._sparse: Dict[object, Node] = {}
+        self._size = 0
+        self.reserve(capacity)
+
+    def reserve(self, capacity: int) -> None:
+        """Make room for the identifiers from zero up to, but not including, the given capacity.
+
+        :param capacity: The number of identifiers, like the ``idCounter`` or ``elementCount`` from an aspect's
+         metadata
+        """
+        if capacity > len(self._dense):
+            self._grow(capacity)
+
+    def _grow(self, capacity: int) -> None:
+        """Extend the list to the given capacity, moving over any identifiers that are now in range."""
+        dense = self._dense
+        start = len(dense)
+        dense.extend([None] * (capacity - start))
+
+        sparse = self._sparse
+        if sparse:
+            for identifier in [i for i in sparse if type(i) is int and start <= i < capacity]:
+                dense[identifier] = sparse.pop(identifier)
+
+    def get(self, identifier) -> Optional[Node]:
+        """Get the node for an identifier, or None if it hasn't been registered."""
+        if type(identifier) is int and 0 <= identifier < len(self._dense):
+            return self._dense[identifier]
+        return self._sparse.get(identifier)
+
+    def __getitem__(self, identifier) -> Node:
+        """Get the node for an identifier, raising a KeyError if it hasn't been registered."""
+        node = self.get(identifier)
+        if node is None:
+            raise KeyError(identifier)
+        return node
+
+    def __setitem__(self, identifier, node: Node) -> None:
+        """Register the node for an identifier."""
+        dense = self._dense
+        if type(identifier) is int and 0 <= identifier:
+            if identifier >= len(dense) and identifier < 2 * len(dense) + DENSE_SLACK:
+                # close enough to the end that growing the list costs less than dictionary entries would
+                self._grow(max(identifier + 1, 2 * len(dense)))
+
+            if identifier < len(dense):
+                if dense[identifier] is None:
+                    self._size += 1
+                dense[identifier] = node
+                return
+
+        if identifier not in self._sparse:
+            self._size += 1
+        self._sparse[identifier] = node
+
+    def __contains__(self, identifier) -> bool:
+        """Check if an identifier has been registered."""
+        return self.get(identifier) is not None
+
+    def __len__(self) -> int:
+        """Count the registered identifiers."""
+        return self._size
+
+    def __iter__(self):
+        """Iterate over the registered identifiers."""
+        for identifier, node in enumerate(self._dense):
+            if node is not None:
+                yield identifier
+        yield from self._sparse
@@ -0,0 +1,238 @@
+# -*- coding: utf-8 -*-
+
+"""Destinations for the triples generated by the exporters.
+
+The exporters don't need any of the indexing an in-memory :class:`rdflib.Graph` does, so when the result is only
+going to be serialized, the triples can be written directly to a file with a :class:`NTriplesSink` or
+:class:`NQuadsSink`, or just counted with a :class:`CountingSink`.
+"""
+
+from abc import ABC, abstractmethod
+from typing import Iterable, List, Optional, TextIO, Tuple
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.store import Store
+from rdflib.term import Node
+
+__all__ = [
+    'TripleSink',
+    'GraphSink',
+    'NTriplesSink',
+    'NQuadsSink',
+    'CountingSink',
+    'ListSink',
+    'has_bulk_insert',
+    'term_to_nt',
+]
+
+#: The type used for RDF triples
+Triple = Tuple[Node, Node, Node]
+
+#: The number of triples a :class:`GraphSink` collects before inserting them into its graph's store at once
+DEFAULT_BATCH_SIZE = 10_000
+
+
+class TripleSink(ABC):
+    """The base class for destinations of triples."""
+
+    #: The graph filled by this sink, if it has one
+    graph: Optional[Graph] = None
+
+    @abstractmethod
+    def add(self, triple: Triple) -> None:
+        """Add a triple."""
+        raise NotImplementedError
+
+    def add_all(self, triples: Iterable[Triple]) -> None:
+        """Add several triples at once."""
+        for triple in triples:
+            self.add(triple)
+
+    def bind(self, prefix: str, namespace: str) -> None:
+        """Bind a prefix to a namespace, if the destination supports it."""
+
+    def flush(self) -> None:
+        """Flush any buffered triples to the destination."""
+
+
+class GraphSink(TripleSink):
+    """A sink that adds triples to an RDFLib graph.
+
+    When the graph's store has its own bulk insertion, like a database-backed store, the triples are collected and
+    inserted in batches with :meth:`rdflib.store.Store.addN` rather than paying for a call to
+    :meth:`rdflib.Graph.add` and the store's dispatch on every triple. The graph is only guaranteed to contain all
+    triples after :meth:`flush` has been called, which the exporters do at the end of each aspect.
+    """
+
+    def __init__(self, graph: Optional[Graph] = None, batch_size: Optional[int] = None):
+        """Initialize the sink.
+
+        :param graph: An optional RDFLib graph to fill. If not specified, creates one.
+        :param batch_size: The number of triples to collect before inserting them. Defaults to
+         :data:`DEFAULT_BATCH_SIZE` if the graph's store implements its own bulk insertion, otherwise to 1, which
+         adds each triple as soon as it's given. The in-memory stores that come with RDFLib only add triples one at a
+         time, so batching doesn't help them.
+        """
+        self.graph = Graph() if graph is None else graph
+        if batch_size is None:
+            batch_size = DEFAULT_BATCH_SIZE if has_bulk_insert(self.graph.store) else 1
+        self.batch_size = batch_size
+        self.buffer: List[Triple] = []
+
+    def add(self, triple: Triple) -> None:
+        """Add a triple to the graph, once the current batch is full."""
+        if self.batch_size <= 1:
+            self.graph.add(triple)
+            return
+
+        buffer = self.buffer
+        buffer.append(triple)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def add_all(self, triples: Iterable[Triple]) -> None:
+        """Add several triples to the graph, once the current batch is full."""
+        if self.batch_size <= 1:
+            add = self.graph.add
+            for triple in triples:
+                add(triple)
+            return
+
+        buffer = self.buffer
+        buffer.extend(triples)
+        if len(buffer) >= self.batch_size:
+            self.flush()
+
+    def flush(self) -> None:
+        """Insert the current batch of triples into the graph's store."""
+        if not self.buffer:
+            return
+
+        graph = self.graph
+        graph.store.addN((s, p, o, graph) for s, p, o in self.buffer)
+        self.buffer.clear()
+
+    def bind(self, prefix: str, namespace: str) -> None:
+        """Bind a prefix to a namespace in the graph's namespace manager."""
+        self.graph.namespace_manager.bind(prefix, namespace)
+
+
+def has_bulk_insert(store: Store) -> bool:
+    """Check if an RDFLib store implements :meth:`rdflib.store.Store.addN` instead of inheriting the default loop."""
+    return type(store).addN is not Store.addN
+
+
+class NTriplesSink(TripleSink):
+    """A sink that writes each triple as a line of N-Triples as soon as it's added."""
+
+    def __init__(self, file: TextIO):
+        """Initialize the sink.
+
+        :param file: A file-like object opened for writing text
+        """
+        self.file = file
+        self._write = file.write
+
+    def add(self, triple: Triple) -> None:
+        """Write a triple as a line of N-Triples."""
+        s, p, o = triple
+        self._write(f'{term_to_nt(s)} {term_to_nt(p)} {term_to_nt(o)} .\n')
+
+    def add_all(self, triples: Iterable[Triple]) -> None:
+        """Write several triples as lines of N-Triples."""
+        self.file.writelines(f'{term_to_nt(s)} {term_to_nt(p)} {term_to_nt(o)} .\n' for s, p, o in triples)
+
+    def flush(self) -> None:
+        """Flush the underlying file."""
+        self.file.flush()
+
+
+class NQuadsSink(NTriplesSink):
+    """A sink that writes each triple as a line of N-Quads as soon as it's added."""
+
+    def __init__(self, file: TextIO, graph_name: Optional[URIRef] = None):
+        """Initialize the sink.
+
+        :param file: A file-like object opened for writing text
+        :param graph_name: The name of the graph to put the triples in. If not given, uses the default graph, in
+         which case the output is also valid N-Triples.
+        """
+        super().__init__(file)
+        self.graph_name = graph_name
+        self.suffix = ' .\n' if graph_name is None else f' {term_to_nt(graph_name)} .\n'
+
+    def add(self, triple: Triple) -> None:
+        """Write a triple as a line of N-Quads."""
+        s, p, o = triple
+        self._write(f'{term_to_nt(s)} {term_to_nt(p)} {term_to_nt(o)}{self.suffix}')
+
+    def add_all(self, triples: Iterable[Triple]) -> None:
+        """Write several triples as lines of N-Quads."""
+        suffix = self.suffix
+        self.file.writelines(f'{term_to_nt(s)} {term_to_nt(p)} {term_to_nt(o)}{suffix}' for s, p, o in triples)
+
+
+class ListSink(TripleSink):
+    """A sink that keeps triples in a list until they're taken."""
+
+    def __init__(self):
+        """Initialize the sink."""
+        self.triples: List[Triple] = []
+
+    def add(self, triple: Triple) -> None:
+        """Add a triple to the list."""
+        self.triples.append(triple)
+
+    def add_all(self, triples: Iterable[Triple]) -> None:
+        """Add several triples to the list."""
+        self.triples.extend(triples)
+
+
+class CountingSink(TripleSink):
+    """A sink that throws away triples and only counts them."""
+
+    def __init__(self):
+        """Initialize the sink."""
+        self.count = 0
+
+    def add(self, triple: Triple) -> None:
+        """Count a triple."""
+        self.count += 1
+
+    def add_all(self, triples: Iterable[Triple]) -> None:
+        """Count several triples."""
+        if not isinstance(triples, list):
+            triples = list(triples)
+        self.count += len(triples)
+
+
+_LITERAL_ESCAPES = str.maketrans({
+    '\\': '\\\\',
+    '"': '\\"',
+    '\n': '\\n',
+    '\r': '\\r',
+})
+
+_IRI_ESCAPES = str.maketrans({
+    character: f'\\u{ord(character):04X}'
+    for character in '<>"{}|^`\\ ' + ''.join(map(chr, range(0x20)))
+})
+
+
+def term_to_nt(term: Node) -> str:
+    """Serialize an RDFLib term in N-Triples."""
+    if isinstance(term, URIRef):
+        return f'<{term.translate(_IRI_ESCAPES)}>'
+
+    if isinstance(term, BNode):
+        return f'_:{term}'
+
+    if isinstance(term, Literal):
+        lexical = term.translate(_LITERAL_ESCAPES)
+        if term.language is not None:
+            return f'"{lexical}"@{term.language}'
+        if term.datatype is not None:
+            return f'"{lexical}"^^<{term.datatype}>'
+        return f'"{lexical}"'
+
+    raise TypeError(f'can not serialize term in N-Triples: {term!r}')
@@ -0,0 +1,270 @@
+# -*- coding: utf-8 -*-
+
+"""Measuring where the time and memory of a conversion go.
+
+An exporter given :class:`ConversionHooks` reports each aspect when it's done with it: the number of elements and
+triples, the time spent converting it, and how much the peak memory grew. It also reports the phases of the
+conversion around the aspects, like the time spent parsing the CX and serializing the RDF, and how much had to be
+held back until a later aspect arrived, like CURIEs waiting for the ``@context``. :class:`ConversionStats` collects all
+of them into a report.
+
+.. code-block:: python
+
+    from cx_rdf import cx_to_rdf_graph
+    from cx_rdf.stats import ConversionStats
+
+    stats = ConversionStats()
+    graph = cx_to_rdf_graph(cx_json, policy='aspect', hooks=stats)
+    for aspect in stats.aspects:
+        print(aspect.name, aspect.elements, aspect.triples, aspect.seconds)
+
+When the CX is read while it's converted, the time spent parsing it is left out of the time of the aspects and
+reported as the ``parse`` phase instead. Likewise, when N-Triples or N-Quads are written as the triples are made,
+writing them is part of the aspects and there is no ``serialize`` phase. The peak memory is the peak resident set
+size, so it's only known where the :mod:`resource` module is available, and it only grows when an aspect needs more
+memory than anything before it did.
+"""
+
+import json
+import sys
+import time
+from typing import Dict, Iterable, List, Optional, TextIO
+
+from .sinks import Triple, TripleSink
+from .typing import CxElementsType
+
+try:
+    import resource
+except ImportError:  # not on Windows
+    resource = None
+
+__all__ = [
+    'AspectStats',
+    'ConversionHooks',
+    'ConversionStats',
+    'get_peak_memory',
+]
+
+
+def get_peak_memory() -> Optional[int]:
+    """Get the peak resident set size of this process so far in bytes, or None if it can't be measured."""
+    if resource is None:
+        return None
+    max_rss = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    # Linux reports kibibytes, macOS reports bytes
+    return max_rss if sys.platform == 'darwin' else max_rss * 1024
+
+
+def _get_growth(before: Optional[int]) -> Optional[int]:
+    return None if before is None else get_peak_memory() - before
+
+
+class AspectStats:
+    """The measurements of converting an aspect."""
+
+    __slots__ = ('name', 'elements', 'triples', 'seconds', 'peak_memory')
+
+    def __init__(self, name: str, elements: int = 0, triples: int = 0, seconds: float = 0.0,
+                 peak_memory: Optional[int] = None):
+        """Initialize the measurements.
+
+        :param name: The name of the aspect
+        :param elements: The number of elements converted
+        :param triples: The number of triples made from them, including those declaring entities
+        :param seconds: The time spent converting them
+        :param peak_memory: How much the peak memory grew while converting them, in bytes
+        """
+        self.name = name
+        self.elements = elements
+        self.triples = triples
+        self.seconds = seconds
+        self.peak_memory = peak_memory
+
+    def to_json(self) -> Dict:
+        """Get the measurements as a dictionary."""
+        return {key: getattr(self, key) for key in self.__slots__}
+
+
+class ConversionHooks:
+    """The callbacks for measuring a conversion, which do nothing unless they're overridden."""
+
+    def on_aspect(self, stats: AspectStats) -> None:
+        """Handle the measurements of an aspect once it's converted.
+
+        An aspect split into several fragments in the CX is reported once for each of them.
+        """
+
+    def on_phase(self, name: str, seconds: float, peak_memory: Optional[int] = None) -> None:
+        """Handle the measurements of a phase of the conversion.
+
+        :param name: One of ``parse``, ``convert``, or ``serialize``
+        :param seconds: The time spent in the phase
+        :param peak_memory: How much the peak memory grew during the phase, in bytes
+        """
+
+    def on_pending(self, stats: Dict[str, int]) -> None:
+        """Handle how much was held back until a later aspect arrived, once the conversion is done.
+
+        :param stats: The numbers of items ``deferred``, ``resolved``, and ``spilled`` to disk, the ``peak`` number
+         waiting at once, and the number still ``pending``. See :class:`cx_rdf.pending.PendingBuffer`.
+        """
+
+
+class ConversionStats(ConversionHooks):
+    """Hooks that collect the measurements of a conversion into a report."""
+
+    def __init__(self):
+        """Initialize the report."""
+        self.aspects: List[AspectStats] = []
+        self.phases: Dict[str, Dict] = {}
+        self.pending: Dict[str, int] = {}
+
+    def on_aspect(self, stats: AspectStats) -> None:
+        """Collect the measurements of an aspect."""
+        self.aspects.append(stats)
+
+    def on_phase(self, name: str, seconds: float, peak_memory: Optional[int] = None) -> None:
+        """Collect the measurements of a phase, adding them up if it happens more than once."""
+        phase = self.phases.setdefault(name, {'seconds': 0.0, 'peak_memory': None})
+        phase['seconds'] += seconds
+        if peak_memory is not None:
+            phase['peak_memory'] = (phase['peak_memory'] or 0) + peak_memory
+
+    def on_pending(self, stats: Dict[str, int]) -> None:
+        """Collect how much was held back."""
+        self.pending = stats
+
+    def to_json(self) -> Dict:
+        """Get the report as a dictionary, with the totals of the aspects."""
+        return {
+            'phases': self.phases,
+            'pending': self.pending,
+            'aspects': [aspect.to_json() for aspect in self.aspects],
+            'total': {
+                'elements': sum(aspect.elements for aspect in self.aspects),
+                'triples': sum(aspect.triples for aspect in self.aspects),
+                'seconds': sum(aspect.seconds for aspect in self.aspects),
+            },
+        }
+
+    def write(self, file: TextIO) -> None:
+        """Write the report as JSON.
+
+        :param file: A file-like object opened for writing text
+        """
+        json.dump(self.to_json(), file, indent=2)
+        file.write('\n')
+
+
+class _CountingProxy(TripleSink):
+    """A sink that counts the triples passing through to another sink."""
+
+    def __init__(self, sink: TripleSink):
+        self.sink = sink
+        self.graph = sink.graph
+        self.count = 0
+
+    def add(self, triple: Triple) -> None:
+        self.count += 1
+        self.sink.add(triple)
+
+    def add_all(self, triples: Iterable[Triple]) -> None:
+        if not isinstance(triples, (list, tuple)):
+            triples = list(triples)
+        self.count += len(triples)
+        self.sink.add_all(triples)
+
+    def bind(self, prefix: str, namespace: str) -> None:
+        self.sink.bind(prefix, namespace)
+
+    def flush(self) -> None:
+        self.sink.flush()
+
+
+class AspectRecorder:
+    """Measures the aspects an exporter converts and reports them to hooks.
+
+    While recording, the exporter's sinks are replaced with ones that count the triples going through them.
+    """
+
+    def __init__(self, exporter, hooks: ConversionHooks):
+        """Initialize the recorder.
+
+        :param exporter: The exporter to measure
+        :param hooks: The hooks to report to
+        """
+        self.exporter = exporter
+        self.hooks = hooks
+        #: The time spent waiting for the elements to be read, which isn't counted towards the aspects
+        self.parse_seconds = 0.0
+        self._current: Optional[AspectStats] = None
+        self._start = self._start_parse = self._start_triples = 0
+        self._start_memory = None
+        self._start_convert = 0.0
+        self._start_convert_memory = None
+        self._sink = self._declaration_sink = None
+
+    def __enter__(self) -> 'AspectRecorder':
+        exporter = self.exporter
+        self._sink, self._declaration_sink = exporter.sink, exporter.declaration_sink
+        exporter.sink = _CountingProxy(self._sink)
+        exporter.declaration_sink = (
+            exporter.sink if self._declaration_sink is self._sink else _CountingProxy(self._declaration_sink)
+        )
+        self._start_convert = time.perf_counter()
+        self._start_convert_memory = get_peak_memory()
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb) -> None:
+        self.finish()
+        exporter = self.exporter
+        exporter.sink, exporter.declaration_sink = self._sink, self._declaration_sink
+        if exc_type is not None:
+            return
+
+        seconds = time.perf_counter() - self._start_convert
+        if self.parse_seconds:
+            self.hooks.on_phase('parse', self.parse_seconds)
+        self.hooks.on_phase('convert', seconds - self.parse_seconds, _get_growth(self._start_convert_memory))
+        self.hooks.on_pending(exporter.pending.get_stats())
+
+    def _count_triples(self) -> int:
+        exporter = self.exporter
+        count = exporter.sink.count
+        if exporter.declaration_sink is not exporter.sink:
+            count += exporter.declaration_sink.count
+        return count
+
+    def iterate(self, elements: CxElementsType) -> CxElementsType:
+        """Iterate over elements, keeping track of the time spent reading them."""
+        iterator = iter(elements)
+        while True:
+            start = time.perf_counter()
+            try:
+                element = next(iterator)
+            except StopIteration:
+                self.parse_seconds += time.perf_counter() - start
+                return
+            self.parse_seconds += time.perf_counter() - start
+            yield element
+
+    def start(self, aspect_name: str) -> AspectStats:
+        """Finish the current aspect, if any, and start measuring another."""
+        self.finish()
+        self._current = AspectStats(aspect_name)
+        self._start = time.perf_counter()
+        self._start_parse = self.parse_seconds
+        self._start_triples = self._count_triples()
+        self._start_memory = get_peak_memory()
+        return self._current
+
+    def finish(self) -> None:
+        """Report the current aspect, if any."""
+        current = self._current
+        if current is None:
+            return
+        self._current = None
+        current.seconds = time.perf_counter() - self._start - (self.parse_seconds - self._start_parse)
+        current.triples = self._count_triples() - self._start_triples
+        current.peak_memory = _get_growth(self._start_memory)
+        self.hooks.on_aspect(current)
@@ -0,0 +1,214 @@
+# -*- coding: utf-8 -*-
+
+"""An RDFLib store that keeps its triples in an SQLite database on disk.
+
+The graphs for the biggest networks don't fit in memory, so they can be built in an :class:`SQLiteStore` instead.
+Since the store is a file, the graph can be reopened and queried later without converting the network again.
+
+.. code-block:: python
+
+    from cx_rdf import cx_file_to_rdf_graph
+    from cx_rdf.store import open_graph
+
+    graph = open_graph('network.sqlite')
+    with open('network.cx') as file:
+        cx_file_to_rdf_graph(file, graph=graph)
+    graph.commit()
+    graph.close()
+
+    # later
+    graph = open_graph('network.sqlite')
+    print(len(graph))
+
+The store is tuned for how the exporters write: triples come in large batches through
+:meth:`SQLiteStore.addN`, which :class:`cx_rdf.sinks.GraphSink` uses automatically, and each batch is inserted with a
+single statement. Only the index for looking up triples by subject is kept while loading. The indexes for looking
+them up by predicate or object are built all at once when the graph is first committed, which is much faster than
+maintaining them row by row.
+"""
+
+import pathlib
+import sqlite3
+from typing import Iterable, Iterator, Optional, Tuple
+
+from rdflib import BNode, Graph, Literal, URIRef
+from rdflib.namespace import Namespace
+from rdflib.store import Store, VALID_STORE
+from rdflib.term import Node
+
+__all__ = [
+    'SQLiteStore',
+    'open_graph',
+]
+
+_SCHEMA = """
+CREATE TABLE IF NOT EXISTS triples (
+    s TEXT NOT NULL,
+    p TEXT NOT NULL,
+    o TEXT NOT NULL,
+    PRIMARY KEY (s, p, o)
+) WITHOUT ROWID;
+CREATE TABLE IF NOT EXISTS namespaces (
+    prefix TEXT PRIMARY KEY,
+    uri TEXT NOT NULL
+);
+"""
+
+_INDEXES = """
+CREATE INDEX IF NOT EXISTS triples_pos ON triples (p, o);
+CREATE INDEX IF NOT EXISTS triples_osp ON triples (o, s);
+"""
+
+_INSERT = 'INSERT OR IGNORE INTO triples (s, p, o) VALUES (?, ?, ?)'
+
+
+def _encode(term: Node) -> str:
+    """Encode an RDFLib term as text whose first character tells its type."""
+    if isinstance(term, URIRef):
+        return f'<{term}'
+    if isinstance(term, BNode):
+        return f'_{term}'
+    if isinstance(term, Literal):
+        # neither language tags nor IRIs can contain a vertical bar
+        return f'"{term.language or ""}|{term.datatype or ""}|{term}'
+    raise TypeError(f'can not store term: {term!r}')
+
+
+def _decode(text: str) -> Node:
+    """Decode a term encoded with :func:`_encode`."""
+    kind, value = text[0], text[1:]
+    if kind == '<':
+        return URIRef(value)
+    if kind == '_':
+        return BNode(value)
+    language, datatype, lexical = value.split('|', 2)
+    return Literal(lexical, lang=language or None, datatype=URIRef(datatype) if datatype else None)
+
+
+class SQLiteStore(Store):
+    """A store for a single graph in an SQLite database."""
+
+    context_aware = False
+    formula_aware = False
+    transaction_aware = True
+    graph_aware = False
+
+    def __init__(self, configuration: Optional[str] = None, identifier=None):
+        """Initialize the store, opening the database right away if a path is given.
+
+        :param configuration: The path of the database
+        """
+        self.identifier = identifier
+        self.connection: Optional[sqlite3.Connection] = None
+        super().__init__(configuration)
+
+    def open(self, configuration: str, create: bool = True) -> int:
+        """Open the database, creating it if it doesn't exist yet.
+
+        :param configuration: The path of the database
+        :param create: If false, only opens the database if it already exists
+        """
+        # quoted, so paths with characters like ? and # that mean something in a URI work too
+        uri = pathlib.Path(configuration).resolve().as_uri() + ('' if create else '?mode=rw')
+        self.connection = sqlite3.connect(uri, uri=True)
+        self.connection.executescript("""
+            PRAGMA journal_mode = WAL;
+            PRAGMA synchronous = NORMAL;
+            PRAGMA cache_size = -262144;
+            PRAGMA temp_store = MEMORY;
+        """)
+        self.connection.executescript(_SCHEMA)
+        return VALID_STORE
+
+    def close(self, commit_pending_transaction: bool = False) -> None:
+        """Close the database.
+
+        :param commit_pending_transaction: If true, commits the triples added since the last commit. Otherwise,
+         they're rolled back.
+        """
+        if self.connection is None:
+            return
+        if commit_pending_transaction:
+            self.commit()
+        self.connection.close()
+        self.connection = None
+
+    def commit(self) -> None:
+        """Commit the triples added since the last commit and make sure the database is fully indexed."""
+        self.connection.executescript(_INDEXES)
+        self.connection.commit()
+
+    def rollback(self) -> None:
+        """Roll back the triples added since the last commit."""
+        self.connection.rollback()
+
+    def add(self, triple: Tuple[Node, Node, Node], context=None, quoted: bool = False) -> None:
+        """Add a triple."""
+        self.connection.execute(_INSERT, tuple(map(_encode, triple)))
+        super().add(triple, context, quoted=quoted)
+
+    def addN(self, quads: Iterable[Tuple[Node, Node, Node, Graph]]) -> None:  # noqa: N802
+        """Add several triples with a single statement. The graphs of the quads are ignored."""
+        self.connection.executemany(_INSERT, ((_encode(s), _encode(p), _encode(o)) for s, p, o, _ in quads))
+
+    def remove(self, triple_pattern, context=None) -> None:
+        """Remove the triples matching a pattern."""
+        where, parameters = self._where(triple_pattern)
+        self.connection.execute(f'DELETE FROM triples{where}', parameters)
+        super().remove(triple_pattern, context=context)
+
+    def triples(self, triple_pattern, context=None) -> Iterator:
+        """Iterate over the triples matching a pattern."""
+        where, parameters = self._where(triple_pattern)
+        for s, p, o in self.connection.execute(f'SELECT s, p, o FROM triples{where}', parameters):
+            yield (_decode(s), _decode(p), _decode(o)), iter(())
+
+    @staticmethod
+    def _where(triple_pattern) -> Tuple[str, Tuple[str, ...]]:
+        """Build the condition for the bound terms of a pattern."""
+        columns, parameters = [], []
+        for column, term in zip('spo', triple_pattern):
+            if term is not None:
+                columns.append(f'{column} = ?')
+                parameters.append(_encode(term))
+        if not columns:
+            return '', ()
+        return ' WHERE ' + ' AND '.join(columns), tuple(parameters)
+
+    def __len__(self, context=None) -> int:
+        """Count the triples."""
+        (count,) = self.connection.execute('SELECT COUNT(*) FROM triples').fetchone()
+        return count
+
+    def bind(self, prefix: str, namespace: str) -> None:
+        """Bind a prefix to a namespace."""
+        self.connection.execute('INSERT OR REPLACE INTO namespaces (prefix, uri) VALUES (?, ?)',
+                                (prefix, str(namespace)))
+
+    def namespace(self, prefix: str) -> Optional[URIRef]:
+        """Get the namespace bound to a prefix."""
+        row = self.connection.execute('SELECT uri FROM namespaces WHERE prefix = ?', (prefix,)).fetchone()
+        return None if row is None else URIRef(row[0])
+
+    def prefix(self, namespace: str) -> Optional[str]:
+        """Get the prefix bound to a namespace."""
+        row = self.connection.execute('SELECT prefix FROM namespaces WHERE uri = ?', (str(namespace),)).fetchone()
+        return None if row is None else row[0]
+
+    def namespaces(self) -> Iterator[Tuple[str, URIRef]]:
+        """Iterate over the bound prefixes and namespaces."""
+        for prefix, uri in self.connection.execute('SELECT prefix, uri FROM namespaces').fetchall():
+            yield prefix, Namespace(uri)
+
+
+def open_graph(path: str, create: bool = True) -> Graph:
+    """Open a graph in an SQLite database on disk.
+
+    :param path: The path of the database
+    :param create: If false, only opens the database if it already exists
+    :return: A graph, which should be closed with ``graph.close(commit_pending_transaction=True)`` or committed with
+     ``graph.commit()`` after adding triples
+    """
+    graph = Graph(store=SQLiteStore())
+    graph.open(path, create=create)
+    return graph
@@ -0,0 +1,141 @@
+# -*- coding: utf-8 -*-
+
+"""Generating synthetic CX networks of any size for testing and benchmarking.
+
+The networks have every aspect the policies handle, with the number of elements in each chosen by the caller, and
+are the same every time they're generated with the same seed.
+
+.. code-block:: python
+
+    from cx_rdf import cx_to_rdf_graph
+    from cx_rdf.synthetic import generate_cx
+
+    cx_json = generate_cx(nodes=10_000, edges=30_000, node_attributes=50_000, seed=5)
+    graph = cx_to_rdf_graph(cx_json, policy='aspect')
+
+Node attributes cycle through strings, numbers, booleans, and lists. The lists are named ``alias`` and hold CURIEs
+whose prefixes are in the ``@context``, like the aliases NDEx networks have, so the predicate policy expands them.
+"""
+
+import random
+from typing import Any, Dict, List, Tuple
+
+from .typing import CxType
+
+__all__ = [
+    'generate_cx',
+]
+
+#: The prefixes in the ``@context`` of the generated networks, which the aliases use
+CONTEXT = {
+    'hgnc': 'http://identifiers.org/hgnc/',
+    'uniprot': 'http://identifiers.org/uniprot/',
+    'ncbigene': 'http://identifiers.org/ncbigene/',
+}
+
+#: The interactions of the generated edges
+INTERACTIONS = ('increases', 'decreases', 'binds', 'association', 'phosphorylates')
+
+
+def generate_cx(nodes: int = 1000, edges: int = 3000, node_attributes: int = 3000, edge_attributes: int = 1000,
+                network_attributes: int = 5, citations: int = 50, supports: int = 50, list_size: int = 3,
+                seed: int = 0) -> CxType:
+    """Generate a synthetic CX network.
+
+    :param nodes: The number of nodes
+    :param edges: The number of edges, between random nodes
+    :param node_attributes: The number of node attributes, on random nodes. Every fifth one is a list.
+    :param edge_attributes: The number of edge attributes, on random edges
+    :param network_attributes: The number of network attributes, including the name
+    :param citations: The number of citations, each of which is cited by a few random edges
+    :param supports: The number of supports, each of which supports a few random edges
+    :param list_size: The number of values in each list-typed attribute
+    :param seed: The seed for the random number generator, so the same network can be generated again
+    """
+    if nodes < 1 and (edges or node_attributes):
+        raise ValueError('edges and node attributes need at least one node')
+    if edges < 1 and (edge_attributes or citations or supports):
+        raise ValueError('edge attributes, citations, and supports need at least one edge')
+
+    rng = random.Random(seed)
+    prefixes = sorted(CONTEXT)
+
+    node_elements = [{'@id': i, 'n': f'node {i}'} for i in range(nodes)]
+    edge_elements = [
+        {'@id': i, 's': rng.randrange(nodes), 't': rng.randrange(nodes), 'i': rng.choice(INTERACTIONS)}
+        for i in range(edges)
+    ]
+
+    node_attribute_elements = []
+    for i in range(node_attributes):
+        element = {'po': rng.randrange(nodes)}
+        element.update(_generate_attribute(rng, i, prefixes, list_size))
+        node_attribute_elements.append(element)
+
+    edge_attribute_elements = [
+        {'po': rng.randrange(edges), 'n': f'edge attribute {i % 10}', 'v': f'value {rng.randrange(1000)}'}
+        for i in range(edge_attributes)
+    ]
+
+    network_attribute_elements = [{'n': 'name', 'v': f'Synthetic network {seed}'}]
+    network_attribute_elements.extend(
+        {'n': f'network attribute {i}', 'v': f'value {i}', 'd': 'string'}
+        for i in range(1, network_attributes)
+    )
+
+    citation_elements = [{'@id': i, 'dc:title': f'Citation {i}'} for i in range(citations)]
+    edge_citation_elements = [
+        {'po': _sample(rng, edges), 'citations': [i]}
+        for i in range(citations)
+    ]
+    support_elements = [{'@id': i, 'text': f'Support {i}'} for i in range(supports)]
+    edge_support_elements = [
+        {'po': _sample(rng, edges), 'supports': [i]}
+        for i in range(supports)
+    ]
+
+    aspects: List[Tuple[str, List[Dict]]] = [
+        ('@context', [dict(CONTEXT)]),
+        ('nodes', node_elements),
+        ('edges', edge_elements),
+        ('networkAttributes', network_attribute_elements),
+        ('nodeAttributes', node_attribute_elements),
+        ('edgeAttributes', edge_attribute_elements),
+        ('citations', citation_elements),
+        ('edgeCitations', edge_citation_elements),
+        ('supports', support_elements),
+        ('edgeSupports', edge_support_elements),
+    ]
+
+    metadata = []
+    for aspect_name, elements in aspects:
+        entry = {'name': aspect_name, 'elementCount': len(elements), 'version': '1.0', 'consistencyGroup': 1}
+        if elements and '@id' in elements[0]:
+            entry['idCounter'] = len(elements) - 1
+        metadata.append(entry)
+
+    return [
+        {'numberVerification': [{'longNumber': 281474976710655}]},
+        {'metaData': metadata},
+        *({aspect_name: elements} for aspect_name, elements in aspects if elements),
+    ]
+
+
+def _generate_attribute(rng: random.Random, i: int, prefixes: List[str], list_size: int) -> Dict[str, Any]:
+    """Generate the name, value, and data type of a node attribute, cycling through the data types."""
+    kind = i % 5
+    if kind == 0:
+        return {'n': 'alias', 'v': [f'{rng.choice(prefixes)}:{rng.randrange(100_000)}' for _ in range(list_size)],
+                'd': 'list_of_string'}
+    if kind == 1:
+        return {'n': 'score', 'v': round(rng.random(), 6), 'd': 'double'}
+    if kind == 2:
+        return {'n': 'degree', 'v': rng.randrange(100), 'd': 'integer'}
+    if kind == 3:
+        return {'n': 'is_drug_target', 'v': rng.random() < 0.5, 'd': 'boolean'}
+    return {'n': 'Color', 'v': rng.choice(('Red', 'Green', 'Blue'))}
+
+
+def _sample(rng: random.Random, edges: int) -> List[int]:
+    """Pick a few distinct random edges."""
+    return rng.sample(range(edges), min(edges, 3))
@@ -0,0 +1,221 @@
+# -*- coding: utf-8 -*-
+
+"""Interning of the RDF terms the exporters create over and over.
+
+Attribute names like ``Color`` or ``alias`` repeat for almost every element of an aspect, and so do many of their
+values. Building a new :class:`rdflib.Literal` for each goes through RDFLib's datatype inference every time, so the
+exporters get their literals from a :class:`TermFactory`, which keeps the most recently used ones in a bounded cache.
+
+The values of attributes come with a CX data type, like ``double`` or ``list_of_integer``, so the factory also has
+a literal factory for each of them that skips the inference altogether. It builds the XSD-typed literal right from
+the value, so a ``double`` is an ``xsd:double`` even when it's written as ``1`` in the JSON:
+
+.. code-block:: python
+
+    from cx_rdf.terms import TermFactory
+
+    terms = TermFactory()
+    double_literal = terms.get_literal_factory('list_of_double')
+    literals = [double_literal(value) for value in [1, 2.5]]
+
+Values that don't fit their data type, like ``"red"`` for a ``double``, fall back to RDFLib's inference.
+"""
+
+from functools import lru_cache
+import logging
+from typing import Any, Callable, Dict, Optional, Tuple
+
+import rdflib
+from rdflib import Literal, URIRef, XSD
+
+__all__ = [
+    'CX_DATATYPES',
+    'TermFactory',
+    'get_item_data_type',
+]
+
+log = logging.getLogger(__name__)
+
+#: The number of literals a :class:`TermFactory` keeps by default
+DEFAULT_LITERAL_CACHE_SIZE = 1 << 16
+
+#: The XSD datatypes of the CX data types that aren't strings
+CX_DATATYPES: Dict[str, URIRef] = {
+    'boolean': XSD.boolean,
+    'double': XSD.double,
+    'integer': XSD.integer,
+    'long': XSD.long,
+}
+
+#: The prefix of the CX data types of lists
+LIST_PREFIX = 'list_of_'
+
+#: The range of ``xsd:long``
+_LONG_MIN, _LONG_MAX = -(1 << 63), (1 << 63) - 1
+
+#: The lexical forms of ``xsd:double`` for the values :func:`repr` writes differently
+_SPECIAL_DOUBLES = {'nan': 'NaN', 'inf': 'INF', '-inf': '-INF'}
+
+LiteralFactory = Callable[[Any], Literal]
+
+
+def get_item_data_type(data_type: Optional[str]) -> Optional[str]:
+    """Get the data type of the values of a CX data type, which is itself unless it's a list type."""
+    if data_type is not None and data_type.startswith(LIST_PREFIX):
+        return data_type[len(LIST_PREFIX):]
+    return data_type
+
+
+def _to_double(value: Any) -> Tuple[str, float]:
+    if isinstance(value, bool):
+        raise TypeError
+    value = float(value)
+    lexical = repr(value)
+    return _SPECIAL_DOUBLES.get(lexical, lexical), value
+
+
+def _to_integer(value: Any) -> Tuple[str, int]:
+    if isinstance(value, bool):
+        raise TypeError
+    if isinstance(value, float):
+        if not value.is_integer():
+            raise ValueError
+        value = int(value)
+    elif not isinstance(value, int):
+        value = int(value)
+    return str(value), value
+
+
+def _to_long(value: Any) -> Tuple[str, int]:
+    lexical, value = _to_integer(value)
+    if not _LONG_MIN <= value <= _LONG_MAX:
+        raise ValueError
+    return lexical, value
+
+
+def _to_boolean(value: Any) -> Tuple[str, bool]:
+    if isinstance(value, str):
+        value = {'true': True, 'false': False}[value.strip().lower()]
+    elif not isinstance(value, bool):
+        raise TypeError
+    return ('true' if value else 'false'), value
+
+
+#: Get the lexical form and Python value of a value of each CX data type, raising an error if it doesn't fit
+_LEXICAL_FORMS: Dict[str, Callable[[Any], Tuple[str, Any]]] = {
+    'boolean': _to_boolean,
+    'double': _to_double,
+    'integer': _to_integer,
+    'long': _to_long,
+}
+
+
+#: Whether RDFLib's literals are made of the slots :func:`_new_literal` fills in, which is only checked for the major
+#: version it was written for, since another could give the same slots a different meaning
+_CAN_SKIP_CONSTRUCTOR = all((
+    rdflib.__version__.split('.')[0] == '5',
+    set(Literal.__slots__) == {'_language', '_datatype', '_value'},
+))
+
+
+def _new_literal(lexical: str, value: Any, datatype: URIRef) -> Literal:
+    """Make a typed literal without going through :meth:`rdflib.Literal.__new__`, which infers and checks again."""
+    if not _CAN_SKIP_CONSTRUCTOR:
+        # the lexical form is already the one to write, which RDFLib would write as inf and nan for doubles
+        return Literal(lexical, datatype=datatype, normalize=False)
+    literal = str.__new__(Literal, lexical)
+    literal._language = None
+    literal._datatype = datatype
+    literal._value = value
+    return literal
+
+
+class TermFactory:
+    """Creates RDF terms, reusing recently created literals."""
+
+    def __init__(self, maxsize: int = DEFAULT_LITERAL_CACHE_SIZE):
+        """Initialize the factory.
+
+        :param maxsize: The number of literals to keep. The least recently used ones are dropped first.
+        """
+        # typed, so equal values of different types like 1, 1.0, and True don't share a literal
+        self._literal = lru_cache(maxsize=maxsize, typed=True)(Literal)
+        self._maxsize = maxsize
+        self._literal_factories: Dict[Optional[str], LiteralFactory] = {}
+
+    def literal(self, value: Any) -> Literal:
+        """Get a literal for a value."""
+        try:
+            return self._literal(value)
+        except TypeError:  # unhashable values, like lists, can't be interned
+            return Literal(value)
+
+    def cache_info(self):
+        """Get the hits, misses, and size of the literal cache."""
+        return self._literal.cache_info()
+
+    def get_literal_factory(self, data_type: Optional[str]) -> LiteralFactory:
+        """Get a function that makes the literal for a value of a CX data type.
+
+        The function is made once for each data type and reused. For list types, it makes the literal for each of
+        the values in the list. Values given as strings get ``xsd:string`` literals, so the data type comes back when
+        converting to CX, and values without a data type, lists of strings, and unknown data types get :meth:`literal`.
+
+        :param data_type: A CX data type, like ``double`` or ``list_of_integer``, or None if it wasn't given
+        """
+        factory = self._literal_factories.get(data_type)
+        if factory is None:
+            factory = self._literal_factories[data_type] = self._make_literal_factory(data_type)
+        return factory
+
+    def _make_literal_factory(self, data_type: Optional[str]) -> LiteralFactory:
+        if data_type == 'string':
+            return self._make_string_literal_factory()
+        item_data_type = get_item_data_type(data_type)
+        # lists of strings stay plain, since a list without a data type is taken to be one when converting back
+        if item_data_type is None or item_data_type == 'string':
+            return self.literal
+
+        datatype = CX_DATATYPES.get(item_data_type)
+        if datatype is None:
+            log.debug('unknown data type: %s', data_type)
+            return self.literal
+
+        to_lexical = _LEXICAL_FORMS[item_data_type]
+        literal = self.literal
+
+        @lru_cache(maxsize=self._maxsize, typed=True)
+        def _typed_literal(value: Any) -> Literal:
+            try:
+                lexical, value = to_lexical(value)
+            except (KeyError, TypeError, ValueError):
+                log.debug('value does not fit data type %s: %r', item_data_type, value)
+                return literal(value)
+            return _new_literal(lexical, value, datatype)
+
+        def typed_literal(value: Any) -> Literal:
+            try:
+                return _typed_literal(value)
+            except TypeError:  # unhashable values, like lists, can't be interned
+                return literal(value)
+
+        return typed_literal
+
+    def _make_string_literal_factory(self) -> LiteralFactory:
+        """Make a function for values that are explicitly strings, so the data type isn't lost when converting back."""
+        literal = self.literal
+
+        @lru_cache(maxsize=self._maxsize, typed=True)
+        def _string_literal(value: Any) -> Literal:
+            if not isinstance(value, str):
+                log.debug('value does not fit data type string: %r', value)
+                return literal(value)
+            return Literal(value, datatype=XSD.string)
+
+        def string_literal(value: Any) -> Literal:
+            try:
+                return _string_literal(value)
+            except TypeError:  # unhashable values, like lists, can't be interned
+                return literal(value)
+
+        return string_literal
@@ -2,11 +2,15 @@
 
 """Type hints for CX-RDF."""
 
-from typing import Dict, List
+from typing import Dict, Iterable, List, Tuple
 
 __all__ = [
     'CxType',
+    'CxElementsType',
 ]
 
 #: The type used for CX JSON
 CxType = List[Dict[str, List[Dict]]]
+
+#: The type used for a stream of CX aspect names and their elements
+CxElementsType = Iterable[Tuple[str, Dict]]
@@ -7,11 +7,12 @@ from typing import Dict, Iterable, List, Tuple
 import rdflib
 
 from .constants import CX, VERSION
-from .typing import CxType
+from .typing import CxElementsType, CxType
 
 __all__ = [
     'get_version',
     'iterate_aspect_fragments',
+    'iterate_aspect_elements',
     'bind_cx_namespace',
 ]
 
@@ -32,6 +33,24 @@ def iterate_aspect_fragments(cx_json: CxType) -> Iterable[Tuple[str, List[Dict]]
             yield name, elements
 
 
+def iterate_aspect_elements(cx_json: CxType) -> CxElementsType:
+    """Iterate over aspect names and each of their elements.
+
+    Aspects that are given as a single object instead of a list of elements, like ``@context`` is by some writers,
+    are treated as lists containing only that object.
+
+    :param cx_json: A CX JSON object
+    :return: A generator of pairs of aspect names and elements
+    """
+    for name, elements in iterate_aspect_fragments(cx_json):
+        if isinstance(elements, dict):
+            yield name, elements
+            continue
+
+        for element in elements:
+            yield name, element
+
+
 def bind_cx_namespace(graph: rdflib.Graph):
     """Bind the CX namespace to the RDFLib graph's namespace manager."""
     graph.namespace_manager.bind('cx', CX)
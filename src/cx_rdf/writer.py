@@ -0,0 +1,154 @@
+# -*- coding: utf-8 -*-
+
+"""An incremental writer for CX documents.
+
+This is the counterpart to :mod:`cx_rdf.reader`. Rather than building the whole document as a list of aspect
+fragments and dumping it at once, elements are given to a :class:`CxWriter` one at a time, in any order of aspects,
+and written in fragments of a bounded size:
+
+.. code-block:: python
+
+    from cx_rdf.writer import CxWriter
+
+    with open('network.cx', 'w') as file, CxWriter(file) as writer:
+        writer.add('nodes', {'@id': 0, 'n': 'A'})
+        writer.add('edges', {'@id': 0, 's': 0, 't': 0})
+        writer.add('nodes', {'@id': 1, 'n': 'B'})
+
+The ``numberVerification`` aspect is written first, and the ``metaData`` aspect last, since only then are the number
+of elements and the largest identifier of each aspect known. Elements given for the ``metaData`` aspect aren't
+written as they are. Their fields, like the ``version``, are used for the metadata of their aspect instead.
+"""
+
+import json
+from typing import Dict, List, Optional, TextIO
+
+from .typing import CxElementsType
+
+__all__ = [
+    'CxWriter',
+]
+
+#: The number of elements of an aspect a :class:`CxWriter` collects by default before writing them as a fragment
+DEFAULT_FRAGMENT_SIZE = 10_000
+
+#: The number NDEx uses to check that integers survived being read, which is the largest one JSON parsers have to keep
+LONG_NUMBER = 281474976710655
+
+#: The fields of the metadata of an aspect that are counted while writing it
+_COUNTED_FIELDS = {'name', 'elementCount', 'idCounter'}
+
+
+class CxWriter:
+    """Writes a CX document one element at a time, collecting each aspect's elements into fragments."""
+
+    def __init__(self, file: TextIO, fragment_size: int = DEFAULT_FRAGMENT_SIZE, indent: Optional[int] = None):
+        """Initialize the writer and start the document.
+
+        :param file: A file-like object opened for writing text
+        :param fragment_size: The number of elements of an aspect to collect before writing them. The memory the
+         writer needs is bounded by this for each aspect.
+        :param indent: If given, pretty prints the document with this many spaces per level, like :func:`json.dump`
+        """
+        self.file = file
+        self.fragment_size = fragment_size
+        self.indent = indent
+        #: The elements of each aspect that haven't been written yet
+        self.buffers: Dict[str, List[Dict]] = {}
+        #: The number of elements of each aspect, in the order the aspects were first given
+        self.counts: Dict[str, int] = {}
+        #: The largest identifier of each aspect whose elements have them
+        self.id_counters: Dict[str, int] = {}
+        #: The fields given for the metadata of each aspect, like its version
+        self.metadata: Dict[str, Dict] = {}
+        self.closed = False
+
+        self.file.write('[')
+        self._write_fragment('numberVerification', [{'longNumber': LONG_NUMBER}])
+
+    def __enter__(self) -> 'CxWriter':
+        """Use the writer in a with statement, which closes it at the end."""
+        return self
+
+    def __exit__(self, exc_type, exc_val, exc_tb):
+        """Write the rest of the elements and the metadata, and end the document."""
+        self.close()
+
+    def _write_fragment(self, aspect_name: str, elements: List[Dict]) -> None:
+        """Write an aspect fragment, after a separator unless it's the first one."""
+        first = aspect_name == 'numberVerification'
+        if self.indent is None:
+            prefix = '' if first else ', '
+            self.file.write(f'{prefix}{{{json.dumps(aspect_name)}: [{", ".join(map(json.dumps, elements))}]}}')
+            return
+
+        # the fragments are items of the document's list, so they're indented by one more level
+        padding = '\n' + ' ' * self.indent
+        fragment = json.dumps({aspect_name: elements}, indent=self.indent).replace('\n', padding)
+        self.file.write(f'{"" if first else ","}{padding}{fragment}')
+
+    def add(self, aspect_name: str, element: Dict) -> None:
+        """Add an element, writing it along with the rest of its aspect's fragment once that's full.
+
+        :param aspect_name: The name of the aspect
+        :param element: An element from the aspect
+        """
+        if aspect_name == 'metaData':
+            self.metadata.setdefault(element['name'], {}).update(element)
+            return
+        if aspect_name == 'numberVerification':  # it's already been written
+            return
+
+        buffer = self.buffers.get(aspect_name)
+        if buffer is None:
+            buffer = self.buffers[aspect_name] = []
+            self.counts[aspect_name] = 0
+        buffer.append(element)
+        self.counts[aspect_name] += 1
+
+        identifier = element.get('@id')
+        if isinstance(identifier, int) and identifier > self.id_counters.get(aspect_name, -1):
+            self.id_counters[aspect_name] = identifier
+
+        if len(buffer) >= self.fragment_size:
+            self._write_fragment(aspect_name, buffer)
+            buffer.clear()
+
+    def add_all(self, elements: CxElementsType) -> None:
+        """Add several elements.
+
+        :param elements: An iterable of pairs of aspect names and elements
+        """
+        for aspect_name, element in elements:
+            self.add(aspect_name, element)
+
+    def get_metadata(self) -> List[Dict]:
+        """Get the metadata of the aspects that have been written, with the number of elements each has."""
+        metadata = []
+        for aspect_name, count in self.counts.items():
+            element = {'name': aspect_name, 'elementCount': count, 'version': '1.0', 'consistencyGroup': 1}
+            # the counts given with the metadata might be out of date, so they're replaced by the actual ones
+            element.update(
+                (field, value)
+                for field, value in self.metadata.get(aspect_name, {}).items()
+                if field not in _COUNTED_FIELDS
+            )
+            id_counter = self.id_counters.get(aspect_name)
+            if id_counter is not None:
+                element['idCounter'] = id_counter
+            metadata.append(element)
+        return metadata
+
+    def close(self) -> None:
+        """Write the rest of the elements and the metadata, and end the document."""
+        if self.closed:
+            return
+
+        for aspect_name, buffer in self.buffers.items():
+            if buffer:
+                self._write_fragment(aspect_name, buffer)
+        self.buffers.clear()
+
+        self._write_fragment('metaData', self.get_metadata())
+        self.file.write(']\n' if self.indent is None else '\n]\n')
+        self.closed = True
@@ -0,0 +1,53 @@
+# -*- coding: utf-8 -*-
+
+"""Constants for testing CX-RDF."""
+
+__all__ = [
+    'EXAMPLE_CX',
+]
+
+#: A small CX document with at least one element from each aspect handled by the policies
+EXAMPLE_CX = [
+    {'numberVerification': [{'longNumber': 281474976710655}]},
+    {'metaData': [
+        {'name': '@context', 'elementCount': 1, 'version': '1.0', 'consistencyGroup': 1},
+        {'name': 'nodes', 'elementCount': 5, 'version': '1.0', 'consistencyGroup': 1, 'idCounter': 4},
+        {'name': 'edges', 'elementCount': 2, 'version': '1.0', 'consistencyGroup': 1, 'idCounter': 1},
+        {'name': 'networkAttributes', 'elementCount': 1, 'version': '1.0', 'consistencyGroup': 1},
+        {'name': 'nodeAttributes', 'elementCount': 10, 'version': '1.0', 'consistencyGroup': 1},
+        {'name': 'edgeAttributes', 'elementCount': 2, 'version': '1.0', 'consistencyGroup': 1},
+    ]},
+    {'@context': [{'example': 'http://example.com/#', 'test': 'http://test.com/#'}]},
+    {'nodes': [
+        {'@id': 0, 'n': 'A'},
+        {'@id': 1, 'n': 'B'},
+        {'@id': 2, 'n': 'C'},
+        {'@id': 3, 'n': 'D'},
+        {'@id': 4, 'n': 'E'},
+    ]},
+    {'edges': [
+        {'@id': 0, 's': 0, 't': 1},
+        {'@id': 1, 's': 1, 't': 2, 'i': 'increases'},
+    ]},
+    {'networkAttributes': [{'n': 'name', 'd': 'string', 'v': 'Test Name'}]},
+    {'nodeAttributes': [
+        {'po': 0, 'n': 'Color', 'v': 'Red'},
+        {'po': 0, 'n': 'alias', 'v': ['test:A', 'example:001'], 'd': 'list_of_string'},
+        {'po': 1, 'n': 'Color', 'v': 'Red'},
+        {'po': 1, 'n': 'alias', 'v': ['test:B', 'example:002'], 'd': 'list_of_string'},
+        {'po': 2, 'n': 'Color', 'v': 'Red'},
+        {'po': 2, 'n': 'alias', 'v': ['test:C', 'example:003'], 'd': 'list_of_string'},
+        {'po': 3, 'n': 'Color', 'v': 'Blue'},
+        {'po': 3, 'n': 'alias', 'v': ['test:D', 'example:004'], 'd': 'list_of_string'},
+        {'po': 4, 'n': 'Color', 'v': 'Blue'},
+        {'po': 4, 'n': 'alias', 'v': ['test:E', 'example:005'], 'd': 'list_of_string'},
+    ]},
+    {'edgeAttributes': [
+        {'po': 0, 'n': 'Color', 'v': 'Green'},
+        {'po': 1, 'n': 'Color', 'v': 'Purple'},
+    ]},
+    {'citations': [{'@id': 0, 'dc:title': 'Hi'}]},
+    {'edgeCitations': [{'po': [0], 'citations': [0]}]},
+    {'supports': [{'@id': 0, 'text': 'Hi'}]},
+    {'edgeSupports': [{'po': [0], 'supports': [0]}]},
+]
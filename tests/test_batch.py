@@ -0,0 +1,122 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for converting many CX files at once."""
+
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from cx_rdf import cx_to_rdf_graph
+from cx_rdf.batch import convert_batch, get_batch_paths, MANIFEST_NAME
+from cx_rdf.io import cx_file_to_rdf_file
+from rdflib import Graph
+from tests.constants import EXAMPLE_CX
+from tests.test_reader import _anonymize
+
+
+class TestBatch(unittest.TestCase):
+    """Tests for converting many CX files at once."""
+
+    def setUp(self):
+        """Write a directory with two good CX files, a broken one, and a file that isn't CX."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.source = os.path.join(self.directory.name, 'cx')
+        self.output = os.path.join(self.directory.name, 'rdf')
+        os.makedirs(self.source)
+
+        for name in ('first.cx', 'second.json'):
+            with open(os.path.join(self.source, name), 'w') as file:
+                json.dump(EXAMPLE_CX, file)
+        with open(os.path.join(self.source, 'broken.cx'), 'w') as file:
+            file.write('[{"nodes": [')
+        with open(os.path.join(self.source, 'README.txt'), 'w') as file:
+            file.write('not CX')
+
+    def tearDown(self):
+        """Remove the directory."""
+        self.directory.cleanup()
+
+    def _convert(self, policy='aspect', **kwargs):
+        return {
+            os.path.basename(result.path): result
+            for result in convert_batch(self.source, self.output, policy=policy, rdf_format='nt', workers=2, **kwargs)
+        }
+
+    def test_paths(self):
+        """Test finding the CX files in a directory or with a glob pattern."""
+        self.assertEqual(['broken.cx', 'first.cx', 'second.json'],
+                         [os.path.basename(path) for path in get_batch_paths(self.source)])
+        self.assertEqual(['broken.cx', 'first.cx'],
+                         [os.path.basename(path) for path in get_batch_paths(os.path.join(self.source, '*.cx'))])
+
+    def test_convert(self):
+        """Test that failures are reported without stopping the batch and that up to date outputs are skipped."""
+        results = self._convert()
+        self.assertEqual({'broken.cx': 'failed', 'first.cx': 'converted', 'second.json': 'converted'},
+                         {name: result.status for name, result in results.items()})
+        self.assertIn('CxSyntaxError', results['broken.cx'].error)
+        self.assertEqual([MANIFEST_NAME, 'first.nt', 'second.nt'], sorted(os.listdir(self.output)))
+
+        graph = Graph().parse(results['first.cx'].destination, format='nt')
+        self.assertEqual(_anonymize(cx_to_rdf_graph(EXAMPLE_CX, policy='aspect')), _anonymize(graph))
+
+        results = self._convert()
+        self.assertEqual({'broken.cx': 'failed', 'first.cx': 'skipped', 'second.json': 'skipped'},
+                         {name: result.status for name, result in results.items()})
+
+        results = self._convert(force=True)
+        self.assertEqual('converted', results['first.cx'].status)
+
+    def test_settings(self):
+        """Test that outputs converted with other settings or by another version aren't skipped."""
+        self._convert()
+        for kwargs in ({'policy': 'predicate'}, {'base_iri': 'http://example.com/'}):
+            with self.subTest(**kwargs):
+                results = self._convert(**kwargs)
+                self.assertEqual('converted', results['first.cx'].status)
+                self.assertEqual('skipped', self._convert(**kwargs)['first.cx'].status)
+
+        with mock.patch('cx_rdf.batch.get_version', return_value='0.0.0'):
+            self.assertEqual('converted', self._convert(base_iri='http://example.com/')['first.cx'].status)
+
+    def test_same_destination(self):
+        """Test that files that would be written to the same RDF file fail instead of overwriting each other."""
+        os.makedirs(os.path.join(self.source, 'other'))
+        for name in ('first.json', os.path.join('other', 'first.cx')):
+            with open(os.path.join(self.source, name), 'w') as file:
+                json.dump(EXAMPLE_CX, file)
+
+        pattern = os.path.join(self.source, '**', '*.*')
+        results = {
+            os.path.relpath(result.path, self.source): result
+            for result in convert_batch(pattern, self.output, rdf_format='nt', workers=2)
+        }
+        self.assertEqual(
+            {'broken.cx': 'failed', 'first.cx': 'failed', 'first.json': 'failed', os.path.join('other', 'first.cx'):
+             'failed', 'second.json': 'converted', 'README.txt': 'failed'},
+            {name: result.status for name, result in results.items()},
+        )
+        self.assertIn('first.json', results['first.cx'].error)
+        self.assertIn(os.path.join('other', 'first.cx'), results['first.cx'].error)
+        self.assertEqual([MANIFEST_NAME, 'second.nt'], sorted(os.listdir(self.output)))
+
+    def test_worker_dies(self):
+        """Test that a worker process dying is reported as a failure rather than stopping the batch."""
+        def _convert(file, *args, **kwargs):
+            if file.name.endswith('second.json'):
+                os._exit(1)
+            cx_file_to_rdf_file(file, *args, **kwargs)
+
+        # the workers are forked, so they see the patch too
+        with mock.patch('cx_rdf.batch.cx_file_to_rdf_file', _convert):
+            # with one worker, the files before it are finished by the time it dies
+            results = {
+                os.path.basename(result.path): result
+                for result in convert_batch(self.source, self.output, rdf_format='nt', workers=1)
+            }
+
+        self.assertEqual({'broken.cx': 'failed', 'first.cx': 'converted', 'second.json': 'failed'},
+                         {name: result.status for name, result in results.items()})
+        self.assertIn('BrokenProcessPool', results['second.json'].error)
@@ -0,0 +1,100 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for caching conversions on disk."""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from cx_rdf import cx_to_rdf_graph
+from cx_rdf.cache import ConversionCache, hash_cx, hash_file
+from cx_rdf.io import cx_file_to_rdf_file
+from tests.constants import EXAMPLE_CX
+from tests.test_reader import _anonymize
+
+BASE_IRI = 'http://example.com/network/'
+
+
+class _Unseekable(io.StringIO):
+    """A file that can only be read front to back, like STDIN."""
+
+    def seekable(self):
+        """Refuse to seek."""
+        return False
+
+
+class TestCache(unittest.TestCase):
+    """Tests for caching conversions on disk."""
+
+    def setUp(self):
+        """Make a cache in a temporary directory."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.cache = ConversionCache(self.directory.name)
+        self.text = json.dumps(EXAMPLE_CX)
+
+    def tearDown(self):
+        """Remove the directory."""
+        self.directory.cleanup()
+
+    def _convert_file(self, file, **kwargs):
+        destination = io.StringIO()
+        cx_file_to_rdf_file(file, destination, cache=self.cache, **kwargs)
+        return destination.getvalue()
+
+    def test_hash(self):
+        """Test that unseekable files are copied while they're hashed."""
+        digest, file = hash_file(io.StringIO(self.text))
+        unseekable_digest, copy = hash_file(_Unseekable(self.text))
+        self.assertEqual(digest, unseekable_digest)
+        self.assertEqual(self.text, copy.read())
+        self.assertEqual(digest, hash_file(io.BytesIO(self.text.encode('utf-8')))[0])
+        self.assertEqual(hash_cx(EXAMPLE_CX), hash_cx(json.loads(self.text)))
+
+    def test_key(self):
+        """Test that the defaults have the same keys as the policy and format they stand for."""
+        self.assertEqual(self.cache.get_key('x'), self.cache.get_key('x', policy='predicate', rdf_format='xml'))
+        self.assertNotEqual(self.cache.get_key('x'), self.cache.get_key('x', policy='aspect'))
+        self.assertNotEqual(self.cache.get_key('x'), self.cache.get_key('x', rdf_format='nt'))
+
+    def test_file(self):
+        """Test that a file converted the same way twice is only converted once."""
+        expected = self._convert_file(io.StringIO(self.text), policy='aspect', rdf_format='nt', base_iri=BASE_IRI)
+        self.assertEqual(1, len(os.listdir(self.directory.name)))
+
+        with mock.patch('cx_rdf.io.cx_file_to_rdf_graph') as convert:
+            cached = self._convert_file(_Unseekable(self.text), policy='aspect', rdf_format='nt', base_iri=BASE_IRI)
+        convert.assert_not_called()
+        self.assertEqual(expected, cached)
+
+        # anything that changes the output gets its own entry
+        self._convert_file(io.StringIO(self.text), policy='predicate', rdf_format='nt', base_iri=BASE_IRI)
+        self._convert_file(io.StringIO(self.text), policy='aspect', rdf_format='turtle', base_iri=BASE_IRI)
+        self._convert_file(io.StringIO(self.text.replace('Test Name', 'Other Name')), policy='aspect',
+                           rdf_format='nt', base_iri=BASE_IRI)
+        self.assertEqual(4, len(os.listdir(self.directory.name)))
+
+    def test_graph(self):
+        """Test that a graph converted the same way twice is loaded from the cache the second time."""
+        expected = cx_to_rdf_graph(EXAMPLE_CX, policy='predicate', cache=self.cache)
+        with mock.patch('cx_rdf.io.cx_elements_to_rdf_graph') as convert:
+            cached = cx_to_rdf_graph(EXAMPLE_CX, policy='predicate', cache=self.cache)
+        convert.assert_not_called()
+        self.assertEqual(_anonymize(expected), _anonymize(cached))
+        self.assertEqual(set(expected), set(cached))
+
+    def test_evict(self):
+        """Test that the least recently used entries are removed first when the cache gets too big."""
+        self.cache.max_size = 1
+
+        keys = []
+        for i in range(3):
+            key = self.cache.get_key(str(i))
+            self.cache.write(key, io.StringIO(), lambda entry: entry.write('x'))
+            keys.append(key)
+            os.utime(self.cache.get(key), (i, i))
+
+        self.assertEqual([keys[2]], os.listdir(self.directory.name))
+        self.assertIsNone(self.cache.get(keys[0]))
@@ -0,0 +1,64 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the command line interface."""
+
+import json
+import os
+import subprocess
+import sys
+import tempfile
+import unittest
+
+from cx_rdf.io import get_exporter
+from cx_rdf.reader import iterate_cx_elements
+from cx_rdf.sinks import NTriplesSink
+from tests.constants import EXAMPLE_CX
+
+#: The dependencies that take much longer to import than a small network takes to convert
+SLOW_DEPENDENCIES = ('ndex2', 'owlready2', 'pandas', 'networkx')
+
+#: The modules that only some options of the commands need
+OPTIONAL_MODULES = ('cx_rdf.parallel', 'cx_rdf.store', 'cx_rdf.edge_table', 'multiprocessing', 'concurrent.futures',
+                    'sqlite3')
+
+
+def _get_imported(code: str, modules=SLOW_DEPENDENCIES) -> list:
+    """Run code in a new interpreter and get which of the modules, by default the slow dependencies, it imported."""
+    code += f'\nimport json, sys\nprint(json.dumps(sorted(set({modules!r}) & set(sys.modules))))'
+    result = subprocess.run([sys.executable, '-c', code], check=True, stdout=subprocess.PIPE,
+                            universal_newlines=True)
+    return json.loads(result.stdout.strip().splitlines()[-1])
+
+
+class TestStartup(unittest.TestCase):
+    """Tests that the commands only import what they need."""
+
+    def test_import(self):
+        """Test that loading the commands doesn't import the slow dependencies."""
+        self.assertEqual([], _get_imported('import cx_rdf.cli'))
+        self.assertEqual([], _get_imported('import cx_rdf.cli', OPTIONAL_MODULES))
+
+    def test_convert(self):
+        """Test that converting CX doesn't import the slow dependencies."""
+        with tempfile.TemporaryDirectory() as directory:
+            path = os.path.join(directory, 'example.cx')
+            with open(path, 'w') as file:
+                json.dump(EXAMPLE_CX, file)
+
+            arguments = ['-i', path, '-f', 'nt', '-p', 'predicate', '-o', os.devnull]
+            code = f'from cx_rdf.cli import cx_to_rdf\ncx_to_rdf({arguments!r}, standalone_mode=False)'
+            self.assertEqual([], _get_imported(code))
+
+    def test_rdf_to_cx(self):
+        """Test that converting RDF back to CX doesn't import the slow dependencies, and gives the same network."""
+        with tempfile.TemporaryDirectory() as directory:
+            path, output = os.path.join(directory, 'example.nt'), os.path.join(directory, 'example.cx')
+            with open(path, 'w') as file:
+                get_exporter(policy='predicate', sink=NTriplesSink(file)).export(EXAMPLE_CX)
+
+            code = f'from cx_rdf.cli import rdf_to_cx\nrdf_to_cx({["-i", path, "-o", output]!r}, standalone_mode=False)'
+            self.assertEqual([], _get_imported(code))
+
+            with open(output) as file:
+                nodes = [element for aspect_name, element in iterate_cx_elements(file) if aspect_name == 'nodes']
+        self.assertEqual(5, len(nodes))
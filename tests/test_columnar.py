@@ -0,0 +1,75 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for exporting CX a column at a time."""
+
+from array import array
+import io
+import json
+import unittest
+
+from cx_rdf import cx_to_rdf_graph
+from cx_rdf.columnar import ColumnarCx, EdgeColumns, NodeColumns
+from cx_rdf.io import ALLOWED_POLICIES, cx_columns_to_rdf_graph, cx_file_to_rdf_file
+from rdflib import Graph
+from tests.constants import EXAMPLE_CX
+from tests.test_reader import _anonymize
+
+
+class TestColumnar(unittest.TestCase):
+    """Tests for exporting CX a column at a time."""
+
+    def test_columns(self):
+        """Test splitting aspects into columns and rebuilding their elements."""
+        columnar = ColumnarCx.from_cx([
+            {'nodes': [{'@id': 0, 'n': 'A'}, {'@id': 1}]},
+            {'networkAttributes': [{'n': 'name', 'v': 'test'}]},
+            {'nodes': [{'@id': 2, 'r': 'HGNC:1'}]},
+            {'edges': [{'@id': 0, 's': 0, 't': 1, 'i': 'binds'}]},
+        ])
+        self.assertEqual(['nodes', 'networkAttributes', 'edges'], [name for name, _ in columnar.aspects])
+
+        nodes = columnar.get('nodes')
+        self.assertIsInstance(nodes, NodeColumns)
+        self.assertEqual(3, len(nodes))
+        self.assertEqual(array('q', [0, 1, 2]), nodes.ids)
+        self.assertEqual(['A', None, None], nodes.names)
+        self.assertEqual({2: {'r': 'HGNC:1'}}, nodes.extras)
+        self.assertIsInstance(columnar.get('edges'), EdgeColumns)
+
+        self.assertEqual(
+            [
+                ('nodes', {'@id': 0, 'n': 'A'}),
+                ('nodes', {'@id': 1}),
+                ('nodes', {'@id': 2, 'r': 'HGNC:1'}),
+                ('networkAttributes', {'n': 'name', 'v': 'test'}),
+                ('edges', {'@id': 0, 's': 0, 't': 1, 'i': 'binds'}),
+            ],
+            list(columnar.iter_elements()),
+        )
+
+        with self.assertRaises(KeyError):
+            ColumnarCx.from_cx([{'edges': [{'@id': 0, 's': 0}]}])
+
+    def test_export(self):
+        """Test that exporting columns gives the same triples as exporting elements."""
+        columnar = ColumnarCx.from_cx(EXAMPLE_CX)
+        for policy in ALLOWED_POLICIES:
+            with self.subTest(policy=policy):
+                self.assertEqual(
+                    _anonymize(cx_to_rdf_graph(EXAMPLE_CX, policy=policy)),
+                    _anonymize(cx_columns_to_rdf_graph(columnar, policy=policy)),
+                )
+
+                base_iri = 'http://example.com/network/'
+                self.assertEqual(
+                    set(cx_to_rdf_graph(EXAMPLE_CX, policy=policy, base_iri=base_iri)),
+                    set(cx_columns_to_rdf_graph(columnar, policy=policy, base_iri=base_iri)),
+                )
+
+    def test_file_to_file(self):
+        """Test converting a file to a file a column at a time."""
+        destination = io.StringIO()
+        cx_file_to_rdf_file(io.StringIO(json.dumps(EXAMPLE_CX)), destination, policy='aspect', rdf_format='nt',
+                            columnar=True)
+        graph = Graph().parse(data=destination.getvalue(), format='nt')
+        self.assertEqual(_anonymize(cx_to_rdf_graph(EXAMPLE_CX, policy='aspect')), _anonymize(graph))
@@ -0,0 +1,70 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the compact abstract policy."""
+
+import json
+import unittest
+
+from cx_rdf import cx_to_rdf_graph
+from cx_rdf.constants import CX, RDF_JSON, RDF_PROPERTY, RDF_TYPE, RDFS_LABEL
+from cx_rdf.sinks import CountingSink
+from cx_rdf.synthetic import generate_cx
+from cx_rdf.utils import iterate_aspect_elements
+from rdflib import Literal
+from tests.constants import EXAMPLE_CX
+
+BASE_IRI = 'http://example.com/network/'
+
+
+def _rebuild_aspects(graph):
+    """Rebuild the elements of each aspect from a graph made with the compact policy and a base IRI."""
+    keys = {
+        predicate: str(graph.value(predicate, CX.has_key))
+        for predicate in graph.subjects(RDF_TYPE, RDF_PROPERTY)
+    }
+    aspects = {}
+    for aspect in set(graph.subjects(CX.has_element, None)):
+        aspect_name = str(graph.value(aspect, RDFS_LABEL))
+        # the elements are numbered in order within each aspect
+        elements = sorted(graph.objects(aspect, CX.has_element), key=lambda node: int(node.rsplit('_', 1)[1]))
+        aspects[aspect_name] = [
+            {
+                keys[predicate]: json.loads(value) if value.datatype == RDF_JSON else value.toPython()
+                for predicate, value in graph.predicate_objects(element)
+                if predicate in keys
+            }
+            for element in elements
+        ]
+    return aspects
+
+
+class TestCompact(unittest.TestCase):
+    """Tests for the compact abstract policy."""
+
+    def test_lossless(self):
+        """Test that the elements of every aspect can be rebuilt exactly."""
+        expected = {}
+        for aspect_name, element in iterate_aspect_elements(EXAMPLE_CX):
+            expected.setdefault(aspect_name, []).append(element)
+
+        graph = cx_to_rdf_graph(EXAMPLE_CX, policy='compact', base_iri=BASE_IRI)
+        self.assertEqual(expected, _rebuild_aspects(graph))
+
+    def test_declarations(self):
+        """Test that the keys of the predicates and the predicates of the aspects are given by different predicates."""
+        graph = cx_to_rdf_graph(EXAMPLE_CX, policy='compact', base_iri=BASE_IRI)
+        self.assertTrue(all(isinstance(key, Literal) for key in graph.objects(None, CX.has_key)))
+
+        predicates = set(graph.subjects(RDF_TYPE, RDF_PROPERTY))
+        self.assertEqual(predicates, set(graph.objects(None, CX.aspect_has_key)))
+        aspect_names = {str(graph.value(aspect, RDFS_LABEL)) for aspect in graph.subjects(CX.aspect_has_key, None)}
+        self.assertEqual({aspect_name for aspect_name, _ in iterate_aspect_elements(EXAMPLE_CX)}, aspect_names)
+
+    def test_fewer_triples(self):
+        """Test that the compact policy makes at least three times fewer triples than the abstract policy."""
+        cx_json = generate_cx(nodes=100, edges=300, node_attributes=300, edge_attributes=100)
+        counts = {}
+        for policy in ('abstract', 'compact'):
+            sink = counts[policy] = CountingSink()
+            cx_to_rdf_graph(cx_json, policy=policy, sink=sink)
+        self.assertLessEqual(3 * counts['compact'].count, counts['abstract'].count)
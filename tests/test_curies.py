@@ -0,0 +1,132 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for expanding CURIEs with the prefixes from the ``@context``."""
+
+import unittest
+
+from cx_rdf import cx_to_rdf_graph
+from cx_rdf.columnar import ColumnarCx
+from cx_rdf.constants import CX
+from cx_rdf.curies import CurieIndex
+from cx_rdf.io import cx_columns_to_rdf_graph, get_exporter
+from rdflib import URIRef
+from tests.constants import EXAMPLE_CX
+
+HGNC = 'http://identifiers.org/hgnc/'
+
+
+def _move_context_to_end(cx_json):
+    """Move the ``@context`` aspect after all of the others."""
+    context = [fragment for fragment in cx_json if '@context' in fragment]
+    return [fragment for fragment in cx_json if '@context' not in fragment] + context
+
+
+def _get_aliases(graph):
+    return set(graph.subject_objects(CX.node_has_alias))
+
+
+class TestCurieIndex(unittest.TestCase):
+    """Tests for the index of prefixes."""
+
+    def test_expand(self):
+        """Test expanding CURIEs, and skipping what isn't one."""
+        curies = CurieIndex(maxsize=2)
+        curies.add_prefixes({'hgnc': HGNC})
+        self.assertEqual(URIRef(HGNC + '1100'), curies.expand('hgnc:1100'))
+        self.assertEqual(URIRef(HGNC + '1100'), curies.expand(' hgnc : 1100 '))
+        self.assertIs(curies.expand('hgnc:5'), curies.expand('hgnc:5'))
+
+        for value in ('hgnc', 'hgnc:', 'uniprot:P12345', 'http://example.com', ''):
+            with self.subTest(value=value):
+                self.assertIsNone(curies.expand(value))
+
+        # the cache forgets the CURIEs that couldn't be expanded once their prefix arrives
+        curies.add_prefixes({'uniprot': 'http://identifiers.org/uniprot/'})
+        self.assertEqual(URIRef('http://identifiers.org/uniprot/P12345'), curies.expand('uniprot:P12345'))
+
+    def test_deferred(self):
+        """Test that CURIEs wait for their prefixes until the context arrives, and not after."""
+        curies = CurieIndex()
+        subject = URIRef('http://example.com/node_0')
+        self.assertEqual([], curies.get_triples(subject, CX.node_has_alias, ['hgnc:1100', '12:30', 'ncbigene:5']))
+
+        self.assertEqual(
+            [(subject, CX.node_has_alias, URIRef(HGNC + '1100'))],
+            curies.add_prefixes({'hgnc': HGNC}),
+        )
+        self.assertEqual([], curies.get_triples(subject, CX.node_has_alias, ['uniprot:P12345']))
+        self.assertEqual([], curies.add_prefixes({'uniprot': 'http://identifiers.org/uniprot/'}))
+
+        # the CURIEs from before the context that are still waiting can be handed over
+        other = CurieIndex()
+        other.add_prefixes({'ncbigene': 'http://identifiers.org/ncbigene/'})
+        self.assertEqual(
+            [(subject, CX.node_has_alias, URIRef('http://identifiers.org/ncbigene/5'))],
+            other.extend_deferred(curies.pop_deferred()),
+        )
+        self.assertEqual([], curies.pop_deferred())
+
+    def test_no_context(self):
+        """Test that nothing waits once the metadata is seen without a context, and everything does with one."""
+        subject = URIRef('http://example.com/node_0')
+        for aspect_names, waits in ((['nodes', 'nodeAttributes'], False), (['nodes', '@context'], True), ([], True)):
+            with self.subTest(aspect_names=aspect_names):
+                curies = CurieIndex()
+                for aspect_name in aspect_names:
+                    curies.add_metadata(aspect_name)
+                self.assertEqual(waits, curies.waits_for_context)
+                self.assertEqual([], curies.get_triples(subject, CX.node_has_alias, ['hgnc:1100']))
+                self.assertEqual(int(waits), len(curies.pending))
+
+
+class TestPredicatePolicy(unittest.TestCase):
+    """Tests for expanding CURIEs in the predicate policy."""
+
+    def test_late_context(self):
+        """Test that the aliases are the same when the context comes after the node attributes."""
+        expected = _get_aliases(cx_to_rdf_graph(EXAMPLE_CX, policy='predicate', base_iri='http://example.com/'))
+        self.assertEqual(10, len(expected))
+
+        cx_json = _move_context_to_end(EXAMPLE_CX)
+        graph = cx_to_rdf_graph(cx_json, policy='predicate', base_iri='http://example.com/')
+        self.assertEqual(expected, _get_aliases(graph))
+
+        graph = cx_columns_to_rdf_graph(ColumnarCx.from_cx(cx_json), policy='predicate',
+                                        base_iri='http://example.com/')
+        self.assertEqual(expected, _get_aliases(graph))
+
+    def test_other_attributes(self):
+        """Test that CURIEs in attributes other than aliases are expanded too."""
+        cx_json = [
+            {'nodes': [{'@id': 0, 'n': 'A'}]},
+            {'edges': [{'@id': 0, 's': 0, 't': 0}]},
+            {'nodeAttributes': [
+                {'po': 0, 'n': 'represents', 'v': 'hgnc:1100'},
+                {'po': 0, 'n': 'members', 'v': ['hgnc:5', 'A', 1.5], 'd': 'list_of_string'},
+                {'po': 0, 'n': 'time', 'v': '12:30'},
+            ]},
+            {'edgeAttributes': [{'po': 0, 'n': 'evidence', 'v': 'hgnc:7'}]},
+            {'@context': [{'hgnc': HGNC}]},
+        ]
+        for columnar in (False, True):
+            with self.subTest(columnar=columnar):
+                if columnar:
+                    graph = cx_columns_to_rdf_graph(ColumnarCx.from_cx(cx_json), policy='predicate')
+                else:
+                    graph = cx_to_rdf_graph(cx_json, policy='predicate')
+                self.assertEqual(
+                    {URIRef(HGNC + identifier) for identifier in ('1100', '5', '7')},
+                    set(graph.objects(None, CX.attribute_has_uri)),
+                )
+
+    def test_no_context(self):
+        """Test that the CURIEs of a network without a context aren't held back."""
+        cx_json = [
+            {'metaData': [{'name': 'nodes'}, {'name': 'nodeAttributes'}]},
+            {'nodes': [{'@id': 0, 'n': 'A'}]},
+            {'nodeAttributes': [{'po': 0, 'n': 'alias', 'v': ['hgnc:1100', 'word:value'], 'd': 'list_of_string'}]},
+        ]
+        exporter = get_exporter(policy='predicate')
+        graph = exporter.export(cx_json)
+        self.assertEqual(0, len(exporter.pending))
+        self.assertEqual(set(), _get_aliases(graph))
@@ -0,0 +1,110 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for converting only what changed between two versions of a network."""
+
+import copy
+import io
+import unittest
+
+from cx_rdf import cx_to_rdf_graph
+from cx_rdf.delta import cx_delta, read_fingerprints, write_fingerprints
+from cx_rdf.io import ALLOWED_POLICIES
+from rdflib import Graph
+from tests.constants import EXAMPLE_CX
+
+BASE_IRI = 'http://example.com/network/'
+
+
+def _get_aspect(cx_json, aspect_name):
+    for fragment in cx_json:
+        if aspect_name in fragment:
+            return fragment[aspect_name]
+    raise KeyError(aspect_name)
+
+
+def _make_new_version():
+    """Rename a node, remove an edge with its attribute, and add a node with an attribute."""
+    cx_json = copy.deepcopy(EXAMPLE_CX)
+    _get_aspect(cx_json, 'nodes')[2]['n'] = 'C2'
+    _get_aspect(cx_json, 'nodes').append({'@id': 5, 'n': 'F'})
+    _get_aspect(cx_json, 'nodeAttributes').append({'po': 5, 'n': 'Color', 'v': 'Green'})
+    del _get_aspect(cx_json, 'edges')[1]
+    del _get_aspect(cx_json, 'edgeAttributes')[1]
+    return cx_json
+
+
+class TestDelta(unittest.TestCase):
+    """Tests for converting only what changed between two versions of a network."""
+
+    def test_apply(self):
+        """Test that applying the delta to the old graph gives the new graph."""
+        new_cx = _make_new_version()
+        for policy in ALLOWED_POLICIES:
+            with self.subTest(policy=policy):
+                delta = cx_delta(EXAMPLE_CX, new_cx, base_iri=BASE_IRI, policy=policy)
+                self.assertTrue(delta.added)
+                self.assertTrue(delta.removed)
+
+                old = set(cx_to_rdf_graph(EXAMPLE_CX, policy=policy, base_iri=BASE_IRI))
+                new = set(cx_to_rdf_graph(new_cx, policy=policy, base_iri=BASE_IRI))
+                self.assertLessEqual(delta.removed, old)
+                self.assertEqual(new, (old - delta.removed) | delta.added)
+
+    def test_same_id(self):
+        """Test elements that share an ``@id``, including one that matches the old version until another joins it."""
+        versions = [
+            [{'nodes': [{'@id': 0, 'n': 'A'}]}],
+            [{'nodes': [{'@id': 0, 'n': 'A'}, {'@id': 0, 'r': 'test:A'}]}],
+            [{'nodes': [{'@id': 0, 'n': 'A'}, {'@id': 0, 'r': 'test:B'}]}],
+        ]
+        for policy in ALLOWED_POLICIES:
+            for old_cx, new_cx in zip(versions, versions[1:] + versions[:-1][::-1]):
+                with self.subTest(policy=policy, old=old_cx, new=new_cx):
+                    delta = cx_delta(old_cx, new_cx, base_iri=BASE_IRI, policy=policy)
+                    old = set(cx_to_rdf_graph(old_cx, policy=policy, base_iri=BASE_IRI))
+                    new = set(cx_to_rdf_graph(new_cx, policy=policy, base_iri=BASE_IRI))
+                    self.assertEqual(new, (old - delta.removed) | delta.added)
+
+    def test_unchanged(self):
+        """Test that nothing is added or removed between identical versions."""
+        delta = cx_delta(EXAMPLE_CX, copy.deepcopy(EXAMPLE_CX), base_iri=BASE_IRI)
+        self.assertEqual(set(), delta.added)
+        self.assertEqual(set(), delta.removed)
+
+    def test_fingerprints(self):
+        """Test that saved fingerprints give the same delta as the old version."""
+        new_cx = _make_new_version()
+        file = io.StringIO()
+        write_fingerprints(cx_delta(EXAMPLE_CX, EXAMPLE_CX, base_iri=BASE_IRI).fingerprints, file)
+        file.seek(0)
+        fingerprints = read_fingerprints(file)
+
+        expected = cx_delta(EXAMPLE_CX, new_cx, base_iri=BASE_IRI)
+        delta = cx_delta(EXAMPLE_CX, new_cx, base_iri=BASE_IRI, old_fingerprints=fingerprints)
+        self.assertEqual(expected.added, delta.added)
+        self.assertEqual(expected.removed, delta.removed)
+
+        with self.assertRaises(ValueError):
+            cx_delta(EXAMPLE_CX, new_cx, base_iri=BASE_IRI, policy='aspect', old_fingerprints=fingerprints)
+
+    def test_sparql_update(self):
+        """Test that the SPARQL Update deletes the removed triples and inserts the added ones."""
+        delta = cx_delta(EXAMPLE_CX, _make_new_version(), base_iri=BASE_IRI)
+        file = io.StringIO()
+        delta.write_sparql_update(file)
+
+        deleted, inserted = file.getvalue().split(' ;\n')
+        for operation, block, expected in (('DELETE DATA', deleted, delta.removed),
+                                           ('INSERT DATA', inserted, delta.added)):
+            with self.subTest(operation=operation):
+                self.assertTrue(block.startswith(operation + ' {\n'))
+                graph = Graph().parse(data=block[len(operation) + 2:].rstrip().rstrip('}'), format='nt')
+                self.assertEqual(expected, set(graph))
+
+    def test_ntriples(self):
+        """Test writing the added and removed triples as N-Triples."""
+        delta = cx_delta(EXAMPLE_CX, _make_new_version(), base_iri=BASE_IRI)
+        added, removed = io.StringIO(), io.StringIO()
+        delta.write_ntriples(added, removed)
+        self.assertEqual(delta.added, set(Graph().parse(data=added.getvalue(), format='nt')))
+        self.assertEqual(delta.removed, set(Graph().parse(data=removed.getvalue(), format='nt')))
@@ -0,0 +1,118 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the table of edges written alongside the predicate policy."""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from cx_rdf import cx_to_rdf_graph
+from cx_rdf.constants import CX, RDF_TYPE, RDFS_LABEL
+from cx_rdf.edge_table import EdgeTable, EdgeTableSink
+from cx_rdf.io import cx_file_to_rdf_file, cx_file_to_rdf_graph
+from cx_rdf.sinks import GraphSink
+from cx_rdf.synthetic import generate_cx
+from rdflib import Literal, URIRef
+from tests.constants import EXAMPLE_CX
+
+
+def _query(graph):
+    """Answer the query from :mod:`cx_rdf.predicate_policy` by matching its patterns against the graph."""
+    nodes = set(graph.subjects(RDF_TYPE, CX.node))
+    edges = set(graph.subjects(RDF_TYPE, CX.edge))
+    return {
+        (source_label, relation, target_label)
+        for source, relation, target in graph
+        if relation in edges and source in nodes and target in nodes
+        for source_label in graph.objects(source, RDFS_LABEL)
+        for target_label in graph.objects(target, RDFS_LABEL)
+    }
+
+
+class TestEdgeTable(unittest.TestCase):
+    """Tests for the table of edges written alongside the predicate policy."""
+
+    def setUp(self):
+        """Make a directory for the databases."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'edges.sqlite')
+
+    def tearDown(self):
+        """Remove the directory."""
+        self.directory.cleanup()
+
+    def _convert(self, cx_json, **kwargs):
+        sink = EdgeTableSink(GraphSink(), self.path, batch_size=3)
+        graph = cx_to_rdf_graph(cx_json, policy='predicate', sink=sink, **kwargs)
+        sink.close()
+        return graph
+
+    def test_query(self):
+        """Test that the table gives the same rows as querying the graph, with blank nodes and with IRIs."""
+        for base_iri in (None, 'http://example.com/'):
+            with self.subTest(base_iri=base_iri):
+                graph = self._convert(EXAMPLE_CX, base_iri=base_iri)
+                with EdgeTable(self.path) as table:
+                    self.assertEqual(_query(graph), set(table.query()))
+                    self.assertEqual(2, table.count_edges())
+
+    def test_lookup(self):
+        """Test that edges can be filtered by the labels of their nodes, and nodes and edges found by identifier."""
+        self._convert(EXAMPLE_CX, base_iri='http://example.com/')
+        with EdgeTable(self.path) as table:
+            rows = list(table.iterate_edges(source_label=Literal('A')))
+            self.assertEqual(1, len(rows))
+            row = rows[0]
+            self.assertEqual(URIRef('http://example.com/node_0'), row.source)
+            self.assertEqual(Literal('B'), row.target_label)
+            self.assertEqual(row.edge, table.get_edge(row.edge_id))
+            self.assertEqual(row.target, table.get_node(row.target_id))
+
+            self.assertEqual([], list(table.iterate_edges(source_label=Literal('A'), target_label=Literal('A'))))
+            self.assertIsNone(table.get_node(1000))
+
+    def test_nodes_last(self):
+        """Test that the labels are joined even when the nodes come after the edges."""
+        cx_json = [
+            {'edges': [{'@id': 2, 's': 0, 't': 1, 'i': 'binds'}]},
+            {'nodes': [{'@id': 0, 'n': 'A'}, {'@id': 1, 'n': 'B'}]},
+        ]
+        self._convert(cx_json, base_iri='http://example.com/')
+        with EdgeTable(self.path) as table:
+            (row,) = table.iterate_edges()
+        self.assertEqual((2, 'binds', Literal('A'), Literal('B')),
+                         (row.edge_id, row.interaction, row.source_label, row.target_label))
+
+    def test_file(self):
+        """Test that the table is the same whichever way the file is converted."""
+        cx_json = generate_cx(nodes=30, edges=60, node_attributes=20, edge_attributes=20)
+        text = json.dumps(cx_json)
+        graph = cx_file_to_rdf_graph(io.StringIO(text), policy='predicate', base_iri='http://example.com/')
+        expected = _query(graph)
+        self.assertEqual(60, len(expected))
+
+        for options in ({'rdf_format': 'turtle'}, {'rdf_format': 'nt'}, {'rdf_format': 'nt', 'columnar': True},
+                        {'rdf_format': 'nt', 'workers': 2}):
+            with self.subTest(**options):
+                destination = io.StringIO()
+                cx_file_to_rdf_file(io.StringIO(text), destination, policy='predicate',
+                                    base_iri='http://example.com/', edge_table=self.path, **options)
+                self.assertTrue(destination.getvalue())
+                with EdgeTable(self.path) as table:
+                    self.assertEqual(expected, set(table.query()))
+
+    def test_special_characters(self):
+        """Test that a path with characters that mean something in a URI opens the right database."""
+        self.path = os.path.join(self.directory.name, 'a?b#c%20d.sqlite')
+        self._convert(EXAMPLE_CX)
+        with EdgeTable(self.path) as table:
+            self.assertEqual(2, table.count_edges())
+        self.assertEqual(['a?b#c%20d.sqlite'], os.listdir(self.directory.name))
+
+    def test_other_policies(self):
+        """Test that the table can only be written with the predicate policy."""
+        with self.assertRaises(ValueError):
+            cx_file_to_rdf_file(io.StringIO(json.dumps(EXAMPLE_CX)), io.StringIO(), policy='aspect',
+                                edge_table=self.path)
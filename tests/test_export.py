@@ -6,11 +6,13 @@ import json
 import unittest
 
 from cx_rdf import cx_to_rdf_graph
+from cx_rdf.columnar import ColumnarCx
+from cx_rdf.io import cx_columns_to_rdf_graph
 from ndex2 import NiceCXNetwork
 from ndex2.cx import CX_CONSTANTS
 from ndex2.cx.aspects.CitationElement import CitationElement
 from ndex2.cx.aspects.SupportElement import SupportElement
-from rdflib import Graph
+from rdflib import Graph, Literal, XSD
 
 
 class TestExport(unittest.TestCase):
@@ -96,3 +98,34 @@ class TestExport(unittest.TestCase):
 
         print(f'\nResulting ABSRAC graph ({len(graph)} triplets):\n')
         print(graph.serialize(format='turtle').decode('utf-8'))
+
+    def test_typed_attributes(self):
+        """Test that attribute values are typed by their CX data types, including network attributes."""
+        cx_json = [
+            {'nodes': [{'@id': 0, 'n': 'A'}]},
+            {'networkAttributes': [
+                {'n': 'version', 'v': 2, 'd': 'double'},
+                {'n': 'public', 'v': True, 'd': 'boolean'},
+                {'n': 'authors', 'v': ['A', 'B'], 'd': 'list_of_string'},
+            ]},
+            {'nodeAttributes': [
+                {'po': 0, 'n': 'score', 'v': 1, 'd': 'double'},
+                {'po': 0, 'n': 'ranks', 'v': [1, 2], 'd': 'list_of_long'},
+            ]},
+        ]
+        expected = {
+            Literal('2.0', datatype=XSD.double),
+            Literal(True),
+            Literal('A'),
+            Literal('B'),
+            Literal('1.0', datatype=XSD.double),
+            Literal('1', datatype=XSD.long),
+            Literal('2', datatype=XSD.long),
+        }
+        for policy in ('aspect', 'predicate'):
+            with self.subTest(policy=policy):
+                graph = cx_to_rdf_graph(cx_json, policy=policy)
+                self.assertLessEqual(expected, set(graph.objects()))
+
+                graph = cx_columns_to_rdf_graph(ColumnarCx.from_cx(cx_json), policy=policy)
+                self.assertLessEqual(expected, set(graph.objects()))
@@ -0,0 +1,106 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for downloading networks and converting them as they arrive."""
+
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+import json
+import os
+import tempfile
+import threading
+import unittest
+
+from cx_rdf import cx_to_rdf_graph
+from cx_rdf.fetch import fetch_networks
+from rdflib import Graph
+from tests.constants import EXAMPLE_CX
+
+
+class _Handler(BaseHTTPRequestHandler):
+    """Serves the example network, a broken one, and one that only works on the third try."""
+
+    protocol_version = 'HTTP/1.1'
+
+    def do_GET(self):  # noqa: N802
+        server = self.server
+        with server.lock:
+            server.requests.append((self.path, self.headers.get('Authorization')))
+            attempts = sum(path == self.path for path, _ in server.requests)
+
+        uuid = self.path.rsplit('/', 1)[-1]
+        if uuid == 'flaky' and attempts < 3:
+            self._send(503, b'try again')
+        elif uuid in {'example', 'flaky'}:
+            self._send(200, json.dumps(EXAMPLE_CX).encode('utf-8'))
+        elif uuid == 'broken':
+            self._send(200, b'[{"nodes": [')
+        else:
+            self._send(404, b'not found')
+
+    def _send(self, status, body):
+        self.send_response(status)
+        self.send_header('Content-Type', 'application/json')
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        """Keep the test output quiet."""
+
+
+class TestFetch(unittest.TestCase):
+    """Tests for downloading networks and converting them as they arrive."""
+
+    def setUp(self):
+        """Start a server on a free port, and make a directory for the output."""
+        self.server = ThreadingHTTPServer(('127.0.0.1', 0), _Handler)
+        self.server.lock = threading.Lock()
+        self.server.requests = []
+        self.thread = threading.Thread(target=self.server.serve_forever, daemon=True)
+        self.thread.start()
+        self.url = f'http://127.0.0.1:{self.server.server_address[1]}/v2'
+
+        self.directory = tempfile.TemporaryDirectory()
+
+    def tearDown(self):
+        """Stop the server and remove the directory."""
+        self.server.shutdown()
+        self.server.server_close()
+        self.directory.cleanup()
+
+    def test_fetch(self):
+        """Test that networks are converted, retried while the server is unavailable, and failures reported."""
+        uuids = ['example', 'flaky', 'broken', 'missing']
+        results = fetch_networks(uuids, self.directory.name, url=self.url, rdf_format='nt',
+                                 base_iri='http://example.com/', concurrency=2, retries=3, backoff=0.01)
+        self.assertEqual(uuids, [result.uuid for result in results])
+
+        statuses = {result.uuid: (result.status, result.attempts) for result in results}
+        self.assertEqual(
+            {'example': ('converted', 1), 'flaky': ('converted', 3), 'broken': ('failed', 1),
+             'missing': ('failed', 1)},
+            statuses,
+        )
+        self.assertIn('404', results[3].error)
+        self.assertEqual(['example.nt', 'flaky.nt'], sorted(os.listdir(self.directory.name)))
+
+        for result in results[:2]:
+            expected = cx_to_rdf_graph(EXAMPLE_CX, base_iri=f'http://example.com/{result.uuid}/')
+            graph = Graph()
+            graph.parse(result.destination, format='nt')
+            self.assertEqual(set(expected), set(graph))
+
+    def test_credentials(self):
+        """Test that the credentials are sent, and that IRIs are minted under a base IRI without a slash."""
+        (result,) = fetch_networks(['example'], self.directory.name, url=self.url, rdf_format='nt',
+                                   base_iri='http://example.com/network', username='user', password='secret')
+        self.assertEqual('converted', result.status)
+        with open(result.destination) as file:
+            self.assertIn('<http://example.com/network/example/node_0>', file.read())
+        self.assertEqual([('/v2/network/example', 'Basic dXNlcjpzZWNyZXQ=')], self.server.requests)
+
+    def test_give_up(self):
+        """Test that a network is given up on once it's been retried enough."""
+        (result,) = fetch_networks(['flaky'], self.directory.name, url=self.url, retries=1, backoff=0.01)
+        self.assertEqual(('failed', 2), (result.status, result.attempts))
+        self.assertIn('503', result.error)
+        self.assertEqual([], os.listdir(self.directory.name))
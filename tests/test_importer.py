@@ -0,0 +1,190 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for converting RDF back to CX."""
+
+import io
+import json
+import random
+import unittest
+
+from cx_rdf.constants import CX, RDF_TYPE
+from cx_rdf.importer import iterate_rdf_cx_elements, rdf_to_cx, RdfSyntaxError
+from cx_rdf.io import get_exporter
+from cx_rdf.sinks import NQuadsSink, NTriplesSink
+from cx_rdf.synthetic import generate_cx
+from cx_rdf.utils import iterate_aspect_elements
+from rdflib import Literal, URIRef
+from tests.constants import EXAMPLE_CX
+
+#: The aspects that aren't converted back as they were
+SKIPPED_ASPECTS = {'numberVerification', 'metaData', '@context'}
+
+
+def _to_nt(cx_json, policy, base_iri=None, sink_cls=NTriplesSink) -> str:
+    file = io.StringIO()
+    get_exporter(policy=policy, base_iri=base_iri, sink=sink_cls(file)).export(cx_json)
+    return file.getvalue()
+
+
+def _get_aspects(cx_json):
+    """Get the elements of each aspect in a canonical order, leaving out the data types of strings."""
+    aspects = {}
+    for aspect_name, element in iterate_aspect_elements(cx_json):
+        if aspect_name in SKIPPED_ASPECTS:
+            continue
+        if element.get('d') == 'string':
+            element = {key: value for key, value in element.items() if key != 'd'}
+        aspects.setdefault(aspect_name, []).append(json.dumps(element, sort_keys=True))
+    return {aspect_name: sorted(elements) for aspect_name, elements in aspects.items()}
+
+
+def _sort_edge_references(cx_json):
+    """Sort the edges of citations and supports, which come back in the order of the edges from the predicate policy."""
+    sorted_aspects = {'edgeCitations', 'edgeSupports'}
+    return [
+        {
+            aspect_name: [
+                {**element, 'po': sorted(element['po'])} if aspect_name in sorted_aspects else element
+                for element in elements
+            ]
+            for aspect_name, elements in aspect.items()
+        }
+        for aspect in cx_json
+    ]
+
+
+def _sort_values(cx_json):
+    """Sort the values of lists, which are separate triples that RDF doesn't keep in order."""
+    return [
+        {
+            aspect_name: [
+                {**element, 'v': sorted(element['v'])} if isinstance(element.get('v'), list) else element
+                for element in elements
+            ]
+            for aspect_name, elements in aspect.items()
+        }
+        for aspect in cx_json
+    ]
+
+
+class TestImporter(unittest.TestCase):
+    """Tests for converting RDF back to CX."""
+
+    def test_round_trip(self):
+        """Test that the example comes back the same from both policies, with and without spilling to disk."""
+        expected = _get_aspects(EXAMPLE_CX)
+        for policy in ('aspect', 'predicate'):
+            for base_iri in (None, 'http://example.com/'):
+                text = _to_nt(EXAMPLE_CX, policy, base_iri=base_iri)
+                for max_in_memory in (3, 1_000_000):
+                    with self.subTest(policy=policy, base_iri=base_iri, max_in_memory=max_in_memory):
+                        cx_json = rdf_to_cx(io.StringIO(text), max_in_memory=max_in_memory)
+                        self.assertEqual(expected, _get_aspects(cx_json))
+
+    def test_round_trip_counts(self):
+        """Test that a bigger network comes back with as many elements in each aspect, and the same ones."""
+        cx_json = generate_cx(nodes=30, edges=60, node_attributes=40, edge_attributes=20)
+        expected = _get_aspects(_sort_edge_references(cx_json))
+        for policy in ('aspect', 'predicate'):
+            with self.subTest(policy=policy):
+                aspects = _get_aspects(_sort_edge_references(rdf_to_cx(io.StringIO(_to_nt(cx_json, policy)))))
+                self.assertEqual(
+                    {aspect_name: len(elements) for aspect_name, elements in expected.items()},
+                    {aspect_name: len(elements) for aspect_name, elements in aspects.items()},
+                )
+                self.assertEqual(expected, aspects)
+
+    def test_metadata(self):
+        """Test that the metadata is counted again, keeping the versions from the RDF."""
+        cx_json = [
+            {'metaData': [{'name': 'nodes', 'version': '2.0', 'elementCount': 10, 'consistencyGroup': 3}]},
+            {'nodes': [{'@id': 5, 'n': 'A'}, {'@id': 7}]},
+        ]
+        for policy in ('aspect', 'predicate'):
+            with self.subTest(policy=policy):
+                result = rdf_to_cx(io.StringIO(_to_nt(cx_json, policy)))
+                self.assertEqual({'numberVerification': [{'longNumber': 281474976710655}]}, result[0])
+                self.assertEqual(
+                    {'metaData': [
+                        {'name': 'nodes', 'elementCount': 2, 'version': '2.0', 'consistencyGroup': 3, 'idCounter': 7},
+                    ]},
+                    result[-1],
+                )
+
+    def test_values(self):
+        """Test that the data types of values are kept, and that text survives escaping."""
+        cx_json = [
+            {'nodes': [{'@id': 0, 'n': 'say "hi"\nback\\slash ∆'}]},
+            {'nodeAttributes': [
+                {'po': 0, 'n': 'score', 'v': 1.5, 'd': 'double'},
+                {'po': 0, 'n': 'count', 'v': 12345678901, 'd': 'long'},
+                {'po': 0, 'n': 'flag', 'v': False, 'd': 'boolean'},
+                {'po': 0, 'n': 'sizes', 'v': [1, 2, 3], 'd': 'list_of_integer'},
+                {'po': 0, 'n': 'alias', 'v': ['test:A'], 'd': 'list_of_string'},
+            ]},
+            {'networkAttributes': [{'n': 'tags', 'v': ['a', 'b'], 'd': 'list_of_string'}]},
+        ]
+        expected = _get_aspects(cx_json)
+        for policy in ('aspect', 'predicate'):
+            with self.subTest(policy=policy):
+                self.assertEqual(expected, _get_aspects(rdf_to_cx(io.StringIO(_to_nt(cx_json, policy)))))
+
+    def test_edited(self):
+        """Test that edits to the RDF show up in the CX."""
+        text = _to_nt(EXAMPLE_CX, 'predicate', base_iri='http://example.com/')
+        text = text.replace('"A" .', '"Z" .')
+        edge = URIRef('http://example.com/edge_9')
+        file = io.StringIO(text)
+        file.seek(0, io.SEEK_END)
+        NTriplesSink(file).add_all([
+            (URIRef('http://example.com/node_4'), edge, URIRef('http://example.com/node_0')),
+            (edge, RDF_TYPE, CX.edge),
+            (edge, CX.edge_has_id, Literal(9)),
+        ])
+        file.seek(0)
+
+        aspects = dict(
+            (aspect_name, elements)
+            for fragment in rdf_to_cx(file)
+            for aspect_name, elements in fragment.items()
+        )
+        self.assertIn({'@id': 0, 'n': 'Z'}, aspects['nodes'])
+        self.assertIn({'@id': 9, 's': 4, 't': 0}, aspects['edges'])
+
+    def test_shuffled(self):
+        """Test that the order of the triples doesn't matter, except for the order of the values of lists."""
+        expected = _get_aspects(_sort_values(EXAMPLE_CX))
+        for policy in ('aspect', 'predicate'):
+            lines = _to_nt(EXAMPLE_CX, policy, base_iri='http://example.com/').splitlines(keepends=True)
+            shuffled = list(lines)
+            random.Random(0).shuffle(shuffled)
+            for name, reordered in (('sorted', sorted(lines)), ('reversed', lines[::-1]), ('shuffled', shuffled)):
+                with self.subTest(policy=policy, order=name):
+                    cx_json = rdf_to_cx(io.StringIO(''.join(reordered)))
+                    self.assertEqual(expected, _get_aspects(_sort_values(cx_json)))
+
+    def test_quads(self):
+        """Test that N-Quads can be read too, ignoring their graphs."""
+        text = _to_nt(EXAMPLE_CX, 'aspect', sink_cls=lambda file: NQuadsSink(file, URIRef('http://example.com/g')))
+        self.assertEqual(_get_aspects(EXAMPLE_CX), _get_aspects(rdf_to_cx(io.StringIO(text))))
+
+    def test_errors(self):
+        """Test that malformed lines and other policies are rejected."""
+        with self.assertRaises(RdfSyntaxError):
+            iterate_rdf_cx_elements(io.StringIO('# a comment\n\n<http://example.com/a> "b" .\n'))
+
+        for policy in ('abstract', 'compact'):
+            with self.subTest(policy=policy), self.assertRaises(ValueError):
+                iterate_rdf_cx_elements(io.StringIO(_to_nt(EXAMPLE_CX, policy)))
+
+        # older versions gave the values of network attributes with the same predicate as their names
+        attribute = URIRef('http://example.com/networkAttributes_0')
+        file = io.StringIO()
+        NTriplesSink(file).add_all([
+            (attribute, RDF_TYPE, CX.network_attribute),
+            (attribute, CX.network_attribute_has_key, Literal('version')),
+            (attribute, CX.network_attribute_has_key, Literal('1.0')),
+        ])
+        file.seek(0)
+        with self.assertRaises(ValueError):
+            rdf_to_cx(file)
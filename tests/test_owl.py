@@ -0,0 +1,219 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for converting OWL to CX."""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+from unittest import mock
+
+from cx_rdf.owl import (
+    convert_ontology, convert_owl_to_file, ensure_node, get_name, iterate_owl_cx_elements, load_ontology,
+    OntologyCache,
+)
+from cx_rdf.reader import iterate_cx_elements
+from ndex2 import NiceCXNetwork
+from owlready2 import Ontology, World
+
+#: A small ontology with a class that has two superclasses and a restriction, one that's only referenced, one from
+#: another ontology, and one with two labels
+EXAMPLE_OWL = """<?xml version="1.0"?>
+<rdf:RDF xmlns:rdf="http://www.w3.org/1999/02/22-rdf-syntax-ns#"
+         xmlns:rdfs="http://www.w3.org/2000/01/rdf-schema#"
+         xmlns:owl="http://www.w3.org/2002/07/owl#"
+         xml:base="http://example.org/test.owl">
+  <owl:Ontology rdf:about="http://example.org/test.owl"/>
+  <owl:ObjectProperty rdf:about="#part_of"/>
+  <owl:Class rdf:about="#animal">
+    <rdfs:label>animal</rdfs:label>
+    <rdfs:subClassOf rdf:resource="http://www.w3.org/2002/07/owl#Thing"/>
+  </owl:Class>
+  <owl:Class rdf:about="#dog">
+    <rdfs:label>dog</rdfs:label>
+    <rdfs:label>hound</rdfs:label>
+    <rdfs:subClassOf rdf:resource="#animal"/>
+    <rdfs:subClassOf rdf:resource="#pet"/>
+    <rdfs:subClassOf>
+      <owl:Restriction>
+        <owl:onProperty rdf:resource="#part_of"/>
+        <owl:someValuesFrom rdf:resource="#pack"/>
+      </owl:Restriction>
+    </rdfs:subClassOf>
+  </owl:Class>
+  <owl:Class rdf:about="#cat">
+    <rdfs:label>cat</rdfs:label>
+    <rdfs:subClassOf rdf:resource="#animal"/>
+    <rdfs:subClassOf rdf:resource="#pet"/>
+  </owl:Class>
+  <owl:Class rdf:about="#pet"/>
+  <owl:Class rdf:about="#pack">
+    <rdfs:subClassOf rdf:resource="http://example.org/other#group"/>
+  </owl:Class>
+</rdf:RDF>
+"""
+
+
+class TestOwl(unittest.TestCase):
+    """Tests for converting OWL to CX."""
+
+    def setUp(self):
+        """Load the example ontology into its own world."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'test.owl')
+        with open(self.path, 'w') as file:
+            file.write(EXAMPLE_OWL)
+        self.world = World()
+        self.onto = self.world.get_ontology(self.path).load()
+
+    def tearDown(self):
+        """Close the world and remove the directory."""
+        self.world.close()
+        self.directory.cleanup()
+
+    def test_convert(self):
+        """Test that each class is a single node, however many subclasses it has."""
+        cx = convert_ontology(self.onto)
+
+        names = {node_id: node.get_name() for node_id, node in cx.nodes.items()}
+        self.assertEqual(['animal', 'cat', 'dog', 'group', 'pack', 'pet'], sorted(names.values()))
+
+        edges = sorted(
+            (names[edge.get_source()], names[edge.get_target()], edge.get_interaction())
+            for edge in cx.edges.values()
+        )
+        self.assertEqual(
+            [
+                ('cat', 'animal', 'subClassOf'),
+                ('cat', 'pet', 'subClassOf'),
+                ('dog', 'animal', 'subClassOf'),
+                ('dog', 'pet', 'subClassOf'),
+                ('pack', 'group', 'subClassOf'),
+            ],
+            edges,
+        )
+
+        labels = {
+            names[node_id]: attribute.get_values()
+            for node_id, attributes in cx.nodeAttributes.items()
+            for attribute in attributes
+        }
+        self.assertEqual({'animal': 'animal', 'dog': 'dog', 'cat': 'cat'}, labels)
+
+    def test_stream(self):
+        """Test that writing the elements as they're made gives the same network as building it, with metadata."""
+        elements = list(iterate_owl_cx_elements(self.onto))
+        self.assertEqual(
+            json.loads(json.dumps(convert_ontology(self.onto).to_cx()))[1:-1],  # without the metadata
+            [
+                {aspect_name: [element for name, element in elements if name == aspect_name]}
+                for aspect_name in ('nodes', 'edges', 'nodeAttributes')
+            ],
+        )
+
+        file = io.StringIO()
+        convert_owl_to_file(self.path, file)
+        cx_json = json.loads(file.getvalue())
+        self.assertEqual({'numberVerification': [{'longNumber': 281474976710655}]}, cx_json[0])
+        self.assertEqual(
+            {'metaData': [
+                {'name': 'nodes', 'elementCount': 6, 'version': '1.0', 'consistencyGroup': 1, 'idCounter': 5},
+                {'name': 'nodeAttributes', 'elementCount': 3, 'version': '1.0', 'consistencyGroup': 1},
+                {'name': 'edges', 'elementCount': 5, 'version': '1.0', 'consistencyGroup': 1, 'idCounter': 4},
+            ]},
+            cx_json[-1],
+        )
+        self.assertEqual(
+            sorted(map(json.dumps, elements)),
+            sorted(
+                json.dumps([aspect_name, element])
+                for aspect_name, element in iterate_cx_elements(io.StringIO(file.getvalue()))
+                if aspect_name not in {'numberVerification', 'metaData'}
+            ),
+        )
+
+    def test_ensure_node(self):
+        """Test that a class visited twice as an object gets one node."""
+        cx, entities = NiceCXNetwork(), {}
+        dog = self.onto.dog
+        node_id = ensure_node(cx, entities, dog)
+        self.assertEqual(node_id, ensure_node(cx, entities, dog))
+        self.assertEqual(1, len(cx.nodes))
+        self.assertEqual('dog', cx.nodes[node_id].get_name())
+
+    def test_get_name(self):
+        """Test that names are taken after the last separator, preferring fragments."""
+        self.assertEqual('dog', get_name('http://example.org/test.owl#dog'))
+        self.assertEqual('GO_0008150', get_name('http://purl.obolibrary.org/obo/GO_0008150'))
+        self.assertEqual('a/b', get_name('http://example.org/test#a/b'))
+        self.assertEqual('x', get_name('urn:x'))
+
+
+class TestOntologyCache(unittest.TestCase):
+    """Tests for keeping parsed ontologies in a cache."""
+
+    def setUp(self):
+        """Write the example ontology and make a cache next to it."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'test.owl')
+        with open(self.path, 'w') as file:
+            file.write(EXAMPLE_OWL)
+        self.cache = OntologyCache(os.path.join(self.directory.name, 'cache'))
+        self.worlds = []
+
+    def tearDown(self):
+        """Close the worlds the ontologies were loaded into and remove the directory."""
+        for world in self.worlds:
+            world.close()
+        self.directory.cleanup()
+
+    def _load(self, cache=None):
+        onto = load_ontology(self.path, cache=self.cache if cache is None else cache)
+        self.worlds.append(onto.world)
+        return onto
+
+    def _get_elements(self, onto):
+        return sorted(map(json.dumps, iterate_owl_cx_elements(onto)))
+
+    def test_miss(self):
+        """Test that an ontology that isn't in the cache is parsed, and its quadstore kept as the only entry."""
+        onto = self._load()
+        self.assertEqual('http://example.org/test.owl#', onto.base_iri)
+        self.assertEqual(1, len(os.listdir(self.cache.directory)))
+
+        world = World()
+        self.worlds.append(world)
+        self.assertEqual(self._get_elements(world.get_ontology(self.path).load()), self._get_elements(onto))
+
+    def test_hit(self):
+        """Test that an ontology that's in the cache is reopened without parsing it, and converts the same."""
+        parsed = self._load()
+        with mock.patch.object(Ontology, 'load', side_effect=AssertionError('parsed again')):
+            cached = self._load()
+            # another world reading the same entry isn't locked out
+            self._load()
+        self.assertIsNot(parsed.world, cached.world)
+        self.assertEqual(self._get_elements(parsed), self._get_elements(cached))
+        self.assertEqual(1, len(os.listdir(self.cache.directory)))
+
+    def test_invalidate(self):
+        """Test that an ontology is parsed again once its file changes."""
+        self._load()
+        with open(self.path, 'w') as file:
+            file.write(EXAMPLE_OWL.replace('<rdfs:label>cat</rdfs:label>', '<rdfs:label>kitty</rdfs:label>'))
+
+        onto = self._load()
+        labels = {
+            element['v']
+            for aspect_name, element in iterate_owl_cx_elements(onto)
+            if aspect_name == 'nodeAttributes'
+        }
+        self.assertIn('kitty', labels)
+        self.assertEqual(2, len(os.listdir(self.cache.directory)))
+
+    def test_evict(self):
+        """Test that old quadstores are removed once the cache is too big."""
+        cache = OntologyCache(self.cache.directory, max_size=1)
+        self._load(cache)
+        self.assertEqual([], os.listdir(cache.directory))
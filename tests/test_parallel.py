@@ -0,0 +1,61 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for converting a network with several processes."""
+
+import io
+import unittest
+
+from cx_rdf import cx_to_rdf_graph
+from cx_rdf.io import ALLOWED_POLICIES, get_exporter
+from cx_rdf.parallel import export_parallel
+from cx_rdf.sinks import GraphSink, NTriplesSink
+from cx_rdf.utils import iterate_aspect_elements
+from tests.constants import EXAMPLE_CX
+from tests.test_curies import _move_context_to_end
+from tests.test_reader import _anonymize
+
+BASE_IRI = 'http://example.com/network/'
+
+
+def _to_nt(policy, workers=None, chunk_size=2, cx_json=EXAMPLE_CX):
+    """Convert the example to N-Triples, in this process if no workers are given."""
+    file = io.StringIO()
+    sink = NTriplesSink(file)
+    if workers is None:
+        get_exporter(policy=policy, sink=sink, base_iri=BASE_IRI).export(cx_json)
+    else:
+        export_parallel(type(get_exporter(policy=policy)), iterate_aspect_elements(cx_json), sink,
+                        base_iri=BASE_IRI, workers=workers, chunk_size=chunk_size)
+    return file.getvalue()
+
+
+class TestParallel(unittest.TestCase):
+    """Tests for converting a network with several processes."""
+
+    def test_same_lines(self):
+        """Test that the chunks are merged into exactly the same N-Triples as converting in one process."""
+        for policy in ALLOWED_POLICIES:
+            with self.subTest(policy=policy):
+                self.assertEqual(_to_nt(policy), _to_nt(policy, workers=2))
+
+    def test_late_context(self):
+        """Test that the aliases held back by the workers until the context arrives aren't lost."""
+        cx_json = _move_context_to_end(EXAMPLE_CX)
+        self.assertEqual(_to_nt('predicate', cx_json=cx_json), _to_nt('predicate', workers=2, cx_json=cx_json))
+
+    def test_blank_nodes(self):
+        """Test that the workers agree on the blank nodes for nodes and edges."""
+        for policy in ALLOWED_POLICIES:
+            with self.subTest(policy=policy):
+                sequential = cx_to_rdf_graph(EXAMPLE_CX, policy=policy)
+                graph = export_parallel(type(get_exporter(policy=policy)), iterate_aspect_elements(EXAMPLE_CX),
+                                        GraphSink(), workers=2, chunk_size=2)
+                self.assertEqual(_anonymize(sequential), _anonymize(graph))
+                self.assertEqual(len(set(sequential.all_nodes())), len(set(graph.all_nodes())))
+
+    def test_graph(self):
+        """Test converting to a graph through the top level function."""
+        self.assertEqual(
+            set(cx_to_rdf_graph(EXAMPLE_CX, policy='aspect', base_iri=BASE_IRI)),
+            set(cx_to_rdf_graph(EXAMPLE_CX, policy='aspect', base_iri=BASE_IRI, workers=2)),
+        )
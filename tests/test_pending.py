@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for holding back what can't be converted until a later aspect arrives."""
+
+import unittest
+
+from cx_rdf import cx_to_rdf_graph
+from cx_rdf.io import get_exporter
+from cx_rdf.pending import PendingBuffer
+from cx_rdf.stats import ConversionStats
+from tests.constants import EXAMPLE_CX
+from tests.test_curies import _get_aliases, _move_context_to_end
+
+
+class TestPendingBuffer(unittest.TestCase):
+    """Tests for the buffer of pending items."""
+
+    def test_resolve(self):
+        """Test that items are given back in order once their key is resolved, even after spilling to disk."""
+        pending = PendingBuffer(max_in_memory=2)
+        for i in range(5):
+            pending.add('a', i)
+            pending.add('b', -i)
+        self.assertEqual(10, len(pending))
+        self.assertLess(0, pending.spilled)
+
+        self.assertEqual([0, 1, 2, 3, 4], pending.resolve('a'))
+        self.assertEqual([], pending.resolve('a'))
+        self.assertEqual([], pending.resolve('c'))
+        self.assertEqual(5, len(pending))
+
+        pending.add('a', 5)
+        self.assertEqual([('b', 0), ('b', -1), ('b', -2), ('b', -3), ('b', -4), ('a', 5)], pending.pop_all())
+        self.assertEqual(0, len(pending))
+        self.assertEqual(
+            {'deferred': 11, 'resolved': 5, 'spilled': pending.spilled, 'pending': 0, 'peak': 10},
+            pending.get_stats(),
+        )
+
+    def test_close(self):
+        """Test that closing forgets everything still waiting."""
+        pending = PendingBuffer(max_in_memory=1)
+        pending.add('a', 1)
+        pending.add('a', 2)
+        pending.close()
+        self.assertEqual(0, len(pending))
+        self.assertEqual([], pending.resolve('a'))
+
+
+class TestLateContext(unittest.TestCase):
+    """Tests for holding back CURIEs until the ``@context`` arrives."""
+
+    def test_spilled(self):
+        """Test that the aliases are right even when the CURIEs waiting for the context are spilled to disk."""
+        expected = _get_aliases(cx_to_rdf_graph(EXAMPLE_CX, policy='predicate', base_iri='http://example.com/'))
+
+        stats = ConversionStats()
+        exporter = get_exporter(policy='predicate', base_iri='http://example.com/', hooks=stats)
+        exporter.pending.max_in_memory = 3
+        graph = exporter.export(_move_context_to_end(EXAMPLE_CX))
+
+        self.assertEqual(expected, _get_aliases(graph))
+        self.assertEqual(10, stats.pending['deferred'])
+        self.assertEqual(10, stats.pending['resolved'])
+        self.assertLess(0, stats.pending['spilled'])
+        self.assertEqual(0, stats.pending['pending'])
+        self.assertIn('pending', stats.to_json())
+
+    def test_in_order(self):
+        """Test that nothing is held back when the context comes first."""
+        stats = ConversionStats()
+        cx_to_rdf_graph(EXAMPLE_CX, policy='predicate', hooks=stats)
+        self.assertEqual(0, stats.pending['deferred'])
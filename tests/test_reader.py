@@ -0,0 +1,69 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for reading CX incrementally."""
+
+from collections import Counter
+import io
+import json
+import unittest
+
+from cx_rdf import cx_file_to_rdf_graph, cx_to_rdf_graph
+from cx_rdf.io import ALLOWED_POLICIES
+from cx_rdf.reader import CxSyntaxError, iterate_cx_elements
+from cx_rdf.utils import iterate_aspect_elements
+from rdflib import BNode
+from tests.constants import EXAMPLE_CX
+
+
+def _anonymize(graph):
+    """Count the triples in a graph after replacing all blank nodes, since blank node predicates defeat isomorphism."""
+    return Counter(
+        tuple(None if isinstance(term, BNode) else term for term in triple)
+        for triple in graph
+    )
+
+
+class TestReader(unittest.TestCase):
+    """Tests for reading CX incrementally."""
+
+    def setUp(self):
+        """Serialize the example CX."""
+        self.text = json.dumps(EXAMPLE_CX, indent=2)
+        self.expected = list(iterate_aspect_elements(EXAMPLE_CX))
+
+    def test_small_chunks(self):
+        """Test that elements split across many reads are reassembled."""
+        for chunk_size in (1, 2, 7, 64, 1 << 16):
+            with self.subTest(chunk_size=chunk_size):
+                elements = list(iterate_cx_elements(io.StringIO(self.text), chunk_size=chunk_size))
+                self.assertEqual(self.expected, elements)
+
+    def test_bytes(self):
+        """Test reading from a binary file, including multi-byte characters split across reads."""
+        cx_json = [{'nodes': [{'@id': 0, 'n': 'α-synuclein'}, {'@id': 12345, 'n': '∆'}]}]
+        data = json.dumps(cx_json, ensure_ascii=False).encode('utf-8')
+        elements = list(iterate_cx_elements(io.BytesIO(data), chunk_size=1))
+        self.assertEqual(list(iterate_aspect_elements(cx_json)), elements)
+
+    def test_object_aspect(self):
+        """Test an aspect given as a single object instead of a list of elements."""
+        text = '[{"@context": {"test": "http://test.com/#"}}, {"nodes": []}, {}]'
+        elements = list(iterate_cx_elements(io.StringIO(text), chunk_size=3))
+        self.assertEqual([('@context', {'test': 'http://test.com/#'})], elements)
+
+    def test_malformed(self):
+        """Test that truncated and malformed documents raise errors."""
+        for text in ('', '[{"nodes": [{"@id": 1}', '{"nodes": []}', '[{"nodes": [{"@id": 1}}]}]'):
+            with self.subTest(text=text), self.assertRaises(ValueError):
+                list(iterate_cx_elements(io.StringIO(text)))
+
+        with self.assertRaises(CxSyntaxError):
+            list(iterate_cx_elements(io.StringIO('[{"nodes" [] }]')))
+
+    def test_export(self):
+        """Test that exporting from a file gives the same graph as exporting from JSON."""
+        for policy in ALLOWED_POLICIES:
+            with self.subTest(policy=policy):
+                expected = cx_to_rdf_graph(EXAMPLE_CX, policy=policy)
+                graph = cx_file_to_rdf_graph(io.StringIO(self.text), policy=policy)
+                self.assertEqual(_anonymize(expected), _anonymize(graph))
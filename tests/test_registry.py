@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the maps from CX identifiers to RDF nodes."""
+
+import unittest
+
+from cx_rdf.io import get_exporter
+from cx_rdf.registry import DENSE_SLACK, IdRegistry
+from rdflib import BNode
+
+
+class TestRegistry(unittest.TestCase):
+    """Tests for the maps from CX identifiers to RDF nodes."""
+
+    def test_dense_and_sparse(self):
+        """Test that dense identifiers go in the list and the rest in the dictionary."""
+        registry = IdRegistry()
+        nodes = {identifier: BNode() for identifier in (0, 1, 5, -1, 10 ** 12, 'a')}
+        for identifier, node in nodes.items():
+            registry[identifier] = node
+
+        self.assertEqual(len(nodes), len(registry))
+        self.assertEqual(set(nodes), set(registry))
+        for identifier, node in nodes.items():
+            self.assertIs(node, registry[identifier])
+        self.assertIsNone(registry.get(2))
+        self.assertNotIn(2, registry)
+        self.assertRaises(KeyError, registry.__getitem__, 3)
+        self.assertEqual({-1, 10 ** 12, 'a'}, set(registry._sparse))
+
+        registry[0] = nodes[1]
+        self.assertEqual(len(nodes), len(registry))
+
+    def test_grow_over_sparse(self):
+        """Test that identifiers in the dictionary are still found after the list grows past them."""
+        registry = IdRegistry()
+        far = 3 * DENSE_SLACK
+        registry[far] = node = BNode()
+        self.assertIn(far, registry._sparse)
+
+        registry.reserve(far + 1)
+        self.assertIs(node, registry[far])
+        self.assertEqual({}, registry._sparse)
+        self.assertEqual(1, len(registry))
+
+    def test_reserve_from_metadata(self):
+        """Test that the exporters size their identifier maps from the metadata."""
+        exporter = get_exporter('aspect')
+        exporter.export([
+            {'metaData': [
+                {'name': 'nodes', 'idCounter': 5000, 'elementCount': 2, 'version': '1.0', 'consistencyGroup': 1},
+                {'name': 'edges', 'elementCount': 3000, 'version': '1.0', 'consistencyGroup': 1},
+            ]},
+            {'nodes': [{'@id': 4000}, {'@id': 5000}]},
+        ])
+        self.assertEqual(5001, len(exporter.id_node._dense))
+        self.assertEqual(3000, len(exporter.id_edge._dense))
+        self.assertEqual({}, exporter.id_node._sparse)
+        self.assertEqual(2, len(exporter.id_node))
+        self.assertFalse(hasattr(exporter, '__dict__'))
@@ -0,0 +1,121 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for the destinations of triples."""
+
+import io
+import json
+import unittest
+
+from cx_rdf import cx_to_rdf_graph, iter_triples
+from cx_rdf.io import ALLOWED_POLICIES, cx_file_to_rdf_file
+from cx_rdf.sinks import CountingSink, GraphSink, has_bulk_insert, NQuadsSink, NTriplesSink
+from rdflib import BNode, ConjunctiveGraph, Graph, Literal, URIRef, XSD
+from rdflib.plugins.memory import IOMemory
+from tests.constants import EXAMPLE_CX
+from tests.test_reader import _anonymize
+
+
+class _BulkStore(IOMemory):
+    """An in-memory store that keeps track of its bulk insertions."""
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.batches = []
+
+    def addN(self, quads):  # noqa: N802
+        """Add quads and remember how many were given at once."""
+        quads = list(quads)
+        self.batches.append(len(quads))
+        super().addN(quads)
+
+
+class TestSinks(unittest.TestCase):
+    """Tests for the destinations of triples."""
+
+    def test_ntriples(self):
+        """Test that streamed N-Triples parse to the same graph as the in-memory export.
+
+        The predicate policy is left out since it uses blank nodes as predicates, which N-Triples doesn't allow.
+        """
+        for policy in ('abstract', 'aspect'):
+            with self.subTest(policy=policy):
+                expected = cx_to_rdf_graph(EXAMPLE_CX, policy=policy)
+
+                file = io.StringIO()
+                self.assertIsNone(cx_to_rdf_graph(EXAMPLE_CX, policy=policy, sink=NTriplesSink(file)))
+
+                graph = Graph().parse(data=file.getvalue(), format='nt')
+                self.assertEqual(_anonymize(expected), _anonymize(graph))
+
+    def test_nquads(self):
+        """Test that streamed N-Quads are put in the given graph."""
+        name = URIRef('http://example.com/network')
+        file = io.StringIO()
+        cx_to_rdf_graph(EXAMPLE_CX, policy='aspect', sink=NQuadsSink(file, graph_name=name))
+
+        graph = ConjunctiveGraph()
+        graph.parse(data=file.getvalue(), format='nquads')
+        self.assertEqual({name}, {context.identifier for context in graph.contexts()})
+
+    def test_escapes(self):
+        """Test that literals and IRIs with special characters survive a round trip."""
+        triples = [
+            (BNode(), URIRef('http://example.com/p'), Literal('quote " and backslash \\ and\nnewline\r')),
+            (URIRef('http://example.com/a b'), URIRef('http://example.com/p'), Literal('α', lang='el')),
+            (BNode(), URIRef('http://example.com/p'), Literal(1.5)),
+            (BNode(), URIRef('http://example.com/p'), Literal('1', datatype=XSD.integer)),
+        ]
+        file = io.StringIO()
+        sink = NTriplesSink(file)
+        for triple in triples:
+            sink.add(triple)
+
+        graph = Graph().parse(data=file.getvalue(), format='nt')
+        self.assertEqual(
+            {o for _, _, o in triples},
+            set(graph.objects()),
+        )
+        self.assertIn(URIRef('http://example.com/a b'), set(graph.subjects()))
+
+    def test_counting(self):
+        """Test counting triples, and that iterating triples gives the same ones."""
+        for policy in ALLOWED_POLICIES:
+            with self.subTest(policy=policy):
+                sink = CountingSink()
+                cx_to_rdf_graph(EXAMPLE_CX, policy=policy, sink=sink)
+                triples = list(iter_triples(EXAMPLE_CX, policy=policy))
+                self.assertEqual(sink.count, len(triples))
+
+                graph = Graph()
+                for triple in triples:
+                    graph.add(triple)
+                self.assertEqual(_anonymize(cx_to_rdf_graph(EXAMPLE_CX, policy=policy)), _anonymize(graph))
+
+    def test_file_to_file(self):
+        """Test converting a file to a file in both streaming and RDFLib formats."""
+        text = json.dumps(EXAMPLE_CX)
+        for rdf_format in ('nt', 'turtle'):
+            with self.subTest(rdf_format=rdf_format):
+                destination = io.StringIO()
+                cx_file_to_rdf_file(io.StringIO(text), destination, policy='aspect', rdf_format=rdf_format)
+                graph = Graph().parse(data=destination.getvalue(), format=rdf_format)
+                self.assertEqual(_anonymize(cx_to_rdf_graph(EXAMPLE_CX, policy='aspect')), _anonymize(graph))
+
+    def test_batches(self):
+        """Test that triples are inserted in bulk into stores that support it, and at the end of each aspect."""
+        self.assertFalse(has_bulk_insert(Graph().store))
+
+        store = _BulkStore()
+        self.assertTrue(has_bulk_insert(store))
+
+        graph = Graph(store=store)
+        sink = GraphSink(graph, batch_size=4)
+        cx_to_rdf_graph([{'nodes': [{'@id': i} for i in range(3)]}], policy='aspect', sink=sink)
+
+        # the two document triples are flushed when the nodes aspect starts, then its 15 triples go in batches
+        self.assertEqual([2, 4, 4, 4, 3], store.batches)
+        self.assertEqual(sum(store.batches), len(graph))
+
+        expected = cx_to_rdf_graph(EXAMPLE_CX, policy='aspect', batch_size=1)
+        batched = cx_to_rdf_graph(EXAMPLE_CX, graph=Graph(store=_BulkStore()), policy='aspect', batch_size=5)
+        self.assertEqual(_anonymize(expected), _anonymize(batched))
@@ -0,0 +1,63 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for minting deterministic IRIs."""
+
+import io
+import json
+import unittest
+
+from cx_rdf import cx_to_rdf_graph, iter_triples
+from cx_rdf.constants import CX
+from cx_rdf.io import ALLOWED_POLICIES, cx_file_to_rdf_file
+from rdflib import BNode, Graph, Literal, URIRef
+from tests.constants import EXAMPLE_CX
+from tests.test_reader import _anonymize
+
+BASE_IRI = 'http://example.com/network/1'
+
+
+def _anonymize_minted(graph):
+    """Count the triples in a graph after replacing all minted IRIs."""
+    return _anonymize(
+        tuple(BNode() if isinstance(term, URIRef) and term.startswith(BASE_IRI) else term for term in triple)
+        for triple in graph
+    )
+
+
+class TestSkolem(unittest.TestCase):
+    """Tests for minting deterministic IRIs."""
+
+    def test_deterministic(self):
+        """Test that converting the same network twice with a base IRI gives the same triples, without blank nodes."""
+        for policy in ALLOWED_POLICIES:
+            with self.subTest(policy=policy):
+                first = set(iter_triples(EXAMPLE_CX, policy=policy, base_iri=BASE_IRI))
+                second = set(iter_triples(EXAMPLE_CX, policy=policy, base_iri=BASE_IRI))
+                self.assertEqual(first, second)
+                self.assertFalse(any(isinstance(term, BNode) for triple in first for term in triple))
+
+                # the same graph as with blank nodes, other than the names of the nodes
+                self.assertEqual(_anonymize(cx_to_rdf_graph(EXAMPLE_CX, policy=policy)), _anonymize_minted(first))
+
+    def test_patterns(self):
+        """Test that the IRIs follow the documented patterns."""
+        graph = cx_to_rdf_graph(EXAMPLE_CX, policy='aspect', base_iri=BASE_IRI)
+        document = URIRef(f'{BASE_IRI}/')
+        self.assertIn((document, CX.policy, CX.aspect), graph)
+
+        node = URIRef(f'{BASE_IRI}/node_1')
+        self.assertIn((node, CX.has_id, Literal(1)), graph)
+        self.assertIn((URIRef(f'{BASE_IRI}/aspect_nodes'), CX.aspect_has_attribute, node), graph)
+        self.assertIn((URIRef(f'{BASE_IRI}/nodeAttributes_1'), CX.attribute_has_name, Literal('alias')), graph)
+
+    def test_predicate_serialization(self):
+        """Test that the predicate policy gives parseable N-Triples and RDF/XML with a base IRI."""
+        text = json.dumps(EXAMPLE_CX)
+        expected = cx_to_rdf_graph(EXAMPLE_CX, policy='predicate', base_iri=BASE_IRI)
+        for rdf_format in ('nt', 'xml'):
+            with self.subTest(rdf_format=rdf_format):
+                destination = io.StringIO()
+                cx_file_to_rdf_file(io.StringIO(text), destination, policy='predicate', rdf_format=rdf_format,
+                                    base_iri=BASE_IRI)
+                graph = Graph().parse(data=destination.getvalue(), format=rdf_format)
+                self.assertEqual(set(expected), set(graph))
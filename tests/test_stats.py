@@ -0,0 +1,72 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for measuring conversions."""
+
+import io
+import json
+import unittest
+
+from cx_rdf import cx_to_rdf_graph
+from cx_rdf.columnar import ColumnarCx
+from cx_rdf.io import ALLOWED_POLICIES, cx_columns_to_rdf_graph, cx_file_to_rdf_file
+from cx_rdf.sinks import CountingSink
+from cx_rdf.stats import ConversionHooks, ConversionStats
+from cx_rdf.utils import iterate_aspect_fragments
+from tests.constants import EXAMPLE_CX
+
+
+class TestStats(unittest.TestCase):
+    """Tests for measuring conversions."""
+
+    def test_aspects(self):
+        """Test that each aspect is reported with its elements and all triples after the network's are counted."""
+        expected_elements = [(name, len(elements)) for name, elements in iterate_aspect_fragments(EXAMPLE_CX)]
+        for policy in ALLOWED_POLICIES:
+            with self.subTest(policy=policy):
+                sink = CountingSink()
+                cx_to_rdf_graph([], policy=policy, sink=sink)
+                network_triples = sink.count
+
+                sink = CountingSink()
+                stats = ConversionStats()
+                cx_to_rdf_graph(EXAMPLE_CX, policy=policy, sink=sink, hooks=stats)
+                self.assertEqual(expected_elements, [(aspect.name, aspect.elements) for aspect in stats.aspects])
+                self.assertEqual(sink.count - network_triples, stats.to_json()['total']['triples'])
+                self.assertIn('convert', stats.phases)
+
+    def test_columns(self):
+        """Test that converting columns reports the same aspects and triples as converting elements."""
+        elements, columns = ConversionStats(), ConversionStats()
+        cx_to_rdf_graph(EXAMPLE_CX, policy='aspect', sink=CountingSink(), hooks=elements)
+        cx_columns_to_rdf_graph(ColumnarCx.from_cx(EXAMPLE_CX), policy='aspect', sink=CountingSink(), hooks=columns)
+        self.assertEqual(
+            [(aspect.name, aspect.elements, aspect.triples) for aspect in elements.aspects],
+            [(aspect.name, aspect.elements, aspect.triples) for aspect in columns.aspects],
+        )
+
+    def test_phases(self):
+        """Test that parsing and serializing are reported as phases when converting a file."""
+        phases = []
+
+        class Hooks(ConversionHooks):
+            def on_phase(self, name, seconds, peak_memory=None):
+                phases.append(name)
+
+        cx_file_to_rdf_file(io.StringIO(json.dumps(EXAMPLE_CX)), io.StringIO(), policy='aspect',
+                            rdf_format='turtle', hooks=Hooks())
+        self.assertEqual(['parse', 'convert', 'serialize'], phases)
+
+    def test_report(self):
+        """Test that the report can be written as JSON."""
+        stats = ConversionStats()
+        cx_to_rdf_graph(EXAMPLE_CX, policy='aspect', hooks=stats)
+        file = io.StringIO()
+        stats.write(file)
+        report = json.loads(file.getvalue())
+        self.assertEqual(len(stats.aspects), len(report['aspects']))
+        self.assertEqual(sum(aspect.elements for aspect in stats.aspects), report['total']['elements'])
+
+    def test_workers(self):
+        """Test that conversions in several processes can't be measured."""
+        with self.assertRaises(ValueError):
+            cx_to_rdf_graph(EXAMPLE_CX, hooks=ConversionStats(), workers=2)
@@ -0,0 +1,81 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for building graphs in a store on disk."""
+
+import io
+import json
+import os
+import tempfile
+import unittest
+
+from cx_rdf import cx_to_rdf_graph
+from cx_rdf.io import ALLOWED_POLICIES, cx_file_to_rdf_store
+from cx_rdf.sinks import has_bulk_insert
+from cx_rdf.store import open_graph, SQLiteStore
+from rdflib import BNode, Literal, URIRef, XSD
+from tests.constants import EXAMPLE_CX
+
+
+class TestStore(unittest.TestCase):
+    """Tests for building graphs in a store on disk."""
+
+    def setUp(self):
+        """Make a directory for the databases."""
+        self.directory = tempfile.TemporaryDirectory()
+        self.path = os.path.join(self.directory.name, 'network.sqlite')
+
+    def tearDown(self):
+        """Remove the directory."""
+        self.directory.cleanup()
+
+    def test_reopen(self):
+        """Test that a converted graph can be reopened and queried."""
+        self.assertTrue(has_bulk_insert(SQLiteStore()))
+        base_iri = 'http://example.com/network/'
+        for policy in ALLOWED_POLICIES:
+            with self.subTest(policy=policy):
+                path = os.path.join(self.directory.name, f'{policy}.sqlite')
+                cx_file_to_rdf_store(io.StringIO(json.dumps(EXAMPLE_CX)), path, policy=policy, base_iri=base_iri)
+
+                expected = cx_to_rdf_graph(EXAMPLE_CX, policy=policy, base_iri=base_iri)
+                graph = open_graph(path, create=False)
+                self.assertEqual(len(expected), len(graph))
+                self.assertEqual(set(expected), set(graph))
+                self.assertEqual(URIRef('http://ndexbio.org/rdfs#'), graph.store.namespace('cx'))
+                graph.close()
+
+    def test_terms(self):
+        """Test that all kinds of terms survive the round trip and that patterns are matched."""
+        graph = open_graph(self.path)
+        subject, predicate = BNode(), URIRef('http://example.com/p')
+        objects = {
+            Literal('plain'),
+            Literal('hallo', lang='de'),
+            Literal(1),
+            Literal('a|b', datatype=XSD.string),
+            URIRef('http://example.com/o'),
+            BNode(),
+        }
+        graph.addN((subject, predicate, o, graph) for o in objects)
+        graph.add((subject, predicate, Literal(1)))
+        graph.commit()
+        self.assertEqual(objects, set(graph.objects(subject, predicate)))
+        self.assertEqual([subject], list(graph.subjects(predicate, Literal(1))))
+
+        graph.remove((subject, predicate, Literal('plain')))
+        graph.rollback()
+        self.assertEqual(len(objects), len(graph))
+
+        graph.remove((subject, predicate, Literal('plain')))
+        graph.close(commit_pending_transaction=True)
+        self.assertEqual(len(objects) - 1, len(open_graph(self.path, create=False)))
+
+    def test_special_characters(self):
+        """Test that a path with characters that mean something in a URI opens the right database."""
+        path = os.path.join(self.directory.name, 'a?b#c%20d.sqlite')
+        graph = open_graph(path)
+        graph.add((URIRef('http://example.com/s'), URIRef('http://example.com/p'), Literal(1)))
+        graph.close(commit_pending_transaction=True)
+
+        self.assertEqual(['a?b#c%20d.sqlite'], os.listdir(self.directory.name))
+        self.assertEqual(1, len(open_graph(path, create=False)))
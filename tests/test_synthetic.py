@@ -0,0 +1,52 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for generating synthetic networks."""
+
+import unittest
+
+from cx_rdf import cx_to_rdf_graph
+from cx_rdf.io import ALLOWED_POLICIES
+from cx_rdf.synthetic import generate_cx
+from cx_rdf.utils import iterate_aspect_fragments
+
+
+class TestSynthetic(unittest.TestCase):
+    """Tests for generating synthetic networks."""
+
+    def test_seed(self):
+        """Test that the same seed gives the same network and a different seed a different one."""
+        self.assertEqual(generate_cx(seed=3), generate_cx(seed=3))
+        self.assertNotEqual(generate_cx(seed=3), generate_cx(seed=4))
+
+    def test_counts(self):
+        """Test that the aspects have the requested number of elements and the metadata agrees."""
+        cx_json = generate_cx(nodes=20, edges=30, node_attributes=40, edge_attributes=10, network_attributes=3,
+                              citations=4, supports=5)
+        aspects = {}
+        for aspect_name, elements in iterate_aspect_fragments(cx_json):
+            aspects.setdefault(aspect_name, []).extend(elements)
+
+        expected = dict(nodes=20, edges=30, nodeAttributes=40, edgeAttributes=10, networkAttributes=3, citations=4,
+                        edgeCitations=4, supports=5, edgeSupports=5)
+        for aspect_name, count in expected.items():
+            with self.subTest(aspect=aspect_name):
+                self.assertEqual(count, len(aspects[aspect_name]))
+
+        for metadata in aspects['metaData']:
+            with self.subTest(aspect=metadata['name']):
+                self.assertEqual(len(aspects[metadata['name']]), metadata['elementCount'])
+
+        node_ids = {node['@id'] for node in aspects['nodes']}
+        for edge in aspects['edges']:
+            self.assertIn(edge['s'], node_ids)
+            self.assertIn(edge['t'], node_ids)
+
+        lists = [attribute for attribute in aspects['nodeAttributes'] if attribute.get('d') == 'list_of_string']
+        self.assertEqual(8, len(lists))
+
+    def test_convert(self):
+        """Test that the synthetic networks can be converted with all policies."""
+        cx_json = generate_cx(nodes=20, edges=30, node_attributes=40, edge_attributes=10)
+        for policy in ALLOWED_POLICIES:
+            with self.subTest(policy=policy):
+                self.assertLess(0, len(cx_to_rdf_graph(cx_json, policy=policy)))
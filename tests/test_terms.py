@@ -0,0 +1,73 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for interning RDF terms."""
+
+import pickle
+import unittest
+
+from cx_rdf.constants import CX, CX_TERMS
+from cx_rdf.terms import TermFactory
+from rdflib import Literal, URIRef, XSD
+
+
+class TestTerms(unittest.TestCase):
+    """Tests for interning RDF terms."""
+
+    def test_literals(self):
+        """Test that literals are reused, without mixing up equal values of different types."""
+        terms = TermFactory(maxsize=2)
+        self.assertIs(terms.literal('Color'), terms.literal('Color'))
+
+        self.assertEqual(XSD.integer, terms.literal(1).datatype)
+        self.assertEqual(XSD.double, terms.literal(1.0).datatype)
+        self.assertEqual(XSD.boolean, terms.literal(True).datatype)
+
+        # unhashable values still work, just without being interned
+        self.assertEqual(Literal(['a', 'b']), terms.literal(['a', 'b']))
+
+    def test_literal_factories(self):
+        """Test that the values of each CX data type get literals with its XSD datatype."""
+        terms = TermFactory()
+        for data_type, value, expected in (
+            ('double', 1, Literal('1.0', datatype=XSD.double)),
+            ('double', '2.5', Literal(2.5)),
+            ('list_of_double', float('inf'), Literal('INF', datatype=XSD.double, normalize=False)),
+            ('double', float('-inf'), Literal('-INF', datatype=XSD.double, normalize=False)),
+            ('long', 1 << 63, Literal(1 << 63)),
+            ('integer', 3, Literal(3)),
+            ('integer', 3.0, Literal(3)),
+            ('long', 4, Literal('4', datatype=XSD.long)),
+            ('boolean', False, Literal(False)),
+            ('list_of_boolean', 'true', Literal(True)),
+            ('string', 5, Literal(5)),
+            (None, 'Red', Literal('Red')),
+        ):
+            with self.subTest(data_type=data_type, value=value):
+                literal = terms.get_literal_factory(data_type)(value)
+                self.assertEqual(expected, literal)
+                self.assertEqual(expected.n3(), literal.n3())
+                self.assertEqual(hash(expected), hash(literal))
+                self.assertEqual(expected.toPython(), literal.toPython())
+
+        self.assertIs(terms.get_literal_factory('double'), terms.get_literal_factory('double'))
+
+        nan = terms.get_literal_factory('double')(float('nan'))
+        self.assertEqual(('NaN', XSD.double), (str(nan), nan.datatype))
+
+        # values that don't fit their data type and unknown data types fall back to inference
+        self.assertEqual(Literal('red'), terms.get_literal_factory('double')('red'))
+        self.assertEqual(Literal(2.5), terms.get_literal_factory('integer')(2.5))
+        self.assertEqual(Literal(1), terms.get_literal_factory('list_of_unknown')(1))
+
+    def test_namespace(self):
+        """Test that the CX vocabulary is precomputed and other terms still work."""
+        for term in CX_TERMS:
+            self.assertIs(getattr(CX, term), getattr(CX, term))
+            self.assertEqual(URIRef(f'http://ndexbio.org/rdfs#{term}'), getattr(CX, term))
+
+        self.assertEqual(URIRef('http://ndexbio.org/rdfs#not_in_vocabulary'), CX.not_in_vocabulary)
+        self.assertEqual(URIRef('http://ndexbio.org/rdfs#has-dash'), CX['has-dash'])
+
+        namespace = pickle.loads(pickle.dumps(CX))
+        self.assertEqual(CX, namespace)
+        self.assertEqual(CX.has_node, namespace.has_node)
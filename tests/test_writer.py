@@ -0,0 +1,60 @@
+# -*- coding: utf-8 -*-
+
+"""Tests for writing CX incrementally."""
+
+import io
+import json
+import unittest
+
+from cx_rdf.reader import iterate_cx_elements
+from cx_rdf.writer import CxWriter
+
+
+class TestWriter(unittest.TestCase):
+    """Tests for writing CX incrementally."""
+
+    def test_fragments(self):
+        """Test that elements are written in fragments no bigger than the given size, in the order they came."""
+        elements = [
+            ('nodes', {'@id': 0, 'n': 'A'}),
+            ('edges', {'@id': 3, 's': 0, 't': 1}),
+            ('nodes', {'@id': 1, 'n': 'B'}),
+            ('nodes', {'@id': 2, 'n': 'C'}),
+        ]
+        file = io.StringIO()
+        with CxWriter(file, fragment_size=2) as writer:
+            writer.add_all(elements)
+            writer.add('metaData', {'name': 'nodes', 'version': '2.0', 'elementCount': 100, 'idCounter': 100})
+
+        cx_json = json.loads(file.getvalue())
+        self.assertEqual(
+            [
+                {'numberVerification': [{'longNumber': 281474976710655}]},
+                {'nodes': [{'@id': 0, 'n': 'A'}, {'@id': 1, 'n': 'B'}]},
+                {'nodes': [{'@id': 2, 'n': 'C'}]},
+                {'edges': [{'@id': 3, 's': 0, 't': 1}]},
+                {'metaData': [
+                    {'name': 'nodes', 'elementCount': 3, 'version': '2.0', 'consistencyGroup': 1, 'idCounter': 2},
+                    {'name': 'edges', 'elementCount': 1, 'version': '1.0', 'consistencyGroup': 1, 'idCounter': 3},
+                ]},
+            ],
+            cx_json,
+        )
+        self.assertEqual(7, len(list(iterate_cx_elements(io.StringIO(file.getvalue())))))
+
+    def test_empty(self):
+        """Test that a document without any elements is still valid CX."""
+        file = io.StringIO()
+        CxWriter(file).close()
+        self.assertEqual(
+            [{'numberVerification': [{'longNumber': 281474976710655}]}, {'metaData': []}],
+            json.loads(file.getvalue()),
+        )
+
+    def test_indent(self):
+        """Test that a pretty printed document is the same as what :func:`json.dump` would write."""
+        file = io.StringIO()
+        with CxWriter(file, indent=2) as writer:
+            writer.add('nodes', {'@id': 0, 'n': 'A'})
+            writer.add('edges', {'@id': 0, 's': 0, 't': 0})
+        self.assertEqual(json.dumps(json.loads(file.getvalue()), indent=2) + '\n', file.getvalue())